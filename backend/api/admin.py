@@ -5,7 +5,12 @@ Also includes debugging utilities for Firebase Auth and Firestore sync.
 """
 from flask import request, jsonify
 from . import admin_bp, users_bp
+from . import profile_cache
 from firebase_admin import auth, firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+from . import aggregates, counters, jobs
+from .data_access import apply_update, version
+from .pagination import InvalidCursor, fetch_filtered_page, fetch_page, page_args
 from datetime import datetime, timezone
 
 def now_iso():
@@ -20,7 +25,7 @@ def _get_admin_id():
 def _verify_admin_access(admin_id):
     """Verify user is an admin."""
     db = firestore.client()
-    admin_doc = db.collection("users").document(admin_id).get()
+    admin_doc = profile_cache.get_user(db, admin_id)
     
     if not admin_doc.exists:
         return None, jsonify({"error": "Admin user not found"}), 404
@@ -50,56 +55,19 @@ def get_admin_dashboard():
     if error_response:
         return error_response, status_code
     
-    # Get all users
-    users_query = db.collection("users").stream()
-    all_users = []
-    role_breakdown = {
-        "staff": 0,
-        "manager": 0,
-        "admin": 0
-    }
-    active_users = 0
-    
-    for user_doc in users_query:
-        user_data = user_doc.to_dict()
-        user_data["user_id"] = user_doc.id
-        all_users.append(user_data)
-        
-        role = user_data.get("role", "staff")
-        if role in role_breakdown:
-            role_breakdown[role] += 1
-        
-        if user_data.get("is_active", True):
-            active_users += 1
+    stats = counters.read_dashboard(db)
+    if stats is None:
+        # Counters not seeded yet (no seeded_at marker): count everything once
+        stats = counters.rebuild(db)
+    totals = stats["totals"]
+    users_by_role = {"staff": 0, "manager": 0, "admin": 0}
+    users_by_role.update(stats["users_by_role"])
     
-    # Get all tasks
-    tasks_query = db.collection("tasks").stream()
-    all_tasks = []
-    status_breakdown = {}
-    priority_breakdown = {}
-    
-    for task_doc in tasks_query:
-        task_data = task_doc.to_dict()
-        task_data["task_id"] = task_doc.id
-        all_tasks.append(task_data)
-        
-        status = task_data.get("status", "To Do")
-        status_breakdown[status] = status_breakdown.get(status, 0) + 1
-        
-        priority = task_data.get("priority", 5)
-        priority_breakdown[f"Priority {priority}"] = priority_breakdown.get(f"Priority {priority}", 0) + 1
-    
-    # Get all projects
-    projects_query = db.collection("projects").stream()
-    all_projects = []
-    
-    for project_doc in projects_query:
-        project_data = project_doc.to_dict()
-        project_data["project_id"] = project_doc.id
-        all_projects.append(project_data)
-    
-    # Sort users by creation date (most recent first)
-    sorted_users = sorted(all_users, key=lambda x: x.get("created_at", ""), reverse=True)
+    def recent(collection, id_field, n):
+        query = db.collection(collection) \
+                  .order_by("created_at", direction=firestore.Query.DESCENDING) \
+                  .limit(n)
+        return [{**(d.to_dict() or {}), id_field: d.id} for d in query.stream()]
     
     return jsonify({
         "view": "admin",
@@ -110,23 +78,73 @@ def get_admin_dashboard():
             "role": "admin"
         },
         "statistics": {
-            "total_users": len(all_users),
-            "active_users": active_users,
-            "inactive_users": len(all_users) - active_users,
-            "users_by_role": role_breakdown,
-            "total_tasks": len(all_tasks),
-            "tasks_by_status": status_breakdown,
-            "tasks_by_priority": priority_breakdown,
-            "total_projects": len(all_projects)
+            "total_users": totals.get("users", 0),
+            "active_users": totals.get("active_users", 0),
+            "inactive_users": totals.get("users", 0) - totals.get("active_users", 0),
+            "users_by_role": users_by_role,
+            "total_tasks": totals.get("tasks", 0),
+            "tasks_by_status": stats["tasks_by_status"],
+            "tasks_by_priority": stats["tasks_by_priority"],
+            "total_projects": totals.get("projects", 0)
         },
-        "recent_users": sorted_users[:10],
-        "recent_tasks": sorted(all_tasks, key=lambda x: x.get("created_at", ""), reverse=True)[:20],
-        "all_projects": all_projects
+        "recent_users": recent("users", "user_id", 10),
+        "recent_tasks": recent("tasks", "task_id", 20),
+        "recent_projects": recent("projects", "project_id", 10)
     }), 200
 
+# Breakdowns reported by /statistics, each one aggregation query
+STATISTICS_TASK_STATUSES = ["To Do", "In Progress", "Completed", "Blocked"]
+STATISTICS_USER_ROLES = ["staff", "manager", "director", "hr", "admin"]
+
+def _compute_system_statistics(db):
+    """Run every count for /statistics as concurrent aggregation queries."""
+    users = db.collection("users")
+    tasks = db.collection("tasks")
+    queries = [
+        ("users", users),
+        ("tasks", tasks),
+        ("projects", db.collection("projects")),
+        ("memberships", db.collection("memberships")),
+        # is_active defaults to True, so count the explicit False ones
+        ("inactive_users", users.where(filter=FieldFilter("is_active", "==", False))),
+    ]
+    queries += [
+        (f"status:{status}", tasks.where(filter=FieldFilter("status", "==", status)))
+        for status in STATISTICS_TASK_STATUSES
+    ]
+    queries += [
+        (f"role:{role}", users.where(filter=FieldFilter("role", "==", role)))
+        for role in STATISTICS_USER_ROLES
+    ]
+    counts = aggregates.count_queries(queries)
+    
+    users_count = counts["users"]
+    tasks_count = counts["tasks"]
+    projects_count = counts["projects"]
+    memberships_count = counts["memberships"]
+    return {
+        "system_statistics": {
+            "users": users_count,
+            "tasks": tasks_count,
+            "projects": projects_count,
+            "project_memberships": memberships_count,
+            "average_tasks_per_user": round(tasks_count / users_count, 2) if users_count > 0 else 0,
+            "average_members_per_project": round(memberships_count / projects_count, 2) if projects_count > 0 else 0,
+            "active_users": users_count - counts["inactive_users"],
+            "inactive_users": counts["inactive_users"],
+            "tasks_by_status": {s: counts[f"status:{s}"] for s in STATISTICS_TASK_STATUSES},
+            "users_by_role": {r: counts[f"role:{r}"] for r in STATISTICS_USER_ROLES},
+        },
+        "generated_at": now_iso()
+    }
+
 @admin_bp.get("/statistics")
 def get_system_statistics():
-    """Get detailed system analytics."""
+    """Get detailed system analytics.
+    
+    Counts come from Firestore count() aggregations and are cached for
+    STATS_CACHE_TTL_SECONDS; `generated_at` tells when they were computed.
+    """
     db = firestore.client()
     admin_id = _get_admin_id()
     
@@ -138,23 +156,29 @@ def get_system_statistics():
     if error_response:
         return error_response, status_code
     
-    # Calculate statistics
-    users_count = len(list(db.collection("users").stream()))
-    tasks_count = len(list(db.collection("tasks").stream()))
-    projects_count = len(list(db.collection("projects").stream()))
-    memberships_count = len(list(db.collection("memberships").stream()))
+    stats, from_cache = aggregates.cached(aggregates.SYSTEM_STATISTICS, lambda: _compute_system_statistics(db))
+    return jsonify({**stats, "cached": from_cache}), 200
+
+@admin_bp.get("/jobs")
+def get_job_status():
+    """Status of the periodic background jobs.
     
-    return jsonify({
-        "system_statistics": {
-            "users": users_count,
-            "tasks": tasks_count,
-            "projects": projects_count,
-            "project_memberships": memberships_count,
-            "average_tasks_per_user": round(tasks_count / users_count, 2) if users_count > 0 else 0,
-            "average_members_per_project": round(memberships_count / projects_count, 2) if projects_count > 0 else 0
-        },
-        "generated_at": now_iso()
-    }), 200
+    Returns which instance holds the scheduler lease, and for every job its
+    schedule, next run on this instance and the outcome and duration of its
+    last run.
+    """
+    db = firestore.client()
+    admin_id = _get_admin_id()
+    
+    if not admin_id:
+        return jsonify({"error": "admin_id required via X-User-Id header or ?admin_id"}), 401
+    
+    # Verify admin access
+    admin_data, error_response, status_code = _verify_admin_access(admin_id)
+    if error_response:
+        return error_response, status_code
+    
+    return jsonify({**jobs.status(db), "generated_at": now_iso()}), 200
 
 # ========== USER MANAGEMENT (Admin.addStaff, Admin.addManager, Admin.removeStaff, Admin.removeManager) ==========
 
@@ -167,6 +191,9 @@ def get_all_users():
     Query params:
     - role: Filter by role (staff, manager, admin)
     - status: Filter by status (active, inactive)
+    - limit, cursor: Page size and the previous page's next_cursor
+    
+    `total` counts every user matching the filters, not just this page.
     """
     db = firestore.client()
     admin_id = _get_admin_id()
@@ -182,30 +209,42 @@ def get_all_users():
     # Get query parameters
     role_filter = request.args.get("role")
     status_filter = request.args.get("status")
+    try:
+        limit, cursor = page_args()
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    
+    users_ref = db.collection("users")
+    query = users_ref
+    if role_filter:
+        query = query.where(filter=FieldFilter("role", "==", role_filter))
+    inactive = query.where(filter=FieldFilter("is_active", "==", False))
+    # is_active defaults to True, so users without the field are active; a
+    # where clause would leave them out, and the page drops inactive ones instead
+    def is_active(doc):
+        return (doc.to_dict() or {}).get("is_active", True)
+    keep = is_active if status_filter == "active" else None
+    if status_filter == "inactive":
+        query = inactive
+    user_docs, next_cursor = fetch_filtered_page(users_ref, query, [], limit, cursor, keep=keep)
+    
+    # Total matching users across all pages, from count() aggregations
+    if status_filter == "active":
+        counts = aggregates.count_queries([("all", query), ("inactive", inactive)])
+        total = counts["all"] - counts["inactive"]
+    else:
+        total = aggregates.count_queries([("all", query)])["all"]
     
     users = []
-    users_query = db.collection("users").stream()
-    
-    for user_doc in users_query:
+    for user_doc in user_docs:
         user_data = user_doc.to_dict()
         user_data["user_id"] = user_doc.id
-        
-        # Apply role filter
-        if role_filter and user_data.get("role") != role_filter:
-            continue
-        
-        # Apply status filter
-        is_active = user_data.get("is_active", True)
-        if status_filter == "active" and not is_active:
-            continue
-        if status_filter == "inactive" and is_active:
-            continue
-        
         users.append(user_data)
     
     return jsonify({
         "users": users,
-        "total": len(users),
+        "total": total,
+        "next_cursor": next_cursor,
         "filters": {
             "role": role_filter,
             "status": status_filter
@@ -266,6 +305,7 @@ def add_staff():
         }
         
         db.collection("users").document(firebase_user.uid).set(staff_doc)
+        counters.record_user(db, after=staff_doc)
         
         return jsonify({
             "success": True,
@@ -339,6 +379,7 @@ def add_manager():
         }
         
         db.collection("users").document(firebase_user.uid).set(manager_doc)
+        counters.record_user(db, after=manager_doc)
         
         return jsonify({
             "success": True,
@@ -393,6 +434,8 @@ def remove_staff(user_id):
     if hard_delete:
         # Hard delete
         user_ref.delete()
+        profile_cache.invalidate(user_id)
+        counters.record_user(db, before=user_data)
         try:
             auth.delete_user(user_id)
         except Exception:
@@ -411,6 +454,8 @@ def remove_staff(user_id):
             "removed_at": now_iso(),
             "removed_by": admin_id
         })
+        profile_cache.invalidate(user_id)
+        counters.record_user(db, before=user_data, updates={"is_active": False})
         
         # Disable in Firebase Auth
         try:
@@ -468,6 +513,8 @@ def remove_manager(user_id):
     if hard_delete:
         # Hard delete
         user_ref.delete()
+        profile_cache.invalidate(user_id)
+        counters.record_user(db, before=user_data)
         try:
             auth.delete_user(user_id)
         except Exception:
@@ -486,6 +533,8 @@ def remove_manager(user_id):
             "removed_at": now_iso(),
             "removed_by": admin_id
         })
+        profile_cache.invalidate(user_id)
+        counters.record_user(db, before=user_data, updates={"is_active": False})
         
         # Disable in Firebase Auth
         try:
@@ -545,6 +594,8 @@ def change_user_role(user_id):
         "updated_at": now_iso(),
         "updated_by": admin_id
     })
+    profile_cache.invalidate(user_id)
+    counters.record_user(db, before=user_doc.to_dict(), updates={"role": new_role})
     
     return jsonify({
         "success": True,
@@ -596,6 +647,8 @@ def change_user_status(user_id):
         "updated_at": now_iso(),
         "updated_by": admin_id
     })
+    profile_cache.invalidate(user_id)
+    counters.record_user(db, before=user_doc.to_dict(), updates={"is_active": is_active})
     
     # Update Firebase Auth
     try:
@@ -660,21 +713,21 @@ def change_user_department(user_id):
 
     # Update department
     try:
-        user_ref.update({
+        updated = apply_update(user_ref, user_doc, {
             "department": department,
             "updated_at": now_iso(),
             "updated_by": admin_id
         })
     except Exception as e:
         return jsonify({"error": f"Failed to update department: {str(e)}"}), 500
-
-    updated_doc = user_ref.get().to_dict()
+    profile_cache.invalidate(user_id)
 
     return jsonify({
         "success": True,
         "message": "Department updated",
         "user_id": user_id,
-        "department": updated_doc.get("department", "")
+        "department": updated.to_dict().get("department", ""),
+        "version": version(updated)
     }), 200
 
 # ========== SYSTEM OVERVIEW (Read-only for Admin) ==========
@@ -723,6 +776,7 @@ def get_all_tasks():
     Query params:
     - status: Filter by status
     - priority: Filter by priority
+    - limit, cursor: Page size and the previous page's next_cursor
     """
     db = firestore.client()
     admin_id = _get_admin_id()
@@ -738,11 +792,17 @@ def get_all_tasks():
     # Get query parameters
     status_filter = request.args.get("status")
     priority_filter = request.args.get("priority")
+    try:
+        limit, cursor = page_args()
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     
-    tasks = []
-    tasks_query = db.collection("tasks").stream()
+    # Filters apply to the page, so a filtered page may hold fewer than limit tasks
+    tasks_ref = db.collection("tasks")
+    task_docs, next_cursor = fetch_page(tasks_ref, tasks_ref, [], limit, cursor)
     
-    for task_doc in tasks_query:
+    tasks = []
+    for task_doc in task_docs:
         task_data = task_doc.to_dict()
         task_data["task_id"] = task_doc.id
         
@@ -757,6 +817,7 @@ def get_all_tasks():
     return jsonify({
         "tasks": tasks,
         "total": len(tasks),
+        "next_cursor": next_cursor,
         "filters": {
             "status": status_filter,
             "priority": priority_filter
@@ -850,8 +911,11 @@ def cleanup_user(user_id):
     # Delete from Firestore
     try:
         user_ref = db.collection("users").document(user_id)
-        if user_ref.get().exists:
+        user_snap = user_ref.get()
+        if user_snap.exists:
             user_ref.delete()
+            profile_cache.invalidate(user_id)
+            counters.record_user(db, before=user_snap.to_dict())
             results["firestore_deleted"] = True
         else:
             results["errors"].append("User not found in Firestore")
@@ -925,6 +989,7 @@ def sync_user(user_id):
             db.collection("users").document(user_id).update({
                 "firebase_uid": firebase_user.uid
             })
+            profile_cache.invalidate(user_id)
             
             return jsonify({
                 "status": "✅ Synced",
@@ -953,6 +1018,8 @@ def sync_user(user_id):
         }
         
         db.collection("users").document(user_id).set(user_doc)
+        counters.record_user(db, after=user_doc)
+        profile_cache.invalidate(user_id)
         
         return jsonify({
             "status": "✅ Synced",
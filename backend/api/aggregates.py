@@ -0,0 +1,83 @@
+"""
+Document counts via Firestore aggregation queries.
+
+`query.count()` is evaluated server-side and billed at one read per 1000
+index entries, instead of downloading every matching document just to take
+`len()` of it. `count_queries` runs a batch of labelled count queries
+concurrently (aggregation queries stream like normal ones, so they go through
+query_fanout) and returns {label: count}.
+
+`cached` keeps computed values for STATS_CACHE_TTL_SECONDS so dashboards that
+poll the same statistics do not re-run the aggregations on every request.
+Writes that change what SYSTEM_STATISTICS counts call `invalidate` (the
+dashboard counters do it for users, tasks and projects), so this instance
+recomputes on the next request; other instances catch up within the TTL.
+"""
+import os
+import threading
+import time
+
+from .query_fanout import run_queries
+
+STATS_CACHE_TTL_SECONDS = float(os.getenv("STATS_CACHE_TTL_SECONDS", "60"))
+
+# Cache key of the /api/admin/statistics counts
+SYSTEM_STATISTICS = "system_statistics"
+
+_COUNT_ALIAS = "count"
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def count_queries(queries):
+    """Count each `(label, query)` pair; returns {label: int}.
+
+    Raises the first query error, since a silently missing count would read
+    as zero.
+    """
+    results = run_queries((label, query.count(alias=_COUNT_ALIAS)) for label, query in queries)
+    counts = {}
+    for result in results:
+        if result.error is not None:
+            raise result.error
+        counts[result.label] = _count_value(result.docs)
+    return counts
+
+
+def _count_value(rows):
+    # An aggregation query streams one row: a list of AggregationResult
+    for row in rows:
+        for aggregate in row:
+            if getattr(aggregate, "alias", _COUNT_ALIAS) == _COUNT_ALIAS:
+                return int(aggregate.value)
+    return 0
+
+
+def cached(key, compute, ttl_seconds=None, clock=time.monotonic):
+    """Return the cached value for `key`, calling `compute()` once it expired.
+
+    Returns (value, from_cache).
+    """
+    ttl = STATS_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    now = clock()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1], True
+    value = compute()
+    with _cache_lock:
+        _cache[key] = (clock() + ttl, value)
+    return value, False
+
+
+def invalidate(key):
+    """Drop `key` so the next `cached` call recomputes it."""
+    with _cache_lock:
+        _cache.pop(key, None)
+
+
+def clear():
+    """Empty the cache (used by tests and maintenance scripts)."""
+    with _cache_lock:
+        _cache.clear()
@@ -6,6 +6,7 @@ from datetime import datetime, timezone
 from flask import request, jsonify
 from . import users_bp
 from firebase_admin import auth, firestore
+from . import counters, profile_cache
 from google.cloud.firestore_v1.base_query import FieldFilter
 import requests
 import os
@@ -75,6 +76,10 @@ def register_user():
             "firebase_uid": firebase_user.uid
         }
         user_ref.set(user_doc)
+        counters.record_user(db, after=user_doc)
+        # Drop a profile this instance may still cache for a user with the same
+        # id who was deleted (through another instance) within the cache TTL
+        profile_cache.invalidate(user_id)
         
         # Generate custom token for client
         custom_token = auth.create_custom_token(user_id)
@@ -0,0 +1,69 @@
+"""
+Write batches of any size.
+
+Firestore caps a WriteBatch at BATCH_LIMIT writes. Rebuilds, backfills and
+cascading deletes write more than that, so they queue their writes on a
+`Batcher`, which starts a new batch whenever the current one is full and
+commits whatever is left on `flush()`:
+
+    writer = Batcher(db)
+    for doc in stale:
+        writer.delete(doc.reference)
+    writer.flush()
+
+A Batcher has the write methods of a WriteBatch, so helpers that queue writes
+on "a batch, transaction or BulkWriter" (unread_counter.add,
+tag_index.release_tasks, ...) accept it too. Writes that must land together
+call `reserve` first so they never straddle two batches.
+"""
+BATCH_LIMIT = 500
+
+
+class Batcher:
+    """Accumulates writes and commits them `limit` (default BATCH_LIMIT) at a time."""
+
+    def __init__(self, db, limit=None):
+        self._db = db
+        self._limit = limit or BATCH_LIMIT
+        self._batch = db.batch()
+        self._pending = 0
+        self.commits = 0
+
+    def fits(self, writes):
+        """Whether `writes` more writes fit in the current batch."""
+        return self._pending + writes <= self._limit
+
+    def reserve(self, writes):
+        """Commit the current batch first unless `writes` more writes fit in it."""
+        if not self.fits(writes):
+            self.flush()
+
+    def _add(self):
+        self.reserve(1)
+        self._pending += 1
+        return self._batch
+
+    # Same arguments as the WriteBatch methods
+    def create(self, ref, data):
+        self._add().create(ref, data)
+
+    def set(self, ref, data, **kwargs):
+        self._add().set(ref, data, **kwargs)
+
+    def update(self, ref, data, **kwargs):
+        self._add().update(ref, data, **kwargs)
+
+    def delete(self, ref, **kwargs):
+        self._add().delete(ref, **kwargs)
+
+    def flush(self):
+        """Commit the queued writes, if any.
+
+        A batch that fails to commit is dropped, so the Batcher can be used
+        again for the writes that follow.
+        """
+        if not self._pending:
+            return
+        batch, self._batch, self._pending = self._batch, self._db.batch(), 0
+        self.commits += 1
+        batch.commit()
@@ -0,0 +1,220 @@
+"""
+Materialized counters behind the admin dashboard.
+
+Instead of streaming every user, task and project on each dashboard load, the
+endpoints that create, change or delete those documents call `record_user`,
+`record_task` or `record_project` with the document before and after the
+write. The difference is applied with `firestore.Increment` to one of
+COUNTER_SHARDS shard documents under
+
+    counters/admin_dashboard/shards/{0..N-1}
+
+so busy write paths do not contend on a single document. `read_dashboard`
+sums the shards: a constant number of reads however large the tenant grows.
+
+Shard layout (every leaf is an integer):
+
+    {"totals": {"users": .., "active_users": .., "tasks": .., "projects": ..},
+     "users_by_role": {"staff": .., ...},
+     "tasks_by_status": {"To Do": .., ...},
+     "tasks_by_priority": {"Priority 5": .., ...}}
+
+`rebuild` recomputes everything from the collections and stamps `seeded_at`
+on counters/admin_dashboard. Until that marker exists the shards only hold
+the changes made since the counters were deployed, so `read_dashboard`
+reports them as unseeded and the dashboard rebuilds first; run
+backend/rebuild_dashboard_counters.py to seed ahead of time or whenever the
+counters are suspected to have drifted. `check_drift` compares the totals
+with count() aggregations without writing anything.
+"""
+import os
+import random
+from collections import Counter
+from datetime import datetime, timezone
+
+from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from . import aggregates
+
+COUNTER_COLLECTION = "counters"
+DASHBOARD_COUNTER = "admin_dashboard"
+COUNTER_SHARDS = int(os.getenv("COUNTER_SHARDS", "8"))
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _user_keys(data):
+    if data is None:
+        return []
+    keys = [("totals", "users"), ("users_by_role", data.get("role") or "staff")]
+    if data.get("is_active", True):
+        keys.append(("totals", "active_users"))
+    return keys
+
+
+def _task_keys(data):
+    if data is None:
+        return []
+    return [
+        ("totals", "tasks"),
+        ("tasks_by_status", data.get("status") or "To Do"),
+        ("tasks_by_priority", f"Priority {data.get('priority', 5)}"),
+    ]
+
+
+def _project_keys(data):
+    if data is None:
+        return []
+    return [("totals", "projects")]
+
+
+def _counter_ref(db):
+    return db.collection(COUNTER_COLLECTION).document(DASHBOARD_COUNTER)
+
+
+def _shards(db):
+    return _counter_ref(db).collection("shards")
+
+
+def _nest(flat):
+    nested = {}
+    for (group, name), value in flat.items():
+        nested.setdefault(group, {})[name] = value
+    return nested
+
+
+def _apply(db, deltas):
+    try:
+        changes = {key: firestore.Increment(delta) for key, delta in deltas.items() if delta}
+        if not changes:
+            return
+        # The cached /statistics counts cover the same documents
+        aggregates.invalidate(aggregates.SYSTEM_STATISTICS)
+        shard = _shards(db).document(str(random.randrange(COUNTER_SHARDS)))
+        shard.set(_nest(changes), merge=True)
+    except Exception as e:
+        # Counters are advisory; never fail the write that triggered them
+        print(f"Failed to update dashboard counters: {e}")
+
+
+def _record(db, key_fn, before, after, updates):
+    if updates is not None:
+        after = {**(before or {}), **updates}
+    deltas = Counter()
+    for key in key_fn(before):
+        deltas[key] -= 1
+    for key in key_fn(after):
+        deltas[key] += 1
+    _apply(db, deltas)
+
+
+def record_user(db, before=None, after=None, updates=None):
+    """Account for a user document going from `before` to `after`.
+
+    None means the document does not exist (created / deleted). Pass
+    `updates` instead of `after` for a partial update of `before`.
+    """
+    _record(db, _user_keys, before, after, updates)
+
+
+def record_task(db, before=None, after=None, updates=None):
+    """Same as `record_user`, for task documents."""
+    _record(db, _task_keys, before, after, updates)
+
+
+def record_tasks_deleted(db, tasks):
+    """Account for deleting every task in `tasks` (their data) with one write."""
+    deltas = Counter()
+    for data in tasks:
+        for key in _task_keys(data):
+            deltas[key] -= 1
+    _apply(db, deltas)
+
+
+def record_project(db, before=None, after=None, updates=None):
+    """Same as `record_user`, for project documents."""
+    _record(db, _project_keys, before, after, updates)
+
+
+def _empty():
+    return {
+        "totals": {"users": 0, "active_users": 0, "tasks": 0, "projects": 0},
+        "users_by_role": {},
+        "tasks_by_status": {},
+        "tasks_by_priority": {},
+    }
+
+
+def read_dashboard(db):
+    """Sum the counter shards, or None if the counters were never seeded."""
+    marker = _counter_ref(db).get()
+    if not marker.exists or not (marker.to_dict() or {}).get("seeded_at"):
+        # Shards written before the first rebuild miss everything older
+        return None
+    shards = list(_shards(db).stream())
+    totals = _empty()
+    for shard in shards:
+        for group, values in (shard.to_dict() or {}).items():
+            if not isinstance(values, dict):
+                continue
+            bucket = totals.setdefault(group, {})
+            for name, value in values.items():
+                bucket[name] = bucket.get(name, 0) + (value or 0)
+    return totals
+
+
+def rebuild(db):
+    """Recount users, tasks and projects and overwrite the counter shards.
+
+    Streams the three collections once; writes that land while it runs may
+    be counted twice or not at all, so run it when the app is quiet.
+    """
+    flat = Counter()
+    for collection, key_fn in (("users", _user_keys), ("tasks", _task_keys), ("projects", _project_keys)):
+        for doc in db.collection(collection).stream():
+            for key in key_fn(doc.to_dict() or {}):
+                flat[key] += 1
+
+    totals = _empty()
+    for group, values in _nest(flat).items():
+        totals[group].update(values)
+
+    shards = _shards(db)
+    batch = db.batch()
+    batch.set(shards.document("0"), totals)
+    for shard in shards.stream():
+        if shard.id != "0":
+            batch.delete(shard.reference)
+    batch.set(_counter_ref(db), {"seeded_at": now_iso()}, merge=True)
+    batch.commit()
+    return totals
+
+
+def check_drift(db):
+    """Compare the seeded totals with count() aggregations; writes nothing.
+
+    Returns {total: {"stored": .., "counted": ..}} for every total that
+    differs (empty when in step), or None if the counters were never seeded.
+    The breakdowns are not checked: their buckets come from defaults that a
+    count() query cannot select.
+    """
+    stored = read_dashboard(db)
+    if stored is None:
+        return None
+    users = db.collection("users")
+    counted = aggregates.count_queries([
+        ("users", users),
+        ("inactive_users", users.where(filter=FieldFilter("is_active", "==", False))),
+        ("tasks", db.collection("tasks")),
+        ("projects", db.collection("projects")),
+    ])
+    # A user without is_active counts as active
+    counted["active_users"] = counted["users"] - counted.pop("inactive_users")
+    return {
+        name: {"stored": stored["totals"].get(name, 0), "counted": value}
+        for name, value in counted.items()
+        if stored["totals"].get(name, 0) != value
+    }
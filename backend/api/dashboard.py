@@ -2,7 +2,9 @@ from datetime import datetime, timezone, timedelta
 from flask import jsonify, request
 from . import dashboard_bp
 from firebase_admin import firestore
-from google.cloud.firestore_v1.base_query import FieldFilter
+from .projection import requested_fields, select_fields, trim
+from .participants import assignee_ids, creator_id, tasks_for
+from . import due_dates
 
 def task_to_json(d):
     data = d.to_dict()
@@ -37,11 +39,26 @@ def task_to_json(d):
         "archived": data.get("archived", False),
     }
 
-def enrich_task_with_timeline_status(task):
-    """Add timeline-specific status flags to task"""
+# Document fields read by task_to_json
+DASHBOARD_TASK_FIELDS = [
+    "title", "description", "priority", "status", "due_date", "created_at",
+    "created_by", "assigned_to", "project_id", "labels", "archived",
+]
+# Fields the statistics and timeline need regardless of ?fields=
+DASHBOARD_REQUIRED_FIELDS = ("priority", "status", "due_date", due_dates.DUE_TS_FIELD, "created_at", "archived",
+                             "created_by", "assigned_to")
+# Keys added by enrich_task_with_timeline_status
+TIMELINE_KEYS = ("task_id", "timeline_status", "is_overdue", "is_upcoming")
+
+def enrich_task_with_timeline_status(task, due_dt=None):
+    """Add timeline-specific status flags to task
+
+    `due_dt` is the task's due instant (due_dates.due_at of its document);
+    when not given it is parsed from the task's due_date.
+    """
     due_date = task.get("due_date")
     status = task.get("status", "To Do")
-
+    
     if status == "Completed":
         task["timeline_status"] = "completed"
         task["is_overdue"] = False
@@ -54,17 +71,7 @@ def enrich_task_with_timeline_status(task):
         task["is_upcoming"] = False
         return task
 
-    # Normalize due_date to tz-aware UTC
-    if isinstance(due_date, datetime):
-        due_dt = due_date if due_date.tzinfo else due_date.replace(tzinfo=timezone.utc)
-    elif isinstance(due_date, str):
-        due_dt = _safe_iso_to_dt(due_date)
-    else:
-        task["timeline_status"] = "invalid_date"
-        task["is_overdue"] = False
-        task["is_upcoming"] = False
-        return task
-
+    due_dt = due_dt or due_dates.due_at(task)
     if not due_dt:
         task["timeline_status"] = "invalid_date"
         task["is_overdue"] = False
@@ -95,8 +102,12 @@ def enrich_task_with_timeline_status(task):
     return task
 
 
-def group_tasks_by_timeline(tasks):
-    """Group tasks by timeline periods (excludes completed tasks)"""
+def group_tasks_by_timeline(tasks, due_at=None):
+    """Group tasks by timeline periods (excludes completed tasks)
+
+    `due_at` optionally maps task_id to the task's due instant.
+    """
+    due_at = due_at or {}
     timeline = {
         "overdue": [],
         "today": [],
@@ -106,7 +117,7 @@ def group_tasks_by_timeline(tasks):
     }
     
     for task in tasks:
-        enriched_task = enrich_task_with_timeline_status(task)
+        enriched_task = enrich_task_with_timeline_status(task, due_at.get(task.get("task_id")))
         status = enriched_task.get("timeline_status", "no_due_date")
         
         # Skip completed tasks - they shouldn't appear in timeline view
@@ -171,36 +182,21 @@ def user_dashboard(user_id):
     if not user_doc.exists:
         return jsonify({"error": "User not found"}), 404
 
-    # Avoid composite index by NOT using order_by on a different field than the filter.
-    created_stream = db.collection("tasks").where(filter=FieldFilter("created_by.user_id", "==", user_id)).stream()
-    assigned_stream = db.collection("tasks").where(filter=FieldFilter("assigned_to.user_id", "==", user_id)).stream()
+    fields = requested_fields(DASHBOARD_TASK_FIELDS)
+    projection = select_fields(DASHBOARD_TASK_FIELDS, fields, required=DASHBOARD_REQUIRED_FIELDS)
 
-    # Convert to JSON and sort locally by created_at desc
-    created_tasks = sorted(
-        (task_to_json(d) for d in created_stream),
+    # One query for created and assigned tasks; no order_by, so no composite index.
+    # Convert to JSON, drop archived tasks and sort locally by created_at desc
+    docs = list(tasks_for(db, user_id).select(projection).stream())
+    due_at = {d.id: due_dates.due_at(d.to_dict()) for d in docs}
+    unique_tasks = sorted(
+        (t for t in (task_to_json(d) for d in docs) if not t.get("archived", False)),
         key=lambda t: (_safe_iso_to_dt(t.get("created_at")) or datetime.min.replace(tzinfo=timezone.utc)),
         reverse=True
     )
-    assigned_tasks = sorted(
-        (task_to_json(d) for d in assigned_stream),
-        key=lambda t: (_safe_iso_to_dt(t.get("created_at")) or datetime.min.replace(tzinfo=timezone.utc)),
-        reverse=True
-    )
-
-    # Exclude archived tasks
-    created_tasks = [t for t in created_tasks if not t.get("archived", False)]
-    assigned_tasks = [t for t in assigned_tasks if not t.get("archived", False)]
-
-    # Combine all tasks for timeline view
-    all_tasks = created_tasks + assigned_tasks
-    # Remove duplicates (task might be both created by and assigned to same person)
-    seen_tasks = set()
-    unique_tasks = []
-    for task in all_tasks:
-        task_id = task["task_id"]
-        if task_id not in seen_tasks:
-            seen_tasks.add(task_id)
-            unique_tasks.append(task)
+    # A task can be both created by and assigned to the user
+    created_tasks = [t for t in unique_tasks if creator_id(t) == user_id]
+    assigned_tasks = [t for t in unique_tasks if user_id in assignee_ids(t)]
 
     # Status + priority breakdown (based on created tasks)
     status_breakdown = {}
@@ -212,8 +208,7 @@ def user_dashboard(user_id):
         status_breakdown[t["status"]] = status_breakdown.get(t["status"], 0) + 1
         priority_breakdown[t["priority"]] = priority_breakdown.get(t["priority"], 0) + 1
 
-        due = t.get("due_date")
-        due_dt = _safe_iso_to_dt(due)
+        due_dt = due_at.get(t["task_id"])
         if due_dt and due_dt < now and t.get("status") != "Completed":
             overdue_count += 1
 
@@ -225,17 +220,23 @@ def user_dashboard(user_id):
             "priority_breakdown": priority_breakdown,
             "overdue_count": overdue_count,
         },
-        "recent_created_tasks": created_tasks[:5],
-        "recent_assigned_tasks": assigned_tasks[:5],
+        "recent_created_tasks": [trim(t, fields) for t in created_tasks[:5]],
+        "recent_assigned_tasks": [trim(t, fields) for t in assigned_tasks[:5]],
     }
 
     # Add timeline data if requested
     if view_mode == "timeline":
-        timeline_data = group_tasks_by_timeline(unique_tasks)
+        timeline_data = group_tasks_by_timeline(unique_tasks, due_at)
         conflicts = detect_conflicts(unique_tasks)
         
-        resp["timeline"] = timeline_data
-        resp["conflicts"] = conflicts
+        resp["timeline"] = {
+            period: [trim(t, fields, keep=TIMELINE_KEYS) for t in period_tasks]
+            for period, period_tasks in timeline_data.items()
+        }
+        resp["conflicts"] = [
+            {**c, "tasks": [trim(t, fields, keep=TIMELINE_KEYS) for t in c["tasks"]]}
+            for c in conflicts
+        ]
         resp["timeline_statistics"] = {
             "total_tasks": len(unique_tasks),
             "overdue_count": len(timeline_data["overdue"]),
@@ -0,0 +1,198 @@
+"""
+Request-scoped Firestore document access.
+
+Documents read through `get_doc` are remembered for the rest of the current
+request in an identity map keyed by (collection, doc_id), so a handler and the
+helpers it calls can ask for the same user, task or membership document
+several times while paying for a single round trip. `get_docs` does the same
+for a whole list of ids, fetching the uncached ones with batched `get_all`
+calls instead of one `get()` per document.
+
+Writes made by the request are folded back into the map with `note_update`,
+`note_set` and `note_delete`, so later reads in the same request see the
+request's own changes without re-fetching.
+
+Handlers that echo a document after updating it use `apply_update`, which
+builds the response snapshot from the snapshot read before the write plus the
+applied fields, instead of reading the document back.
+
+Outside of a Flask app context (scripts, background jobs) nothing is cached and
+every call goes straight to Firestore.
+"""
+import copy
+from datetime import datetime
+
+from flask import g, has_app_context
+
+_IDENTITY_MAP_ATTR = "_firestore_identity_map"
+
+
+class LocalSnapshot:
+    """Minimal DocumentSnapshot stand-in built from data we already hold."""
+
+    def __init__(self, doc_id, data, reference=None, exists=True, update_time=None):
+        self.id = doc_id
+        self.reference = reference
+        self.exists = exists
+        self.update_time = update_time
+        self._data = data if exists else None
+
+    def to_dict(self):
+        if not self.exists:
+            return None
+        return copy.deepcopy(self._data or {})
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+def _identity_map():
+    """Return the identity map for the current request, or None outside one."""
+    if not has_app_context():
+        return None
+    cache = getattr(g, _IDENTITY_MAP_ATTR, None)
+    if cache is None:
+        cache = {}
+        setattr(g, _IDENTITY_MAP_ATTR, cache)
+    return cache
+
+
+def get_doc(db, collection, doc_id, ref=None):
+    """Fetch `collection/doc_id`, reusing the snapshot if this request already read it.
+
+    Callers that already hold the DocumentReference can pass it as `ref` to
+    avoid building it again.
+    """
+    cache = _identity_map()
+    key = (collection, doc_id)
+    if cache is not None and key in cache:
+        return cache[key]
+    if ref is None:
+        ref = db.collection(collection).document(doc_id)
+    snap = ref.get()
+    if cache is not None:
+        cache[key] = snap
+    return snap
+
+
+GET_ALL_CHUNK_SIZE = 100
+
+
+def get_docs(db, collection, doc_ids, chunk_size=GET_ALL_CHUNK_SIZE):
+    """Fetch many documents of one collection with batched `get_all` calls.
+
+    Returns one snapshot per requested id, in the same order as `doc_ids`
+    (duplicates included). Missing documents come back as snapshots with
+    `exists == False`. Ids already in this request's identity map are not
+    fetched again, and everything fetched is added to it.
+    """
+    doc_ids = list(doc_ids)
+    cache = _identity_map()
+    found = {}
+    pending = []
+    for doc_id in doc_ids:
+        if doc_id in found or doc_id in pending:
+            continue
+        if cache is not None and (collection, doc_id) in cache:
+            found[doc_id] = cache[(collection, doc_id)]
+        else:
+            pending.append(doc_id)
+
+    coll = db.collection(collection)
+    for i in range(0, len(pending), chunk_size):
+        chunk = pending[i:i + chunk_size]
+        refs = [coll.document(doc_id) for doc_id in chunk]
+        # get_all streams results back in arbitrary order; match them by id
+        for snap in db.get_all(refs):
+            found[snap.id] = snap
+        for doc_id in chunk:
+            snap = found.setdefault(doc_id, LocalSnapshot(doc_id, None, exists=False))
+            if cache is not None:
+                cache[(collection, doc_id)] = snap
+
+    return [found[doc_id] for doc_id in doc_ids]
+
+
+def _is_plain_value(value):
+    """True for values that can be merged locally (not Firestore transforms)."""
+    module = type(value).__module__ or ""
+    return not module.startswith("google.cloud.firestore")
+
+
+def note_update(collection, doc_id, updates):
+    """Fold an `update()` issued by this request into the cached snapshot.
+
+    Updates that cannot be applied locally (dotted field paths or server-side
+    transforms such as Increment / DELETE_FIELD) evict the entry instead, so
+    the next read goes back to Firestore.
+    """
+    cache = _identity_map()
+    if cache is None:
+        return
+    key = (collection, doc_id)
+    snap = cache.get(key)
+    if snap is None:
+        return
+    if not getattr(snap, "exists", False) or any(
+        "." in k or not _is_plain_value(v) for k, v in updates.items()
+    ):
+        cache.pop(key, None)
+        return
+    data = copy.deepcopy(snap.to_dict() or {})
+    data.update(copy.deepcopy(updates))
+    cache[key] = LocalSnapshot(doc_id, data, reference=getattr(snap, "reference", None))
+
+
+def merged(snap, updates, write_result=None):
+    """Snapshot of `snap` with `updates` applied, as stored after the write.
+
+    `updates` must hold plain values (no dotted paths or transforms).
+    `write_result` is the WriteResult of the update, whose update_time becomes
+    the snapshot's `update_time`.
+    """
+    data = copy.deepcopy(snap.to_dict() or {})
+    data.update(copy.deepcopy(updates))
+    return LocalSnapshot(
+        snap.id, data,
+        reference=getattr(snap, "reference", None),
+        update_time=getattr(write_result, "update_time", None),
+    )
+
+
+def apply_update(ref, snap, updates, collection=None):
+    """`ref.update(updates)` and return the updated document without re-reading it.
+
+    `snap` is the snapshot of `ref` read earlier in the request. With
+    `collection` set the write is also folded into the identity map.
+    """
+    result = ref.update(updates)
+    if collection:
+        note_update(collection, snap.id, updates)
+    return merged(snap, updates, result)
+
+
+def version(snap):
+    """The ISO update_time of a snapshot, for responses; None if unknown."""
+    update_time = getattr(snap, "update_time", None)
+    return update_time.isoformat() if isinstance(update_time, datetime) else None
+
+
+def note_set(collection, doc_id, data, reference=None):
+    """Record a full `set()` issued by this request."""
+    cache = _identity_map()
+    if cache is None:
+        return
+    key = (collection, doc_id)
+    if any(not _is_plain_value(v) for v in data.values()):
+        cache.pop(key, None)
+        return
+    cache[key] = LocalSnapshot(doc_id, copy.deepcopy(data), reference=reference)
+
+
+def note_delete(collection, doc_id):
+    """Record a `delete()` issued by this request."""
+    cache = _identity_map()
+    if cache is None:
+        return
+    cache[(collection, doc_id)] = LocalSnapshot(doc_id, None, exists=False)
+
@@ -0,0 +1,125 @@
+"""
+Canonical task due timestamps.
+
+Tasks keep `due_date` as the string the client sent, which over time has
+been a full ISO timestamp ("2025-10-29T08:00:00+00:00"), a "Z" timestamp or a
+minute-resolution local-less value ("2025-10-29T08:00", read as UTC). Next
+to it every task carries `due_ts`: the same instant as a Firestore
+Timestamp (a tz-aware UTC datetime in Python), or None without a due date.
+Range queries and sorts use `due_ts`, so they no longer depend on the
+stored strings happening to share one format.
+
+Every write that sets due_date must also set `due_ts` (see `due_fields`).
+Tasks written before the field existed are filled in by
+backend/migrate_due_ts.py; until then `due_at` falls back to parsing
+due_date.
+"""
+from datetime import datetime, timezone
+
+from .pagination import decode_cursor, fetch_page
+
+DUE_TS_FIELD = "due_ts"
+MIGRATION_PAGE_SIZE = 500
+# migrations/due_ts remembers the last task migrated, so a rerun resumes there
+MIGRATIONS_COLLECTION = "migrations"
+MIGRATION_DOC = "due_ts"
+# Attempts per migration write, as the BulkWriter's default error handler
+WRITE_ATTEMPTS = 15
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def parse_due(value):
+    """UTC datetime of a due date string (or datetime); None if empty or unparseable."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, str):
+        try:
+            dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def due_fields(due_date):
+    """due_date and its canonical due_ts, for a task write."""
+    return {"due_date": due_date, DUE_TS_FIELD: parse_due(due_date)}
+
+
+def due_at(data):
+    """Due instant of task `data`: its due_ts, or due_date parsed if not migrated yet."""
+    data = data or {}
+    due_ts = data.get(DUE_TS_FIELD)
+    if isinstance(due_ts, datetime):
+        return parse_due(due_ts)
+    return parse_due(data.get("due_date"))
+
+
+def migration_ref(db):
+    return db.collection(MIGRATIONS_COLLECTION).document(MIGRATION_DOC)
+
+
+def migrate(db, page_size=MIGRATION_PAGE_SIZE, dry_run=False, start_after=None, restart=False):
+    """Set due_ts on every task where it is missing or disagrees with due_date.
+
+    Pages through tasks in document id order and writes through a
+    BulkWriter, flushed once per page. After each page the last task id is
+    recorded on migrations/due_ts, so an interrupted run picks up where it
+    stopped; `start_after` overrides the recorded position and `restart`
+    ignores it. Once a page has a write that failed every attempt, progress
+    is no longer recorded, so the next run scans that page again. Returns
+    (tasks scanned, tasks updated, failed writes).
+    """
+    tasks = db.collection("tasks")
+    query = tasks.select(["due_date", DUE_TS_FIELD])
+    checkpoint = migration_ref(db)
+    if start_after is None and not restart:
+        snap = checkpoint.get()
+        start_after = (snap.to_dict() or {}).get("last_id") if snap.exists else None
+    cursor = [start_after] if start_after else None
+    writer = None if dry_run else db.bulk_writer()
+    failures = []
+
+    def on_write_error(failure, bulk_writer):
+        if failure.attempts < WRITE_ATTEMPTS:
+            return True
+        failures.append(failure)
+        return False
+
+    if writer is not None:
+        writer.on_write_error(on_write_error)
+    scanned = updated = 0
+    try:
+        while True:
+            docs, next_cursor = fetch_page(tasks, query, [], page_size, cursor)
+            for doc in docs:
+                scanned += 1
+                data = doc.to_dict() or {}
+                due_ts = parse_due(data.get("due_date"))
+                if data.get(DUE_TS_FIELD) == due_ts and DUE_TS_FIELD in data:
+                    continue
+                updated += 1
+                if writer is not None:
+                    writer.update(doc.reference, {DUE_TS_FIELD: due_ts})
+            if writer is not None:
+                writer.flush()
+                if docs and not failures:
+                    checkpoint.set({"last_id": docs[-1].id, "updated_at": now_iso()}, merge=True)
+            if not next_cursor:
+                break
+            cursor = decode_cursor(next_cursor)
+        if writer is not None and not failures:
+            # Finished: the next run starts from the beginning again
+            checkpoint.set({"last_id": None, "completed_at": now_iso()}, merge=True)
+    finally:
+        if writer is not None:
+            writer.close()
+    return scanned, updated - len(failures), len(failures)
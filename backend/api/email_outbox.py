@@ -0,0 +1,270 @@
+"""
+Durable outbound email queue.
+
+Request handlers never talk to SMTP. `create_notification` writes the
+notification and an `email_outbox/{notification_id}` item in one batch, and a
+pool of worker threads started with `start()` (see app.create_app) delivers
+the queued mail in the background:
+
+    {"notification_id": .., "to": .., "subject": .., "body": ..,
+     "status": "pending" | "sending" | "sent" | "dead",
+     "attempts": .., "next_attempt_at": .., "last_error": ..,
+     "created_at": .., "updated_at": .., "sent_at": ..}
+
+A worker claims an item in a transaction by moving it to "sending" and
+pushing `next_attempt_at` LEASE_SECONDS ahead, so an item whose worker died
+mid-send is picked up again once the lease runs out. A successful send marks
+the item "sent" and sets `email_sent` / `email_sent_at` on the notification;
+a failure schedules a retry with exponential backoff, and after MAX_ATTEMPTS
+the item is dead-lettered ("dead") and left for an admin to inspect.
+Finished items have no `next_attempt_at`, so the due-items query is a single
+range filter and needs no composite index.
+"""
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from email_utils import send_email
+
+OUTBOX_COLLECTION = "email_outbox"
+EMAIL_OUTBOX_WORKERS = int(os.getenv("EMAIL_OUTBOX_WORKERS", "4"))
+# How often the queue is polled when nothing wakes the dispatcher
+POLL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5"))
+MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+# A claimed item is retried if its worker has not finished within this time
+LEASE_SECONDS = 120
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _later_iso(seconds):
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+def outbox_ref(db, notification_id):
+    return db.collection(OUTBOX_COLLECTION).document(notification_id)
+
+
+def new_item(notification_id, to, subject, body):
+    now = now_iso()
+    return {
+        "notification_id": notification_id,
+        "to": to,
+        "subject": subject,
+        "body": body,
+        "status": PENDING,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "last_error": None,
+        "created_at": now,
+        "updated_at": now,
+        "sent_at": None,
+    }
+
+
+def add(writer, db, notification_id, to, subject, body):
+    """Queue an email for `notification_id` on `writer` (a batch or transaction).
+
+    Call `wake()` once the writer is committed so a worker picks it up
+    straight away instead of at the next poll.
+    """
+    writer.set(outbox_ref(db, notification_id), new_item(notification_id, to, subject, body))
+
+
+def backoff_seconds(attempts):
+    """Delay before retry number `attempts` (1-based), with +/-10% jitter."""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.9, 1.1)
+
+
+def due_items(db, limit):
+    """Up to `limit` items whose next attempt is due, oldest first."""
+    return db.collection(OUTBOX_COLLECTION) \
+             .where(filter=FieldFilter("next_attempt_at", "<=", now_iso())) \
+             .order_by("next_attempt_at").limit(limit).stream()
+
+
+def _claim_in_transaction(transaction, ref):
+    snap = ref.get(transaction=transaction)
+    if not snap.exists:
+        return None
+    data = snap.to_dict() or {}
+    now = now_iso()
+    if data.get("status") not in (PENDING, SENDING) or (data.get("next_attempt_at") or now) > now:
+        return None
+    transaction.update(ref, {"status": SENDING, "next_attempt_at": _later_iso(LEASE_SECONDS), "updated_at": now})
+    return data
+
+
+def claim(db, ref):
+    """Take an item for delivery; returns its data, or None if it is not due
+    (another worker claimed it first, or it was already delivered)."""
+    return firestore.transactional(_claim_in_transaction)(db.transaction(), ref)
+
+
+def deliver(db, ref, data):
+    """Send a claimed item and record the outcome; returns the new status."""
+    attempts = int(data.get("attempts") or 0) + 1
+    error = None
+    try:
+        ok = send_email(data.get("to"), data.get("subject"), data.get("body"))
+        if not ok:
+            error = "send failed"
+    except Exception as e:
+        ok, error = False, str(e)
+
+    now = now_iso()
+    if ok:
+        batch = db.batch()
+        batch.update(ref, {
+            "status": SENT, "attempts": attempts, "next_attempt_at": None,
+            "last_error": None, "sent_at": now, "updated_at": now,
+        })
+        notification_id = data.get("notification_id")
+        if notification_id:
+            batch.update(db.collection("notifications").document(notification_id),
+                         {"email_sent": True, "email_sent_at": now})
+        batch.commit()
+        return SENT
+
+    if attempts >= MAX_ATTEMPTS:
+        status, next_attempt_at = DEAD, None
+    else:
+        status, next_attempt_at = PENDING, _later_iso(backoff_seconds(attempts))
+    ref.update({
+        "status": status, "attempts": attempts, "next_attempt_at": next_attempt_at,
+        "last_error": error, "updated_at": now,
+    })
+    return status
+
+
+def process(db, ref):
+    """Claim and deliver one item; returns the new status, or None if not claimed."""
+    data = claim(db, ref)
+    if data is None:
+        return None
+    return deliver(db, ref, data)
+
+
+def drain(db, limit=100):
+    """Deliver the due items inline (scripts and tests); returns {status: count}."""
+    results = {}
+    for doc in due_items(db, limit):
+        status = process(db, doc.reference)
+        if status is not None:
+            results[status] = results.get(status, 0) + 1
+    return results
+
+
+class OutboxWorker:
+    """Dispatcher thread feeding due outbox items to a pool of send workers.
+
+    The dispatcher polls every POLL_SECONDS, or sooner when `wake()` is
+    called after `add`, and never has more than two items per worker
+    in flight.
+    """
+
+    def __init__(self, workers=EMAIL_OUTBOX_WORKERS):
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._inflight = set()
+        self._thread = None
+        self._executor = None
+        self._db = None
+
+    def start(self, db=None):
+        """Start the dispatcher and the send workers (idempotent)."""
+        if self._thread is not None:
+            return
+        self._db = db or firestore.client()
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="email-outbox")
+        self._thread = threading.Thread(target=self._run, name="email-outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop dispatching and wait for the sends in flight."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        thread.join(timeout=5)
+        executor, self._executor = self._executor, None
+        executor.shutdown(wait=True)
+
+    def wake(self):
+        self._wake.set()
+
+    def dispatch(self):
+        """Claim due items up to the free capacity and submit them; returns the number submitted."""
+        with self._lock:
+            free = self._workers * 2 - len(self._inflight)
+            busy = set(self._inflight)
+        if free <= 0:
+            return 0
+        submitted = 0
+        for doc in due_items(self._db, free + len(busy)):
+            if submitted >= free:
+                break
+            if doc.id in busy:
+                continue
+            data = claim(self._db, doc.reference)
+            if data is None:
+                continue
+            with self._lock:
+                self._inflight.add(doc.id)
+            self._executor.submit(self._deliver, doc.id, doc.reference, data)
+            submitted += 1
+        return submitted
+
+    def _deliver(self, doc_id, ref, data):
+        try:
+            deliver(self._db, ref, data)
+        except Exception as e:
+            print(f"Failed to record email delivery for {doc_id}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(doc_id)
+            # A slot is free again; look for more work
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.dispatch()
+            except Exception as e:
+                print(f"Email outbox dispatch failed: {e}")
+            self._wake.wait(POLL_SECONDS)
+            self._wake.clear()
+
+
+_worker = OutboxWorker()
+
+
+def start(db=None):
+    _worker.start(db)
+
+
+def stop():
+    _worker.stop()
+
+
+def wake():
+    _worker.wake()
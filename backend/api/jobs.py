@@ -0,0 +1,281 @@
+"""
+Periodic background jobs.
+
+Every API instance started with `start()` (see app.create_app) runs an
+APScheduler BackgroundScheduler with the jobs registered in JOBS, but only the
+instance holding the leader lease actually executes them, so a deployment
+with several workers still sends each round of reminders once. The lease is
+a single document
+
+    job_leases/scheduler  {"owner": .., "acquired_at": .., "renewed_at": .., "expires_at": ..}
+
+taken or renewed in a transaction every LEASE_RENEW_SECONDS and valid for
+LEASE_SECONDS; if the leader dies, another instance takes over once it has
+expired. Every run records its outcome on `jobs/{name}`:
+
+    {"name": .., "status": "running" | "ok" | "error", "runner": ..,
+     "last_started_at": .., "last_finished_at": .., "last_duration_ms": ..,
+     "last_error": .., "last_result": .., "runs": .., "failures": ..}
+
+which GET /api/admin/jobs reports together with the lease and this
+instance's schedule. Jobs run on the scheduler's threads, never in a request,
+so startup does not wait for them.
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from firebase_admin import firestore
+
+from . import counters, email_outbox, labels, notifications
+
+JOBS_COLLECTION = "jobs"
+LEASE_COLLECTION = "job_leases"
+LEASE_DOC = "scheduler"
+LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+LEASE_RENEW_SECONDS = max(1, LEASE_SECONDS // 3)
+# Delay before the jobs marked run_at_startup first run, so the lease is settled
+STARTUP_DELAY_SECONDS = int(os.getenv("JOB_STARTUP_DELAY_SECONDS", "15"))
+
+RUNNING = "running"
+OK = "ok"
+ERROR = "error"
+
+Job = namedtuple("Job", ["name", "fn", "trigger", "trigger_args", "run_at_startup", "description"])
+
+JOBS = {}
+
+
+def register(name, fn, trigger, run_at_startup=False, description="", **trigger_args):
+    """Add a job: `fn(db)` runs on the APScheduler `trigger` ("interval" or "cron").
+
+    Whatever `fn` returns is stored as the run's `last_result`, so it should
+    be a small JSON-serialisable summary.
+    """
+    JOBS[name] = Job(name, fn, trigger, trigger_args, run_at_startup, description)
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _later_iso(seconds):
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+def lease_ref(db):
+    return db.collection(LEASE_COLLECTION).document(LEASE_DOC)
+
+
+def job_ref(db, name):
+    return db.collection(JOBS_COLLECTION).document(name)
+
+
+def _acquire_in_transaction(transaction, ref, owner, seconds):
+    snap = ref.get(transaction=transaction)
+    data = (snap.to_dict() or {}) if snap.exists else {}
+    now = now_iso()
+    holder = data.get("owner")
+    if holder and holder != owner and (data.get("expires_at") or "") > now:
+        return False
+    transaction.set(ref, {
+        "owner": owner,
+        "acquired_at": data.get("acquired_at") if holder == owner else now,
+        "renewed_at": now,
+        "expires_at": _later_iso(seconds),
+    })
+    return True
+
+
+def acquire_lease(db, owner, seconds=LEASE_SECONDS):
+    """Take or renew the leader lease for `owner`; returns whether it holds it."""
+    return firestore.transactional(_acquire_in_transaction)(db.transaction(), lease_ref(db), owner, seconds)
+
+
+def _release_in_transaction(transaction, ref, owner):
+    snap = ref.get(transaction=transaction)
+    if snap.exists and (snap.to_dict() or {}).get("owner") == owner:
+        transaction.delete(ref)
+
+
+def release_lease(db, owner):
+    """Give the lease up early (on shutdown) if `owner` still holds it."""
+    firestore.transactional(_release_in_transaction)(db.transaction(), lease_ref(db), owner)
+
+
+def run_job(db, job, runner=None):
+    """Run `job` now and record the outcome on jobs/{name}; returns the new status."""
+    ref = job_ref(db, job.name)
+    ref.set({"name": job.name, "status": RUNNING, "runner": runner, "last_started_at": now_iso()}, merge=True)
+    started = time.perf_counter()
+    try:
+        result, error = job.fn(db), None
+    except Exception as e:
+        print(f"Job {job.name} failed: {e}")
+        result, error = None, str(e)
+    ref.set({
+        "status": ERROR if error else OK,
+        "last_finished_at": now_iso(),
+        "last_duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "last_error": error,
+        "last_result": result,
+        "runs": firestore.Increment(1),
+        "failures": firestore.Increment(1 if error else 0),
+    }, merge=True)
+    return ERROR if error else OK
+
+
+class JobRunner:
+    """APScheduler scheduler that only runs jobs while holding the leader lease."""
+
+    def __init__(self):
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._lease_until = 0.0
+        self._scheduler = None
+        self._db = None
+
+    def start(self, db=None):
+        """Schedule the lease renewal and every registered job (idempotent, non-blocking)."""
+        if self._scheduler is not None:
+            return
+        self._db = db or firestore.client()
+        scheduler = BackgroundScheduler(
+            timezone=timezone.utc,
+            job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 300},
+        )
+        now = datetime.now(timezone.utc)
+        scheduler.add_job(self.renew_lease, "interval", seconds=LEASE_RENEW_SECONDS,
+                          id="_lease", next_run_time=now)
+        for job in JOBS.values():
+            extra = {}
+            if job.run_at_startup:
+                extra["next_run_time"] = now + timedelta(seconds=STARTUP_DELAY_SECONDS)
+            scheduler.add_job(self.run, job.trigger, args=[job.name], id=job.name,
+                              name=job.description or job.name, **job.trigger_args, **extra)
+        scheduler.start()
+        self._scheduler = scheduler
+
+    def stop(self):
+        """Stop scheduling and hand the lease over straight away."""
+        scheduler, self._scheduler = self._scheduler, None
+        if scheduler is None:
+            return
+        scheduler.shutdown(wait=False)
+        if self.is_leader():
+            try:
+                release_lease(self._db, self.owner)
+            except Exception as e:
+                print(f"Failed to release job lease: {e}")
+        with self._lock:
+            self._lease_until = 0.0
+
+    def renew_lease(self):
+        started = time.monotonic()
+        try:
+            held = acquire_lease(self._db, self.owner)
+        except Exception as e:
+            print(f"Job lease renewal failed: {e}")
+            held = False
+        with self._lock:
+            # Count the lease from before the round trip, so it never outlives the stored one
+            self._lease_until = started + LEASE_SECONDS if held else 0.0
+
+    def is_running(self):
+        return self._scheduler is not None
+
+    def is_leader(self):
+        with self._lock:
+            return time.monotonic() < self._lease_until
+
+    def run(self, name):
+        """Scheduler entry point: run the job if this instance is the leader."""
+        if not self.is_leader():
+            return None
+        return run_job(self._db, JOBS[name], runner=self.owner)
+
+    def schedule(self):
+        """{name: next run time} of this instance's jobs."""
+        if self._scheduler is None:
+            return {}
+        return {
+            job.id: job.next_run_time.isoformat() if job.next_run_time else None
+            for job in self._scheduler.get_jobs() if job.id in JOBS
+        }
+
+
+_runner = JobRunner()
+
+
+def start(db=None):
+    _runner.start(db)
+
+
+def stop():
+    _runner.stop()
+
+
+def status(db):
+    """Lease holder, this instance's schedule and the last run of every job."""
+    lease = lease_ref(db).get()
+    lease_data = (lease.to_dict() or {}) if lease.exists else None
+    schedule = _runner.schedule()
+    runs = {doc.id: doc.to_dict() or {} for doc in db.collection(JOBS_COLLECTION).stream()}
+    jobs = []
+    for job in JOBS.values():
+        jobs.append({
+            **runs.get(job.name, {"status": None}),
+            "name": job.name,
+            "description": job.description,
+            "trigger": {"type": job.trigger, **job.trigger_args},
+            "next_run_at": schedule.get(job.name),
+        })
+    return {
+        "instance": {"owner": _runner.owner, "running": _runner.is_running(), "leader": _runner.is_leader()},
+        "lease": lease_data,
+        "jobs": jobs,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Registered jobs
+
+
+def _deadline_reminders(db):
+    summary = notifications.run_deadline_check(db)
+    return {key: summary[key] for key in ("checked", "notifications_created", "elapsed_ms")}
+
+
+def _drain_email_outbox(db):
+    return email_outbox.drain(db)
+
+
+def _check_dashboard_counters(db):
+    drift = counters.check_drift(db)
+    if drift:
+        # Only reported: a rebuild overwrites concurrent increments, so it stays manual
+        print(f"Dashboard counters drifted, run rebuild_dashboard_counters.py: {drift}")
+    return {"seeded": drift is not None, "drift": drift or {}}
+
+
+def _rebuild_label_counts(db):
+    return {"labels": len(labels.rebuild_usage(db))}
+
+
+register("deadline_reminders", _deadline_reminders, "interval", run_at_startup=True,
+         description="Remind involved users of tasks due in the next window",
+         minutes=int(os.getenv("JOB_DEADLINE_MINUTES", "60")))
+register("email_outbox_drain", _drain_email_outbox, "interval",
+         description="Deliver due outbox emails missed by the instance workers",
+         minutes=int(os.getenv("JOB_OUTBOX_DRAIN_MINUTES", "5")))
+register("dashboard_counter_drift", _check_dashboard_counters, "cron",
+         description="Compare the admin dashboard totals with count() queries",
+         hour=int(os.getenv("JOB_ROLLUP_HOUR", "3")), minute=0)
+register("label_counts", _rebuild_label_counts, "cron",
+         description="Rebuild task_labels and label task counts",
+         hour=int(os.getenv("JOB_ROLLUP_HOUR", "3")), minute=30)
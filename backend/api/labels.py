@@ -1,11 +1,53 @@
+from collections import Counter
 from datetime import datetime, timezone
 from flask import request, jsonify
 from . import labels_bp
 from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud.firestore_v1.base_query import FieldFilter
+from .batching import Batcher
+from .data_access import get_docs
+from .pagination import InvalidCursor, decode_cursor, fetch_page, page_args, with_next_cursor
+from .tasks import task_to_json
+
+# Label assignments live in two places: the task's `labels` array (read with
+# the task) and one task_labels/{task_id}_{label_id} document per assignment
+# (queried by label). Each label document keeps `task_count`, the number of
+# tasks carrying it. Assign/unassign change all three in one batch; the
+# mapping document's create / delete precondition makes a repeated request a
+# no-op instead of double counting.
+TASK_LABELS_COLLECTION = "task_labels"
+REBUILD_PAGE_SIZE = 500
 
 def now_iso():
     return datetime.now(timezone.utc).isoformat()
 
+def mapping_ref(db, task_id, label_id):
+    return db.collection(TASK_LABELS_COLLECTION).document(f"{task_id}_{label_id}")
+
+def _mapping_doc(task_id, label_id):
+    return {"task_id": task_id, "label_id": label_id, "assigned_at": now_iso()}
+
+def assign_to_new_task(db, task_id, label_ids):
+    """Record the labels a task was created with (ids that are not labels are skipped)."""
+    label_ids = list(dict.fromkeys(l for l in (label_ids or []) if isinstance(l, str) and l))
+    if not label_ids:
+        return
+    batch = db.batch()
+    for label in get_docs(db, "labels", label_ids):
+        if not label.exists:
+            continue
+        batch.create(mapping_ref(db, task_id, label.id), _mapping_doc(task_id, label.id))
+        batch.update(db.collection("labels").document(label.id), {"task_count": firestore.Increment(1)})
+    batch.commit()
+
+def release_mappings(writer, db, mappings):
+    """Add the task_count decrements for deleting `mappings` (task_labels data) to `writer`."""
+    counts = Counter((m or {}).get("label_id") for m in mappings)
+    counts.pop(None, None)
+    for label_id, n in sorted(counts.items()):
+        writer.set(db.collection("labels").document(label_id), {"task_count": firestore.Increment(-n)}, merge=True)
+
 @labels_bp.post("")
 def create_label():
     """Create a new label."""
@@ -23,6 +65,7 @@ def create_label():
         "label_id": ref.id,
         "name": name,
         "color": color,
+        "task_count": 0,
         "created_at": now_iso()
     }
     ref.set(label_doc)
@@ -31,15 +74,35 @@ def create_label():
 
 @labels_bp.get("")
 def list_labels():
-    """Get all labels."""
+    """Get labels, one page at a time in label id order."""
     db = firestore.client()
-    labels = db.collection("labels").stream()
+    try:
+        limit, cursor = page_args()
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    labels_ref = db.collection("labels")
+    labels, next_cursor = fetch_page(labels_ref, labels_ref, [], limit, cursor)
     result = []
     for label in labels:
         label_data = label.to_dict()
         label_data["label_id"] = label.id
         result.append(label_data)
-    return jsonify(result), 200
+    return with_next_cursor(jsonify(result), next_cursor), 200
+
+@labels_bp.get("/<label_id>/tasks")
+def list_label_tasks(label_id):
+    """Tasks carrying a label, one page at a time, found through task_labels."""
+    db = firestore.client()
+    try:
+        limit, cursor = page_args()
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    mappings = db.collection(TASK_LABELS_COLLECTION)
+    query = mappings.where(filter=FieldFilter("label_id", "==", label_id))
+    docs, next_cursor = fetch_page(mappings, query, [], limit, cursor)
+    task_ids = [(d.to_dict() or {}).get("task_id") for d in docs]
+    tasks = get_docs(db, "tasks", [t for t in task_ids if t])
+    return with_next_cursor(jsonify([task_to_json(t) for t in tasks if t.exists]), next_cursor), 200
 
 @labels_bp.post("/assign")
 def assign_label():
@@ -53,23 +116,18 @@ def assign_label():
     if not task_id or not label_id:
         return jsonify({"error": "task_id and label_id are required"}), 400
     
-    # Update task to add label to labels array
-    task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
-    
-    if task_doc.exists:
-        task_data = task_doc.to_dict() or {}
-        labels = task_data.get("labels", [])
-        if label_id not in labels:
-            labels.append(label_id)
-            task_ref.update({"labels": labels})
-    
-    # Create task_labels mapping
-    db.collection("task_labels").document(f"{task_id}_{label_id}").set({
-        "task_id": task_id,
-        "label_id": label_id,
-        "assigned_at": now_iso()
-    })
+    # One batch: the mapping (create fails if it already exists), the task's
+    # labels array and the label's usage count
+    batch = db.batch()
+    batch.create(mapping_ref(db, task_id, label_id), _mapping_doc(task_id, label_id))
+    batch.update(db.collection("tasks").document(task_id), {"labels": firestore.ArrayUnion([label_id])})
+    batch.update(db.collection("labels").document(label_id), {"task_count": firestore.Increment(1)})
+    try:
+        batch.commit()
+    except AlreadyExists:
+        return jsonify({"ok": True, "message": "Label already assigned to task"}), 200
+    except NotFound:
+        return jsonify({"error": "Task or label not found"}), 404
     
     return jsonify({"ok": True, "message": "Label assigned to task"}), 200
 
@@ -85,18 +143,48 @@ def unassign_label():
     if not task_id or not label_id:
         return jsonify({"error": "task_id and label_id are required"}), 400
     
-    # Update task to remove label from labels array
-    task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
-    
-    if task_doc.exists:
-        task_data = task_doc.to_dict() or {}
-        labels = task_data.get("labels", [])
-        if label_id in labels:
-            labels.remove(label_id)
-            task_ref.update({"labels": labels})
-    
-    # Delete task_labels mapping
-    db.collection("task_labels").document(f"{task_id}_{label_id}").delete()
+    # One batch, only applied if the mapping exists (so the count never
+    # drops twice for the same assignment)
+    batch = db.batch()
+    batch.delete(mapping_ref(db, task_id, label_id), option=db.write_option(exists=True))
+    batch.update(db.collection("tasks").document(task_id), {"labels": firestore.ArrayRemove([label_id])})
+    batch.update(db.collection("labels").document(label_id), {"task_count": firestore.Increment(-1)})
+    try:
+        batch.commit()
+    except NotFound:
+        return jsonify({"ok": True, "message": "Label was not assigned to task"}), 200
     
     return jsonify({"ok": True, "message": "Label unassigned from task"}), 200
+
+def rebuild_usage(db, page_size=REBUILD_PAGE_SIZE):
+    """Rebuild task_labels and every label's task_count from the tasks' labels arrays.
+
+    Returns {label_id: count}. Mappings for labels a task no longer carries
+    are deleted; ids in `labels` arrays that are not labels are ignored.
+    """
+    label_ids = {d.id for d in db.collection("labels").select([]).stream()}
+    counts = Counter({label_id: 0 for label_id in label_ids})
+    keep = set()
+    writer = Batcher(db)
+    tasks = db.collection("tasks")
+    cursor = None
+    while True:
+        docs, next_cursor = fetch_page(tasks, tasks.select(["labels"]), [], page_size, cursor)
+        for doc in docs:
+            labels = (doc.to_dict() or {}).get("labels")
+            for label_id in set(labels if isinstance(labels, list) else []) & label_ids:
+                counts[label_id] += 1
+                ref = mapping_ref(db, doc.id, label_id)
+                keep.add(ref.id)
+                writer.set(ref, {"task_id": doc.id, "label_id": label_id}, merge=True)
+        if not next_cursor:
+            break
+        cursor = decode_cursor(next_cursor)
+
+    for m in db.collection(TASK_LABELS_COLLECTION).select([]).stream():
+        if m.id not in keep:
+            writer.delete(m.reference)
+    for label_id, n in counts.items():
+        writer.update(db.collection("labels").document(label_id), {"task_count": n})
+    writer.flush()
+    return dict(counts)
@@ -5,6 +5,16 @@ from flask import request, jsonify
 from . import manager_bp
 from firebase_admin import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
+from .data_access import get_doc, get_docs, note_update
+from .profile_cache import get_user, invalidate as invalidate_profile
+from . import batching, counters, due_dates, membership_replica, task_acl
+from .participants import assignee_ids, creator_id, participant_updates, tasks_for, tasks_for_any
+from .query_fanout import run_queries
+from .projection import requested_fields, select_fields, trim
+from .pagination import InvalidCursor, fetch_page, page_args
+
+# Sort key of tasks without a due date: after every dated one
+NO_DUE_DATE = datetime.max.replace(tzinfo=timezone.utc)
 
 def now_iso():
     return datetime.now(timezone.utc).isoformat()
@@ -31,8 +41,12 @@ def _is_manager_role(role):
     manager_roles = ["manager", "director", "hr", "admin"]
     return role in manager_roles
 
-def _get_task_status_flags(due_date_str):
-    """Calculate overdue/upcoming status for a task with visual categorization."""
+def _get_task_status_flags(due_date_str, due_dt=None):
+    """Calculate overdue/upcoming status for a task with visual categorization.
+
+    `due_dt` is the task's canonical due timestamp when known (see due_dates);
+    otherwise due_date_str is parsed.
+    """
     if not due_date_str:
         return {
             "is_overdue": False, 
@@ -43,7 +57,8 @@ def _get_task_status_flags(due_date_str):
             "days_until_due": None
         }
     
-    due_dt = _safe_iso_to_dt(due_date_str)
+    if due_dt is None:
+        due_dt = _safe_iso_to_dt(due_date_str)
     if not due_dt:
         return {
             "is_overdue": False, 
@@ -94,6 +109,19 @@ def _get_task_status_flags(due_date_str):
             "days_until_due": days_until_due
         }
 
+# Document fields read by _enrich_task_with_status; team queries select only these
+MANAGER_TASK_FIELDS = [
+    "title", "description", "priority", "status", "due_date", "created_at",
+    "updated_at", "created_by", "assigned_to", "project_id", "labels",
+]
+# Fields needed for member attribution, filtering, sorting and statistics
+MANAGER_REQUIRED_FIELDS = ("priority", "status", "due_date", "due_ts", "project_id", "created_by", "assigned_to")
+# Computed keys that survive ?fields= trimming
+TEAM_TASK_KEYS = (
+    "task_id", "member_id", "member_role", "is_overdue", "is_upcoming",
+    "visual_status", "days_overdue", "days_until_due",
+)
+
 def _enrich_task_with_status(task_data, task_id):
     """Enrich task data with status flags and member info."""
     enriched = {
@@ -111,13 +139,17 @@ def _enrich_task_with_status(task_data, task_id):
         "labels": task_data.get("labels", []),
     }
     
-    status_flags = _get_task_status_flags(task_data.get("due_date"))
+    status_flags = _get_task_status_flags(task_data.get("due_date"), due_dates.due_at(task_data))
     enriched.update(status_flags)
     
     return enriched
 
-def _group_tasks_by_timeline(tasks):
-    """Group tasks by timeline periods."""
+def _group_tasks_by_timeline(tasks, due_at=None):
+    """Group tasks by timeline periods.
+
+    `due_at` optionally maps task_id to the task's due instant.
+    """
+    due_at = due_at or {}
     timeline = {
         "overdue": [],
         "today": [],
@@ -132,7 +164,7 @@ def _group_tasks_by_timeline(tasks):
             timeline["no_due_date"].append(task)
             continue
         
-        due_dt = _safe_iso_to_dt(due_date)
+        due_dt = due_at.get(task.get("task_id")) or _safe_iso_to_dt(due_date)
         if not due_dt:
             timeline["no_due_date"].append(task)
             continue
@@ -177,7 +209,7 @@ def _detect_conflicts(tasks):
 def _verify_manager_access(manager_id):
     """Verify manager exists and has appropriate role."""
     db = firestore.client()
-    manager_doc = db.collection("users").document(manager_id).get()
+    manager_doc = get_user(db, manager_id)
     
     if not manager_doc.exists:
         return None, jsonify({"error": "Manager not found"}), 404
@@ -195,23 +227,51 @@ def _get_manager_team_member_ids(manager_id):
     db = firestore.client()
     
     # Get manager's projects
-    manager_memberships = db.collection("memberships").where("user_id", "==", manager_id).stream()
-    manager_projects = set(mem.to_dict().get("project_id") for mem in manager_memberships)
+    manager_projects = membership_replica.user_project_ids(db, manager_id)
     
     if not manager_projects:
         return set()
     
     # Get all team members from those projects
     team_member_ids = set()
-    for project_id in manager_projects:
-        project_members = db.collection("memberships").where("project_id", "==", project_id).stream()
-        for mem in project_members:
-            user_id = mem.to_dict().get("user_id")
+    for member_ids in membership_replica.members_by_project(db, manager_projects).values():
+        for user_id in member_ids:
             if user_id != manager_id:  # Exclude manager
                 team_member_ids.add(user_id)
     
     return team_member_ids
 
+def _get_team_task_docs(db, member_ids, projection=MANAGER_TASK_FIELDS):
+    """Fetch every task created by or assigned to any of `member_ids`.
+
+    Uses one `participant_ids array_contains_any` query per chunk of members
+    (run concurrently), selecting only the `projection` fields. Returns
+    (task_doc, member_id, member_role) tuples; when a member both created and
+    is assigned a task, or several members are involved, the creator wins.
+    """
+    member_ids = set(member_ids)
+    queries = [(label, query.select(projection)) for label, query in tasks_for_any(db, member_ids)]
+    results = run_queries(queries)
+    
+    seen = set()
+    task_docs = []
+    for result in results:
+        if result.error is not None:
+            raise result.error
+        for task_doc in result.docs:
+            # A task with participants in two chunks comes back twice
+            if task_doc.id in seen:
+                continue
+            seen.add(task_doc.id)
+            task_data = task_doc.to_dict() or {}
+            creator = creator_id(task_data)
+            if creator in member_ids:
+                task_docs.append((task_doc, creator, "creator"))
+                continue
+            assignee = next((uid for uid in assignee_ids(task_data) if uid in member_ids), None)
+            task_docs.append((task_doc, assignee, "assignee"))
+    return task_docs
+
 @manager_bp.get("/dashboard")
 def manager_dashboard():
     """
@@ -246,10 +306,7 @@ def manager_dashboard():
         return error_response, status_code
     
     # Get manager's projects
-    manager_memberships = db.collection("memberships").where("user_id", "==", manager_id).stream()
-    manager_projects = set()
-    for mem in manager_memberships:
-        manager_projects.add(mem.to_dict().get("project_id"))
+    manager_projects = set(membership_replica.user_project_ids(db, manager_id))
     
     # Get team member IDs
     team_member_ids = _get_manager_team_member_ids(manager_id)
@@ -266,10 +323,10 @@ def manager_dashboard():
             # Ignore fallback errors and continue with whatever we have
             pass
     
-    # Get team member details
+    # Get team member details (batched)
     team_members = []
-    for member_id in team_member_ids:
-        member_doc = db.collection("users").document(member_id).get()
+    member_ids = list(team_member_ids)
+    for member_id, member_doc in zip(member_ids, get_docs(db, "users", member_ids)):
         if member_doc.exists:
             member_data = member_doc.to_dict()
             team_members.append({
@@ -281,60 +338,35 @@ def manager_dashboard():
             })
     
     # Get all team tasks
-    all_tasks = []
+    unique_tasks = []
     active_tasks = 0
     completed_tasks = 0
     overdue_tasks = 0
     
-    for member_id in team_member_ids:
-        # Created tasks
-        created_tasks = db.collection("tasks").where("created_by.user_id", "==", member_id).stream()
-        for task_doc in created_tasks:
-            task_data = task_doc.to_dict()
-            enriched_task = _enrich_task_with_status(task_data, task_doc.id)
-            
-            # Count by status
-            status = task_data.get("status", "To Do")
-            if status in ["To Do", "In Progress"]:
-                active_tasks += 1
-            elif status == "Completed":
-                completed_tasks += 1
-            
-            if enriched_task.get("is_overdue"):
-                overdue_tasks += 1
-            
-            all_tasks.append(enriched_task)
-        
-        # Assigned tasks
-        assigned_tasks = db.collection("tasks").where("assigned_to.user_id", "==", member_id).stream()
-        for task_doc in assigned_tasks:
-            task_data = task_doc.to_dict()
-            enriched_task = _enrich_task_with_status(task_data, task_doc.id)
-            
-            status = task_data.get("status", "To Do")
-            if status in ["To Do", "In Progress"]:
-                active_tasks += 1
-            elif status == "Completed":
-                completed_tasks += 1
-            
-            if enriched_task.get("is_overdue"):
-                overdue_tasks += 1
-            
-            all_tasks.append(enriched_task)
+    fields = requested_fields(MANAGER_TASK_FIELDS)
+    projection = select_fields(MANAGER_TASK_FIELDS, fields, required=MANAGER_REQUIRED_FIELDS)
     
-    # Remove duplicate tasks
-    seen_tasks = set()
-    unique_tasks = []
-    for task in all_tasks:
-        task_key = task["task_id"]
-        if task_key not in seen_tasks:
-            seen_tasks.add(task_key)
-            unique_tasks.append(task)
+    # Created and assigned tasks for the whole team, already deduped
+    due_at = {}
+    for task_doc, _member_id, _member_role in _get_team_task_docs(db, team_member_ids, projection):
+        task_data = task_doc.to_dict()
+        enriched_task = _enrich_task_with_status(task_data, task_doc.id)
+        due_at[task_doc.id] = due_dates.due_at(task_data)
+        
+        # Count by status
+        status = task_data.get("status", "To Do")
+        if status in ["To Do", "In Progress"]:
+            active_tasks += 1
+        elif status == "Completed":
+            completed_tasks += 1
+        
+        if enriched_task.get("is_overdue"):
+            overdue_tasks += 1
+        
+        unique_tasks.append(enriched_task)
     
     # Sort by due date (most urgent first)
-    unique_tasks.sort(
-        key=lambda t: _safe_iso_to_dt(t.get("due_date")) or datetime.max.replace(tzinfo=timezone.utc)
-    )
+    unique_tasks.sort(key=lambda t: due_at.get(t["task_id"]) or NO_DUE_DATE)
     
     # Get recent tasks (last 10)
     recent_tasks = unique_tasks[:10]
@@ -367,7 +399,7 @@ def manager_dashboard():
         "total_tasks": len(unique_tasks),
         "overdue_tasks": overdue_tasks,
         "team_members": team_members,
-        "team_tasks": recent_tasks,  # Recent 10 tasks
+        "team_tasks": [trim(t, fields, keep=TEAM_TASK_KEYS) for t in recent_tasks],  # Recent 10 tasks
         "statistics": {
             "total_tasks": len(unique_tasks),
             "active_tasks": active_tasks,
@@ -402,10 +434,7 @@ def get_team_tasks():
     view_mode = request.args.get("view_mode", "grid")
     
     # Find all projects where manager is a member
-    manager_memberships = db.collection("memberships").where(filter=FieldFilter("user_id", "==", manager_id)).stream()
-    manager_projects = set()
-    for mem in manager_memberships:
-        manager_projects.add(mem.to_dict().get("project_id"))
+    manager_projects = set(membership_replica.user_project_ids(db, manager_id))
     
     if not manager_projects:
         return jsonify({
@@ -425,45 +454,27 @@ def get_team_tasks():
     team_member_ids = set()
     project_memberships = {}
     
-    for project_id in manager_projects:
-        project_members = db.collection("memberships").where(filter=FieldFilter("project_id", "==", project_id)).stream()
+    for project_id, member_ids in membership_replica.members_by_project(db, manager_projects).items():
         project_member_ids = []
-        for mem in project_members:
-            user_id = mem.to_dict().get("user_id")
+        for user_id in member_ids:
             if user_id != manager_id:
                 team_member_ids.add(user_id)
                 project_member_ids.append(user_id)
         project_memberships[project_id] = project_member_ids
     
-    # Get all tasks for team members
-    all_tasks = []
-    for member_id in team_member_ids:
-        # Get tasks created by this member
-        created_tasks = db.collection("tasks").where(filter=FieldFilter("created_by.user_id", "==", member_id)).stream()
-        for task_doc in created_tasks:
-            task_data = task_doc.to_dict()
-            enriched_task = _enrich_task_with_status(task_data, task_doc.id)
-            enriched_task["member_id"] = member_id
-            enriched_task["member_role"] = "creator"
-            all_tasks.append(enriched_task)
-        
-        # Get tasks assigned to this member
-        assigned_tasks = db.collection("tasks").where(filter=FieldFilter("assigned_to.user_id", "==", member_id)).stream()
-        for task_doc in assigned_tasks:
-            task_data = task_doc.to_dict()
-            enriched_task = _enrich_task_with_status(task_data, task_doc.id)
-            enriched_task["member_id"] = member_id
-            enriched_task["member_role"] = "assignee"
-            all_tasks.append(enriched_task)
-    
-    # Remove duplicates
-    seen_tasks = set()
+    fields = requested_fields(MANAGER_TASK_FIELDS)
+    projection = select_fields(MANAGER_TASK_FIELDS, fields, required=MANAGER_REQUIRED_FIELDS)
+    
+    # Get all tasks for team members (created or assigned, already deduped)
     unique_tasks = []
-    for task in all_tasks:
-        task_key = task["task_id"]
-        if task_key not in seen_tasks:
-            seen_tasks.add(task_key)
-            unique_tasks.append(task)
+    due_at = {}
+    for task_doc, member_id, member_role in _get_team_task_docs(db, team_member_ids, projection):
+        task_data = task_doc.to_dict()
+        enriched_task = _enrich_task_with_status(task_data, task_doc.id)
+        due_at[task_doc.id] = due_dates.due_at(task_data)
+        enriched_task["member_id"] = member_id
+        enriched_task["member_role"] = member_role
+        unique_tasks.append(enriched_task)
     
     # Apply filtering
     if filter_by and filter_value:
@@ -478,17 +489,17 @@ def get_team_tasks():
     
     # Sort tasks
     sort_functions = {
-        "due_date": lambda t: _safe_iso_to_dt(t.get("due_date")) or datetime.max.replace(tzinfo=timezone.utc),
+        "due_date": lambda t: due_at.get(t["task_id"]) or NO_DUE_DATE,
         "priority": lambda t: t.get("priority", 5),
         "project": lambda t: t.get("project_id") or "",
     }
     if sort_by in sort_functions:
         unique_tasks.sort(key=sort_functions[sort_by], reverse=(sort_order == "desc"))
     
-    # Get team member details
+    # Get team member details (batched)
     team_members = []
-    for member_id in team_member_ids:
-        member_doc = db.collection("users").document(member_id).get()
+    member_ids = list(team_member_ids)
+    for member_id, member_doc in zip(member_ids, get_docs(db, "users", member_ids)):
         if member_doc.exists:
             member_data = member_doc.to_dict()
             team_members.append({
@@ -498,10 +509,10 @@ def get_team_tasks():
                 "role": member_data.get("role", "staff")
             })
     
-    # Get project details
+    # Get project details (batched)
     projects = []
-    for project_id in manager_projects:
-        project_doc = db.collection("projects").document(project_id).get()
+    project_ids = list(manager_projects)
+    for project_id, project_doc in zip(project_ids, get_docs(db, "projects", project_ids)):
         if project_doc.exists:
             project_data = project_doc.to_dict()
             projects.append({
@@ -528,7 +539,7 @@ def get_team_tasks():
         visual_status_breakdown[visual_status] = visual_status_breakdown.get(visual_status, 0) + 1
     
     response_data = {
-        "team_tasks": unique_tasks,
+        "team_tasks": [trim(t, fields, keep=TEAM_TASK_KEYS) for t in unique_tasks],
         "team_members": team_members,
         "projects": projects,
         "statistics": {
@@ -544,11 +555,17 @@ def get_team_tasks():
     
     # Add timeline data if requested
     if view_mode == "timeline":
-        timeline_data = _group_tasks_by_timeline(unique_tasks)
+        timeline_data = _group_tasks_by_timeline(unique_tasks, due_at)
         conflicts = _detect_conflicts(unique_tasks)
         
-        response_data["timeline"] = timeline_data
-        response_data["conflicts"] = conflicts
+        response_data["timeline"] = {
+            period: [trim(t, fields, keep=TEAM_TASK_KEYS) for t in period_tasks]
+            for period, period_tasks in timeline_data.items()
+        }
+        response_data["conflicts"] = [
+            {**c, "tasks": [trim(t, fields, keep=TEAM_TASK_KEYS) for t in c["tasks"]]}
+            for c in conflicts
+        ]
         response_data["timeline_statistics"] = {
             "total_tasks": len(unique_tasks),
             "overdue_count": len(timeline_data["overdue"]),
@@ -588,7 +605,7 @@ def assign_task(task_id):
     
     # Get task
     task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
+    task_doc = get_doc(db, "tasks", task_id, ref=task_ref)
     
     if not task_doc.exists:
         return jsonify({"error": "Task not found"}), 404
@@ -609,10 +626,9 @@ def assign_task(task_id):
         if assignee_id not in all_team_member_ids:
             return jsonify({"error": f"User {assignee_id} is not in your team"}), 403
     
-    # Get assignee details
+    # Get assignee details (batched)
     assigned_to_list = []
-    for assignee_id in assignee_ids:
-        user_doc = db.collection("users").document(assignee_id).get()
+    for assignee_id, user_doc in zip(assignee_ids, get_docs(db, "users", assignee_ids)):
         if user_doc.exists:
             user_data = user_doc.to_dict()
             assigned_to_list.append({
@@ -622,7 +638,8 @@ def assign_task(task_id):
             })
     
     # Update task
-    task_ref.update({
+    task_data = task_doc.to_dict() or {}
+    task_updates = task_acl.acl_updates(db, task_data, participant_updates(task_data, {
         "assigned_to": assigned_to_list[0] if len(assigned_to_list) == 1 else assigned_to_list,
         "updated_at": now_iso(),
         "updated_by": {
@@ -630,7 +647,9 @@ def assign_task(task_id):
             "name": manager_data.get("name"),
             "email": manager_data.get("email")
         }
-    })
+    }))
+    task_ref.update(task_updates)
+    note_update("tasks", task_id, task_updates)
     
     return jsonify({
         "success": True,
@@ -671,6 +690,7 @@ def create_project():
     # Create project
     project_ref = db.collection("projects").add(project_data)
     project_id = project_ref[1].id
+    counters.record_project(db, after=project_data)
     
     # Add manager as first project member
     db.collection("memberships").add({
@@ -711,12 +731,12 @@ def add_team_member(project_id):
         return jsonify({"error": "user_id required"}), 400
     
     # Verify project exists
-    project_doc = db.collection("projects").document(project_id).get()
+    project_doc = get_doc(db, "projects", project_id)
     if not project_doc.exists:
         return jsonify({"error": "Project not found"}), 404
     
     # Verify user exists
-    user_doc = db.collection("users").document(user_id).get()
+    user_doc = get_doc(db, "users", user_id)
     if not user_doc.exists:
         return jsonify({"error": "User not found"}), 404
     
@@ -756,12 +776,16 @@ def get_all_users():
     Headers:
         X-User-Id: Manager's user ID
     
+    Query params:
+        limit, cursor: Page size and the previous page's next_cursor
+    
     Returns:
         {
             "staff": [...],
             "managers": [...],
             "total_staff": 5,
-            "total_managers": 3
+            "total_managers": 3,
+            "next_cursor": "..." or null
         }
     """
     db = firestore.client()
@@ -776,9 +800,14 @@ def get_all_users():
         return error_response, status_code
     
     try:
-        # Get all users
+        limit, cursor = page_args()
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        # One page of users in user id order
         users_ref = db.collection("users")
-        all_users = users_ref.stream()
+        all_users, next_cursor = fetch_page(users_ref, users_ref, [], limit, cursor)
         
         staff_list = []
         manager_list = []
@@ -806,7 +835,8 @@ def get_all_users():
             "staff": staff_list,
             "managers": manager_list,
             "total_staff": len(staff_list),
-            "total_managers": len(manager_list)
+            "total_managers": len(manager_list),
+            "next_cursor": next_cursor
         }), 200
         
     except Exception as e:
@@ -866,27 +896,18 @@ def get_team_member_overview(member_id):
         return jsonify({"error": "User is not in your team"}), 403
     
     # Get member details
-    member_doc = db.collection("users").document(member_id).get()
+    member_doc = get_doc(db, "users", member_id)
     if not member_doc.exists:
         return jsonify({"error": "Member not found"}), 404
     
     member_data = member_doc.to_dict()
     
-    # Get member's tasks
-    created_tasks = db.collection("tasks").where("created_by.user_id", "==", member_id).stream()
-    assigned_tasks = db.collection("tasks").where("assigned_to.user_id", "==", member_id).stream()
-    
+    # Get member's tasks (created or assigned, one query)
     all_tasks = []
-    for task_doc in created_tasks:
-        task_data = task_doc.to_dict()
-        enriched = _enrich_task_with_status(task_data, task_doc.id)
-        enriched["task_type"] = "created"
-        all_tasks.append(enriched)
-    
-    for task_doc in assigned_tasks:
+    for task_doc in tasks_for(db, member_id).stream():
         task_data = task_doc.to_dict()
         enriched = _enrich_task_with_status(task_data, task_doc.id)
-        enriched["task_type"] = "assigned"
+        enriched["task_type"] = "created" if creator_id(task_data) == member_id else "assigned"
         all_tasks.append(enriched)
     
     # Calculate statistics
@@ -937,7 +958,7 @@ def update_task_status(task_id):
     
     # Get task
     task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
+    task_doc = get_doc(db, "tasks", task_id, ref=task_ref)
     
     if not task_doc.exists:
         return jsonify({"error": "Task not found"}), 404
@@ -951,14 +972,17 @@ def update_task_status(task_id):
         return jsonify({"error": "Task does not belong to your team"}), 403
     
     # Update status
-    task_ref.update({
+    task_updates = {
         "status": new_status,
         "updated_at": now_iso(),
         "updated_by": {
             "user_id": manager_id,
             "name": manager_data.get("name")
         }
-    })
+    }
+    task_ref.update(task_updates)
+    note_update("tasks", task_id, task_updates)
+    counters.record_task(db, before=task_data, updates=task_updates)
     
     return jsonify({
         "success": True,
@@ -989,7 +1013,7 @@ def update_task_priority(task_id):
     
     # Get task
     task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
+    task_doc = get_doc(db, "tasks", task_id, ref=task_ref)
     
     if not task_doc.exists:
         return jsonify({"error": "Task not found"}), 404
@@ -1003,14 +1027,17 @@ def update_task_priority(task_id):
         return jsonify({"error": "Task does not belong to your team"}), 403
     
     # Update priority
-    task_ref.update({
+    task_updates = {
         "priority": new_priority,
         "updated_at": now_iso(),
         "updated_by": {
             "user_id": manager_id,
             "name": manager_data.get("name")
         }
-    })
+    }
+    task_ref.update(task_updates)
+    note_update("tasks", task_id, task_updates)
+    counters.record_task(db, before=task_data, updates=task_updates)
     
     return jsonify({
         "success": True,
@@ -1063,7 +1090,7 @@ def assign_manager_to_staff(staff_id):
     target_manager_id = data.get("manager_id", manager_id)
     
     # Verify target manager exists and has manager role
-    target_manager_doc = db.collection("users").document(target_manager_id).get()
+    target_manager_doc = get_doc(db, "users", target_manager_id)
     if not target_manager_doc.exists:
         return jsonify({"error": "Target manager not found"}), 404
     
@@ -1073,7 +1100,7 @@ def assign_manager_to_staff(staff_id):
     
     # Verify staff exists
     staff_ref = db.collection("users").document(staff_id)
-    staff_doc = staff_ref.get()
+    staff_doc = get_doc(db, "users", staff_id, ref=staff_ref)
     
     if not staff_doc.exists:
         return jsonify({"error": "Staff member not found"}), 404
@@ -1085,13 +1112,16 @@ def assign_manager_to_staff(staff_id):
         return jsonify({"error": "User is not a staff member"}), 400
     
     # Update staff document with manager_id
-    staff_ref.update({
+    staff_updates = {
         "manager_id": target_manager_id,
         "manager_name": target_manager_data.get("name"),
         "manager_email": target_manager_data.get("email"),
         "manager_assigned_at": now_iso(),
         "updated_at": now_iso()
-    })
+    }
+    staff_ref.update(staff_updates)
+    note_update("users", staff_id, staff_updates)
+    invalidate_profile(staff_id)
     
     return jsonify({
         "success": True,
@@ -1103,6 +1133,22 @@ def assign_manager_to_staff(staff_id):
     }), 200
 
 
+def _assign_staff_in_transaction(transaction, db, manager_ref, staff_ids, staff_updates):
+    """Assign `staff_ids` to the manager and add them to its team; returns the manager updates."""
+    manager_doc = manager_ref.get(transaction=transaction)
+    team = list((manager_doc.to_dict() or {}).get("team_staff_ids") or [])
+    team += [staff_id for staff_id in staff_ids if staff_id not in team]
+    manager_updates = {
+        "team_staff_ids": team,
+        "team_size": len(team),
+        "updated_at": now_iso()
+    }
+    for staff_id in staff_ids:
+        transaction.update(db.collection("users").document(staff_id), staff_updates)
+    transaction.update(manager_ref, manager_updates)
+    return manager_updates
+
+
 @manager_bp.post("/assign-staff")
 def assign_staff_to_manager():
     """
@@ -1124,11 +1170,15 @@ def assign_staff_to_manager():
             "success": true,
             "message": "5 staff members assigned to manager",
             "manager_id": "mgr123",
+            "results": [
+                {"user_id": "staff1", "name": "John Doe", "assigned": true},
+                {"user_id": "staff9", "error": "Staff member not found", "assigned": false}
+            ],
             "staff_assigned": [
                 {"user_id": "staff1", "name": "John Doe"},
                 {"user_id": "staff2", "name": "Jane Smith"}
             ],
-            "failed": []
+            "failed": [{"user_id": "staff9", "error": "Staff member not found"}]
         }
     """
     db = firestore.client()
@@ -1152,7 +1202,7 @@ def assign_staff_to_manager():
     
     # Verify target manager
     target_manager_ref = db.collection("users").document(target_manager_id)
-    target_manager_doc = target_manager_ref.get()
+    target_manager_doc = get_doc(db, "users", target_manager_id, ref=target_manager_ref)
     
     if not target_manager_doc.exists:
         return jsonify({"error": "Target manager not found"}), 404
@@ -1161,77 +1211,82 @@ def assign_staff_to_manager():
     if not _is_manager_role(target_manager_data.get("role", "staff")):
         return jsonify({"error": "Target user is not a manager"}), 400
     
-    # Get existing team_staff_ids array (if any)
-    existing_staff_ids = target_manager_data.get("team_staff_ids", [])
+    existing_staff_ids = target_manager_data.get("team_staff_ids", []) or []
     
-    # Process each staff member
-    staff_assigned = []
-    failed = []
+    # Results are reported per id, in request order. Duplicates are reported
+    # once; ids that cannot name a user are keyed by their position instead.
+    results = {}
+    for i, staff_id in enumerate(staff_ids):
+        if isinstance(staff_id, str) and staff_id:
+            results.setdefault(staff_id, None)
+        else:
+            results[i] = {"user_id": staff_id, "error": "Invalid staff id"}
+    valid_ids = [staff_id for staff_id in results if isinstance(staff_id, str)]
     
-    for staff_id in staff_ids:
+    # Fetch every staff document up front in batched reads
+    staff_docs = dict(zip(valid_ids, get_docs(db, "users", valid_ids)))
+    
+    to_assign = []
+    for staff_id in valid_ids:
+        staff_doc = staff_docs[staff_id]
+        if not staff_doc.exists:
+            results[staff_id] = {"user_id": staff_id, "error": "Staff member not found"}
+            continue
+        staff_data = staff_doc.to_dict() or {}
+        if staff_data.get("role") != "staff":
+            results[staff_id] = {"user_id": staff_id, "error": "User is not a staff member"}
+            continue
+        to_assign.append((staff_id, staff_data))
+    
+    # Each transaction writes a chunk of staff documents together with the
+    # manager's team list, so a staff member is never assigned without being
+    # on the team (or vice versa). The team is re-read inside the transaction
+    # so concurrent assignments to the same manager keep team_size exact.
+    team = list(existing_staff_ids)
+    chunk_size = batching.BATCH_LIMIT - 1
+    for start in range(0, len(to_assign), chunk_size):
+        chunk = to_assign[start:start + chunk_size]
+        staff_updates = {
+            "manager_id": target_manager_id,
+            "manager_name": target_manager_data.get("name"),
+            "manager_email": target_manager_data.get("email"),
+            "manager_assigned_at": now_iso(),
+            "updated_at": now_iso()
+        }
+        chunk_ids = [staff_id for staff_id, _ in chunk]
         try:
-            # Verify staff exists
-            staff_ref = db.collection("users").document(staff_id)
-            staff_doc = staff_ref.get()
-            
-            if not staff_doc.exists:
-                failed.append({
-                    "user_id": staff_id,
-                    "error": "Staff member not found"
-                })
-                continue
-            
-            staff_data = staff_doc.to_dict()
-            
-            # Verify is staff role
-            if staff_data.get("role") != "staff":
-                failed.append({
-                    "user_id": staff_id,
-                    "error": "User is not a staff member"
-                })
-                continue
-            
-            # Update staff document with manager_id
-            staff_ref.update({
-                "manager_id": target_manager_id,
-                "manager_name": target_manager_data.get("name"),
-                "manager_email": target_manager_data.get("email"),
-                "manager_assigned_at": now_iso(),
-                "updated_at": now_iso()
-            })
-            
-            # Add to assigned list
-            staff_assigned.append({
+            manager_updates = firestore.transactional(_assign_staff_in_transaction)(
+                db.transaction(), db, target_manager_ref, chunk_ids, staff_updates
+            )
+        except Exception as e:
+            for staff_id in chunk_ids:
+                results[staff_id] = {"user_id": staff_id, "error": str(e)}
+            continue
+        team = manager_updates["team_staff_ids"]
+        note_update("users", target_manager_id, manager_updates)
+        invalidate_profile(target_manager_id)
+        for staff_id, staff_data in chunk:
+            note_update("users", staff_id, staff_updates)
+            invalidate_profile(staff_id)
+            results[staff_id] = {
                 "user_id": staff_id,
                 "name": staff_data.get("name"),
                 "email": staff_data.get("email")
-            })
-            
-            # Add to team list if not already present
-            if staff_id not in existing_staff_ids:
-                existing_staff_ids.append(staff_id)
-        
-        except Exception as e:
-            failed.append({
-                "user_id": staff_id,
-                "error": str(e)
-            })
+            }
     
-    # Update manager document with team_staff_ids array
-    target_manager_ref.update({
-        "team_staff_ids": existing_staff_ids,
-        "team_size": len(existing_staff_ids),
-        "updated_at": now_iso()
-    })
+    reported = list(results.values())
+    staff_assigned = [r for r in reported if "error" not in r]
+    failed = [r for r in reported if "error" in r]
     
     return jsonify({
         "success": True,
         "message": f"{len(staff_assigned)} staff member(s) assigned to manager",
         "manager_id": target_manager_id,
         "manager_name": target_manager_data.get("name"),
+        "results": [{**r, "assigned": "error" not in r} for r in reported],
         "staff_assigned": staff_assigned,
         "failed": failed,
-        "total_team_size": len(existing_staff_ids)
+        "total_team_size": len(team)
     }), 200
 
 
@@ -1264,7 +1319,7 @@ def remove_manager_from_staff(staff_id):
     
     # Get staff document
     staff_ref = db.collection("users").document(staff_id)
-    staff_doc = staff_ref.get()
+    staff_doc = get_doc(db, "users", staff_id, ref=staff_ref)
     
     if not staff_doc.exists:
         return jsonify({"error": "Staff member not found"}), 404
@@ -1281,18 +1336,21 @@ def remove_manager_from_staff(staff_id):
         return jsonify({"error": "You are not assigned to this staff member"}), 403
     
     # Remove manager fields from staff document
-    staff_ref.update({
+    staff_updates = {
         "manager_id": firestore.DELETE_FIELD,
         "manager_name": firestore.DELETE_FIELD,
         "manager_email": firestore.DELETE_FIELD,
         "manager_assigned_at": firestore.DELETE_FIELD,
         "updated_at": now_iso()
-    })
+    }
+    staff_ref.update(staff_updates)
+    note_update("users", staff_id, staff_updates)
+    invalidate_profile(staff_id)
     
     # Remove from manager's team_staff_ids array
     if current_manager_id:
         manager_ref = db.collection("users").document(current_manager_id)
-        manager_doc = manager_ref.get()
+        manager_doc = get_doc(db, "users", current_manager_id, ref=manager_ref)
         
         if manager_doc.exists:
             manager_team_data = manager_doc.to_dict()
@@ -1300,11 +1358,14 @@ def remove_manager_from_staff(staff_id):
             
             if staff_id in team_staff_ids:
                 team_staff_ids.remove(staff_id)
-                manager_ref.update({
+                manager_updates = {
                     "team_staff_ids": team_staff_ids,
                     "team_size": len(team_staff_ids),
                     "updated_at": now_iso()
-                })
+                }
+                manager_ref.update(manager_updates)
+                note_update("users", current_manager_id, manager_updates)
+                invalidate_profile(current_manager_id)
     
     return jsonify({
         "success": True,
@@ -0,0 +1,248 @@
+"""
+In-process replica of the `memberships` collection.
+
+Project membership is looked up on almost every hot path (list_tasks, change
+notifications, note mentions, deadline checks, manager team views). The
+collection is small and rarely written, so instead of querying it each time we
+keep two maps in memory:
+
+    project_id -> {user_id, ...}
+    user_id    -> {project_id, ...}
+
+They are kept current by a Firestore `on_snapshot` listener started with
+`start()` (see app.create_app). Until the listener has delivered its first
+snapshot (or if it was never started, e.g. in scripts and tests), and again
+once it has failed or been closed, the helper functions fall back to querying
+Firestore directly, so callers never need to check whether the replica is
+ready. Endpoints that write memberships also report the write through
+`record_write` / `record_delete`, so their own next lookup sees it without
+waiting for the listener.
+"""
+import threading
+
+from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from .data_access import get_doc
+from .query_fanout import chunked, run_queries
+
+
+class MembershipReplica:
+    """Project/user membership maps fed by a collection snapshot listener."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._watch = None
+        # Set when the listener failed; its later snapshots are ignored
+        self._failed = False
+        # doc_id -> (project_id, user_id); needed to undo MODIFIED/REMOVED docs
+        self._docs = {}
+        self._members = {}
+        self._projects = {}
+
+    def start(self, db=None):
+        """Attach the snapshot listener (idempotent)."""
+        if self._watch is not None:
+            return
+        db = db or firestore.client()
+        self._failed = False
+        self._watch = db.collection("memberships").on_snapshot(self._on_snapshot)
+
+    def stop(self):
+        """Detach the listener and go back to direct queries."""
+        watch, self._watch = self._watch, None
+        self._ready.clear()
+        with self._lock:
+            self._docs.clear()
+            self._members.clear()
+            self._projects.clear()
+        if watch is not None:
+            _unsubscribe(watch)
+
+    def is_ready(self):
+        if not self._ready.is_set():
+            return False
+        # The listener closes itself on an unrecoverable error without
+        # telling the callback; stop serving the maps it no longer updates
+        watch = self._watch
+        if watch is not None and not getattr(watch, "is_active", True):
+            self._reset("membership listener closed")
+            return False
+        return True
+
+    def _reset(self, reason):
+        print(f"Membership replica disabled, falling back to queries: {reason}")
+        watch, self._watch = self._watch, None
+        self._failed = True
+        self._ready.clear()
+        with self._lock:
+            self._docs.clear()
+            self._members.clear()
+            self._projects.clear()
+        if watch is not None:
+            # May run on the listener's own thread, which cannot join itself
+            threading.Thread(target=_unsubscribe, args=(watch,), daemon=True).start()
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def _on_snapshot(self, col_snapshot, changes, read_time):
+        if self._failed:
+            return
+        try:
+            with self._lock:
+                for change in changes:
+                    doc = change.document
+                    self._discard(doc.id)
+                    if change.type.name != "REMOVED":
+                        self._add(doc.id, doc.to_dict() or {})
+        except Exception as e:
+            # The maps may be half-updated; do not serve them
+            self._reset(e)
+            return
+        self._ready.set()
+
+    def apply(self, doc_id, data):
+        """Apply a membership write made by this process (None: deleted).
+
+        The listener delivers it too, a moment later; applying it now lets
+        the writer's next lookup see it. A no-op while not ready.
+        """
+        if not self.is_ready():
+            return
+        with self._lock:
+            self._discard(doc_id)
+            if data is not None:
+                self._add(doc_id, data)
+
+    def _add(self, doc_id, data):
+        project_id = data.get("project_id")
+        user_id = data.get("user_id")
+        if not project_id or not user_id:
+            return
+        self._docs[doc_id] = (project_id, user_id)
+        self._members.setdefault(project_id, set()).add(user_id)
+        self._projects.setdefault(user_id, set()).add(project_id)
+
+    def _discard(self, doc_id):
+        entry = self._docs.pop(doc_id, None)
+        if entry is None:
+            return
+        project_id, user_id = entry
+        # Another membership doc may still link the same pair
+        if any(pair == entry for pair in self._docs.values()):
+            return
+        self._members.get(project_id, set()).discard(user_id)
+        self._projects.get(user_id, set()).discard(project_id)
+
+    def project_member_ids(self, project_id):
+        """Sorted member ids of a project, or None while not ready."""
+        if not self.is_ready():
+            return None
+        with self._lock:
+            return sorted(self._members.get(project_id, ()))
+
+    def user_project_ids(self, user_id):
+        """Sorted project ids a user belongs to, or None while not ready."""
+        if not self.is_ready():
+            return None
+        with self._lock:
+            return sorted(self._projects.get(user_id, ()))
+
+    def is_member(self, project_id, user_id):
+        """True/False membership check, or None while not ready."""
+        if not self.is_ready():
+            return None
+        with self._lock:
+            return user_id in self._members.get(project_id, ())
+
+
+def _unsubscribe(watch):
+    try:
+        watch.unsubscribe()
+    except Exception:
+        pass
+
+
+_replica = MembershipReplica()
+
+
+def start(db=None):
+    _replica.start(db)
+
+
+def stop():
+    _replica.stop()
+
+
+def is_ready():
+    return _replica.is_ready()
+
+
+def record_write(doc_id, data):
+    """Report that memberships/{doc_id} was just written with `data`."""
+    _replica.apply(doc_id, data)
+
+
+def record_delete(doc_id):
+    """Report that memberships/{doc_id} was just deleted."""
+    _replica.apply(doc_id, None)
+
+
+def project_member_ids(db, project_id):
+    """User ids of every member of `project_id`."""
+    ids = _replica.project_member_ids(project_id)
+    if ids is not None:
+        return ids
+    query = db.collection("memberships").where(filter=FieldFilter("project_id", "==", project_id)).stream()
+    return _unique((m.to_dict() or {}).get("user_id") for m in query)
+
+
+def user_project_ids(db, user_id):
+    """Project ids of every project `user_id` is a member of."""
+    ids = _replica.user_project_ids(user_id)
+    if ids is not None:
+        return ids
+    query = db.collection("memberships").where(filter=FieldFilter("user_id", "==", user_id)).stream()
+    return _unique((m.to_dict() or {}).get("project_id") for m in query)
+
+
+def members_by_project(db, project_ids):
+    """Map each of `project_ids` to the user ids of its members.
+
+    While the replica is warming up this issues chunked `project_id in [...]`
+    queries (run concurrently) instead of one query per project.
+    """
+    project_ids = _unique(project_ids)
+    if _replica.is_ready():
+        return {pid: _replica.project_member_ids(pid) for pid in project_ids}
+    members = {pid: [] for pid in project_ids}
+    queries = [
+        (f"memberships[{i}]", db.collection("memberships").where(filter=FieldFilter("project_id", "in", chunk)))
+        for i, chunk in enumerate(chunked(project_ids))
+    ]
+    for result in run_queries(queries):
+        if result.error is not None:
+            raise result.error
+        for m in result.docs:
+            md = m.to_dict() or {}
+            pid, uid = md.get("project_id"), md.get("user_id")
+            if uid and pid in members and uid not in members[pid]:
+                members[pid].append(uid)
+    return members
+
+
+def is_member(db, project_id, user_id):
+    """Whether `user_id` is a member of `project_id`."""
+    if not project_id or not user_id:
+        return False
+    member = _replica.is_member(project_id, user_id)
+    if member is not None:
+        return member
+    return get_doc(db, "memberships", f"{project_id}_{user_id}").exists
+
+
+def _unique(values):
+    """Drop empty values and duplicates, keeping first-seen order."""
+    return [value for value in dict.fromkeys(values) if value]
@@ -3,6 +3,9 @@ from flask import request, jsonify
 from . import memberships_bp
 from firebase_admin import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
+from .data_access import get_doc, note_set, note_delete
+from .profile_cache import get_role
+from . import aggregates, membership_replica
 
 def now_iso():
     return datetime.now(timezone.utc).isoformat()
@@ -15,9 +18,7 @@ def add_member():
     # If a viewer is provided, enforce RBAC (disallow staff)
     if viewer:
         try:
-            vdoc = db.collection('users').document(viewer).get()
-            vdata = vdoc.to_dict() if vdoc.exists else {}
-            vrole = (vdata.get('role') or 'staff').lower()
+            vrole = get_role(db, viewer)
         except Exception:
             vrole = 'staff'
         if vrole == 'staff':
@@ -31,11 +32,14 @@ def add_member():
     ref = db.collection("memberships").document(f"{project_id}_{user_id}")
     doc = {"project_id": project_id, "user_id": user_id, "role": role, "added_at": now_iso()}
     ref.set(doc)
+    note_set("memberships", f"{project_id}_{user_id}", doc, reference=ref)
+    membership_replica.record_write(f"{project_id}_{user_id}", doc)
+    aggregates.invalidate(aggregates.SYSTEM_STATISTICS)
     
     # Send notification to the new member
     try:
         # Get project details
-        project_doc = db.collection("projects").document(project_id).get()
+        project_doc = get_doc(db, "projects", project_id)
         if project_doc.exists:
             project_data = project_doc.to_dict() or {}
             project_name = project_data.get("name", "a project")
@@ -44,7 +48,7 @@ def add_member():
             added_by_name = "A manager"
             if viewer:
                 try:
-                    viewer_doc = db.collection("users").document(viewer).get()
+                    viewer_doc = get_doc(db, "users", viewer)
                     if viewer_doc.exists:
                         viewer_data = viewer_doc.to_dict() or {}
                         added_by_name = viewer_data.get("name", "A manager")
@@ -83,9 +87,7 @@ def remove_member(project_id, user_id):
         return jsonify({"error":"viewer_id required via X-User-Id header"}), 401
     # Lookup viewer role
     try:
-        vdoc = db.collection('users').document(viewer).get()
-        vdata = vdoc.to_dict() if vdoc.exists else {}
-        vrole = (vdata.get('role') or 'staff').lower()
+        vrole = get_role(db, viewer)
     except Exception:
         vrole = 'staff'
     # Disallow staff from removing memberships
@@ -93,11 +95,11 @@ def remove_member(project_id, user_id):
         return jsonify({"error":"Permission denied"}), 403
     doc_id = f"{project_id}_{user_id}"
     ref = db.collection("memberships").document(doc_id)
-    if not ref.get().exists:
+    if not get_doc(db, "memberships", doc_id, ref=ref).exists:
         return jsonify({"error": "Membership not found"}), 404
 
     # Prevent removing the project's owner via the membership endpoint
-    proj_ref = db.collection("projects").document(project_id).get()
+    proj_ref = get_doc(db, "projects", project_id)
     try:
         if proj_ref.exists:
             proj = proj_ref.to_dict() or {}
@@ -109,4 +111,7 @@ def remove_member(project_id, user_id):
         pass
 
     ref.delete()
+    note_delete("memberships", doc_id)
+    membership_replica.record_delete(doc_id)
+    aggregates.invalidate(aggregates.SYSTEM_STATISTICS)
     return jsonify({"ok": True, "project_id": project_id, "user_id": user_id}), 200
\ No newline at end of file
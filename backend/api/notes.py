@@ -3,6 +3,9 @@ from flask import request, jsonify
 from . import notes_bp
 from firebase_admin import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
+from .data_access import apply_update, get_doc, note_update, note_delete, version
+from . import membership_replica
+from .pagination import InvalidCursor, fetch_page, page_args, with_next_cursor
 import re
 
 def now_iso():
@@ -50,15 +53,14 @@ def add_note():
     # Send notifications about the new note
     try:
         # Get task details
-        task_ref = db.collection("tasks").document(task_id)
-        task_doc = task_ref.get()
+        task_doc = get_doc(db, "tasks", task_id)
         
         if task_doc.exists:
             task_data = task_doc.to_dict() or {}
             task_title = task_data.get("title", "Task")
             
             # Get author name
-            author_doc = db.collection("users").document(author_id).get()
+            author_doc = get_doc(db, "users", author_id)
             author_name = "Someone"
             if author_doc.exists:
                 author_data = author_doc.to_dict() or {}
@@ -84,7 +86,7 @@ def add_note():
                     try:
                         # Try to find user by username (assuming username might be stored as 'name' or 'user_id')
                         # First try exact user_id match
-                        user_doc = db.collection("users").document(username).get()
+                        user_doc = get_doc(db, "users", username)
                         if user_doc.exists:
                             recipients.add(username)
                         else:
@@ -100,14 +102,7 @@ def add_note():
             # 4. Project members (if task is in a project)
             project_id = task_data.get("project_id")
             if project_id:
-                mem_q = db.collection("memberships").where(
-                    filter=FieldFilter("project_id", "==", project_id)
-                ).stream()
-                for m in mem_q:
-                    md = m.to_dict() or {}
-                    uid = md.get("user_id")
-                    if uid:
-                        recipients.add(uid)
+                recipients.update(membership_replica.project_member_ids(db, project_id))
             
             # 5. Exclude the note author
             recipients.discard(author_id)
@@ -137,11 +132,18 @@ def add_note():
 
 @notes_bp.get("/by-task/<task_id>")
 def list_notes(task_id):
-    """List all notes for a task."""
+    """List a task's notes, oldest first, one page at a time."""
     db = firestore.client()
-    q = db.collection("notes").where(filter=FieldFilter("task_id", "==", task_id)).order_by("created_at").limit(100).stream()
-    res = [{"note_id": d.id, **d.to_dict()} for d in q]
-    return jsonify(res), 200
+    order = [("created_at", firestore.Query.ASCENDING)]
+    try:
+        limit, cursor = page_args(order=order)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    notes = db.collection("notes")
+    q = notes.where(filter=FieldFilter("task_id", "==", task_id))
+    docs, next_cursor = fetch_page(notes, q, order, limit, cursor)
+    res = [{"note_id": d.id, **d.to_dict()} for d in docs]
+    return with_next_cursor(jsonify(res), next_cursor), 200
 
 @notes_bp.patch("/<note_id>")
 def update_note(note_id):
@@ -154,7 +156,7 @@ def update_note(note_id):
     
     # Get the note
     note_ref = db.collection("notes").document(note_id)
-    note_doc = note_ref.get()
+    note_doc = get_doc(db, "notes", note_id, ref=note_ref)
     
     if not note_doc.exists:
         return jsonify({"error": "Note not found"}), 404
@@ -180,11 +182,8 @@ def update_note(note_id):
         "mentions": mentions,
         "edited_at": now_iso()
     }
-    note_ref.update(update_data)
-    
-    # Get updated document
-    updated_doc = note_ref.get()
-    return jsonify({"note_id": note_id, **updated_doc.to_dict()}), 200
+    updated_doc = apply_update(note_ref, note_doc, update_data, "notes")
+    return jsonify({"note_id": note_id, **updated_doc.to_dict(), "version": version(updated_doc)}), 200
 
 @notes_bp.delete("/<note_id>")
 def delete_note(note_id):
@@ -197,7 +196,7 @@ def delete_note(note_id):
     
     # Get the note
     note_ref = db.collection("notes").document(note_id)
-    note_doc = note_ref.get()
+    note_doc = get_doc(db, "notes", note_id, ref=note_ref)
     
     if not note_doc.exists:
         return jsonify({"error": "Note not found"}), 404
@@ -210,5 +209,6 @@ def delete_note(note_id):
     
     # Delete the note
     note_ref.delete()
+    note_delete("notes", note_id)
     
     return jsonify({"message": "Note deleted successfully"}), 200
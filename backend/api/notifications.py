@@ -1,10 +1,16 @@
 from datetime import datetime, timezone, timedelta
+import hashlib
 import os
-import re
+import time
 from flask import request, jsonify
 from . import notifications_bp
 from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
 from google.cloud.firestore_v1.base_query import FieldFilter
+from .batching import Batcher
+from .data_access import get_doc, get_docs
+from . import due_dates, email_outbox, membership_replica, unread_counter
+from .pagination import InvalidCursor, fetch_page, page_args
 from email_utils import send_email as send_email_util
 
 
@@ -13,8 +19,26 @@ def now_iso():
 
 
 
+def new_notification(user_id: str, title: str, body: str, task_id: str = None) -> dict:
+    return {
+        "user_id": user_id,
+        "title": title,
+        "body": body,
+        "task_id": task_id,
+        "created_at": now_iso(),
+        "read": False,
+        "email_sent": False,
+        "email_sent_at": None,
+    }
+
+
 def create_notification(db, user_id: str, title: str, body: str, task_id: str = None, send_email: bool = False):
-    """Create an in-app notification and optionally send an email.
+    """Create an in-app notification and optionally queue an email.
+
+    The email goes to the outbox (see email_outbox) in the same batch as the
+    notification and is sent by a background worker, which sets
+    `email_sent` / `email_sent_at` once it is delivered. The same batch adds
+    one to the user's unread counter (see unread_counter).
 
     Returns the notification document id on success, or None on failure.
     """
@@ -25,34 +49,27 @@ def create_notification(db, user_id: str, title: str, body: str, task_id: str =
     user_email = None
     if send_email:
         try:
-            user_doc = db.collection("users").document(user_id).get()
+            user_doc = get_doc(db, "users", user_id)
             user_data = user_doc.to_dict() if user_doc.exists else {}
             user_email = user_data.get("email")
         except Exception:
             user_email = None
 
-    notif = {
-        "user_id": user_id,
-        "title": title,
-        "body": body,
-        "task_id": task_id,
-        "created_at": now_iso(),
-        "read": False,
-        "email_sent": False,
-        "email_sent_at": None,
-    }
+    notif = new_notification(user_id, title, body, task_id)
 
-    # Create the notification document
+    # Create the notification document and count it as unread
     ref = db.collection("notifications").document()
-    ref.set(notif)
-
-    # Send email if requested and we have an address
-    if send_email and user_email:
-        ok = send_email_util(user_email, title, body)
-        if ok:
-            ref.update({"email_sent": True, "email_sent_at": now_iso()})
-            # email sent; no debug print to reduce noise
-
+    batch = db.batch()
+    batch.set(ref, notif)
+    unread_counter.add(batch, db, user_id, 1)
+    if not (send_email and user_email):
+        batch.commit()
+        return ref.id
+
+    # Queue the email with the notification so neither exists without the other
+    email_outbox.add(batch, db, ref.id, user_email, title, body)
+    batch.commit()
+    email_outbox.wake()
     return ref.id
 
 
@@ -76,7 +93,7 @@ def test_email():
         return jsonify({"error": "user_id is required"}), 400
     
     # Get user email
-    user_doc = db.collection("users").document(user_id).get()
+    user_doc = get_doc(db, "users", user_id)
     if not user_doc.exists:
         return jsonify({"error": "User not found"}), 404
     
@@ -102,235 +119,234 @@ def test_email():
         }), 500
 
 
+# `kind` of the deadline reminders in their reminder_id
+DEADLINE_REMINDER = "deadline"
+
+def _ms(started):
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def _window(start_iso: str, end_iso: str):
+    """(start, end) UTC datetimes of an ISO window given by the client."""
+    start, end = due_dates.parse_due(start_iso), due_dates.parse_due(end_iso)
+    if start is None or end is None:
+        raise ValueError("start_iso and end_iso must be ISO 8601 timestamps")
+    return start, end
+
+
+def _deadline_message(tdata: dict):
+    title = tdata.get("title") or "Task"
+    msg_title = f"Upcoming deadline tomorrow: {title}"
+    msg_body = f"Task '{title}' is due tomorrow at {tdata.get('due_date')}. Please review or update the task."
+    return msg_title, msg_body
+
+
+def _task_recipients(tdata: dict, members_by_project: dict):
+    """User ids involved in a task: creator, assignee and project members."""
+    user_ids = [
+        (tdata.get("created_by") or {}).get("user_id"),
+        (tdata.get("assigned_to") or {}).get("user_id"),
+    ]
+    user_ids.extend(members_by_project.get(tdata.get("project_id"), []))
+    return [uid for uid in dict.fromkeys(user_ids) if uid]
+
+
+def reminder_id(user_id: str, task_id: str, kind: str, window: str) -> str:
+    """Document id of the `kind` reminder sent to `user_id` about `task_id` for `window`.
+
+    Derived from a hash of its key, so every run that decides to send the same
+    reminder writes the same document and `create()` turns repeats into no-ops.
+    """
+    key = "\x1f".join(str(part) for part in (user_id, task_id, kind, window))
+    return f"{kind}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}"
+
+
+def _add_reminder(writer, db, reminder):
+    ref, notif, user_email = reminder
+    writer.create(ref, notif)
+    unread_counter.add(writer, db, notif["user_id"], 1)
+    if user_email:
+        email_outbox.add(writer, db, ref.id, user_email, notif["title"], notif["body"])
+
+
+def _commit_reminders(writer, db, group):
+    """Commit the writer's batch holding the reminders in `group`; returns those created.
+
+    If another run created one of them first, the batch fails as a whole and
+    is retried one reminder at a time, skipping the ones that now exist.
+    """
+    try:
+        writer.flush()
+        return group
+    except AlreadyExists:
+        done = []
+        for reminder in group:
+            _add_reminder(writer, db, reminder)
+            try:
+                writer.flush()
+                done.append(reminder)
+            except AlreadyExists:
+                pass
+        return done
+
+
+def _write_reminders(writer, db, reminders):
+    """Create (ref, notification, email) reminders on `writer` with their outbox emails.
+
+    A notification, its unread count and its email always share a batch.
+    Returns (created, emails queued).
+    """
+    done, group = [], []
+    for reminder in reminders:
+        size = 3 if reminder[2] else 2
+        if group and not writer.fits(size):
+            done += _commit_reminders(writer, db, group)
+            group = []
+        _add_reminder(writer, db, reminder)
+        group.append(reminder)
+    if group:
+        done += _commit_reminders(writer, db, group)
+    return len(done), sum(1 for reminder in done if reminder[2])
+
+
 @notifications_bp.post("/check-deadlines")
 def check_deadlines():
     """Check for tasks with due dates approaching and create notifications for involved users.
 
     Query params:
       hours - lookahead window in hours (default 24, starting from tomorrow)
+      start_iso, end_iso - explicit UTC window instead of `hours`
+      resend_existing - queue the email again for reminders whose email was never sent
+
+    The same check runs periodically as the `deadline_reminders` job (see jobs).
     """
     db = firestore.client()
     # Allow callers to specify an explicit start/end ISO window (UTC strings).
     # If not provided, fall back to the `hours` lookahead window starting from tomorrow.
     start_iso = request.args.get("start_iso")
     end_iso = request.args.get("end_iso")
-    if not start_iso or not end_iso:
-        try:
-            hours = int(request.args.get("hours") or 24)
-        except Exception:
-            hours = 24
-
-        now = datetime.now(timezone.utc)
-        # Start from tomorrow (24 hours from now)
-        tomorrow = now + timedelta(hours=24)
-        window_end = tomorrow + timedelta(hours=hours)
-        start_iso = tomorrow.isoformat()
-        end_iso = window_end.isoformat()
-
-    # Query tasks with due_date between start_iso and end_iso (ISO strings)
-    # Firestore stores due dates as strings in different formats sometimes
-    # (e.g. "YYYY-MM-DDTHH:MM"). Normalize start/end ISO to match stored
-    # format when possible so string comparisons behave as expected.
     try:
-        sample = next(db.collection("tasks").limit(1).stream(), None)
-        sample_due = None
-        if sample:
-            sample_due = (sample.to_dict() or {}).get("due_date")
-        if isinstance(sample_due, str) and re.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}$", sample_due):
-            # store minute-resolution UTC string like '2025-10-29T08:00'
-            def fmt_minute(dt: datetime) -> str:
-                return dt.strftime("%Y-%m-%dT%H:%M")
-
-            # parse the already computed ISO strings back to datetimes then
-            # format them to minute-only to match stored documents
-            try:
-                start_dt = datetime.fromisoformat(start_iso)
-                end_dt = datetime.fromisoformat(end_iso)
-                start_iso_q = fmt_minute(start_dt)
-                end_iso_q = fmt_minute(end_dt)
-            except Exception:
-                # fallback: fall back to using original strings if parsing fails
-                start_iso_q = start_iso
-                end_iso_q = end_iso
-        else:
-            start_iso_q = start_iso
-            end_iso_q = end_iso
-    except Exception as e:
-        print(f"check_deadlines: sample lookup failed: {e}")
-        start_iso_q = start_iso
-        end_iso_q = end_iso
-
-    q = db.collection("tasks").where(filter=FieldFilter("due_date", ">=", start_iso_q)).where(filter=FieldFilter("due_date", "<=", end_iso_q))
-    try:
-        docs_preview = [d.id for d in list(q.limit(50).stream())]
-    except Exception as e:
-        docs_preview = f"query-error:{e}"
-        print(f"check_deadlines: query preview error: {e}")
-    results = list(q.stream())
-    created = 0
-    resent = 0
+        hours = int(request.args.get("hours") or 24)
+    except Exception:
+        hours = 24
     # Allow requester to request resending for existing notification documents
     resend_existing = str(request.args.get("resend_existing") or "").lower() in ("1", "true", "yes")
-    for t in results:
-        tdata = t.to_dict() or {}
-        task_id = t.id
-        due_date = tdata.get("due_date")
-        title = tdata.get("title") or "Task"
-        msg_title = f"Upcoming deadline tomorrow: {title}"
-        msg_body = f"Task '{title}' is due tomorrow at {due_date}. Please review or update the task."
-
-        user_ids = set()
-        # creator
-        creator = (tdata.get("created_by") or {}).get("user_id")
-        if creator:
-            user_ids.add(creator)
-        # assignee
-        assignee = (tdata.get("assigned_to") or {}).get("user_id")
-        if assignee:
-            user_ids.add(assignee)
-        # project members
-        project_id = tdata.get("project_id")
-        if project_id:
-            mem_q = db.collection("memberships").where(filter=FieldFilter("project_id", "==", project_id)).stream()
-            for m in mem_q:
-                md = m.to_dict() or {}
-                uid = md.get("user_id")
-                if uid:
-                    user_ids.add(uid)
-        for uid in user_ids:
-            # Simple dedupe: check if a similar notification exists for this task & user
-            # Fetch user email for debugging
-            try:
-                udoc = db.collection("users").document(uid).get()
-                udata = udoc.to_dict() if udoc.exists else {}
-                user_email = udata.get("email")
-            except Exception:
-                user_email = None
-
-            existing_q = db.collection("notifications").where(filter=FieldFilter("user_id", "==", uid)).where(filter=FieldFilter("task_id", "==", task_id)).where(filter=FieldFilter("title", "==", msg_title)).limit(1).stream()
-            existing_docs = list(existing_q)
-            if existing_docs:
-                # existing notification doc found
-                existing_doc = existing_docs[0]
-                existing_data = existing_doc.to_dict() or {}
-                # If requested, attempt to resend email for existing notification when email hasn't been sent
-                if resend_existing and not existing_data.get("email_sent") and user_email:
-                    try:
-                        ok = send_email_util(user_email, msg_title, msg_body)
-                        if ok:
-                            existing_doc.reference.update({"email_sent": True, "email_sent_at": now_iso()})
-                            resent += 1
-                            # resent email successfully (no verbose print)
-                        else:
-                            # resend failed (no verbose print)
-                            pass
-                    except Exception as e:
-                        print(f"check_deadlines: resend exception for {existing_doc.id}: {e}")
-                else:
-                    # existing notification found; skipping create (no verbose print)
-                    pass
-                continue
-
-            # create notification for this user (no verbose print)
-            create_notification(db, uid, msg_title, msg_body, task_id=task_id, send_email=True)
-            created += 1
-
-    # Fallback / complementary path: iterate users and notify them of tasks that are due in the same window
-    # This uses the same per-user logic as the due-today endpoint to ensure users who are involved
-    # get an email even if the top-level task query didn't find them (covers membership/visibility edge cases).
-    users_q = db.collection("users").stream()
-    per_user_created = 0
     try:
-        for u in users_q:
-            uid = (u.to_dict() or {}).get("user_id") or u.id
-            if not uid:
-                continue
-            per_user_created += _notify_user_due_tasks(db, uid, start_iso, end_iso)
-    except Exception as e:
-        print(f"check_deadlines: per-user notification pass failed: {e}")
+        summary = run_deadline_check(db, start_iso, end_iso, hours=hours, resend_existing=resend_existing)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(summary), 200
 
-    total_created = created + per_user_created
-    return jsonify({"checked": len(results), "notifications_created": total_created}), 200
 
+def run_deadline_check(db, start_iso: str = None, end_iso: str = None, hours: int = 24, resend_existing: bool = False) -> dict:
+    """Create deadline reminders for the tasks due between start_iso and end_iso.
 
-def _notify_user_due_tasks(db, user_id: str, start_iso: str, end_iso: str) -> int:
-    """Find tasks due between start_iso and end_iso that involve user_id and create notifications.
+    Without an explicit window, covers `hours` hours starting 24 hours from now.
+    Tasks are matched on their canonical `due_ts` (see due_dates), so any ISO
+    form of start_iso / end_iso works; an unparseable one raises ValueError.
 
-    Returns number of notifications created for this user.
+    Runs in one pass over the tasks due in the window: members and user
+    documents of every task are fetched in bulk, each reminder's
+    deterministic id (see reminder_id) is looked up in one batched read, and
+    new notifications (with their outbox emails) are created in batches, so
+    retried or overlapping runs never remind anyone twice. Returns counts and
+    timings per phase.
     """
-    # Normalize per same logic as check_deadlines: many docs store minute-only
-    # ISO datetimes like 'YYYY-MM-DDTHH:MM'. Detect and format accordingly.
-    try:
-        sample = next(db.collection("tasks").limit(1).stream(), None)
-        sample_due = None
-        if sample:
-            sample_due = (sample.to_dict() or {}).get("due_date")
-        if isinstance(sample_due, str) and re.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}$", sample_due):
-            try:
-                start_dt = datetime.fromisoformat(start_iso)
-                end_dt = datetime.fromisoformat(end_iso)
-                start_iso_q = start_dt.strftime("%Y-%m-%dT%H:%M")
-                end_iso_q = end_dt.strftime("%Y-%m-%dT%H:%M")
-            except Exception:
-                start_iso_q = start_iso
-                end_iso_q = end_iso
-        else:
-            start_iso_q = start_iso
-            end_iso_q = end_iso
-    except Exception:
-        start_iso_q = start_iso
-        end_iso_q = end_iso
+    started = time.perf_counter()
+    if not start_iso or not end_iso:
+        now = datetime.now(timezone.utc)
+        # Start from tomorrow (24 hours from now)
+        window_start = now + timedelta(hours=24)
+        window_end = window_start + timedelta(hours=hours)
+    else:
+        window_start, window_end = _window(start_iso, end_iso)
+    phases = {}
+
+    # 1. Tasks due in the window
+    phase_started = time.perf_counter()
+    q = (db.collection("tasks")
+         .where(filter=FieldFilter(due_dates.DUE_TS_FIELD, ">=", window_start))
+         .where(filter=FieldFilter(due_dates.DUE_TS_FIELD, "<=", window_end)))
+    results = list(q.stream())
+    phases["query"] = {"tasks": len(results), "ms": _ms(phase_started)}
 
-    q = db.collection("tasks").where(filter=FieldFilter("due_date", ">=", start_iso_q)).where(filter=FieldFilter("due_date", "<=", end_iso_q))
-    docs = list(q.stream())
-    created_local = 0
-    for d in docs:
-        data = d.to_dict() or {}
+    # 2. Recipients: members of every project at once, then every user's email
+    phase_started = time.perf_counter()
+    tasks = []
+    for t in results:
+        data = t.to_dict() or {}
+        # Archived tasks keep their due date but nobody works on them any more
         if data.get("archived"):
             continue
+        tasks.append((t.id, data))
+    project_ids = [tdata.get("project_id") for _, tdata in tasks if tdata.get("project_id")]
+    members = membership_replica.members_by_project(db, project_ids) if project_ids else {}
+    recipients = {task_id: _task_recipients(tdata, members) for task_id, tdata in tasks}
+    user_ids = list(dict.fromkeys(uid for uids in recipients.values() for uid in uids))
+    emails = {}
+    if user_ids:
+        for udoc in get_docs(db, "users", user_ids):
+            if udoc.exists:
+                emails[udoc.id] = (udoc.to_dict() or {}).get("email")
+    phases["recipients"] = {
+        "projects": len(members),
+        "users": len(user_ids),
+        "pairs": sum(len(uids) for uids in recipients.values()),
+        "ms": _ms(phase_started),
+    }
 
-        task_id = d.id
-        involved = False
-        creator = (data.get("created_by") or {}).get("user_id")
-        if creator == user_id:
-            involved = True
-        assignee = (data.get("assigned_to") or {}).get("user_id")
-        if assignee == user_id:
-            involved = True
-
-        if not involved:
-            project_id = data.get("project_id")
-            if project_id:
-                mem_id = f"{project_id}_{user_id}"
-                if db.collection("memberships").document(mem_id).get().exists:
-                    involved = True
-
-        if involved:
-            title = data.get("title") or "Task"
-            msg_title = f"Upcoming deadline tomorrow: {title}"
-            msg_body = f"Task '{title}' is due tomorrow at {data.get('due_date')}. Please review or update the task."
-
-            # Fetch user email for debugging
-            try:
-                udoc = db.collection("users").document(user_id).get()
-                udata = udoc.to_dict() if udoc.exists else {}
-                user_email = udata.get("email")
-            except Exception:
-                user_email = None
-
-            # Dedupe by checking for existing notification
-            existing_q = db.collection("notifications").where(filter=FieldFilter("user_id", "==", user_id)).where(filter=FieldFilter("task_id", "==", task_id)).where(filter=FieldFilter("title", "==", msg_title)).limit(1).stream()
-            exists = any(existing_q)
-            if exists:
-                # existing notification found; skip (no verbose print)
-                continue
-
-            # create notification for this user (no verbose print)
-            create_notification(db, user_id, msg_title, msg_body, task_id=task_id, send_email=True)
-            created_local += 1
+    # 3. Dedupe: every reminder has a deterministic id, so look them up by key
+    phase_started = time.perf_counter()
+    candidates = []
+    for task_id, tdata in tasks:
+        msg_title, msg_body = _deadline_message(tdata)
+        for uid in recipients[task_id]:
+            rid = reminder_id(uid, task_id, DEADLINE_REMINDER, tdata.get("due_date"))
+            candidates.append((rid, uid, task_id, msg_title, msg_body))
+    existing = {}
+    if candidates:
+        for snap in get_docs(db, "notifications", [c[0] for c in candidates]):
+            if snap.exists:
+                existing[snap.id] = snap
+    phases["dedupe"] = {"candidates": len(candidates), "existing": len(existing), "ms": _ms(phase_started)}
+
+    # 4. Create new notifications (and queued emails) in batches
+    phase_started = time.perf_counter()
+    notifications = db.collection("notifications")
+    reminders, resends = [], []
+    for rid, uid, task_id, msg_title, msg_body in candidates:
+        user_email = emails.get(uid)
+        existing_doc = existing.get(rid)
+        if existing_doc is None:
+            notif = new_notification(uid, msg_title, msg_body, task_id)
+            reminders.append((notifications.document(rid), notif, user_email))
+        elif resend_existing and user_email and not (existing_doc.to_dict() or {}).get("email_sent"):
+            # Queue the email again for an existing notification whose email hasn't been sent
+            resends.append((rid, user_email, msg_title, msg_body))
+    writer = Batcher(db)
+    created, queued = _write_reminders(writer, db, reminders)
+    for rid, user_email, msg_title, msg_body in resends:
+        email_outbox.add(writer, db, rid, user_email, msg_title, msg_body)
+    writer.flush()
+    resent = len(resends)
+    queued += resent
+    if queued:
+        email_outbox.wake()
+    phases["write"] = {
+        "created": created,
+        "resent": resent,
+        "emails_queued": queued,
+        "batches": writer.commits,
+        "ms": _ms(phase_started),
+    }
 
-    # summary logging removed; only exceptions are printed
-    return created_local
+    return {
+        "checked": len(results),
+        "notifications_created": created,
+        "emails_resent": resent,
+        "phases": phases,
+        "elapsed_ms": _ms(started),
+    }
 
 
 @notifications_bp.get("/due-today")
@@ -352,17 +368,16 @@ def due_today():
         now = datetime.now(timezone.utc)
         start = datetime(now.year, now.month, now.day, 0, 0, 0, tzinfo=timezone.utc)
         end = start + timedelta(days=1, microseconds=-1)
-        start_iso = start.isoformat()
-        end_iso = end.isoformat()
-
-    # Query tasks with due_date between start and end
-    q = db.collection("tasks").where(filter=FieldFilter("due_date", ">=", start_iso)).where(filter=FieldFilter("due_date", "<=", end_iso))
-    # Debug prints removed: only log on exceptions
-    try:
-        docs_preview = [d.id for d in list(q.limit(50).stream())]
-    except Exception as e:
-        docs_preview = f"query-error:{e}"
-        print(f"due_today: query preview error: {e}")
+    else:
+        try:
+            start, end = _window(start_iso, end_iso)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    # Query tasks with due_ts between start and end
+    q = (db.collection("tasks")
+         .where(filter=FieldFilter(due_dates.DUE_TS_FIELD, ">=", start))
+         .where(filter=FieldFilter(due_dates.DUE_TS_FIELD, "<=", end)))
     docs = list(q.stream())
     res = []
     for d in docs:
@@ -382,10 +397,8 @@ def due_today():
 
         if not involved:
             project_id = data.get("project_id")
-            if project_id:
-                mem_id = f"{project_id}_{viewer}"
-                if db.collection("memberships").document(mem_id).get().exists:
-                    involved = True
+            if project_id and membership_replica.is_member(db, project_id, viewer):
+                involved = True
 
         if involved:
             # Minimal task info
@@ -398,3 +411,137 @@ def due_today():
             })
 
     return jsonify({"count": len(res), "tasks": res}), 200
+
+
+# Newest first; the cursor carries created_at and the document id
+INBOX_ORDER = [("created_at", "DESCENDING")]
+INBOX_PAGE_SIZE = 20
+
+
+def _viewer_id():
+    return request.headers.get("X-User-Id") or request.args.get("user_id")
+
+
+def notification_to_json(d):
+    data = d.to_dict() or {}
+    return {
+        "notification_id": d.id,
+        "title": data.get("title"),
+        "body": data.get("body"),
+        "task_id": data.get("task_id"),
+        "created_at": data.get("created_at"),
+        "read": bool(data.get("read")),
+        "read_at": data.get("read_at"),
+    }
+
+
+@notifications_bp.get("")
+def list_notifications():
+    """The requesting user's notifications, newest first.
+
+    Uses X-User-Id header or ?user_id query param. Paginated with ?limit= and
+    ?cursor= (see pagination); the body carries `next_cursor` and the user's
+    unread count.
+    """
+    db = firestore.client()
+    viewer = _viewer_id()
+    if not viewer:
+        return jsonify({"error": "user_id required via X-User-Id header or ?user_id"}), 401
+    try:
+        limit, cursor = page_args(default=INBOX_PAGE_SIZE, order=INBOX_ORDER)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    notifications = db.collection("notifications")
+    query = notifications.where(filter=FieldFilter("user_id", "==", viewer))
+    docs, next_cursor = fetch_page(notifications, query, INBOX_ORDER, limit, cursor)
+    return jsonify({
+        "notifications": [notification_to_json(d) for d in docs],
+        "next_cursor": next_cursor,
+        "unread": unread_counter.get(db, viewer),
+    }), 200
+
+
+@notifications_bp.get("/unread-count")
+def unread_count():
+    """Unread notifications of the requesting user, for the badge (one document read)."""
+    db = firestore.client()
+    viewer = _viewer_id()
+    if not viewer:
+        return jsonify({"error": "user_id required via X-User-Id header or ?user_id"}), 401
+    return jsonify({"user_id": viewer, "unread": unread_counter.get(db, viewer)}), 200
+
+
+def _mark_read_in_transaction(transaction, ref, db, user_id):
+    snap = ref.get(transaction=transaction)
+    data = (snap.to_dict() or {}) if snap.exists else {}
+    if data.get("user_id") != user_id:
+        return None
+    if data.get("read"):
+        return False
+    transaction.update(ref, {"read": True, "read_at": now_iso()})
+    unread_counter.add(transaction, db, user_id, -1)
+    return True
+
+
+def mark_read(db, user_id, notification_id):
+    """Mark one of `user_id`'s notifications read.
+
+    Returns None if the notification does not exist or is someone else's,
+    otherwise whether it was still unread.
+    """
+    ref = db.collection("notifications").document(notification_id)
+    return firestore.transactional(_mark_read_in_transaction)(db.transaction(), ref, db, user_id)
+
+
+def mark_all_read(db, user_id):
+    """Mark every unread notification of `user_id` read; returns how many were marked.
+
+    The updates go through a BulkWriter, each on the condition that the
+    notification has not changed since it was listed, so one marked read in
+    the meantime is neither updated nor subtracted from the counter twice.
+    """
+    unread = (db.collection("notifications")
+              .where(filter=FieldFilter("user_id", "==", user_id))
+              .where(filter=FieldFilter("read", "==", False)))
+    marked = []
+    writer = db.bulk_writer()
+    writer.on_write_result(lambda ref, result, bulk_writer: marked.append(ref.id))
+    # A failed precondition means the notification changed; leave it to the next call
+    writer.on_write_error(lambda failure, bulk_writer: False)
+    read_at = now_iso()
+    try:
+        for doc in unread.select([]).stream():
+            writer.update(doc.reference, {"read": True, "read_at": read_at},
+                          option=db.write_option(last_update_time=doc.update_time))
+        writer.flush()
+        # Taken before the counter write below, which reports a result too
+        count = len(marked)
+        if count:
+            unread_counter.add(writer, db, user_id, -count)
+    finally:
+        writer.close()
+    return count
+
+
+@notifications_bp.post("/<notification_id>/read")
+def read_notification(notification_id):
+    """Mark one of the requesting user's notifications read."""
+    db = firestore.client()
+    viewer = _viewer_id()
+    if not viewer:
+        return jsonify({"error": "user_id required via X-User-Id header or ?user_id"}), 401
+    changed = mark_read(db, viewer, notification_id)
+    if changed is None:
+        return jsonify({"error": "Notification not found"}), 404
+    return jsonify({"notification_id": notification_id, "read": True, "changed": changed}), 200
+
+
+@notifications_bp.post("/read-all")
+def read_all_notifications():
+    """Mark all of the requesting user's notifications read."""
+    db = firestore.client()
+    viewer = _viewer_id()
+    if not viewer:
+        return jsonify({"error": "user_id required via X-User-Id header or ?user_id"}), 401
+    return jsonify({"marked": mark_all_read(db, viewer)}), 200
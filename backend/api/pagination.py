@@ -0,0 +1,149 @@
+"""
+Cursor pagination for list endpoints.
+
+Every paginated endpoint accepts the same two query parameters:
+
+    ?limit=N      page size (default depends on the endpoint, clamped to
+                  1..PAGE_SIZE_MAX; a non-numeric value falls back to the default)
+    ?cursor=...   opaque token from the previous page's `next_cursor`
+
+Pages are read with `order_by(<sort key>..., "__name__")` + `start_after` +
+`limit(N + 1)`, so each request touches at most N + 1 documents no matter how
+large the collection grows. The document id is always the final sort key,
+which makes the order stable even when the other sort values tie. The extra
+document only tells us whether another page exists; it is not returned.
+
+`next_cursor` is None on the last page. Endpoints whose body is a bare JSON
+array (kept that way for existing clients) return it in the `X-Next-Cursor`
+response header instead of the body.
+
+Filters a query cannot express are applied by `fill_page`, which reads on
+until the page is full instead of returning short pages.
+"""
+import base64
+import json
+import os
+
+from flask import request
+
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+MAX_PAGE_SIZE = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+# Reads `fill_page` may take to fill one page
+FILL_MAX_ROUNDS = int(os.getenv("PAGE_FILL_MAX_ROUNDS", "5"))
+
+DOCUMENT_ID = "__name__"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """The `cursor` query parameter could not be decoded."""
+
+
+def page_args(default=DEFAULT_PAGE_SIZE, order=()):
+    """(limit, cursor values) from `?limit=` and `?cursor=`.
+
+    Raises InvalidCursor for a malformed cursor or one that does not match the
+    endpoint's `order`; handlers turn it into a 400.
+    """
+    try:
+        limit = int(request.args.get("limit") or default)
+    except (TypeError, ValueError):
+        limit = default
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    token = request.args.get("cursor")
+    if not token:
+        return limit, None
+    cursor = decode_cursor(token)
+    if len(cursor) != len(order) + 1:
+        raise InvalidCursor("invalid cursor")
+    return limit, cursor
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise InvalidCursor("invalid cursor") from e
+    if not isinstance(values, list) or not values or not isinstance(values[-1], str):
+        raise InvalidCursor("invalid cursor")
+    return values
+
+
+def page_query(collection, query, order, limit, cursor=None):
+    """Order `query` by `order` plus document id and position it after `cursor`.
+
+    `order` is a list of (field, direction) pairs; the document id follows the
+    direction of the last one (ascending when `order` is empty). `collection`
+    is the CollectionReference the query runs on, used to turn the cursor's
+    document id back into a reference. Fetches `limit + 1` documents.
+    """
+    direction = order[-1][1] if order else "ASCENDING"
+    for field, field_direction in order:
+        query = query.order_by(field, direction=field_direction)
+    query = query.order_by(DOCUMENT_ID, direction=direction)
+    if cursor is not None:
+        position = {field: value for (field, _), value in zip(order, cursor)}
+        position[DOCUMENT_ID] = collection.document(cursor[-1])
+        query = query.start_after(position)
+    return query.limit(limit + 1)
+
+
+def split_page(docs, limit, order=()):
+    """(first `limit` docs, next cursor or None) from a `limit + 1` fetch."""
+    docs = list(docs)
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    last = docs[-1]
+    data = last.to_dict() or {}
+    return docs, encode_cursor([data.get(field) for field, _ in order] + [last.id])
+
+
+def fetch_page(collection, query, order, limit, cursor=None):
+    """Stream one page of `query`; returns (docs, next_cursor)."""
+    docs = page_query(collection, query, order, limit, cursor).stream()
+    return split_page(docs, limit, order)
+
+
+def fill_page(scan, keep, limit, order=(), cursor=None, max_rounds=FILL_MAX_ROUNDS):
+    """One page of the documents `keep(doc)` accepts; returns (docs, next_cursor).
+
+    `scan(position)` reads the next page after `position` (cursor values, or
+    None for the start) and returns (docs, next_cursor) like `fetch_page`.
+    While `keep` leaves fewer than `limit` docs, the scan continues after the
+    last document it returned, at most `max_rounds` times; the page only
+    comes out short when the rounds run out.
+    """
+    docs, position, next_cursor = [], cursor, None
+    for _ in range(max_rounds):
+        scanned, next_cursor = scan(position)
+        docs += [d for d in scanned if keep(d)]
+        if len(docs) >= limit or not next_cursor:
+            break
+        position = decode_cursor(next_cursor)
+    if len(docs) > limit:
+        return split_page(docs, limit, order)
+    # Otherwise the next page resumes after the last document scanned
+    return docs, next_cursor
+
+
+def fetch_filtered_page(collection, query, order, limit, cursor=None, keep=None):
+    """`fetch_page` for the documents `keep(doc)` accepts (see `fill_page`)."""
+    if keep is None:
+        return fetch_page(collection, query, order, limit, cursor)
+    return fill_page(lambda position: fetch_page(collection, query, order, limit, position),
+                     keep, limit, order, cursor)
+
+
+def with_next_cursor(response, next_cursor):
+    """Attach `next_cursor` to a Flask response whose body is a JSON array."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
@@ -0,0 +1,97 @@
+"""
+Denormalized task participants.
+
+Each task document carries `participant_ids`: the creator's user id plus
+every assignee's (assigned_to is a single {user_id, ...} dict, or a list of
+them after a multi-assign). "Tasks a user created or is assigned to" is then
+one `array_contains` query instead of a created_by query and an assigned_to
+query merged and deduped in Python, and a set of users is one
+`array_contains_any` query per chunk of ids.
+
+Every write that sets created_by or assigned_to must also set
+`participant_ids` (see `participant_ids` / `participant_updates`). Tasks
+written before the field existed are filled in by
+backend/backfill_participant_ids.py.
+"""
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from .batching import Batcher
+from .pagination import decode_cursor, fetch_page
+from .query_fanout import chunked
+
+PARTICIPANTS_FIELD = "participant_ids"
+BACKFILL_PAGE_SIZE = 500
+
+
+def _user_id(person):
+    if isinstance(person, dict):
+        return person.get("user_id")
+    return None
+
+
+def creator_id(data):
+    return _user_id((data or {}).get("created_by"))
+
+
+def assignee_ids(data):
+    assigned = (data or {}).get("assigned_to")
+    people = assigned if isinstance(assigned, list) else [assigned]
+    return [uid for uid in (_user_id(p) for p in people) if uid]
+
+
+def participant_ids(data):
+    """Sorted, de-duplicated creator and assignee ids of a task."""
+    ids = set(assignee_ids(data))
+    creator = creator_id(data)
+    if creator:
+        ids.add(creator)
+    return sorted(ids)
+
+
+def participant_updates(current, updates):
+    """`updates` plus the recomputed participant_ids when they change who is involved."""
+    if "created_by" not in updates and "assigned_to" not in updates:
+        return updates
+    return {**updates, PARTICIPANTS_FIELD: participant_ids({**(current or {}), **updates})}
+
+
+def tasks_for(db, user_id):
+    """Query for every task `user_id` created or is assigned to."""
+    return db.collection("tasks").where(filter=FieldFilter(PARTICIPANTS_FIELD, "array_contains", user_id))
+
+
+def tasks_for_any(db, user_ids):
+    """(label, query) pairs covering the tasks of any of `user_ids`, for run_queries."""
+    return [
+        (f"participants[{i}]", db.collection("tasks").where(filter=FieldFilter(PARTICIPANTS_FIELD, "array_contains_any", chunk)))
+        for i, chunk in enumerate(chunked(sorted(u for u in user_ids if u)))
+    ]
+
+
+def backfill(db, page_size=BACKFILL_PAGE_SIZE, dry_run=False):
+    """Set participant_ids on every task where it is missing or stale.
+
+    Streams tasks `page_size` at a time and commits each page's updates
+    before reading the next. Returns (tasks scanned, tasks updated).
+    """
+    tasks = db.collection("tasks")
+    query = tasks.select(["created_by", "assigned_to", PARTICIPANTS_FIELD])
+    writer = Batcher(db)
+    scanned = updated = 0
+    cursor = None
+    while True:
+        docs, next_cursor = fetch_page(tasks, query, [], page_size, cursor)
+        for doc in docs:
+            scanned += 1
+            data = doc.to_dict() or {}
+            ids = participant_ids(data)
+            if data.get(PARTICIPANTS_FIELD) == ids:
+                continue
+            if not dry_run:
+                writer.update(doc.reference, {PARTICIPANTS_FIELD: ids})
+            updated += 1
+        writer.flush()
+        if not next_cursor:
+            break
+        cursor = decode_cursor(next_cursor)
+    return scanned, updated
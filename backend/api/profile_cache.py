@@ -0,0 +1,104 @@
+"""
+Process-wide cache of user profiles used for role checks.
+
+Almost every endpoint starts by reading the caller's user document to find out
+their role. `get_user` keeps recently read profiles in a bounded LRU with a
+short TTL so those checks stop costing a Firestore read per request.
+
+Only existing users are cached; a missing user is looked up again next time so
+freshly created accounts show up immediately. Endpoints that change a user's
+role, status or department must call `invalidate(user_id)` after writing.
+"""
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .data_access import LocalSnapshot, get_doc
+
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "60"))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "1024"))
+
+
+class ProfileCache:
+    """Thread-safe LRU of user_id -> profile dict with per-entry expiry."""
+
+    def __init__(self, ttl_seconds=PROFILE_CACHE_TTL_SECONDS,
+                 max_entries=PROFILE_CACHE_MAX_ENTRIES, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return a copy of the cached profile, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at <= self._clock():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return copy.deepcopy(data)
+
+    def put(self, user_id, data):
+        with self._lock:
+            self._entries[user_id] = (self._clock() + self.ttl_seconds, copy.deepcopy(data))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_cache = ProfileCache()
+
+
+def get_user(db, user_id):
+    """Return a snapshot of `users/user_id`, served from the cache when fresh.
+
+    The returned object behaves like a DocumentSnapshot (`exists`, `to_dict()`,
+    `get()`), so it can replace a direct `document(user_id).get()` call.
+    """
+    if not user_id:
+        return LocalSnapshot(user_id, None, exists=False)
+    data = _cache.get(user_id)
+    if data is not None:
+        return LocalSnapshot(user_id, data)
+    snap = get_doc(db, "users", user_id)
+    if snap.exists:
+        data = snap.to_dict()
+        if isinstance(data, dict):
+            _cache.put(user_id, data)
+    return snap
+
+
+def get_role(db, user_id, default="staff"):
+    """Return the lower-cased role of `user_id`, or `default` if unknown."""
+    snap = get_user(db, user_id)
+    data = (snap.to_dict() or {}) if snap.exists else {}
+    return (data.get("role") or default).lower()
+
+
+def invalidate(user_id):
+    """Drop a user's cached profile after it has been changed."""
+    _cache.invalidate(user_id)
+
+
+def clear():
+    """Empty the cache (used by tests and maintenance scripts)."""
+    _cache.clear()
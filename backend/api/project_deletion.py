@@ -0,0 +1,212 @@
+"""
+Cascading project deletion as a background job.
+
+Deleting a project removes everything that hangs off it: its tasks, each
+task's subtasks, notes, attachments and task_labels mappings, and the
+project's memberships. A large project is thousands of documents, far too
+many to delete one `.delete()` round trip at a time inside a request, so
+`start` records a job and returns immediately while a worker thread deletes
+the documents in WriteBatches of up to 500 writes.
+
+Progress is kept in `project_deletions/{project_id}`:
+
+    {"project_id": .., "status": "queued" | "running" | "done" | "failed",
+     "deleted": {"tasks": .., "subtasks": .., "notes": .., "attachments": ..,
+                 "task_labels": .., "memberships": ..},
+     "requested_by": .., "started_at": .., "updated_at": .., "finished_at": ..,
+     "error": ..}
+
+and served by GET /api/projects/<id>/deletion. The project document itself
+is marked `deleting: true` when the job starts and removed last, so a failed
+job can simply be started again. Tag usage counts and the admin dashboard
+counters and label usage counts are adjusted for the deleted tasks a page at
+a time.
+"""
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from . import counters, labels, membership_replica, tag_index
+from .batching import Batcher
+from .pagination import decode_cursor, fetch_page
+from .query_fanout import chunked, run_queries
+
+DELETION_JOBS_COLLECTION = "project_deletions"
+PROJECT_DELETION_WORKERS = int(os.getenv("PROJECT_DELETION_WORKERS", "2"))
+# Tasks read (and deleted) per page
+TASK_PAGE_SIZE = 500
+# Per-task collections removed with their task
+TASK_CHILD_COLLECTIONS = ("subtasks", "notes", "attachments", "task_labels")
+# Fields read from child documents before deleting them
+_CHILD_FIELDS = {"task_labels": ["label_id"]}
+# A queued/running job not updated for this long is assumed to have died
+# with its process and may be started again
+JOB_STALE_SECONDS = int(os.getenv("PROJECT_DELETION_STALE_SECONDS", "300"))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=PROJECT_DELETION_WORKERS,
+                thread_name_prefix="project-deletion",
+            )
+        return _executor
+
+
+def _submit(fn, *args):
+    return _get_executor().submit(fn, *args)
+
+
+def job_ref(db, project_id):
+    return db.collection(DELETION_JOBS_COLLECTION).document(project_id)
+
+
+def get_job(db, project_id):
+    """The deletion job of `project_id` as a dict, or None if there is none."""
+    snap = job_ref(db, project_id).get()
+    return (snap.to_dict() or {}) if snap.exists else None
+
+
+def _is_active(job):
+    if not job or job.get("status") not in ACTIVE_STATUSES:
+        return False
+    try:
+        updated = datetime.fromisoformat(job.get("updated_at") or "")
+    except ValueError:
+        return False
+    return (datetime.now(timezone.utc) - updated).total_seconds() < JOB_STALE_SECONDS
+
+
+def _child_docs(db, task_ids):
+    """{collection: [docs]} of the per-task documents of `task_ids`."""
+    queries = [
+        (name, db.collection(name).where(filter=FieldFilter("task_id", "in", chunk))
+                                  .select(_CHILD_FIELDS.get(name, [])))
+        for chunk in chunked(task_ids)
+        for name in TASK_CHILD_COLLECTIONS
+    ]
+    docs = {name: [] for name in TASK_CHILD_COLLECTIONS}
+    for result in run_queries(queries):
+        if result.error is not None:
+            raise result.error
+        docs[result.label].extend(result.docs)
+    return docs
+
+
+def _delete_tasks(db, project_id, job):
+    tasks = db.collection("tasks")
+    query = tasks.where(filter=FieldFilter("project_id", "==", project_id)) \
+                 .select(["tags", "archived", "status", "priority"])
+    deleted = job["deleted"]
+    cursor = None
+    while True:
+        docs, next_cursor = fetch_page(tasks, query, [], TASK_PAGE_SIZE, cursor)
+        if docs:
+            writer = Batcher(db)
+            children = _child_docs(db, [d.id for d in docs])
+            for name, child_docs in children.items():
+                for child in child_docs:
+                    writer.delete(child.reference)
+                deleted[name] += len(child_docs)
+            labels.release_mappings(writer, db, [m.to_dict() or {} for m in children["task_labels"]])
+            task_data = [d.to_dict() or {} for d in docs]
+            for doc in docs:
+                writer.delete(doc.reference)
+            tag_index.release_tasks(writer, db, task_data)
+            writer.flush()
+            counters.record_tasks_deleted(db, task_data)
+            deleted["tasks"] += len(docs)
+            _save(db, project_id, job)
+        if not next_cursor:
+            return
+        cursor = decode_cursor(next_cursor)
+
+
+def _delete_memberships(db, project_id, job):
+    memberships = db.collection("memberships") \
+                    .where(filter=FieldFilter("project_id", "==", project_id)).select([]).stream()
+    writer = Batcher(db)
+    deleted = []
+    for m in memberships:
+        writer.delete(m.reference)
+        deleted.append(m.id)
+        job["deleted"]["memberships"] += 1
+    writer.flush()
+    for doc_id in deleted:
+        membership_replica.record_delete(doc_id)
+    _save(db, project_id, job)
+
+
+def _save(db, project_id, job):
+    job["updated_at"] = now_iso()
+    job_ref(db, project_id).set(job)
+
+
+def run(db, project_id, project_data=None):
+    """Delete `project_id` and everything under it, recording progress.
+
+    Runs on the deletion worker (see `start`); returns the final job dict.
+    Errors are recorded on the job rather than raised.
+    """
+    job = get_job(db, project_id) or new_job(project_id)
+    job.update({"status": "running", "error": None})
+    _save(db, project_id, job)
+    try:
+        _delete_tasks(db, project_id, job)
+        _delete_memberships(db, project_id, job)
+        project_ref = db.collection("projects").document(project_id)
+        if project_data is None:
+            snap = project_ref.get()
+            project_data = (snap.to_dict() or {}) if snap.exists else None
+        project_ref.delete()
+        if project_data is not None:
+            counters.record_project(db, before=project_data)
+        job.update({"status": "done", "finished_at": now_iso()})
+    except Exception as e:
+        print(f"Failed to delete project {project_id}: {e}")
+        job.update({"status": "failed", "error": str(e)})
+    _save(db, project_id, job)
+    return job
+
+
+def new_job(project_id, requested_by=None):
+    return {
+        "project_id": project_id,
+        "status": "queued",
+        "deleted": {name: 0 for name in ("tasks",) + TASK_CHILD_COLLECTIONS + ("memberships",)},
+        "requested_by": requested_by,
+        "started_at": now_iso(),
+        "updated_at": now_iso(),
+        "finished_at": None,
+        "error": None,
+    }
+
+
+def start(db, project_id, project_data, requested_by=None):
+    """Queue the deletion of `project_id` unless it is already under way.
+
+    Returns (job, started): the job dict and whether a new job was queued.
+    """
+    existing = get_job(db, project_id)
+    if _is_active(existing):
+        return existing, False
+    job = new_job(project_id, requested_by)
+    job_ref(db, project_id).set(job)
+    db.collection("projects").document(project_id).update({"deleting": True, "updated_at": now_iso()})
+    _submit(run, db, project_id, project_data)
+    return job, True
@@ -0,0 +1,43 @@
+"""
+Field projections for list endpoints.
+
+List views only need a subset of each document. Queries are narrowed with
+Firestore `select()` so unused fields (long descriptions, notes, history...)
+never leave the server, and clients can trim the JSON rows further with
+`?fields=title,status,due_date`. The id key of each row is always kept.
+"""
+from flask import request
+
+
+def requested_fields(available):
+    """Response keys asked for via `?fields=`, limited to `available`.
+
+    Returns None when the parameter is absent (meaning: every field).
+    Unknown names are ignored.
+    """
+    raw = request.args.get("fields") or ""
+    wanted = {f.strip() for f in raw.split(",") if f.strip()}
+    if not wanted:
+        return None
+    return [f for f in available if f in wanted]
+
+
+def select_fields(default, requested=None, required=()):
+    """Document fields to `select()`.
+
+    `default` is the endpoint's full projection; when the client asked for a
+    subset only those are kept, plus `required` fields the handler itself
+    needs for filtering or sorting.
+    """
+    fields = list(default) if requested is None else [f for f in default if f in requested]
+    for field in required:
+        if field not in fields:
+            fields.append(field)
+    return fields
+
+
+def trim(row, fields, keep=("task_id",)):
+    """Drop keys the client did not ask for (no-op when `fields` is None)."""
+    if fields is None:
+        return row
+    return {k: v for k, v in row.items() if k in fields or k in keep}
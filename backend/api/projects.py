@@ -3,6 +3,9 @@ from flask import request, jsonify
 from . import projects_bp
 from firebase_admin import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
+from . import counters, membership_replica, project_deletion
+from .data_access import apply_update, version
+from .pagination import InvalidCursor, fetch_page, page_args, with_next_cursor
 
 def now_iso():
     return datetime.now(timezone.utc).isoformat()
@@ -54,27 +57,34 @@ def create_project():
         "archived": False,
     }
     proj_ref.set(doc)
+    counters.record_project(db, after=doc)
 
     # Ensure owner is also a member (role=owner)
     mem_id = f"{project_id}_{owner_id}"
-    db.collection("memberships").document(mem_id).set({
+    membership = {
         "membership_id": mem_id,
         "project_id": project_id,
         "user_id": owner_id,
         "role": "owner",
         "created_at": now_iso()
-    })
+    }
+    db.collection("memberships").document(mem_id).set(membership)
+    membership_replica.record_write(mem_id, membership)
 
     return jsonify({"project_id": proj_ref.id, **doc}), 201
 
 @projects_bp.get("")
 def list_projects():
     db = firestore.client()
-    q = db.collection("projects") \
-          .order_by("created_at", direction=firestore.Query.DESCENDING) \
-          .stream()
-    res = [{"project_id": d.id, **d.to_dict()} for d in q]
-    return jsonify(res), 200
+    order = [("created_at", firestore.Query.DESCENDING)]
+    try:
+        limit, cursor = page_args(order=order)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    projects = db.collection("projects")
+    docs, next_cursor = fetch_page(projects, projects, order, limit, cursor)
+    res = [{"project_id": d.id, **d.to_dict()} for d in docs]
+    return with_next_cursor(jsonify(res), next_cursor), 200
 
 @projects_bp.get("/<project_id>")
 def get_project(project_id):
@@ -89,26 +99,38 @@ def patch_project(project_id):
     db = firestore.client()
     payload = request.get_json(force=True) or {}
     ref = db.collection("projects").document(project_id)
-    if not ref.get().exists:
+    snap = ref.get()
+    if not snap.exists:
         return jsonify({"error": "Project not found"}), 404
     updates = {k: v for k, v in payload.items() if k in {"name", "key", "description", "archived"}}
     if not updates:
         return jsonify({"error": "No fields to update"}), 400
     updates["updated_at"] = now_iso()
-    ref.update(updates)
-    return jsonify({"project_id": project_id, **ref.get().to_dict()}), 200
+    updated = apply_update(ref, snap, updates)
+    return jsonify({"project_id": project_id, **updated.to_dict(), "version": version(updated)}), 200
 
 @projects_bp.delete("/<project_id>")
 def delete_project(project_id):
+    """Start deleting a project with its tasks and memberships in the background.
+
+    Returns 202 with the deletion job; poll GET /<project_id>/deletion for
+    progress.
+    """
     db = firestore.client()
     ref = db.collection("projects").document(project_id)
-    if not ref.get().exists:
+    snap = ref.get()
+    if not snap.exists:
         return jsonify({"error": "Project not found"}), 404
 
-    # Cleanup memberships for this project
-    mems = db.collection("memberships").where(filter=FieldFilter("project_id", "==", project_id)).stream()
-    for m in mems:
-        db.collection("memberships").document(m.id).delete()
+    requested_by = (request.headers.get('X-User-Id') or request.args.get('viewer_id') or '').strip() or None
+    job, _ = project_deletion.start(db, project_id, snap.to_dict(), requested_by)
+    return jsonify({"ok": True, "project_id": project_id, "job": job}), 202
 
-    ref.delete()
-    return jsonify({"ok": True, "project_id": project_id}), 200
+@projects_bp.get("/<project_id>/deletion")
+def get_project_deletion(project_id):
+    """Progress of a project's deletion job."""
+    db = firestore.client()
+    job = project_deletion.get_job(db, project_id)
+    if job is None:
+        return jsonify({"error": "No deletion job for this project"}), 404
+    return jsonify(job), 200
@@ -0,0 +1,80 @@
+"""
+Concurrent execution of independent Firestore queries.
+
+Several endpoints build a handful of queries whose results are simply merged
+(e.g. "tasks I created" + "tasks assigned to me" + "tasks in my projects").
+Streaming them one after another costs one full round trip each; `run_queries`
+streams them on a small shared thread pool instead and reports how long each
+one took so handlers can surface the timings in their diagnostics.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+QUERY_FANOUT_MAX_WORKERS = int(os.getenv("QUERY_FANOUT_MAX_WORKERS", "8"))
+
+# Firestore accepts at most 30 values in an `in` / `array-contains-any` filter
+IN_QUERY_LIMIT = 30
+
+QueryResult = namedtuple("QueryResult", ["label", "docs", "elapsed_ms", "error"])
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=QUERY_FANOUT_MAX_WORKERS,
+                thread_name_prefix="firestore-query",
+            )
+        return _executor
+
+
+def chunked(values, size=IN_QUERY_LIMIT):
+    """Split `values` into lists of at most `size` items for `in` filters."""
+    values = list(values)
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def _stream(label, query):
+    started = time.perf_counter()
+    try:
+        docs = list(query.stream())
+        error = None
+    except Exception as e:
+        docs = []
+        error = e
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    return QueryResult(label, docs, elapsed_ms, error)
+
+
+def run_queries(queries):
+    """Stream every `(label, query)` pair and return their results in input order.
+
+    A query that raises yields an empty `docs` list with `error` set to the
+    exception, so one failing query never hides the results of the others;
+    callers that cannot tolerate partial results can re-raise it. A single
+    query is streamed inline without touching the pool.
+    """
+    queries = list(queries)
+    if len(queries) <= 1:
+        return [_stream(label, query) for label, query in queries]
+    executor = _get_executor()
+    futures = [executor.submit(_stream, label, query) for label, query in queries]
+    return [future.result() for future in futures]
+
+
+def timings(results):
+    """Summarise results for a `_diag` payload."""
+    out = []
+    for result in results:
+        entry = {"query": result.label, "ms": result.elapsed_ms, "docs": len(result.docs)}
+        if result.error is not None:
+            entry["error"] = str(result.error)
+        out.append(entry)
+    return out
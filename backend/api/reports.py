@@ -13,7 +13,8 @@ from openpyxl.styles import Font, Alignment, PatternFill
 import io
 import csv
 
-from . import reports_bp
+from . import due_dates, reports_bp
+from .profile_cache import get_user
 
 def _viewer_id():
     """Get the current user ID from request headers"""
@@ -23,7 +24,7 @@ def _is_admin_or_hr(db, user_id):
     """Check if user is admin or HR"""
     if not user_id:
         return False
-    user_doc = db.collection("users").document(user_id).get()
+    user_doc = get_user(db, user_id)
     if not user_doc.exists:
         return False
     user_role = (user_doc.to_dict() or {}).get("role", "").lower()
@@ -121,7 +122,7 @@ def task_completion_report():
         due_date_str = task_data.get("due_date")
         
         if due_date_str:
-            due_date = parse_date(due_date_str)
+            due_date = due_dates.due_at(task_data) or parse_date(due_date_str)
             if due_date:
                 # Check date range
                 if start_date and due_date < start_date:
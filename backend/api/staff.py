@@ -2,8 +2,18 @@
 from flask import request, jsonify
 from firebase_admin import firestore
 from . import staff_bp
+from . import counters, due_dates, labels, task_acl
+from .data_access import get_docs
+from .participants import PARTICIPANTS_FIELD, assignee_ids, creator_id, participant_ids, tasks_for
+from .projection import requested_fields, select_fields, trim
 from datetime import datetime, timezone
 
+# Task fields returned by get_my_tasks (the ones create_task writes, plus archived)
+STAFF_TASK_FIELDS = [
+    'title', 'description', 'priority', 'status', 'due_date', 'created_by',
+    'assigned_to', 'project_id', 'labels', 'created_at', 'updated_at', 'archived',
+]
+
 @staff_bp.route('/dashboard', methods=['GET'])
 def get_staff_dashboard():
     """Staff dashboard - only their own tasks"""
@@ -21,29 +31,23 @@ def get_staff_dashboard():
     current_user = user_doc.to_dict()
     current_user['user_id'] = user_id
     
-    # Get tasks created by this staff member
-    my_tasks_query = db.collection('tasks').where('created_by.user_id', '==', user_id).stream()
+    # Tasks created by or assigned to this staff member, in one query
     my_tasks = []
-    for task_doc in my_tasks_query:
-        task_data = task_doc.to_dict()
-        task_data['task_id'] = task_doc.id
-        my_tasks.append(task_data)
-    
-    # Get tasks assigned to this staff member
-    assigned_tasks_query = db.collection('tasks').where('assigned_to.user_id', '==', user_id).stream()
     assigned_tasks = []
-    for task_doc in assigned_tasks_query:
+    for task_doc in tasks_for(db, user_id).stream():
         task_data = task_doc.to_dict()
         task_data['task_id'] = task_doc.id
-        assigned_tasks.append(task_data)
+        if creator_id(task_data) == user_id:
+            my_tasks.append(task_data)
+        if user_id in assignee_ids(task_data):
+            assigned_tasks.append(task_data)
     
     # Get projects this staff is part of
     memberships = db.collection('memberships').where('user_id', '==', user_id).stream()
     project_ids = [mem.to_dict().get('project_id') for mem in memberships]
     
     projects = []
-    for project_id in project_ids:
-        project_doc = db.collection('projects').document(project_id).get()
+    for project_id, project_doc in zip(project_ids, get_docs(db, 'projects', project_ids)):
         if project_doc.exists:
             project_data = project_doc.to_dict()
             project_data['project_id'] = project_id
@@ -73,13 +77,17 @@ def get_my_tasks():
         return jsonify({'error': 'user_id required'}), 400
     
     # Can only see own tasks
+    fields = requested_fields(STAFF_TASK_FIELDS)
     tasks = []
-    my_tasks = db.collection('tasks').where('created_by.user_id', '==', user_id).stream()
+    my_tasks = (db.collection('tasks')
+                .where('created_by.user_id', '==', user_id)
+                .select(select_fields(STAFF_TASK_FIELDS, fields))
+                .stream())
     
     for task_doc in my_tasks:
         task_data = task_doc.to_dict()
         task_data['task_id'] = task_doc.id
-        tasks.append(task_data)
+        tasks.append(trim(task_data, fields))
     
     return jsonify({'tasks': tasks}), 200
 
@@ -105,7 +113,7 @@ def create_task():
         'description': data.get('description', ''),
         'priority': data.get('priority', 5),
         'status': data.get('status', 'To Do'),
-        'due_date': data.get('due_date'),
+        **due_dates.due_fields(data.get('due_date')),
         'created_by': {
             'user_id': user_id,
             'name': user_data.get('name'),
@@ -117,8 +125,12 @@ def create_task():
         'created_at': datetime.now(timezone.utc).isoformat(),
         'updated_at': datetime.now(timezone.utc).isoformat()
     }
+    task_data[PARTICIPANTS_FIELD] = participant_ids(task_data)
+    task_acl.with_visible_to(db, task_data)
     
     task_ref = db.collection('tasks').add(task_data)
+    counters.record_task(db, after=task_data)
+    labels.assign_to_new_task(db, task_ref[1].id, task_data['labels'])
     
     return jsonify({
         'success': True,
@@ -0,0 +1,140 @@
+"""
+Per-tag usage counts for the tag catalog.
+
+`tag_index/{id}` holds {"tag": <tag>, "count": <non-archived tasks carrying
+it>}, so listing or searching tags reads the (small) index instead of every
+task. The task endpoints keep it current: `set_task` and `update_task` write
+the task and the affected index entries in one transaction, using
+`firestore.Increment` so concurrent writers to the same tag do not conflict.
+Entries whose count drops to 0 are kept (and filtered out when listing).
+
+`rebuild` recounts from the tasks collection a page at a time; run
+backend/rebuild_tag_index.py after deploying the index or if it drifts.
+"""
+from collections import Counter
+
+from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from .batching import Batcher
+from .pagination import decode_cursor, fetch_page
+
+TAG_INDEX_COLLECTION = "tag_index"
+REBUILD_PAGE_SIZE = 500
+
+
+def _doc_id(tag):
+    # Tags are free text; escape anything that could be a path separator or
+    # form a reserved id ("." / ".." / "__x__") the way URLs escape bytes
+    return "".join(
+        ch if (ch.isascii() and ch.isalnum()) or ch == "-"
+        else "".join(f"%{b:02X}" for b in ch.encode("utf-8"))
+        for ch in tag
+    )
+
+
+def tag_ref(db, tag):
+    return db.collection(TAG_INDEX_COLLECTION).document(_doc_id(tag))
+
+
+def task_tags(data):
+    """The tags a task contributes to the index (none once it is archived)."""
+    if not data or data.get("archived"):
+        return set()
+    tags = data.get("tags")
+    return {t for t in tags if isinstance(t, str) and t} if isinstance(tags, list) else set()
+
+
+def _write_deltas(writer, db, before, after):
+    old, new = task_tags(before), task_tags(after)
+    for tag, delta in [(t, 1) for t in new - old] + [(t, -1) for t in old - new]:
+        writer.set(tag_ref(db, tag), {"tag": tag, "count": firestore.Increment(delta)}, merge=True)
+
+
+def _set_in_transaction(transaction, db, task_ref, task_doc):
+    transaction.set(task_ref, task_doc)
+    _write_deltas(transaction, db, None, task_doc)
+
+
+def _update_in_transaction(transaction, db, task_ref, updates):
+    # Re-read inside the transaction so the deltas match the stored tags
+    snap = task_ref.get(transaction=transaction)
+    before = snap.to_dict() or {}
+    transaction.update(task_ref, updates)
+    _write_deltas(transaction, db, before, {**before, **updates})
+
+
+def set_task(db, task_ref, task_doc):
+    """Create a task, counting its tags in the same transaction."""
+    if not task_tags(task_doc):
+        task_ref.set(task_doc)
+        return
+    firestore.transactional(_set_in_transaction)(db.transaction(), db, task_ref, task_doc)
+
+
+def update_task(db, task_ref, current, updates):
+    """Apply `updates` to a task whose last-read data is `current`.
+
+    Only writes that change the task's indexed tags (tag edits, archival) go
+    through a transaction; everything else is a plain update. Returns the
+    plain update's WriteResult (None for a transaction).
+    """
+    if task_tags(current) == task_tags({**current, **updates}):
+        return task_ref.update(updates)
+    firestore.transactional(_update_in_transaction)(db.transaction(), db, task_ref, updates)
+    return None
+
+
+def release_tasks(writer, db, tasks):
+    """Add the index decrements for deleting `tasks` (their data) to `writer`.
+
+    `writer` is a batch (or anything with a batch's `set`); each tag gets a
+    single write however many of the tasks carry it.
+    """
+    counts = Counter(tag for data in tasks for tag in task_tags(data))
+    for tag, n in sorted(counts.items()):
+        writer.set(tag_ref(db, tag), {"tag": tag, "count": firestore.Increment(-n)}, merge=True)
+
+
+def list_entries(db, prefix="", limit=100, cursor=None):
+    """One page of index entries whose tag starts with `prefix`, by tag.
+
+    Returns (docs, next_cursor); entries with a zero count are dropped from
+    the page, so it may come out short.
+    """
+    collection = db.collection(TAG_INDEX_COLLECTION)
+    query = collection
+    if prefix:
+        query = query.where(filter=FieldFilter("tag", ">=", prefix)) \
+                     .where(filter=FieldFilter("tag", "<", prefix + "\uf8ff"))
+    docs, next_cursor = fetch_page(collection, query, [("tag", "ASCENDING")], limit, cursor)
+    return [d for d in docs if ((d.to_dict() or {}).get("count") or 0) > 0], next_cursor
+
+
+def rebuild(db, page_size=REBUILD_PAGE_SIZE):
+    """Recount every tag from the tasks collection and overwrite the index.
+
+    Returns {tag: count}. Tasks are streamed `page_size` at a time so memory
+    stays flat on large tenants.
+    """
+    tasks = db.collection("tasks")
+    counts = {}
+    cursor = None
+    while True:
+        docs, next_cursor = fetch_page(tasks, tasks.select(["tags", "archived"]), [], page_size, cursor)
+        for doc in docs:
+            for tag in task_tags(doc.to_dict()):
+                counts[tag] = counts.get(tag, 0) + 1
+        if not next_cursor:
+            break
+        cursor = decode_cursor(next_cursor)
+
+    writer = Batcher(db)
+    for tag, n in counts.items():
+        writer.set(tag_ref(db, tag), {"tag": tag, "count": n})
+    keep = {_doc_id(tag) for tag in counts}
+    for doc in db.collection(TAG_INDEX_COLLECTION).stream():
+        if doc.id not in keep:
+            writer.delete(doc.reference)
+    writer.flush()
+    return counts
@@ -1,19 +1,34 @@
 from flask import request, jsonify
-from . import tags_bp
+from . import tags_bp, tag_index
 from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+from .pagination import InvalidCursor, page_args
 
 # Tags are simple strings (max 12 chars) stored directly on tasks
-# No separate tags collection needed - just validate and store on task.tags array (max 3 tags)
+# (task.tags array, max 3 tags). Usage counts are kept in tag_index.
 
 @tags_bp.get("")
 def list_tags():
-    """Get all unique tags across all tasks"""
+    """Get all unique tags in use on non-archived tasks"""
     db = firestore.client()
-    tasks = db.collection("tasks").stream()
-    tag_set = set()
-    for task in tasks:
-        task_data = task.to_dict() or {}
-        tags = task_data.get("tags", [])
-        if isinstance(tags, list):
-            tag_set.update(tags)
-    return jsonify(sorted(list(tag_set))), 200
\ No newline at end of file
+    entries = db.collection(tag_index.TAG_INDEX_COLLECTION) \
+                .where(filter=FieldFilter("count", ">", 0)).stream()
+    tag_set = {(e.to_dict() or {}).get("tag") for e in entries}
+    tag_set.discard(None)
+    return jsonify(sorted(tag_set)), 200
+
+@tags_bp.get("/catalog")
+def tag_catalog():
+    """Tags with their usage counts, alphabetical, filtered by ?prefix= and paginated."""
+    db = firestore.client()
+    prefix = (request.args.get("prefix") or "").strip()
+    try:
+        limit, cursor = page_args(order=[("tag", "ASCENDING")])
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    docs, next_cursor = tag_index.list_entries(db, prefix, limit, cursor)
+    tags = []
+    for d in docs:
+        data = d.to_dict() or {}
+        tags.append({"tag": data.get("tag"), "count": data.get("count", 0)})
+    return jsonify({"tags": tags, "next_cursor": next_cursor}), 200
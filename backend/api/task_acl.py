@@ -0,0 +1,366 @@
+"""
+Precomputed task visibility.
+
+Each task document carries `visible_to`, the ids of every non-admin user
+allowed to see it under the rules `tasks._can_view_task_doc` used to evaluate
+on each request:
+
+    - the creator and the assignee(s)
+    - every member of the task's project
+    - the direct manager (users/{id}.manager_id) of the creator and assignee(s),
+      when that manager's role is one of MANAGER_ROLES
+
+With the list in place a visibility check is an in-memory `viewer in
+visible_to` (plus the viewer's cached role for admins), and "every task I can
+see" is a single `visible_to array_contains` query.
+
+Task writes that change the inputs on the task itself (create, reassign,
+project move) set `visible_to` inline through `acl_updates` /
+`with_visible_to`. Changes elsewhere - memberships added or removed,
+a user's manager_id or role changing - are picked up by `AclPropagator`,
+which listens to the memberships and users collections (see app.create_app)
+and recomputes the affected tasks on a background thread. The list is therefore
+eventually consistent for those changes; backend/verify_task_acl.py reports
+(and with --fix repairs) any task whose stored list differs from the rules.
+
+Tasks written before the field existed have no `visible_to` and never match
+the array_contains query. A completed `verify(fix=True)` pass records
+`completed_at` on migrations/task_acl; until `is_backfilled` sees it, task
+lists also run the old per-rule queries (see `legacy_visible_queries`).
+"""
+import queue
+import threading
+from datetime import datetime, timezone
+
+from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from .batching import Batcher
+from .data_access import get_docs
+from .membership_replica import project_member_ids
+from .pagination import decode_cursor, fetch_page
+from .participants import PARTICIPANTS_FIELD, participant_ids
+
+ACL_FIELD = "visible_to"
+# Task fields the ACL is derived from
+ACL_INPUT_FIELDS = ["created_by", "assigned_to", "project_id"]
+VERIFY_PAGE_SIZE = 500
+# migrations/task_acl records the completed backfill
+MIGRATIONS_COLLECTION = "migrations"
+BACKFILL_DOC = "task_acl"
+# Firestore caps `in` filters; used by the legacy queries
+IN_QUERY_LIMIT = 10
+# Roles whose direct reports' tasks they may see
+MANAGER_ROLES = ("manager", "director", "hr")
+
+# Set once the backfill is known to be complete; it never becomes incomplete
+_backfilled = threading.Event()
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _manages(user_data):
+    return ((user_data or {}).get("role") or "staff").lower() in MANAGER_ROLES
+
+
+def _manager_ids(db, user_ids):
+    managers = set()
+    for user_doc in get_docs(db, "users", user_ids):
+        if user_doc.exists:
+            manager_id = (user_doc.to_dict() or {}).get("manager_id")
+            if manager_id:
+                managers.add(manager_id)
+    managers = sorted(managers)
+    return {
+        manager_id for manager_id, manager_doc in zip(managers, get_docs(db, "users", managers))
+        if manager_doc.exists and _manages(manager_doc.to_dict())
+    }
+
+
+def _project_members(db, project_id, members_cache=None):
+    if not project_id:
+        return []
+    if members_cache is None:
+        return project_member_ids(db, project_id)
+    if project_id not in members_cache:
+        members_cache[project_id] = project_member_ids(db, project_id)
+    return members_cache[project_id]
+
+
+def compute_visible_to(db, data, members_cache=None):
+    """Sorted ids of the non-admin users who may see a task with `data`."""
+    people = participant_ids(data)
+    ids = set(people)
+    ids.update(_project_members(db, (data or {}).get("project_id"), members_cache))
+    ids.update(_manager_ids(db, people))
+    return sorted(ids)
+
+
+def with_visible_to(db, data):
+    """Set `visible_to` on a new task document (in place) and return it."""
+    data[ACL_FIELD] = compute_visible_to(db, data)
+    return data
+
+
+def acl_updates(db, current, updates):
+    """`updates` plus the recomputed `visible_to` when it changes an ACL input."""
+    if not any(field in updates for field in ACL_INPUT_FIELDS):
+        return updates
+    return {**updates, ACL_FIELD: compute_visible_to(db, {**(current or {}), **updates})}
+
+
+def can_view(data, viewer_id, viewer_role=None):
+    """In-memory visibility check; None if the task predates `visible_to`."""
+    if viewer_role == "admin":
+        return True
+    acl = (data or {}).get(ACL_FIELD)
+    if not isinstance(acl, list):
+        return None
+    return viewer_id in acl
+
+
+def visible_tasks(db, viewer_id):
+    """Query for every task `viewer_id` may see (non-admin viewers)."""
+    return db.collection("tasks").where(filter=FieldFilter(ACL_FIELD, "array_contains", viewer_id))
+
+
+def backfill_ref(db):
+    return db.collection(MIGRATIONS_COLLECTION).document(BACKFILL_DOC)
+
+
+def is_backfilled(db):
+    """Whether every task has `visible_to` (a full `verify(fix=True)` pass ran).
+
+    Reads migrations/task_acl until it says so, then remembers it.
+    """
+    if not _backfilled.is_set():
+        snap = backfill_ref(db).get()
+        if snap.exists and (snap.to_dict() or {}).get("completed_at"):
+            _backfilled.set()
+    return _backfilled.is_set()
+
+
+def _chunks(ids, n=IN_QUERY_LIMIT):
+    for i in range(0, len(ids), n):
+        yield ids[i:i + n]
+
+
+def legacy_visible_queries(db, viewer_id, viewer_role, project_ids):
+    """(label, query) pairs for tasks a non-admin may see, by the rules themselves.
+
+    Covers tasks that predate `visible_to`: the viewer's created and assigned
+    tasks, the tasks of `project_ids` (the viewer's projects) and, for
+    managers, those created by or assigned to their direct reports. The
+    results overlap the `visible_tasks` query, so callers dedupe by id.
+    """
+    tasks = db.collection("tasks")
+    queries = [
+        ("created_by", tasks.where(filter=FieldFilter("created_by.user_id", "==", viewer_id))),
+        ("assigned_to", tasks.where(filter=FieldFilter("assigned_to.user_id", "==", viewer_id))),
+    ]
+    for i, chunk in enumerate(_chunks(list(project_ids))):
+        queries.append((f"member_projects[{i}]", tasks.where(filter=FieldFilter("project_id", "in", chunk))))
+    if viewer_role == "manager":
+        team = db.collection("users").where(filter=FieldFilter("manager_id", "==", viewer_id))
+        team_ids = [u.id for u in team.select([]).stream()]
+        for i, chunk in enumerate(_chunks(team_ids)):
+            queries.append((f"team_created_by[{i}]", tasks.where(filter=FieldFilter("created_by.user_id", "in", chunk))))
+            queries.append((f"team_assigned_to[{i}]", tasks.where(filter=FieldFilter("assigned_to.user_id", "in", chunk))))
+    return queries
+
+
+def recompute(db, query, members_cache=None):
+    """Recompute `visible_to` for every task `query` matches; returns tasks updated."""
+    members_cache = {} if members_cache is None else members_cache
+    writer = Batcher(db)
+    updated = 0
+    for doc in query.select(ACL_INPUT_FIELDS + [ACL_FIELD]).stream():
+        data = doc.to_dict() or {}
+        acl = compute_visible_to(db, data, members_cache)
+        if data.get(ACL_FIELD) == acl:
+            continue
+        writer.update(doc.reference, {ACL_FIELD: acl})
+        updated += 1
+    writer.flush()
+    return updated
+
+
+def recompute_project(db, project_id):
+    """Recompute the tasks of a project whose membership changed."""
+    # Read the members directly: the membership replica may not have seen
+    # the change that triggered this job yet
+    memberships = db.collection("memberships").where(filter=FieldFilter("project_id", "==", project_id)).stream()
+    members = sorted({(m.to_dict() or {}).get("user_id") for m in memberships} - {None})
+    tasks = db.collection("tasks").where(filter=FieldFilter("project_id", "==", project_id))
+    return recompute(db, tasks, {project_id: members})
+
+
+def recompute_user(db, user_id):
+    """Recompute the tasks a user created or is assigned (their manager changed)."""
+    tasks = db.collection("tasks").where(filter=FieldFilter(PARTICIPANTS_FIELD, "array_contains", user_id))
+    return recompute(db, tasks)
+
+
+def recompute_reports(db, manager_id):
+    """Recompute the tasks of a user's direct reports (their role changed)."""
+    team = db.collection("users").where(filter=FieldFilter("manager_id", "==", manager_id))
+    return sum(recompute_user(db, report.id) for report in team.select([]).stream())
+
+
+def verify(db, fix=False, page_size=VERIFY_PAGE_SIZE):
+    """Compare every task's stored `visible_to` with the current rules.
+
+    Returns a list of (task_id, stored, expected) for the tasks that differ;
+    with `fix=True` they are also rewritten.
+    """
+    tasks = db.collection("tasks")
+    query = tasks.select(ACL_INPUT_FIELDS + [ACL_FIELD])
+    members_cache = {}
+    mismatches = []
+    writer = Batcher(db)
+    cursor = None
+    while True:
+        docs, next_cursor = fetch_page(tasks, query, [], page_size, cursor)
+        for doc in docs:
+            data = doc.to_dict() or {}
+            expected = compute_visible_to(db, data, members_cache)
+            if data.get(ACL_FIELD) != expected:
+                mismatches.append((doc.id, data.get(ACL_FIELD), expected))
+                if fix:
+                    writer.update(doc.reference, {ACL_FIELD: expected})
+        writer.flush()
+        if not next_cursor:
+            break
+        cursor = decode_cursor(next_cursor)
+    if fix:
+        # Every task has visible_to now; task lists can drop the legacy queries
+        backfill_ref(db).set({"completed_at": now_iso()}, merge=True)
+    return mismatches
+
+
+class AclPropagator:
+    """Recomputes task ACLs when memberships or users' managers change.
+
+    Snapshot listeners on `memberships` and `users` turn relevant changes into
+    ("project", project_id) / ("user", user_id) / ("reports", user_id) jobs; a
+    single worker thread runs them. Each listener's first snapshot is the
+    initial state of the collection and only primes the user map.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._pending = set()
+        # user id -> (manager_id, whether their role is in MANAGER_ROLES)
+        self._users = {}
+        self._primed = set()
+        self._watches = []
+        self._thread = None
+        self._db = None
+
+    def start(self, db=None):
+        """Attach the listeners and start the worker (idempotent)."""
+        if self._thread is not None:
+            return
+        self._db = db or firestore.client()
+        self._thread = threading.Thread(target=self._run, name="task-acl-propagator", daemon=True)
+        self._thread.start()
+        self._watches = [
+            self._db.collection("memberships").on_snapshot(self._on_memberships),
+            self._db.collection("users").on_snapshot(self._on_users),
+        ]
+
+    def stop(self):
+        """Detach the listeners and let the worker finish its current job."""
+        watches, self._watches = self._watches, []
+        for watch in watches:
+            try:
+                watch.unsubscribe()
+            except Exception:
+                pass
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._jobs.put(None)
+            thread.join(timeout=5)
+        with self._lock:
+            self._pending.clear()
+            self._users.clear()
+            self._primed.clear()
+
+    def enqueue(self, kind, key):
+        """Queue a recompute job unless the same one is already waiting."""
+        if not key:
+            return
+        job = (kind, key)
+        with self._lock:
+            if job in self._pending:
+                return
+            self._pending.add(job)
+        self._jobs.put(job)
+
+    def _prime(self, name):
+        with self._lock:
+            first = name not in self._primed
+            self._primed.add(name)
+        return first
+
+    def _on_memberships(self, col_snapshot, changes, read_time):
+        if self._prime("memberships"):
+            return
+        for change in changes:
+            self.enqueue("project", (change.document.to_dict() or {}).get("project_id"))
+
+    def _on_users(self, col_snapshot, changes, read_time):
+        first = self._prime("users")
+        for change in changes:
+            user_id = change.document.id
+            if change.type.name == "REMOVED":
+                with self._lock:
+                    self._users.pop(user_id, None)
+                continue
+            data = change.document.to_dict() or {}
+            current = (data.get("manager_id"), _manages(data))
+            with self._lock:
+                previous = self._users.get(user_id, (None, False))
+                self._users[user_id] = current
+            if first:
+                continue
+            if previous[0] != current[0]:
+                self.enqueue("user", user_id)
+            if previous[1] != current[1]:
+                self.enqueue("reports", user_id)
+
+    def run_job(self, job):
+        kind, key = job
+        if kind == "project":
+            return recompute_project(self._db, key)
+        if kind == "user":
+            return recompute_user(self._db, key)
+        if kind == "reports":
+            return recompute_reports(self._db, key)
+        return 0
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            with self._lock:
+                self._pending.discard(job)
+            try:
+                self.run_job(job)
+            except Exception as e:
+                print(f"Failed to propagate task visibility for {job}: {e}")
+
+
+_propagator = AclPropagator()
+
+
+def start(db=None):
+    _propagator.start(db)
+
+
+def stop():
+    _propagator.stop()
@@ -1,8 +1,16 @@
 from datetime import datetime, timezone, timedelta
+import time
 from flask import request, jsonify
 from . import tasks_bp
 from firebase_admin import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
+from .data_access import apply_update, get_doc, merged, note_update, version
+from .profile_cache import get_role, get_user
+from . import counters, due_dates, membership_replica, tag_index, task_acl
+from .participants import PARTICIPANTS_FIELD, participant_ids, participant_updates
+from .query_fanout import run_queries, timings
+from .projection import requested_fields, select_fields, trim
+from .pagination import InvalidCursor, fill_page, page_args, page_query, split_page, with_next_cursor
 
 def now_iso():
     return datetime.now(timezone.utc).isoformat()
@@ -46,6 +54,17 @@ def task_to_json(d):
         "subtask_completed_count": data.get("subtask_completed_count", 0),
     }
 
+# Document fields read by task_to_json; list queries select only these
+TASK_LIST_FIELDS = [
+    "title", "description", "priority", "status", "due_date", "created_at",
+    "updated_at", "created_by", "assigned_to", "project_id", "tags",
+    "archived", "archived_at", "archived_by", "is_recurring",
+    "recurrence_interval_days", "parent_recurring_task_id",
+    "subtask_count", "subtask_completed_count",
+]
+# GET /api/tasks lists newest first; every query of a page uses this order
+TASK_LIST_ORDER = [("created_at", "DESCENDING")]
+
 def _viewer_id():
     vid = (request.headers.get("X-User-Id") or request.args.get("viewer_id") or "").strip()
     return vid
@@ -63,6 +82,19 @@ def _can_view_task_doc(db, task_doc):
     if not viewer:
         return False
     data = task_doc.to_dict() or {}
+
+    # Tasks carrying a precomputed ACL are checked in memory; only admins,
+    # who are not listed in it, cost a (cached) role lookup
+    allowed = task_acl.can_view(data, viewer)
+    if allowed is not None:
+        if allowed:
+            return True
+        try:
+            return get_role(db, viewer) == 'admin'
+        except Exception:
+            return False
+
+    # Older tasks: evaluate the rules directly
     creator_id = (data.get("created_by") or {}).get("user_id")
     assignee_id = (data.get("assigned_to") or {}).get("user_id")
     if viewer == creator_id or viewer == assignee_id:
@@ -78,9 +110,7 @@ def _can_view_task_doc(db, task_doc):
 
     # Check viewer role
     try:
-        viewer_doc = db.collection("users").document(viewer).get()
-        viewer_data = (viewer_doc.to_dict() or {}) if viewer_doc.exists else {}
-        viewer_role = (viewer_data.get("role") or "staff").lower()
+        viewer_role = get_role(db, viewer)
     except Exception:
         viewer_role = 'staff'
 
@@ -94,7 +124,7 @@ def _can_view_task_doc(db, task_doc):
             def is_managed_by(user_id, manager_id):
                 if not user_id or not manager_id:
                     return False
-                u = db.collection("users").document(user_id).get()
+                u = get_doc(db, "users", user_id)
                 if not u.exists:
                     return False
                 ud = u.to_dict() or {}
@@ -120,10 +150,7 @@ def _can_edit_task(task_doc):
     return viewer == creator or viewer == assignee
 
 def _require_membership(db, project_id, user_id):
-    if not project_id or not user_id:
-        return False
-    mem_id = f"{project_id}_{user_id}"
-    return db.collection("memberships").document(mem_id).get().exists
+    return membership_replica.is_member(db, project_id, user_id)
 
 def _notify_task_changes(db, task_id, old_data, updates, editor_id, notifications_module):
     """Send notification emails about task changes to relevant users."""
@@ -165,7 +192,7 @@ def _notify_task_changes(db, task_id, old_data, updates, editor_id, notification
             editor_name = (old_data.get("assigned_to") or {}).get("name") or "Someone"
         else:
             # Fall back to DB lookup only if necessary
-            editor_doc = db.collection("users").document(editor_id).get()
+            editor_doc = get_doc(db, "users", editor_id)
             if editor_doc.exists:
                 editor_data = editor_doc.to_dict() or {}
                 editor_name = editor_data.get("name", "Someone")
@@ -190,14 +217,7 @@ def _notify_task_changes(db, task_id, old_data, updates, editor_id, notification
     # Notify project members (if task is in a project)
     project_id = old_data.get("project_id")
     if project_id:
-        mem_q = db.collection("memberships").where(
-            filter=FieldFilter("project_id", "==", project_id)
-        ).stream()
-        for m in mem_q:
-            md = m.to_dict() or {}
-            uid = md.get("user_id")
-            if uid:
-                recipients.add(uid)
+        recipients.update(membership_replica.project_member_ids(db, project_id))
     
     # Send notification to each recipient
     changes_text = "\n".join(changes)
@@ -264,7 +284,7 @@ def _create_next_recurring_task(db, completed_task_doc):
         "description": task_data.get("description"),
         "priority": task_data.get("priority", 5),
         "status": "To Do",  # Reset to To Do
-        "due_date": next_due_date,
+        **due_dates.due_fields(next_due_date),
         "created_at": now_iso(),
         "updated_at": None,
         "project_id": task_data.get("project_id"),
@@ -279,8 +299,11 @@ def _create_next_recurring_task(db, completed_task_doc):
         "recurrence_interval_days": interval_days,
         "parent_recurring_task_id": completed_task_doc.id,  # Link to original task
     }
+    new_task_data[PARTICIPANTS_FIELD] = participant_ids(new_task_data)
+    task_acl.with_visible_to(db, new_task_data)
     
-    new_task_ref.set(new_task_data)
+    tag_index.set_task(db, new_task_ref, new_task_data)
+    counters.record_task(db, after=new_task_data)
     return new_task_ref.id
 
 @tasks_bp.post("")
@@ -317,7 +340,7 @@ def create_task():
         # For other types, default to "Medium"
         priority = "Medium"
 
-    created_by_doc = db.collection("users").document(created_by_id).get()
+    created_by_doc = get_doc(db, "users", created_by_id)
     if not created_by_doc.exists:
         return jsonify({"error": "created_by user not found"}), 404
     created_by = created_by_doc.to_dict()
@@ -328,7 +351,7 @@ def create_task():
 
     assigned_to = None
     if assigned_to_id:
-        assigned_doc = db.collection("users").document(assigned_to_id).get()
+        assigned_doc = get_doc(db, "users", assigned_to_id)
         if not assigned_doc.exists:
             return jsonify({"error": "assigned_to user not found"}), 404
         assigned_to = assigned_doc.to_dict()
@@ -360,7 +383,7 @@ def create_task():
         "description": description,
         "priority": priority,
         "status": status,
-        "due_date": due_date,
+        **due_dates.due_fields(due_date),
         "created_at": now_iso(),
         "updated_at": None,
         "project_id": (project_id or None),
@@ -384,7 +407,10 @@ def create_task():
         "recurrence_interval_days": recurrence_interval_days if is_recurring else None,
         "parent_recurring_task_id": None,
     }
-    task_ref.set(task_doc)
+    task_doc[PARTICIPANTS_FIELD] = participant_ids(task_doc)
+    task_acl.with_visible_to(db, task_doc)
+    tag_index.set_task(db, task_ref, task_doc)
+    counters.record_task(db, after=task_doc)
     # Notify assignee if present
     if assigned_to_id:
         try:
@@ -415,169 +441,144 @@ def list_tasks():
     label_id = (request.args.get("label_id") or "").strip()
     debug_mode = (request.args.get("debug") or "0") == "1"
     try:
-        limit = int(request.args.get("limit") or 50)
-    except Exception:
-        limit = 50
-    limit_fetch = max(limit, 200)
+        limit, cursor = page_args(default=50, order=TASK_LIST_ORDER)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
 
     # Determine viewer role
-    viewer_doc = db.collection("users").document(viewer).get()
-    viewer_data = (viewer_doc.to_dict() or {}) if viewer_doc.exists else {}
-    viewer_role = (viewer_data.get("role") or "staff").lower()
+    viewer_role = get_role(db, viewer)
 
     include_archived = (request.args.get("include_archived") or "").lower() in ("1", "true", "yes")
+    fields = requested_fields(TASK_LIST_FIELDS)
+    # archived and created_at are needed below for filtering and sorting, tags
+    # for the label filter on the visible_to query
+    projection = select_fields(TASK_LIST_FIELDS, fields, required=("archived", "created_at", "tags"))
 
-    # We'll collect matching docs from multiple queries and dedupe by id
-    docs_by_id = {}
     # diagnostics
-    diag = {"viewer": viewer, "project_id": project_id, "proj_ids_from_memberships": [], "steps": []}
+    diag = {"viewer": viewer, "project_id": project_id, "steps": []}
 
-    def add_docs(q):
-        try:
-            for d in q.stream():
-                docs_by_id[d.id] = d
-        except Exception:
-            pass
+    # The task queries below are independent of each other; collect them here
+    # and page through them together once they are all known
+    pending_queries = []
+
+    def add_docs(q, label):
+        pending_queries.append((label, q))
 
-    # Helper to apply optional server-side narrow filters (project/tag/assigned_to)
-    def apply_filters(query_obj):
+    # Helper to apply optional server-side narrow filters (project/tag/assigned_to).
+    # Firestore allows one array_contains per query, so the visible_to query
+    # leaves the tag filter to the post-filter below.
+    def apply_filters(query_obj, tags=True):
         q = query_obj
         if project_id:
             q = q.where(filter=FieldFilter("project_id", "==", project_id))
         if assigned_to_id:
             q = q.where(filter=FieldFilter("assigned_to.user_id", "==", assigned_to_id))
-        if label_id:
+        if label_id and tags:
             q = q.where(filter=FieldFilter("tags", "array_contains", label_id))
         return q
 
-    # If no explicit project_id filter is provided, include tasks from projects
-    # where the viewer is a member. This makes "All my tasks" include project
-    # work for project members.
-    if not project_id:
-        try:
-            mem_q = db.collection("memberships").where(filter=FieldFilter("user_id", "==", viewer)).stream()
-            proj_ids = [m.to_dict().get("project_id") for m in mem_q if (m.to_dict() or {}).get("project_id")]
-            diag["proj_ids_from_memberships"] = proj_ids
-            # Query tasks for these projects (Firestore 'in' supports up to 10 items)
-            if proj_ids:
-                def chunks(lst, n):
-                    for i in range(0, len(lst), n):
-                        yield lst[i:i+n]
-                for chunk in chunks(proj_ids, 10):
-                    diag["steps"].append({"query_projects_chunk": chunk})
-                    q_proj = apply_filters(db.collection("tasks").where(filter=FieldFilter("project_id", "in", chunk)))
-                    add_docs(q_proj.limit(limit_fetch))
-        except Exception:
-            diag["steps"].append("memberships_query_failed")
-            pass
-
-    # If a project_id is supplied and the viewer is a member (or admin),
-    # include all tasks for that project. This allows project owners/members
-    # to see project tasks even if they are not the creator/assignee.
-    if project_id:
-        try:
-            # Admins see everything already; for others check membership
-            if viewer_role == 'admin':
-                diag["steps"].append("viewer_is_admin_including_project_tasks")
-                q_proj = apply_filters(db.collection("tasks").where(filter=FieldFilter("project_id", "==", project_id)))
-                add_docs(q_proj.limit(limit_fetch))
-            else:
-                mem_doc = db.collection("memberships").document(f"{project_id}_{viewer}").get()
-                if mem_doc.exists:
-                    diag["steps"].append("viewer_has_membership_for_project")
-                    q_proj = apply_filters(db.collection("tasks").where(filter=FieldFilter("project_id", "==", project_id)))
-                    add_docs(q_proj.limit(limit_fetch))
-                else:
-                    diag["steps"].append("no_membership_for_viewer_checking_owner_and_manager")
-                    # If no explicit membership exists, allow visibility when the viewer reports to the
-                    # project owner (i.e., viewer.manager_id == project.owner_id). This lets staff see
-                    # project tasks when their manager owns the project.
-                    try:
-                        proj_doc = db.collection("projects").document(project_id).get()
-                        if proj_doc.exists:
-                            proj = proj_doc.to_dict() or {}
-                            owner_id = proj.get("owner_id")
-                            diag["proj_owner"] = owner_id
-                            if owner_id:
-                                # allow if viewer is the owner or viewer reports to the owner
-                                if viewer == owner_id:
-                                    diag["steps"].append("viewer_is_owner")
-                                    q_proj = apply_filters(db.collection("tasks").where(filter=FieldFilter("project_id", "==", project_id)))
-                                    add_docs(q_proj.limit(limit_fetch))
-                                else:
-                                    vdoc = db.collection("users").document(viewer).get()
-                                    if vdoc.exists:
-                                        vdata = vdoc.to_dict() or {}
-                                        if vdata.get("manager_id") == owner_id:
-                                            diag["steps"].append("viewer_reports_to_owner")
-                                            q_proj = apply_filters(db.collection("tasks").where(filter=FieldFilter("project_id", "==", project_id)))
-                                            add_docs(q_proj.limit(limit_fetch))
-                    except Exception:
-                        diag["steps"].append("owner_check_failed")
-                        pass
-        except Exception:
-            # On any error here, continue with default visibility rules below
-            pass
-
-    # Admins see everything
     if viewer_role == 'admin':
+        # Admins see everything
         q = db.collection("tasks")
         q = apply_filters(q)
-        add_docs(q.limit(limit_fetch))
+        add_docs(q, "all_tasks")
     else:
-        # Everyone can see tasks they created
-        q1 = apply_filters(db.collection("tasks").where(filter=FieldFilter("created_by.user_id", "==", viewer)))
-        add_docs(q1.limit(limit_fetch))
-
-        # Everyone can see tasks assigned to them
-        q2 = apply_filters(db.collection("tasks").where(filter=FieldFilter("assigned_to.user_id", "==", viewer)))
-        add_docs(q2.limit(limit_fetch))
-
-        # Managers (and similar roles) can see team members' tasks
-        manager_roles = ["manager"]
-        if viewer_role in manager_roles:
-            # Find team members (users who have manager_id == viewer)
+        # Creator, assignee, project members and the creator's/assignee's
+        # manager are all listed in the task's precomputed visible_to
+        q = apply_filters(task_acl.visible_tasks(db, viewer), tags=False)
+        add_docs(q, "visible_to")
+
+        # Tasks that predate visible_to only match the per-rule queries
+        try:
+            if not task_acl.is_backfilled(db):
+                diag["steps"].append("visible_to_not_backfilled")
+                proj_ids = membership_replica.user_project_ids(db, viewer)
+                for label, q_legacy in task_acl.legacy_visible_queries(db, viewer, viewer_role, proj_ids):
+                    add_docs(apply_filters(q_legacy), label)
+        except Exception:
+            diag["steps"].append("legacy_queries_failed")
+
+        # If a project_id is supplied and the viewer is not a member, allow
+        # visibility when the viewer owns the project or reports to its owner
+        # (viewer.manager_id == project.owner_id). This lets staff see project
+        # tasks when their manager owns the project.
+        if project_id:
             try:
-                team_q = db.collection("users").where(filter=FieldFilter("manager_id", "==", viewer)).stream()
-                team_ids = [u.id for u in team_q if u.exists]
+                if not membership_replica.is_member(db, project_id, viewer):
+                    diag["steps"].append("no_membership_for_viewer_checking_owner_and_manager")
+                    proj_doc = get_doc(db, "projects", project_id)
+                    if proj_doc.exists:
+                        proj = proj_doc.to_dict() or {}
+                        owner_id = proj.get("owner_id")
+                        diag["proj_owner"] = owner_id
+                        if owner_id:
+                            # allow if viewer is the owner or viewer reports to the owner
+                            if viewer == owner_id:
+                                diag["steps"].append("viewer_is_owner")
+                                q_proj = apply_filters(db.collection("tasks"))
+                                add_docs(q_proj, "project")
+                            else:
+                                vdoc = get_doc(db, "users", viewer)
+                                if vdoc.exists:
+                                    vdata = vdoc.to_dict() or {}
+                                    if vdata.get("manager_id") == owner_id:
+                                        diag["steps"].append("viewer_reports_to_owner")
+                                        q_proj = apply_filters(db.collection("tasks"))
+                                        add_docs(q_proj, "project")
             except Exception:
-                team_ids = []
-
-            # If we have team ids, query tasks created_by or assigned_to any of them
-            if team_ids:
-                # Firestore 'in' supports up to 10 items; chunk if necessary
-                def chunks(lst, n):
-                    for i in range(0, len(lst), n):
-                        yield lst[i:i+n]
-
-                for chunk in chunks(team_ids, 10):
-                    q3 = apply_filters(db.collection("tasks").where(filter=FieldFilter("created_by.user_id", "in", chunk)))
-                    add_docs(q3.limit(limit_fetch))
-                    q4 = apply_filters(db.collection("tasks").where(filter=FieldFilter("assigned_to.user_id", "in", chunk)))
-                    add_docs(q4.limit(limit_fetch))
-
-    # Convert to list and post-filter archived unless explicitly included
-    docs = [d for d in docs_by_id.values()]
-    if not include_archived:
-        docs = [d for d in docs if not ((d.to_dict() or {}).get("archived", False))]
-
-    # Sort by created_at desc and limit
-    def _key(d):
-        v = (d.to_dict() or {}).get("created_at") or ""
-        return v
-
-    docs.sort(key=_key, reverse=True)
-    docs = docs[:limit]
-    tasks_out = [task_to_json(d) for d in docs]
+                diag["steps"].append("owner_check_failed")
+                pass
+
+    # Archived tasks (unless included) and, on the visible_to query, the label
+    # filter are dropped in Python, since Firestore cannot express them there
+    def keep(d):
+        data = d.to_dict() or {}
+        if not include_archived and data.get("archived", False):
+            return False
+        return not label_id or label_id in (data.get("tags") or [])
+
+    def newest_first(d):
+        return ((d.to_dict() or {}).get("created_at") or "", d.id)
+
+    # Run the collected queries concurrently, each reading limit + 1 docs in
+    # TASK_LIST_ORDER after the position, and merge them by id; the first
+    # limit docs of the merged order are then exactly the union's
+    tasks_ref = db.collection("tasks")
+    diag["queries"] = []
+
+    def scan(position):
+        results = run_queries([
+            (label, page_query(tasks_ref, q, TASK_LIST_ORDER, limit, position).select(projection))
+            for label, q in pending_queries
+        ])
+        docs_by_id = {}
+        for result in results:
+            if result.error is not None:
+                # A missing query would silently drop tasks from the page
+                raise result.error
+            for d in result.docs:
+                docs_by_id[d.id] = d
+        diag["queries"] += timings(results)
+        return split_page(sorted(docs_by_id.values(), key=newest_first, reverse=True), limit, TASK_LIST_ORDER)
+
+    fanout_started = time.perf_counter()
+    try:
+        docs, next_cursor = fill_page(scan, keep, limit, TASK_LIST_ORDER, cursor)
+    except Exception as e:
+        # Usually a composite index from firestore.indexes.json that is not deployed
+        return jsonify({"error": f"Failed to list tasks: {e}"}), 500
+    diag["fanout_ms"] = round((time.perf_counter() - fanout_started) * 1000, 2)
+
+    tasks_out = [trim(task_to_json(d), fields) for d in docs]
     if debug_mode:
         diag["total_returned"] = len(tasks_out)
-        return jsonify({"tasks": tasks_out, "_diag": diag}), 200
-    return jsonify(tasks_out), 200
+        return jsonify({"tasks": tasks_out, "next_cursor": next_cursor, "_diag": diag}), 200
+    return with_next_cursor(jsonify(tasks_out), next_cursor), 200
 
 @tasks_bp.get("/<task_id>")
 def get_task(task_id):
     db = firestore.client()
-    doc = db.collection("tasks").document(task_id).get()
+    doc = get_doc(db, "tasks", task_id)
     if not doc.exists:
         return jsonify({"error": "Task not found"}), 404
     # Allow creator or assignee, or manager/admin visibility
@@ -599,7 +600,7 @@ def update_task(task_id):
 
     payload = request.get_json(force=True) or {}
     doc_ref = db.collection("tasks").document(task_id)
-    doc = doc_ref.get()
+    doc = get_doc(db, "tasks", task_id, ref=doc_ref)
     if not doc.exists:
         return jsonify({"error": "Task not found"}), 404
     
@@ -656,9 +657,19 @@ def update_task(task_id):
             # Note: Removed the "must be in future" restriction to allow drag-to-overdue
         except Exception:
             return jsonify({"error": "Invalid due date format"}), 400
+    if "due_date" in updates:
+        updates.update(due_dates.due_fields(updates["due_date"]))
 
     updates["updated_at"] = now_iso()
-    doc_ref.update(updates)
+    write_result = tag_index.update_task(db, doc_ref, current_data, updates)
+    note_update("tasks", task_id, updates)
+    if write_result is None:
+        # Tag changes are written in a transaction, which leaves no WriteResult
+        # to take the version from; read the stored task back instead
+        updated_doc = doc_ref.get()
+    else:
+        updated_doc = merged(doc, updates, write_result)
+    counters.record_task(db, before=current_data, updates=updates)
     
     # Send notification email about task changes
     try:
@@ -673,20 +684,19 @@ def update_task(task_id):
     
     if new_status == "Completed" and current_status != "Completed" and is_recurring:
         # Task was just marked as completed - create next recurring task
-        updated_doc = doc_ref.get()
         next_task_id = _create_next_recurring_task(db, updated_doc)
-        response_data = task_to_json(updated_doc)
+        response_data = {**task_to_json(updated_doc), "version": version(updated_doc)}
         if next_task_id:
             response_data["next_recurring_task_id"] = next_task_id
         return jsonify(response_data), 200
     
-    return jsonify(task_to_json(doc_ref.get())), 200
+    return jsonify({**task_to_json(updated_doc), "version": version(updated_doc)}), 200
 
 @tasks_bp.delete("/<task_id>")
 def delete_task(task_id):
     db = firestore.client()
     doc_ref = db.collection("tasks").document(task_id)
-    doc = doc_ref.get()
+    doc = get_doc(db, "tasks", task_id, ref=doc_ref)
     if not doc.exists:
         return jsonify({"error": "Task not found"}), 404
     # If viewer is not the creator, hide the task (404) regardless of role
@@ -698,9 +708,7 @@ def delete_task(task_id):
     if not viewer:
         return jsonify({"error": "viewer_id required"}), 401
     try:
-        vdoc = db.collection('users').document(viewer).get()
-        vdata = vdoc.to_dict() if vdoc.exists else {}
-        vrole = (vdata.get('role') or 'staff').lower()
+        vrole = get_role(db, viewer)
     except Exception:
         vrole = 'staff'
     if vrole == 'staff':
@@ -708,11 +716,13 @@ def delete_task(task_id):
 
     # Soft delete → archive
     viewer = _viewer_id() or ((doc.to_dict() or {}).get("created_by") or {}).get("user_id")
-    doc_ref.update({
+    archive_updates = {
         "archived": True,
         "archived_at": now_iso(),
         "archived_by": viewer
-    })
+    }
+    tag_index.update_task(db, doc_ref, doc.to_dict() or {}, archive_updates)
+    note_update("tasks", task_id, archive_updates)
     return jsonify({"ok": True, "task_id": task_id, "archived": True}), 200
 
 
@@ -734,7 +744,7 @@ def reassign_task(task_id):
         return jsonify({"error": "new_assigned_to_id is required"}), 400
     
     # Check if viewer is a manager or above
-    viewer_doc = db.collection("users").document(viewer_id).get()
+    viewer_doc = get_user(db, viewer_id)
     if not viewer_doc.exists:
         return jsonify({"error": "Viewer not found"}), 404
     
@@ -747,7 +757,7 @@ def reassign_task(task_id):
     
     # Get the task
     task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
+    task_doc = get_doc(db, "tasks", task_id, ref=task_ref)
     
     if not task_doc.exists:
         return jsonify({"error": "Task not found"}), 404
@@ -764,21 +774,23 @@ def reassign_task(task_id):
         }), 200
     
     # Get new assignee details
-    new_assignee_doc = db.collection("users").document(new_assigned_to_id).get()
+    new_assignee_doc = get_doc(db, "users", new_assigned_to_id)
     if not new_assignee_doc.exists:
         return jsonify({"error": "New assignee user not found"}), 404
     
     new_assignee_data = new_assignee_doc.to_dict() or {}
     
     # Update the task
-    task_ref.update({
+    reassign_updates = task_acl.acl_updates(db, task_data, participant_updates(task_data, {
         "assigned_to": {
             "user_id": new_assigned_to_id,
             "name": new_assignee_data.get("name", ""),
             "email": new_assignee_data.get("email", "")
         },
         "updated_at": now_iso()
-    })
+    }))
+    task_ref.update(reassign_updates)
+    note_update("tasks", task_id, reassign_updates)
     # Notify new assignee and previous assignee (if any)
     try:
         from . import notifications as notifications_module
@@ -820,7 +832,7 @@ def reassign_task(task_id):
 def list_subtasks(task_id):
     db = firestore.client()
     task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
+    task_doc = get_doc(db, "tasks", task_id, ref=task_ref)
     if not task_doc.exists:
         return jsonify({"error": "Task not found"}), 404
 
@@ -863,7 +875,7 @@ def create_subtask(task_id):
         return jsonify({"error": "viewer_id required"}), 401
 
     task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
+    task_doc = get_doc(db, "tasks", task_id, ref=task_ref)
     if not task_doc.exists:
         return jsonify({"error": "Task not found"}), 404
 
@@ -878,7 +890,7 @@ def create_subtask(task_id):
         return jsonify({"error": "Subtask title required"}), 400
 
     # get creator details
-    creator_doc = db.collection("users").document(viewer).get()
+    creator_doc = get_doc(db, "users", viewer)
     creator = (creator_doc.to_dict() or {}) if creator_doc.exists else {}
 
     sub_ref = db.collection("subtasks").document()
@@ -896,14 +908,11 @@ def create_subtask(task_id):
         "completed_at": None,
         "completed_by": None,
     }
-    sub_ref.set(sub_doc)
-
-    # Increment subtask count on task document
-    try:
-        task_ref.update({"subtask_count": firestore.Increment(1)})
-    except Exception:
-        # ignore failures but continue
-        pass
+    # Create the subtask and bump the task's count in one commit
+    batch = db.batch()
+    batch.set(sub_ref, sub_doc)
+    batch.update(task_ref, {"subtask_count": firestore.Increment(1)})
+    batch.commit()
 
     return jsonify({"subtask_id": sub_ref.id, **sub_doc}), 201
 
@@ -916,7 +925,7 @@ def update_subtask(task_id, subtask_id):
         return jsonify({"error": "viewer_id required"}), 401
 
     task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
+    task_doc = get_doc(db, "tasks", task_id, ref=task_ref)
     if not task_doc.exists:
         return jsonify({"error": "Task not found"}), 404
 
@@ -925,7 +934,7 @@ def update_subtask(task_id, subtask_id):
         return jsonify({"error": "forbidden"}), 403
 
     sub_ref = db.collection("subtasks").document(subtask_id)
-    sub = sub_ref.get()
+    sub = get_doc(db, "subtasks", subtask_id, ref=sub_ref)
     if not sub.exists:
         return jsonify({"error": "Subtask not found"}), 404
 
@@ -939,8 +948,21 @@ def update_subtask(task_id, subtask_id):
         return jsonify({"error": "No fields to update"}), 400
 
     updates["updated_at"] = now_iso()
-    sub_ref.update(updates)
-    return jsonify({"subtask_id": subtask_id, **(sub_ref.get().to_dict() or {})}), 200
+    updated = apply_update(sub_ref, sub, updates, "subtasks")
+    return jsonify({"subtask_id": subtask_id, **updated.to_dict(), "version": version(updated)}), 200
+
+
+def _delete_subtask_in_transaction(transaction, sub_ref, task_ref):
+    # Read inside the transaction so the counters match the stored state
+    snap = sub_ref.get(transaction=transaction)
+    if not snap.exists:
+        return False
+    counts = {"subtask_count": firestore.Increment(-1)}
+    if bool((snap.to_dict() or {}).get("completed", False)):
+        counts["subtask_completed_count"] = firestore.Increment(-1)
+    transaction.delete(sub_ref)
+    transaction.update(task_ref, counts)
+    return True
 
 
 @tasks_bp.delete("/<task_id>/subtasks/<subtask_id>")
@@ -951,7 +973,7 @@ def delete_subtask(task_id, subtask_id):
         return jsonify({"error": "viewer_id required"}), 401
 
     task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
+    task_doc = get_doc(db, "tasks", task_id, ref=task_ref)
     if not task_doc.exists:
         return jsonify({"error": "Task not found"}), 404
 
@@ -959,31 +981,48 @@ def delete_subtask(task_id, subtask_id):
     if not _ensure_creator_or_404(task_doc):
         return jsonify({"error": "forbidden"}), 403
 
+    # Delete the subtask and decrement the task's counters in one transaction
     sub_ref = db.collection("subtasks").document(subtask_id)
-    sub = sub_ref.get()
-    if not sub.exists:
-        return jsonify({"error": "Subtask not found"}), 404
-
-    sd = sub.to_dict() or {}
-    was_completed = bool(sd.get("completed", False))
-
-    # Delete subtask
     try:
-        sub_ref.delete()
+        deleted = firestore.transactional(_delete_subtask_in_transaction)(db.transaction(), sub_ref, task_ref)
     except Exception:
         return jsonify({"error": "Failed to delete subtask"}), 500
-
-    # Decrement counts on task
-    try:
-        task_ref.update({"subtask_count": firestore.Increment(-1)})
-        if was_completed:
-            task_ref.update({"subtask_completed_count": firestore.Increment(-1)})
-    except Exception:
-        pass
+    if not deleted:
+        return jsonify({"error": "Subtask not found"}), 404
 
     return jsonify({"ok": True, "subtask_id": subtask_id}), 200
 
 
+def _complete_subtask_in_transaction(transaction, sub_ref, task_ref, completed, viewer):
+    """Set (or toggle, when `completed` is None) a subtask's completion.
+
+    The subtask is read inside the transaction, so concurrent clicks are
+    serialized and subtask_completed_count only moves when the stored state
+    actually changes. Returns the subtask's data after the update, or None if
+    it does not exist.
+    """
+    snap = sub_ref.get(transaction=transaction)
+    if not snap.exists:
+        return None
+    data = snap.to_dict() or {}
+    old_completed = bool(data.get("completed", False))
+    new_completed = (not old_completed) if completed is None else bool(completed)
+
+    updates = {"completed": new_completed}
+    if new_completed and not old_completed:
+        updates["completed_at"] = now_iso()
+        updates["completed_by"] = {"user_id": viewer}
+    if not new_completed:
+        updates["completed_at"] = None
+        updates["completed_by"] = None
+    transaction.update(sub_ref, updates)
+
+    if new_completed != old_completed:
+        delta = 1 if new_completed else -1
+        transaction.update(task_ref, {"subtask_completed_count": firestore.Increment(delta)})
+    return {**data, **updates}
+
+
 @tasks_bp.patch("/<task_id>/subtasks/<subtask_id>/complete")
 def complete_subtask(task_id, subtask_id):
     db = firestore.client()
@@ -992,7 +1031,7 @@ def complete_subtask(task_id, subtask_id):
         return jsonify({"error": "viewer_id required"}), 401
 
     task_ref = db.collection("tasks").document(task_id)
-    task_doc = task_ref.get()
+    task_doc = get_doc(db, "tasks", task_id, ref=task_ref)
     if not task_doc.exists:
         return jsonify({"error": "Task not found"}), 404
 
@@ -1000,36 +1039,17 @@ def complete_subtask(task_id, subtask_id):
     if not _can_view_task_doc(db, task_doc):
         return jsonify({"error": "Not found"}), 404
 
+    # No body (or no "completed") toggles the subtask
+    payload = request.get_json(force=True, silent=True) or {}
     sub_ref = db.collection("subtasks").document(subtask_id)
-    sub = sub_ref.get()
-    if not sub.exists:
-        return jsonify({"error": "Subtask not found"}), 404
-
-    payload = request.get_json(force=True) or {}
-    new_completed = payload.get("completed")
-    if new_completed is None:
-        # toggle if not provided
-        new_completed = not bool((sub.to_dict() or {}).get("completed", False))
-
-    old_completed = bool((sub.to_dict() or {}).get("completed", False))
-    updates = {"completed": bool(new_completed)}
-    if new_completed and not old_completed:
-        updates["completed_at"] = now_iso()
-        updates["completed_by"] = {"user_id": viewer}
-    if not new_completed:
-        updates["completed_at"] = None
-        updates["completed_by"] = None
-
-    sub_ref.update(updates)
-
-    # Update counters on task
     try:
-        if not old_completed and new_completed:
-            task_ref.update({"subtask_completed_count": firestore.Increment(1)})
-        elif old_completed and not new_completed:
-            task_ref.update({"subtask_completed_count": firestore.Increment(-1)})
+        sub_data = firestore.transactional(_complete_subtask_in_transaction)(
+            db.transaction(), sub_ref, task_ref, payload.get("completed"), viewer
+        )
     except Exception:
-        pass
+        return jsonify({"error": "Failed to update subtask"}), 500
+    if sub_data is None:
+        return jsonify({"error": "Subtask not found"}), 404
 
-    return jsonify({"subtask_id": subtask_id, **(sub_ref.get().to_dict() or {})}), 200
+    return jsonify({"subtask_id": subtask_id, **sub_data}), 200
 
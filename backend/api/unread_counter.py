@@ -0,0 +1,72 @@
+"""
+Per-user unread notification counters.
+
+The notification badge reads one document per user,
+
+    notification_counters/{user_id}  {"user_id": .., "unread": .., "updated_at": ..}
+
+instead of counting the user's unread notifications. Every write that
+creates a notification or changes its `read` flag adjusts `unread` in the
+same batch or transaction (see `add`): create_notification and the deadline
+reminders add one, marking read subtracts what was actually marked. Users
+without a counter document have no unread notifications as far as the badge
+is concerned; after upgrading an existing database run
+backend/rebuild_unread_counts.py once to count the notifications written
+before the counters existed.
+"""
+from datetime import datetime, timezone
+
+from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+COLLECTION = "notification_counters"
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def counter_ref(db, user_id):
+    return db.collection(COLLECTION).document(user_id)
+
+
+def add(writer, db, user_id, delta):
+    """Queue `unread += delta` for `user_id` on `writer` (a batch, transaction or BulkWriter)."""
+    writer.set(counter_ref(db, user_id), {
+        "user_id": user_id,
+        "unread": firestore.Increment(delta),
+        "updated_at": now_iso(),
+    }, merge=True)
+
+
+def get(db, user_id):
+    """Unread notifications of `user_id`: a single document read."""
+    snap = counter_ref(db, user_id).get()
+    if not snap.exists:
+        return 0
+    # Concurrent mark-read calls can overshoot briefly; never show a negative badge
+    return max(0, int((snap.to_dict() or {}).get("unread") or 0))
+
+
+def rebuild(db):
+    """Recount every user's unread notifications and overwrite the counters.
+
+    Counters of users without unread notifications are reset to zero.
+    Returns {user_id: unread}.
+    """
+    totals = {}
+    unread = db.collection("notifications").where(filter=FieldFilter("read", "==", False))
+    for doc in unread.select(["user_id"]).stream():
+        user_id = (doc.to_dict() or {}).get("user_id")
+        if user_id:
+            totals[user_id] = totals.get(user_id, 0) + 1
+
+    writer = db.bulk_writer()
+    try:
+        for doc in db.collection(COLLECTION).select([]).stream():
+            totals.setdefault(doc.id, 0)
+        for user_id, count in totals.items():
+            writer.set(counter_ref(db, user_id), {"user_id": user_id, "unread": count, "updated_at": now_iso()})
+    finally:
+        writer.close()
+    return totals
@@ -5,6 +5,7 @@ from flask import request, jsonify
 from . import users_bp
 from firebase_admin import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
+from . import counters, profile_cache
 
 def now_iso():
     return datetime.now(timezone.utc).isoformat()
@@ -40,6 +41,8 @@ def create_user():
         "created_at": now_iso(),
     }
     user_ref.set(user_doc)
+    counters.record_user(db, after=user_doc)
+    profile_cache.invalidate(user_id)
     return jsonify({"user": user_doc}), 201
 
 @users_bp.get("/<user_id>")
@@ -8,7 +8,6 @@ load_dotenv()
 
 import firebase_admin
 from firebase_admin import credentials
-from datetime import datetime as _dt, timedelta as _td, timezone as _tz
 from urllib.parse import quote_plus
 import atexit
 
@@ -17,6 +16,7 @@ from api import (
     projects_bp, notes_bp, tags_bp, memberships_bp, attachments_bp, admin_bp, staff_bp, reports_bp, labels_bp
 )
 from api import notifications_bp
+from api import email_outbox, jobs, membership_replica, task_acl
 from firebase_utils import get_firebase_credentials
 
 # Check if running in test/development mode without Firebase
@@ -94,10 +94,11 @@ def create_app(run_startup_checks: bool = False):
     """Create and configure the Flask application.
 
     Args:
-        run_startup_checks: If True, run one-time startup checks that may
-            perform internal requests (used by the real application startup).
-            Defaults to False so tests and normal imports don't execute
-            internal requests. The real server can enable these checks by
+        run_startup_checks: If True, start the periodic background jobs
+            (see api/jobs.py), which run the deadline check shortly after
+            startup and then on schedule without delaying it (used by the
+            real application startup). Defaults to False so tests and normal
+            imports don't start them. The real server enables them by
             calling `create_app(run_startup_checks=True)`.
     """
     app = Flask(__name__)
@@ -107,6 +108,8 @@ def create_app(run_startup_checks: bool = False):
     CORS(app, 
          resources={r"/*": {"origins": "*"}},
          allow_headers=["Content-Type", "X-User-Id", "Authorization"],
+         # Paginated list endpoints that return a JSON array send their cursor here
+         expose_headers=["X-Next-Cursor"],
          methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
          supports_credentials=True)
     
@@ -163,6 +166,27 @@ def create_app(run_startup_checks: bool = False):
     app.register_blueprint(notifications_bp)
     app.register_blueprint(reports_bp)  # Reports API
     app.register_blueprint(labels_bp)  # Labels API
+
+    # Keep an in-memory replica of project memberships current via a Firestore
+    # listener; until it has synced, lookups fall back to direct queries.
+    if firebase_initialized:
+        try:
+            membership_replica.start()
+            atexit.register(membership_replica.stop)
+        except Exception as e:
+            print(f"⚠️  Membership replica not started: {e}")
+        # Recompute task visibility lists when memberships or managers change
+        try:
+            task_acl.start()
+            atexit.register(task_acl.stop)
+        except Exception as e:
+            print(f"⚠️  Task ACL propagator not started: {e}")
+        # Deliver queued notification emails in the background
+        try:
+            email_outbox.start()
+            atexit.register(email_outbox.stop)
+        except Exception as e:
+            print(f"⚠️  Email outbox workers not started: {e}")
     # Add OPTIONS handler for CORS preflight (register before any requests)
     @app.route('/<path:path>', methods=['OPTIONS'])
     def handle_options(path):
@@ -172,62 +196,16 @@ def create_app(run_startup_checks: bool = False):
         response.headers.add('Access-Control-Allow-Headers', 'Content-Type, X-User-Id, Authorization')
         return response, 200
 
-    # Optionally run one-time startup check for deadlines. This block issues
-    # internal requests using the test client and therefore must be disabled
-    # during tests to avoid locking the app from further setup calls. Only
-    # run when explicitly requested by the caller (e.g. main()).
-    if run_startup_checks:
+    # Run the periodic jobs (deadline reminders, outbox drain, rollups) on a
+    # background scheduler; only the instance holding the Firestore lease
+    # executes them, and nothing here waits for them. Off unless requested by
+    # the caller (e.g. main()) so tests and plain imports stay quiet.
+    if run_startup_checks and firebase_initialized:
         try:
-            # Late import of notifications module
-            from api import notifications as notifications_module
-
-            # Compute today's UTC start/end to match the `due_today` behaviour
-            now = _dt.now(_tz.utc)
-            start = _dt(now.year, now.month, now.day, 0, 0, 0, tzinfo=_tz.utc)
-            end = start + _td(days=1, microseconds=-1)
-            start_iso = start.isoformat()
-            end_iso = end.isoformat()
-
-            # Run inside app and use the test client to POST to the endpoint so
-            # we get a proper Flask Response object (avoids calling view
-            # functions directly).
-            with app.app_context():
-                with app.test_client() as client:
-                    try:
-                        resp = client.post('/api/notifications/check-deadlines', query_string={"start_iso": start_iso, "end_iso": end_iso})
-                    except Exception as e:
-                        print(f"[startup] check_deadlines view raised: {e}")
-
-                # If the initial UTC-day pass found nothing, attempt a retry
-                try:
-                    parsed = None
-                    try:
-                        if isinstance(resp, tuple) and hasattr(resp[0], 'get_json'):
-                            print("hello world")
-                            parsed = resp[0].get_json()
-                            print("hello world 2")
-                            print(f"[startup] check_deadlines response: {parsed}")
-                        elif hasattr(resp, 'get_json'):
-                            parsed = resp.get_json()
-                            print(f"[startup] check_deadlines response: {parsed}")
-                    except Exception:
-                        parsed = None
-
-                    if not parsed or parsed.get('checked', 0) == 0:
-                        local_now = _dt.now().astimezone()
-                        local_start = _dt(local_now.year, local_now.month, local_now.day, 0, 0, 0, tzinfo=local_now.tzinfo)
-                        local_end = local_start + _td(days=1, microseconds=-1)
-                        alt_start_iso = local_start.astimezone(_tz.utc).isoformat()
-                        alt_end_iso = local_end.astimezone(_tz.utc).isoformat()
-                        with app.test_client() as client:
-                            try:
-                                alt_resp = client.post('/api/notifications/check-deadlines', query_string={"start_iso": alt_start_iso, "end_iso": alt_end_iso})
-                            except Exception as e:
-                                print(f"[startup] alternate check_deadlines view raised: {e}")
-                except Exception as e:
-                    print(f"[startup] failed alternate local-day check: {e}")
+            jobs.start()
+            atexit.register(jobs.stop)
         except Exception as e:
-            print(f"[startup] failed to run check_deadlines: {e}")
+            print(f"⚠️  Background jobs not started: {e}")
     
     # NOTE: CORS OPTIONS handler registered earlier before startup requests
     
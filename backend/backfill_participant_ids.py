@@ -0,0 +1,43 @@
+"""Migration script: add participant_ids to existing task documents.
+
+Usage:
+  python backfill_participant_ids.py [--dry-run] [--page-size N]
+
+Dashboards find a user's tasks with one `participant_ids array_contains`
+query, so tasks created before the field existed are invisible to them until
+this has run. Tasks are read N at a time and only those whose
+participant_ids is missing or out of date are written. Safe to re-run.
+"""
+from dotenv import load_dotenv
+import argparse
+
+load_dotenv()
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from firebase_utils import get_firebase_credentials
+from api import participants
+
+
+def init_firebase_app():
+    if not firebase_admin._apps:
+        creds = get_firebase_credentials()
+        cred = credentials.Certificate(creds)
+        firebase_admin.initialize_app(cred)
+
+
+def main(dry_run: bool = False, page_size: int = participants.BACKFILL_PAGE_SIZE):
+    init_firebase_app()
+    db = firestore.client()
+
+    scanned, updated = participants.backfill(db, page_size=page_size, dry_run=dry_run)
+    verb = 'would update' if dry_run else 'updated'
+    print(f'Done. Scanned {scanned} tasks, {verb} {updated}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    parser.add_argument('--page-size', type=int, default=participants.BACKFILL_PAGE_SIZE, help='Tasks to read per page (at most 500, one write batch per page)')
+    args = parser.parse_args()
+    main(dry_run=args.dry_run, page_size=args.page_size)
@@ -0,0 +1,92 @@
+"""Throughput benchmark for SMTP delivery: one connection per message vs. the pool.
+
+Usage:
+  python benchmark_smtp.py [--messages N] [--workers N] [--latency-ms N]
+                           [--host H --port P [--starttls] [--user U --password P]]
+
+Without --host it starts an in-process smtp_stub whose replies are delayed by
+--latency-ms to imitate a remote server. It then sends the same messages
+three ways and prints messages per second for each:
+
+  per-message   a new connection (and STARTTLS/LOGIN) for every message,
+                as email_utils.send_email used to
+  send_many     one pooled session for the whole list
+  pooled xN     N threads sharing an SMTPPool of N sessions, as the
+                email outbox workers do
+"""
+import argparse
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from email_utils import SMTPPool, build_message
+from smtp_stub import StubSMTPServer
+
+
+def per_message(pool, messages):
+    for to_email, subject, body in messages:
+        with smtplib.SMTP(pool.host, pool.port, timeout=pool.timeout) as server:
+            if pool.starttls:
+                server.starttls()
+            if pool.user:
+                server.login(pool.user, pool.password)
+            server.send_message(build_message(pool.email_from, to_email, subject, body))
+    return len(messages)
+
+
+def bulk(pool, messages):
+    return sum(pool.send_many(messages))
+
+
+def pooled(pool, messages, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(lambda m: pool.send(*m), messages))
+
+
+def timed(label, fn):
+    started = time.perf_counter()
+    sent = fn()
+    elapsed = time.perf_counter() - started
+    print(f'{label:<14} {sent:>6} sent in {elapsed:7.2f}s  {sent / elapsed:8.1f} msg/s')
+
+
+def main(messages=200, workers=4, latency_ms=5.0, host=None, port=None,
+         starttls=False, user=None, password=None):
+    stub = None
+    if host is None:
+        stub = StubSMTPServer(latency=latency_ms / 1000).start()
+        host, port = stub.host, stub.port
+        print(f'Using SMTP stub on {host}:{port} with {latency_ms}ms reply latency')
+
+    batch = [(f'user{i}@example.com', f'Benchmark {i}', 'Throughput test message') for i in range(messages)]
+
+    def pool_of(size):
+        return SMTPPool(host, port, user, password, email_from='bench@example.com',
+                        starttls=starttls, size=size)
+
+    try:
+        timed('per-message', lambda: per_message(pool_of(1), batch))
+        single = pool_of(1)
+        timed('send_many', lambda: bulk(single, batch))
+        single.close()
+        shared = pool_of(workers)
+        timed(f'pooled x{workers}', lambda: pooled(shared, batch, workers))
+        shared.close()
+    finally:
+        if stub is not None:
+            stub.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=200, help='Messages per run')
+    parser.add_argument('--workers', type=int, default=4, help='Threads (and pooled sessions) for the pooled run')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Stub reply latency')
+    parser.add_argument('--host', help='Benchmark a real server instead of the stub')
+    parser.add_argument('--port', type=int, default=587)
+    parser.add_argument('--starttls', action='store_true')
+    parser.add_argument('--user')
+    parser.add_argument('--password')
+    args = parser.parse_args()
+    main(messages=args.messages, workers=args.workers, latency_ms=args.latency_ms, host=args.host,
+         port=args.port, starttls=args.starttls, user=args.user, password=args.password)
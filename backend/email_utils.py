@@ -1,39 +1,246 @@
-"""Simple email sending utilities (SMTP)."""
+"""Simple email sending utilities (SMTP).
+
+Messages go out over pooled, persistent SMTP sessions: `SMTPPool` keeps up
+to `size` authenticated connections open and hands them to callers one at a
+time, so a burst of notifications pays for the TCP connect, STARTTLS and LOGIN
+once per connection instead of once per message. An idle connection is
+checked with NOOP before reuse and replaced if the server has dropped it, and
+a send that fails because the session died is retried once on a fresh
+connection. `send_many` delivers a list of messages over a single session.
+
+`send_email` / `send_many` use a pool built from the SMTP_* settings in the
+environment; `smtp_stub.py` is a local SMTP sink to point them at in
+development, tests and `benchmark_smtp.py`.
+"""
 import os
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
 
-def send_email(to_email: str, subject: str, body: str) -> bool:
-    """Send an email using SMTP settings from environment.
+SMTP_TIMEOUT_SECONDS = 10
+# Idle connections are NOOP-checked before reuse after this long...
+KEEPALIVE_SECONDS = 30
+# ...and closed instead once they have been idle this long
+MAX_IDLE_SECONDS = 300
 
-    Reads SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD and EMAIL_FROM from env.
-    Returns True on success, False otherwise.
-    """
+# The message was refused but the session is still usable
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+def build_message(email_from: str, to_email: str, subject: str, body: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = email_from
+    msg["To"] = to_email
+    msg.set_content(body)
+    return msg
+
+
+def _close_quietly(server):
+    if server is None:
+        return
     try:
-        import smtplib
-        from email.message import EmailMessage
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
 
-        smtp_host = os.getenv("SMTP_HOST")
-        smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        smtp_user = os.getenv("SMTP_USER")
-        smtp_password = os.getenv("SMTP_PASSWORD")
-        email_from = os.getenv("EMAIL_FROM") or smtp_user
 
-        if not smtp_host or not smtp_user or not smtp_password:
-            print("SMTP not configured - skipping email send")
+class SMTPPool:
+    """Thread-safe pool of persistent SMTP sessions to one server."""
+
+    def __init__(self, host, port=587, user=None, password=None, email_from=None,
+                 starttls=True, size=4, timeout=SMTP_TIMEOUT_SECONDS,
+                 keepalive_seconds=KEEPALIVE_SECONDS, max_idle_seconds=MAX_IDLE_SECONDS):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.email_from = email_from or user
+        self.starttls = starttls
+        self.timeout = timeout
+        self.keepalive_seconds = keepalive_seconds
+        self.max_idle_seconds = max_idle_seconds
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        # (server, last used) pairs; reused most recent first
+        self._idle = []
+        self._closed = False
+        self.connections_opened = 0
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            _close_quietly(server)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    @staticmethod
+    def _alive(server):
+        try:
+            return server.noop()[0] == 250
+        except Exception:
             return False
 
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = email_from
-        msg["To"] = to_email
-        msg.set_content(body)
+    def _checkout(self):
+        """Take a slot; returns a live idle session or None (connect lazily)."""
+        self._slots.acquire()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                server, last_used = self._idle.pop()
+            idle = time.monotonic() - last_used
+            if idle > self.max_idle_seconds or (idle > self.keepalive_seconds and not self._alive(server)):
+                _close_quietly(server)
+                continue
+            return server
 
-        with smtplib.SMTP(smtp_host, smtp_port, timeout=10) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.send_message(msg)
-        # Helpful log for debugging local email sends
-        print(f"Email sent to {to_email} via {smtp_host}:{smtp_port} as {smtp_user}")
-        return True
+    def _checkin(self, server):
+        try:
+            if server is not None:
+                with self._lock:
+                    keep = not self._closed
+                    if keep:
+                        self._idle.append((server, time.monotonic()))
+                if not keep:
+                    _close_quietly(server)
+        finally:
+            self._slots.release()
+
+    def send_many(self, messages):
+        """Send (to_email, subject, body) tuples over one session.
+
+        Returns one bool per message. A refused message does not affect the
+        others; if the session drops it is reopened and the message retried
+        once, and if the server cannot be reached the rest are not attempted.
+        """
+        messages = list(messages)
+        results = []
+        server = self._checkout()
+        try:
+            for to_email, subject, body in messages:
+                msg = build_message(self.email_from, to_email, subject, body)
+                sent = False
+                for attempt in (1, 2):
+                    try:
+                        if server is None:
+                            server = self._connect()
+                        server.send_message(msg)
+                        sent = True
+                        break
+                    except _MESSAGE_ERRORS as e:
+                        print(f"Error sending email to {to_email}: {e}")
+                        break
+                    except (smtplib.SMTPException, OSError) as e:
+                        _close_quietly(server)
+                        server = None
+                        if attempt == 2:
+                            print(f"Error sending email to {to_email}: {e}")
+                results.append(sent)
+                if not sent and server is None:
+                    break
+        finally:
+            self._checkin(server)
+        return results + [False] * (len(messages) - len(results))
+
+    def send(self, to_email, subject, body):
+        return self.send_many([(to_email, subject, body)])[0]
+
+    def close(self):
+        """Close the idle sessions; sessions in use are closed when returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            _close_quietly(server)
+
+
+_pool = None
+_pool_config = None
+_pool_lock = threading.Lock()
+
+
+def _env_config():
+    smtp_host = os.getenv("SMTP_HOST")
+    smtp_user = os.getenv("SMTP_USER")
+    smtp_password = os.getenv("SMTP_PASSWORD")
+    if not smtp_host or not smtp_user or not smtp_password:
+        return None
+    return (
+        smtp_host,
+        int(os.getenv("SMTP_PORT", "587")),
+        smtp_user,
+        smtp_password,
+        os.getenv("EMAIL_FROM") or smtp_user,
+        os.getenv("SMTP_STARTTLS", "true").lower() not in ("0", "false", "no"),
+        int(os.getenv("SMTP_POOL_SIZE", "4")),
+    )
+
+
+def get_pool():
+    """The shared pool for the SMTP settings in the environment, or None if unset.
+
+    Reads SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, EMAIL_FROM,
+    SMTP_STARTTLS and SMTP_POOL_SIZE; the pool is rebuilt if they change.
+    """
+    global _pool, _pool_config
+    config = _env_config()
+    if config is None:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_config != config:
+            if _pool is not None:
+                _pool.close()
+            host, port, user, password, email_from, starttls, size = config
+            _pool = SMTPPool(host, port, user, password, email_from, starttls=starttls, size=size)
+            _pool_config = config
+        return _pool
+
+
+def close_pool():
+    global _pool, _pool_config
+    with _pool_lock:
+        pool, _pool, _pool_config = _pool, None, None
+    if pool is not None:
+        pool.close()
+
+
+def send_many(messages):
+    """Send (to_email, subject, body) tuples over one pooled session.
+
+    Returns one bool per message (all False if SMTP is not configured).
+    """
+    messages = list(messages)
+    pool = get_pool()
+    if pool is None:
+        print("SMTP not configured - skipping email send")
+        return [False] * len(messages)
+    try:
+        return pool.send_many(messages)
     except Exception as e:
         print(f"Error sending email: {e}")
-        return False
+        return [False] * len(messages)
+
+
+def send_email(to_email: str, subject: str, body: str) -> bool:
+    """Send an email using SMTP settings from environment.
+
+    Reads SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD and EMAIL_FROM from env.
+    Returns True on success, False otherwise.
+    """
+    ok = send_many([(to_email, subject, body)])[0]
+    if ok:
+        # Helpful log for debugging local email sends
+        print(f"Email sent to {to_email} via {os.getenv('SMTP_HOST')}:{os.getenv('SMTP_PORT', '587')}")
+    return ok
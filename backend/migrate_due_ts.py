@@ -0,0 +1,54 @@
+"""Migration script: add the canonical due_ts timestamp to existing tasks.
+
+Usage:
+  python migrate_due_ts.py [--dry-run] [--page-size N] [--start-after TASK_ID] [--restart]
+
+Deadline reminders, the due-today list and due date sorts read `due_ts`
+(see api/due_dates.py), so tasks written before the field existed are
+missing from the deadline range queries until this has run. Tasks are read
+N at a time in document id order and only those whose due_ts is missing or
+out of date are written, through a BulkWriter. The last task of every page
+is recorded on migrations/due_ts, so an interrupted run resumes there; pass
+--start-after to pick the position yourself or --restart to begin again.
+A run with failed writes stops recording its position at the first page that
+had one, so running it again retries them. Safe to re-run.
+"""
+from dotenv import load_dotenv
+import argparse
+
+load_dotenv()
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from firebase_utils import get_firebase_credentials
+from api import due_dates
+
+
+def init_firebase_app():
+    if not firebase_admin._apps:
+        creds = get_firebase_credentials()
+        cred = credentials.Certificate(creds)
+        firebase_admin.initialize_app(cred)
+
+
+def main(dry_run: bool = False, page_size: int = due_dates.MIGRATION_PAGE_SIZE,
+         start_after: str = None, restart: bool = False):
+    init_firebase_app()
+    db = firestore.client()
+
+    scanned, updated, failed = due_dates.migrate(db, page_size=page_size, dry_run=dry_run,
+                                                 start_after=start_after, restart=restart)
+    verb = 'would update' if dry_run else 'updated'
+    print(f'Done. Scanned {scanned} tasks, {verb} {updated}')
+    if failed:
+        print(f'{failed} writes failed; run again to retry them')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    parser.add_argument('--page-size', type=int, default=due_dates.MIGRATION_PAGE_SIZE, help='Tasks to read per page')
+    parser.add_argument('--start-after', help='Resume after this task id instead of the recorded position')
+    parser.add_argument('--restart', action='store_true', help='Ignore the recorded position and start from the first task')
+    args = parser.parse_args()
+    main(dry_run=args.dry_run, page_size=args.page_size, start_after=args.start_after, restart=args.restart)
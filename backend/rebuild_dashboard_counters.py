@@ -0,0 +1,50 @@
+"""Admin script to recompute the admin dashboard counters.
+
+Usage:
+  python rebuild_dashboard_counters.py [--dry-run]
+
+Streams the users, tasks and projects collections once, overwrites the
+counter shards under counters/admin_dashboard/shards with the fresh totals
+and marks the counters as seeded. The dashboard does this itself while they
+are unseeded; run it after deploying the counters to spare that first load,
+and whenever the dashboard_counter_drift job reports differences. Writes
+that happen while it runs may be missed, so prefer a quiet period.
+"""
+from dotenv import load_dotenv
+import argparse
+import json
+
+load_dotenv()
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from firebase_utils import get_firebase_credentials
+from api import counters
+
+
+def init_firebase_app():
+    if not firebase_admin._apps:
+        creds = get_firebase_credentials()
+        cred = credentials.Certificate(creds)
+        firebase_admin.initialize_app(cred)
+
+
+def main(dry_run: bool = False):
+    init_firebase_app()
+    db = firestore.client()
+
+    if dry_run:
+        print('Current counters:')
+        print(json.dumps(counters.read_dashboard(db), indent=2, sort_keys=True))
+        return
+
+    totals = counters.rebuild(db)
+    print('Rebuilt counters:')
+    print(json.dumps(totals, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dry-run', action='store_true', help='Print the current counters without rebuilding them')
+    args = parser.parse_args()
+    main(dry_run=args.dry_run)
@@ -0,0 +1,43 @@
+"""Admin script to rebuild label assignments and usage counts.
+
+Usage:
+  python rebuild_label_counts.py [--page-size N]
+
+Streams the tasks collection N documents at a time and, from each task's
+`labels` array, recreates the task_labels mappings (deleting mappings no task
+carries any more) and sets every label's task_count. Run it once after
+deploying label usage counts and whenever the counts look off.
+"""
+from dotenv import load_dotenv
+import argparse
+
+load_dotenv()
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from firebase_utils import get_firebase_credentials
+from api import labels
+
+
+def init_firebase_app():
+    if not firebase_admin._apps:
+        creds = get_firebase_credentials()
+        cred = credentials.Certificate(creds)
+        firebase_admin.initialize_app(cred)
+
+
+def main(page_size: int = labels.REBUILD_PAGE_SIZE):
+    init_firebase_app()
+    db = firestore.client()
+
+    counts = labels.rebuild_usage(db, page_size=page_size)
+    for label_id in sorted(counts):
+        print(f'{label_id}: {counts[label_id]}')
+    print(f'Done. Counted {len(counts)} labels')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--page-size', type=int, default=labels.REBUILD_PAGE_SIZE, help='Tasks to read per page')
+    args = parser.parse_args()
+    main(page_size=args.page_size)
@@ -0,0 +1,43 @@
+"""Admin script to rebuild the tag catalog (tag_index collection).
+
+Usage:
+  python rebuild_tag_index.py [--page-size N]
+
+Streams the tasks collection N documents at a time, counts the tags on
+non-archived tasks and overwrites tag_index with the result (dropping entries
+for tags no longer in use). Run it once after deploying the tag index and
+whenever the catalog counts look off.
+"""
+from dotenv import load_dotenv
+import argparse
+
+load_dotenv()
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from firebase_utils import get_firebase_credentials
+from api import tag_index
+
+
+def init_firebase_app():
+    if not firebase_admin._apps:
+        creds = get_firebase_credentials()
+        cred = credentials.Certificate(creds)
+        firebase_admin.initialize_app(cred)
+
+
+def main(page_size: int = tag_index.REBUILD_PAGE_SIZE):
+    init_firebase_app()
+    db = firestore.client()
+
+    counts = tag_index.rebuild(db, page_size=page_size)
+    for tag in sorted(counts):
+        print(f'{tag}: {counts[tag]}')
+    print(f'Done. Indexed {len(counts)} tags')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--page-size', type=int, default=tag_index.REBUILD_PAGE_SIZE, help='Tasks to read per page')
+    args = parser.parse_args()
+    main(page_size=args.page_size)
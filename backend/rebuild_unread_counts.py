@@ -0,0 +1,39 @@
+"""Admin script to recount the unread notification counters.
+
+Usage:
+  python rebuild_unread_counts.py
+
+Streams the unread notifications once and overwrites every user's
+notification_counters/{user_id} document with the fresh count. Run it once
+after deploying the counters (notifications created earlier are not
+counted otherwise) and whenever a badge looks off. Notifications created or
+read while it runs may be miscounted, so prefer a quiet period.
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from firebase_utils import get_firebase_credentials
+from api import unread_counter
+
+
+def init_firebase_app():
+    if not firebase_admin._apps:
+        creds = get_firebase_credentials()
+        cred = credentials.Certificate(creds)
+        firebase_admin.initialize_app(cred)
+
+
+def main():
+    init_firebase_app()
+    db = firestore.client()
+
+    totals = unread_counter.rebuild(db)
+    unread = sum(totals.values())
+    print(f'Done. {unread} unread notifications across {len(totals)} users')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,9 @@
 Usage:
   python resend_notifications.py [--dry-run] [--limit N]
 
-This will iterate recent notifications and call send_email for those where
-email_sent is False or missing. It updates the document's email_sent and
+This will iterate recent notifications and send the emails of those where
+email_sent is False or missing, all over one pooled SMTP session
+(email_utils.send_many). It updates the document's email_sent and
 email_sent_at when successful.
 """
 from dotenv import load_dotenv
@@ -17,7 +18,7 @@ load_dotenv()
 import firebase_admin
 from firebase_admin import credentials, firestore
 from firebase_utils import get_firebase_credentials
-from email_utils import send_email
+from email_utils import close_pool, send_many
 
 
 def init_firebase_app():
@@ -36,7 +37,7 @@ def main(dry_run: bool = True, limit: int = 100):
     docs = list(q.stream())
     print(f'Found {len(docs)} recent notifications (limit={limit})')
 
-    count_sent = 0
+    pending = []
     for d in docs:
         data = d.to_dict() or {}
         nid = d.id
@@ -60,8 +61,12 @@ def main(dry_run: bool = True, limit: int = 100):
         print(f"would send to {to_email}: subject='{subject}' (dry_run={dry_run})")
         if dry_run:
             continue
+        pending.append((nid, (to_email, subject, body)))
 
-        ok = send_email(to_email, subject, body)
+    count_sent = 0
+    results = send_many([message for _, message in pending])
+    close_pool()
+    for (nid, _), ok in zip(pending, results):
         if ok:
             db.collection('notifications').document(nid).update({
                 'email_sent': True,
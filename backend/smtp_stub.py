@@ -0,0 +1,201 @@
+"""Local SMTP sink for development, tests and benchmarks.
+
+Usage:
+  python smtp_stub.py [--port N] [--latency-ms N]
+
+Speaks just enough SMTP (EHLO/HELO, AUTH PLAIN, MAIL, RCPT, DATA, NOOP, RSET,
+QUIT) for smtplib, accepts any credentials and keeps the messages it receives
+in memory instead of delivering them. Point the app at it with
+SMTP_HOST=localhost SMTP_PORT=<port> SMTP_STARTTLS=false and any SMTP_USER /
+SMTP_PASSWORD. In code:
+
+    with StubSMTPServer() as stub:
+        pool = SMTPPool("127.0.0.1", stub.port, starttls=False)
+        ...
+        stub.messages  # [email.message.Message, ...]
+
+`latency` delays every reply to imitate a remote server, `reject` refuses
+the listed recipients and `drop_connections()` hangs up on every open session
+(as a server timing out idle clients would).
+"""
+import argparse
+import email
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _reply(self, *lines):
+        stub = self.server.stub
+        if stub.latency:
+            time.sleep(stub.latency)
+        out = "".join(
+            f"{line[:3]}{'-' if i < len(lines) - 1 else ' '}{line[4:]}\r\n"
+            for i, line in enumerate(lines)
+        )
+        self.wfile.write(out.encode("ascii"))
+
+    def _read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                return b"".join(lines)
+            # Undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b"..") else line)
+
+    def handle(self):
+        stub = self.server.stub
+        stub._opened(self.connection)
+        try:
+            self._reply("220 smtp-stub ready")
+            mail_from, rcpts = None, []
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.decode("utf-8", "replace").rstrip("\r\n")
+                verb, _, arg = command.partition(" ")
+                verb = verb.upper()
+                stub._count(verb)
+                if verb == "EHLO":
+                    self._reply("250 smtp-stub", "250 AUTH PLAIN", "250 8BITMIME")
+                elif verb == "HELO":
+                    self._reply("250 smtp-stub")
+                elif verb == "AUTH":
+                    self._reply("235 2.7.0 Authentication successful")
+                elif verb == "MAIL":
+                    mail_from, rcpts = arg.partition(":")[2].strip(" <>"), []
+                    self._reply("250 OK")
+                elif verb == "RCPT":
+                    address = arg.partition(":")[2].strip(" <>")
+                    if address in stub.reject:
+                        self._reply("550 5.1.1 Mailbox unavailable")
+                    else:
+                        rcpts.append(address)
+                        self._reply("250 OK")
+                elif verb == "DATA":
+                    if not rcpts:
+                        self._reply("503 5.5.1 No valid recipients")
+                        continue
+                    self._reply("354 End data with <CR><LF>.<CR><LF>")
+                    stub._received(mail_from, rcpts, self._read_data())
+                    mail_from, rcpts = None, []
+                    self._reply("250 OK")
+                elif verb in ("NOOP", "RSET"):
+                    if verb == "RSET":
+                        mail_from, rcpts = None, []
+                    self._reply("250 OK")
+                elif verb == "QUIT":
+                    self._reply("221 Bye")
+                    return
+                else:
+                    self._reply("502 5.5.2 Command not implemented")
+        except OSError:
+            pass
+        finally:
+            stub._closed(self.connection)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class StubSMTPServer:
+    """In-process SMTP server recording what it receives."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, on_message=None):
+        self.host = host
+        self.latency = latency
+        self.reject = set()
+        self.messages = []
+        self.envelopes = []
+        self.connections = 0
+        self.commands = {}
+        self._on_message = on_message
+        self._lock = threading.Lock()
+        self._open = set()
+        self._server = _Server((host, port), _Handler)
+        self._server.stub = self
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), name="smtp-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self.drop_connections()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def drop_connections(self):
+        """Hang up on every open session."""
+        with self._lock:
+            sockets = list(self._open)
+        for sock in sockets:
+            try:
+                sock.shutdown(2)
+                sock.close()
+            except OSError:
+                pass
+
+    def wait_for(self, count, timeout=5):
+        """Wait until `count` messages have arrived; returns whether they did."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if len(self.messages) >= count:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def _opened(self, sock):
+        with self._lock:
+            self.connections += 1
+            self._open.add(sock)
+
+    def _closed(self, sock):
+        with self._lock:
+            self._open.discard(sock)
+
+    def _count(self, verb):
+        with self._lock:
+            self.commands[verb] = self.commands.get(verb, 0) + 1
+
+    def _received(self, mail_from, rcpts, data):
+        message = email.message_from_bytes(data)
+        with self._lock:
+            self.envelopes.append((mail_from, list(rcpts)))
+            self.messages.append(message)
+        if self._on_message:
+            self._on_message(mail_from, rcpts, message)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=1025, help='Port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay before every reply')
+    args = parser.parse_args()
+
+    def show(mail_from, rcpts, message):
+        print(f"{mail_from} -> {', '.join(rcpts)}: {message['Subject']}")
+
+    stub = StubSMTPServer(port=args.port, latency=args.latency_ms / 1000, on_message=show).start()
+    print(f'SMTP stub listening on {stub.host}:{stub.port} (Ctrl+C to stop)')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,48 @@
+"""Maintenance script: check (and optionally repair) each task's visible_to list.
+
+Usage:
+  python verify_task_acl.py [--fix] [--page-size N]
+
+Task reads are authorized from the precomputed `visible_to` array, which the
+API keeps current on task writes and the ACL propagator updates after
+membership or manager changes. This recomputes the list for every task from
+the current rules and prints each task whose stored list differs. With --fix
+the differing tasks are rewritten, which is also how tasks created before the
+field existed get it; a completed --fix run is recorded on migrations/task_acl,
+after which task lists stop running the pre-visible_to queries. Safe to re-run.
+"""
+from dotenv import load_dotenv
+import argparse
+
+load_dotenv()
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+from firebase_utils import get_firebase_credentials
+from api import task_acl
+
+
+def init_firebase_app():
+    if not firebase_admin._apps:
+        creds = get_firebase_credentials()
+        cred = credentials.Certificate(creds)
+        firebase_admin.initialize_app(cred)
+
+
+def main(fix: bool = False, page_size: int = task_acl.VERIFY_PAGE_SIZE):
+    init_firebase_app()
+    db = firestore.client()
+
+    mismatches = task_acl.verify(db, fix=fix, page_size=page_size)
+    for task_id, stored, expected in mismatches:
+        print(f'{task_id}: stored={stored} expected={expected}')
+    verb = 'fixed' if fix else 'found'
+    print(f'Done. {verb} {len(mismatches)} task(s) with a stale visible_to')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fix', action='store_true', help='Rewrite the tasks whose visible_to differs')
+    parser.add_argument('--page-size', type=int, default=task_acl.VERIFY_PAGE_SIZE, help='Tasks to read per page (at most 500, one write batch per page)')
+    args = parser.parse_args()
+    main(fix=args.fix, page_size=args.page_size)
@@ -337,8 +337,9 @@
         
         async function loadProjects() {
             try {
-                const response = await fetch(`${API_BASE}/api/projects`);
-                const projects = await response.json();
+                const response = await fetchAllPages(`${API_BASE}/api/projects`);
+                if (!response.ok) throw new Error(response.error);
+                const projects = response.items;
                 
                 const projectsHtml = projects.map(p => `
                     <div style="padding: 15px; border: 1px solid #eee; margin: 10px 0; border-radius: 4px; background: #f9f9f9;">
@@ -51,6 +51,25 @@ function el(id){ return document.getElementById(id); }
   }
 })();
 
+// Read every page of a cursor-paginated list endpoint. Endpoints returning a
+// JSON array send the next cursor in the X-Next-Cursor header; those returning
+// an object (pass `key`, e.g. "users") send it as `next_cursor` in the body.
+// Resolves to { ok, status, items } or { ok:false, status, error }.
+async function fetchAllPages(url, init, key){
+  const items = [];
+  let cursor = null;
+  do {
+    const pageUrl = cursor ? url + (url.indexOf("?") >= 0 ? "&" : "?") + "cursor=" + encodeURIComponent(cursor) : url;
+    const res = await fetch(pageUrl, init || {});
+    const body = await res.json();
+    if (!res.ok) return { ok: false, status: res.status, error: (body && body.error) || "Request failed" };
+    const page = key ? (body[key] || []) : body;
+    if (Array.isArray(page)) items.push(...page);
+    cursor = key ? body.next_cursor : res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return { ok: true, status: 200, items };
+}
+
 // Sticky navbar at top of every page with role-based navigation
 function injectNavbar(){
   // Skip navbar injection if page has skipNavbar flag
@@ -12,8 +12,8 @@
 
   async function loadProjects(){
     const sel = document.getElementById("project_id");
-    const res = await fetch(API_BASE + "/api/projects");
-    const list = await res.json();
+    const res = await fetchAllPages(API_BASE + "/api/projects");
+    const list = res.ok ? res.items : [];
     if(Array.isArray(list)){
       list.forEach(p=>{
         const opt = document.createElement("option");
@@ -220,23 +220,28 @@
         
         async function loadAvailableUsers() {
             try {
-                // Load all users to get staff and managers
-                const response = await fetch(`${API_BASE}/api/manager/all-users`, {
-                    headers: {
-                        'X-User-Id': currentUser.user_id
+                // Load all users to get staff and managers, one page at a time
+                allStaff = [];
+                allManagers = [];
+                let cursor = null;
+                do {
+                    const url = `${API_BASE}/api/manager/all-users` + (cursor ? `?cursor=${encodeURIComponent(cursor)}` : '');
+                    const response = await fetch(url, {
+                        headers: {
+                            'X-User-Id': currentUser.user_id
+                        }
+                    });
+                    
+                    // ✅ Add error checking
+                    if (!response.ok) {
+                        throw new Error(`Failed to load users: ${response.status}`);
                     }
-                });
-                
-                // ✅ Add error checking
-                if (!response.ok) {
-                    throw new Error(`Failed to load users: ${response.status}`);
-                }
-                
-                const data = await response.json();
-                
-                // ✅ CHANGED: Direct assignment from response structure
-                allStaff = data.staff || [];
-                allManagers = data.managers || [];
+                    
+                    const data = await response.json();
+                    allStaff.push(...(data.staff || []));
+                    allManagers.push(...(data.managers || []));
+                    cursor = data.next_cursor;
+                } while (cursor);
                 
                 console.log('Loaded users:', { 
                     staff: allStaff.length, 
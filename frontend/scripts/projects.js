@@ -103,8 +103,8 @@ load();
 }
 
   async function load(){
-    const res = await fetch(API_BASE + "/api/projects");
-    const data = await res.json();
+    const res = await fetchAllPages(API_BASE + "/api/projects");
+    const data = res.ok ? res.items : [];
     const host = document.getElementById("list"); host.innerHTML = "";
     if(!Array.isArray(data) || !data.length){ host.innerHTML = "<p>No projects yet</p>"; return; }
     data.forEach(p=>{
@@ -351,8 +351,8 @@ load();
     let options = [];
     try{
       if (u && u.role === 'admin'){
-        const res = await fetch(API_BASE + '/api/admin/users'); if (!res.ok) throw new Error('fail');
-        const d = await res.json(); options = d.users || [];
+        const res = await fetchAllPages(API_BASE + '/api/admin/users', {}, 'users'); if (!res.ok) throw new Error('fail');
+        options = res.items;
       } else {
         const res = await fetch(API_BASE + '/api/manager/dashboard'); if (!res.ok) throw new Error('fail');
         const d = await res.json(); options = d.team_members || [];
@@ -382,10 +382,9 @@ load();
         memberSelect.innerHTML = '<option>Loading...</option>';
 
         if (u.role === 'admin'){
-          const res = await fetch(API_BASE + '/api/admin/users');
+          const res = await fetchAllPages(API_BASE + '/api/admin/users', {}, 'users');
           if (!res.ok) throw new Error('Failed to load users');
-          const data = await res.json();
-          const users = data.users || [];
+          const users = res.items;
           if (!users.length){ memberSelect.innerHTML = '<option disabled>No users</option>'; return; }
           memberSelect.innerHTML = '';
           users.forEach(us => {
@@ -282,9 +282,9 @@ requireAuth();
     // Show project name instead of id when possible
     if (task.project_id) {
       try {
-        const pRes = await fetch(API + '/api/projects');
+        const pRes = await fetchAllPages(API + '/api/projects');
         if (pRes.ok) {
-          const projects = await pRes.json();
+          const projects = pRes.items;
           const proj = (Array.isArray(projects)?projects:[]).find(p=>p.project_id===task.project_id) || {};
           meta.innerHTML += '<div><strong>Project:</strong> '+(proj.name || task.project_id)+'</div>';
         } else {
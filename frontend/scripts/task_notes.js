@@ -158,8 +158,8 @@
     window.deleteNote = deleteNote;
 
     async function load() {
-      var res = await fetch(API_BASE + "/api/notes/by-task/" + encodeURIComponent(task_id));
-      var list = await res.json();
+      var res = await fetchAllPages(API_BASE + "/api/notes/by-task/" + encodeURIComponent(task_id));
+      var list = res.ok ? res.items : [];
       var host = q("#list"); 
       host.innerHTML = "";
       
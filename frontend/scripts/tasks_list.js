@@ -53,8 +53,8 @@ requireAuth();
     const viewerId = current.user_id || current.uid || current.id || '';
     const url = API_BASE + "/api/tasks" + (qs ? "?" + qs : "");
     console.debug('[tasks] fetching', { url, viewerId, qs });
-    const res = await fetch(url, { headers: viewerId ? { 'X-User-Id': viewerId } : {} });
-    const list = await res.json();
+    const res = await fetchAllPages(url, { headers: viewerId ? { 'X-User-Id': viewerId } : {} });
+    const list = res.ok ? res.items : { error: res.error };
     const tbody = document.getElementById("rows"); tbody.innerHTML = "";
     if(!res.ok){ tbody.innerHTML = "<tr><td colspan='7'>"+ (list.error || "Failed to load") +"</td></tr>"; return; }
     console.debug('[tasks] fetched', Array.isArray(list) ? list.length : 'non-array', (Array.isArray(list) ? list.slice(0,5) : list));
@@ -171,8 +171,8 @@ requireAuth();
   showR.addEventListener("change", onToggle);
 
   async function fillProjects(){
-    const res = await fetch(API_BASE + "/api/projects");
-    const list = await res.json();
+    const res = await fetchAllPages(API_BASE + "/api/projects");
+    const list = res.ok ? res.items : [];
     const sel = document.getElementById("project_select");
     sel.innerHTML = '<option value="">(all my tasks)</option>';
     (Array.isArray(list)?list:[]).forEach(p=>{
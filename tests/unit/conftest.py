@@ -102,6 +102,8 @@ fake_firestore.ArrayRemove = _array_remove_mock
 fake_firestore.Increment = _increment_mock
 fake_firestore.Query = QueryMock
 fake_firestore.DELETE_FIELD = "DELETE_FIELD_SENTINEL"
+# Transactional functions run once with whatever transaction Mock they are given
+fake_firestore.transactional = lambda fn: fn
 
 fake_firebase.firestore = fake_firestore
 
@@ -124,10 +126,27 @@ fake_google_cloud_firestore.base_query = fake_google_cloud_firestore_base_query
 fake_google_cloud.firestore_v1 = fake_google_cloud_firestore
 fake_google.cloud = fake_google_cloud
 
+# Mock google.api_core.exceptions for write precondition failures
+fake_google_api_core = types.ModuleType("google.api_core")
+fake_google_api_core_exceptions = types.ModuleType("google.api_core.exceptions")
+
+class AlreadyExists(Exception):
+    pass
+
+class NotFound(Exception):
+    pass
+
+fake_google_api_core_exceptions.AlreadyExists = AlreadyExists
+fake_google_api_core_exceptions.NotFound = NotFound
+fake_google_api_core.exceptions = fake_google_api_core_exceptions
+fake_google.api_core = fake_google_api_core
+
 sys.modules["google"] = fake_google
 sys.modules["google.cloud"] = fake_google_cloud
 sys.modules["google.cloud.firestore_v1"] = fake_google_cloud_firestore
 sys.modules["google.cloud.firestore_v1.base_query"] = fake_google_cloud_firestore_base_query
+sys.modules["google.api_core"] = fake_google_api_core
+sys.modules["google.api_core.exceptions"] = fake_google_api_core_exceptions
 
 sys.modules["firebase_admin"] = fake_firebase
 sys.modules["firebase_admin.credentials"] = fake_credentials
@@ -381,6 +400,28 @@ def reset_mocks(mock_db):
     fake_firestore.client.reset_mock()
 
 
+@pytest.fixture(autouse=True)
+def _clear_profile_cache():
+    """The role/profile and statistics caches and the task ACL backfill flag are process-wide; start every test empty."""
+    from backend.api import aggregates, profile_cache, task_acl
+    profile_cache.clear()
+    aggregates.clear()
+    task_acl._backfilled.clear()
+    yield
+    profile_cache.clear()
+    aggregates.clear()
+    task_acl._backfilled.clear()
+
+
+def fake_get_all(refs, *args, **kwargs):
+    """Stand-in for ``Client.get_all``: resolve each reference with ``ref.get()``.
+
+    Results are matched back to the requested ids by ``snapshot.id``, so the
+    snapshots a test returns need their ``id`` set.
+    """
+    return [ref.get() for ref in refs]
+
+
 @pytest.fixture
 def mock_db():
     """Create a fresh mock Firestore database for each test.
@@ -423,16 +464,20 @@ def mock_db():
     mock_collection.stream = Mock(return_value=[])
     mock_collection.get = Mock(return_value=[])
     
-    # Mock where(), order_by(), and limit() for query chaining
+    # Mock where(), order_by(), limit() and select() for query chaining
     # These return the collection itself to allow chaining
     mock_collection.where = Mock(return_value=mock_collection)
     mock_collection.order_by = Mock(return_value=mock_collection)
     mock_collection.limit = Mock(return_value=mock_collection)
+    mock_collection.select = Mock(return_value=mock_collection)
     
     # Set up collection() to return the default collection
     # Tests can override this with mock_db.collection = Mock(return_value=custom_collection)
     mock_db.collection = Mock(return_value=mock_collection)
     
+    # Batched reads (Client.get_all) fall through to each reference's get()
+    mock_db.get_all = Mock(side_effect=fake_get_all)
+    
     return mock_db
 
 
@@ -469,7 +514,7 @@ def app():
     # Import all blueprints
     from backend.api import (
         users_bp, projects_bp, tasks_bp,
-        tags_bp, notes_bp, attachments_bp, memberships_bp, dashboard_bp, manager_bp, admin_bp, staff_bp, reports_bp, notifications_bp
+        tags_bp, labels_bp, notes_bp, attachments_bp, memberships_bp, dashboard_bp, manager_bp, admin_bp, staff_bp, reports_bp, notifications_bp
     )
     # Ensure notifications module is imported so its routes attach to the
     # `notifications_bp` blueprint before registration on the test app.
@@ -495,7 +540,7 @@ def app():
     
     # Register all blueprints to ensure all endpoints are available
     blueprints = [
-        users_bp, projects_bp, tasks_bp, tags_bp,
+        users_bp, projects_bp, tasks_bp, tags_bp, labels_bp,
         notes_bp, attachments_bp, memberships_bp, dashboard_bp, manager_bp, admin_bp, staff_bp, reports_bp, notifications_bp
     ]
     # Append staff blueprint if available (register under '/staff')
@@ -693,9 +738,109 @@ class _ChainableQuery:
         # Return self to allow chaining
         return self
 
+    def select(self, *args, **kwargs):
+        return self
+
+    def order_by(self, *args, **kwargs):
+        return self
+
+    def start_after(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args, **kwargs):
+        return self
+
     def stream(self):
         return self._results
 
+def empty_collection():
+    """Collection Mock with no documents, including nested sub-collections."""
+    coll = Mock()
+    coll.stream.return_value = []
+    coll.document.return_value.get.return_value.exists = False
+    coll.document.return_value.collection.return_value.stream.return_value = []
+    return chain_paging(coll)
+
+def stream_counts(query):
+    """Answer count() aggregations on a collection Mock from its stream().
+
+    Filtered counts (`where(...).count()`) see the same documents, which is
+    enough for tests that only check the arithmetic around the counts.
+    """
+    stream_counts_only(query)
+    query.where.return_value = query
+    return query
+
+def chain_paging(query):
+    """Make a collection/query Mock stand in for its own paginated chain.
+
+    List endpoints read `query.where(...).order_by(...).start_after(...).limit(...)`;
+    tests that only configure `query.stream` can wrap the mock with this.
+    `where(filter=FieldFilter(field, "==", value))` streams the matching
+    documents (a missing field reads as None) and `count()` counts them.
+    """
+    for name in ("order_by", "start_after", "limit"):
+        getattr(query, name).return_value = query
+
+    def where(*args, filter=None, **kwargs):
+        field, value = (filter.field_path, filter.value) if filter is not None else (args[0], args[2])
+        matching = chain_paging(Mock())
+
+        def stream(*a, **kw):
+            docs = []
+            for doc in query.stream():
+                data = doc.to_dict() or {}
+                for key in field.split("."):
+                    data = data.get(key) if isinstance(data, dict) else None
+                if data == value:
+                    docs.append(doc)
+            return docs
+        matching.stream.side_effect = stream
+        return matching
+
+    query.where.side_effect = where
+    stream_counts_only(query)
+    return query
+
+def static_query(docs=()):
+    """Query Mock whose every chain (where / order_by / select / limit ...) streams `docs`."""
+    query = Mock()
+    for name in ("where", "order_by", "start_after", "limit", "select"):
+        getattr(query, name).return_value = query
+    query.stream.return_value = list(docs)
+    return query
+
+def stream_counts_only(query):
+    """Answer `query.count()` from `query.stream()` (see `stream_counts`)."""
+    def count(alias="count"):
+        aggregation = Mock()
+        aggregation.stream.side_effect = lambda: iter([[Mock(alias=alias, value=len(list(query.stream())))]])
+        return aggregation
+
+    query.count = Mock(side_effect=count)
+    return query
+
+def participants_query(*queries):
+    """Query Mock for a `participant_ids array_contains` filter.
+
+    Streams the documents of the given created_by / assigned_to query Mocks,
+    deduped by id, so tests written against the two separate queries can
+    serve the single participants query.
+    """
+    def stream():
+        seen, docs = set(), []
+        for query in queries:
+            for doc in query.stream():
+                if doc.id not in seen:
+                    seen.add(doc.id)
+                    docs.append(doc)
+        return docs
+
+    merged = Mock()
+    merged.stream = Mock(side_effect=stream)
+    merged.select = Mock(return_value=merged)
+    return merged
+
 def make_tasks_collection(created_results, assigned_results):
     """Return a mock 'tasks' collection with chainable where() for tests."""
     tasks_collection = Mock()
@@ -707,6 +852,8 @@ def make_tasks_collection(created_results, assigned_results):
             value = getattr(filter, "value", value)
         
         # Handle string field names
+        if field == "participant_ids":
+            return participants_query(_ChainableQuery(created_results), _ChainableQuery(assigned_results))
         if isinstance(field, str) and field.startswith("created_by."):
             return _ChainableQuery(created_results)
         if isinstance(field, str) and field.startswith("assigned_to."):
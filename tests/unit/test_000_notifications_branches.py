@@ -10,6 +10,77 @@ import sys
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
 
+def _task(task_id, title="Test Task", due_date="2025-01-15T14:30", **fields):
+    task = Mock()
+    task.id = task_id
+    task.to_dict.return_value = {"title": title, "due_date": due_date, **fields}
+    return task
+
+
+def _existing(user_id, task_id, due_date="2025-01-15T14:30", email_sent=False):
+    """Snapshot of the deadline reminder already created for (user, task, due date)."""
+    from backend.api.notifications import reminder_id
+    doc = Mock()
+    doc.id = reminder_id(user_id, task_id, "deadline", due_date)
+    doc.exists = True
+    doc.to_dict.return_value = {"user_id": user_id, "task_id": task_id, "email_sent": email_sent}
+    return doc
+
+
+def _deadline_db(mock_db, tasks, users=None, members=None, existing=None):
+    """Wire mock_db for check_deadlines.
+
+    `users` maps user id to email (None for a user without one); ids not in
+    it have no user document. `members` and `existing` are the membership and
+    already-created reminder documents (see `_existing`).
+    """
+    users = users or {}
+    mock_db.batch.return_value = Mock()
+
+    def user_ref(uid):
+        snap = Mock()
+        snap.id = uid
+        snap.exists = uid in users
+        snap.to_dict.return_value = {"email": users.get(uid)}
+        return Mock(get=Mock(return_value=snap))
+
+    existing = {doc.id: doc for doc in existing or []}
+
+    def notification_ref(doc_id):
+        snap = existing.get(doc_id) or Mock(id=doc_id, exists=False)
+        return Mock(id=doc_id, get=Mock(return_value=snap))
+
+    member_docs = [Mock(to_dict=Mock(return_value=m)) for m in (members or [])]
+    collections = {
+        "tasks": Mock(**{
+            "where.return_value.where.return_value.stream.return_value": tasks,
+        }),
+        "users": Mock(document=Mock(side_effect=user_ref)),
+        "memberships": Mock(**{"where.return_value.stream.return_value": member_docs}),
+        "notifications": Mock(document=Mock(side_effect=notification_ref)),
+        "email_outbox": Mock(),
+        "notification_counters": Mock(),
+    }
+    mock_db.collection.side_effect = lambda name: collections[name]
+    return collections
+
+
+def _written(mock_db):
+    """(notifications created, outbox items set) on the check_deadlines batches."""
+    batch = mock_db.batch.return_value
+    outbox = [c.args[1] for c in batch.set.call_args_list if "unread" not in c.args[1]]
+    return [c.args[1] for c in batch.create.call_args_list], outbox
+
+
+def _unread_added(mock_db):
+    """{user_id: unread increments} set on the check_deadlines batches."""
+    added = {}
+    for c in mock_db.batch.return_value.set.call_args_list:
+        if "unread" in c.args[1]:
+            added[c.args[1]["user_id"]] = added.get(c.args[1]["user_id"], 0) + c.args[1]["unread"]
+    return added
+
+
 class TestNotificationsBranchCoverage:
     """Test missing branches in notifications.py"""
     
@@ -50,11 +121,12 @@ class TestNotificationsBranchCoverage:
         mock_doc_ref.id = "notif123"
         mock_db.collection.return_value.document.side_effect = [
             Mock(get=Mock(return_value=mock_user_doc)),  # user lookup
-            mock_doc_ref  # notification creation
+            mock_doc_ref,  # notification creation
+            Mock(),  # unread counter
+            Mock(),  # outbox item
         ]
         
-        with patch('backend.api.notifications.send_email_util', return_value=True):
-            result = create_notification(mock_db, "user123", "Title", "Body", send_email=True)
+        result = create_notification(mock_db, "user123", "Title", "Body", send_email=True)
         
         assert result == "notif123"
     
@@ -69,7 +141,8 @@ class TestNotificationsBranchCoverage:
         mock_doc_ref.id = "notif123"
         mock_db.collection.return_value.document.side_effect = [
             Mock(get=Mock(return_value=mock_user_doc)),
-            mock_doc_ref
+            mock_doc_ref,
+            Mock(),  # unread counter
         ]
         
         result = create_notification(mock_db, "user123", "Title", "Body", send_email=True)
@@ -104,14 +177,15 @@ class TestNotificationsBranchCoverage:
         mock_doc_ref.id = "notif123"
         mock_db.collection.return_value.document.side_effect = [
             Mock(get=Mock(return_value=mock_user_doc)),
-            mock_doc_ref
+            mock_doc_ref,
+            Mock(),  # unread counter
         ]
         
         result = create_notification(mock_db, "user123", "Title", "Body", send_email=True)
         assert result == "notif123"
     
-    def test_create_notification_email_send_success(self, mock_db):
-        """Branch: send_email_util returns True (line 53->54)"""
+    def test_create_notification_email_is_queued(self, mock_db):
+        """Branch: send_email and user_email -> email queued with the notification"""
         from backend.api.notifications import create_notification
         
         mock_user_doc = Mock()
@@ -120,37 +194,47 @@ class TestNotificationsBranchCoverage:
         
         mock_doc_ref = Mock()
         mock_doc_ref.id = "notif123"
+        mock_counter_ref = Mock()
+        mock_outbox_ref = Mock()
         mock_db.collection.return_value.document.side_effect = [
             Mock(get=Mock(return_value=mock_user_doc)),
-            mock_doc_ref
+            mock_doc_ref,
+            mock_counter_ref,
+            mock_outbox_ref,
         ]
         
-        with patch('backend.api.notifications.send_email_util', return_value=True):
+        with patch('backend.api.notifications.send_email_util') as mock_send:
             result = create_notification(mock_db, "user123", "Title", "Body", send_email=True)
         
-        mock_doc_ref.update.assert_called_once()
         assert result == "notif123"
+        mock_send.assert_not_called()
+        batch = mock_db.batch.return_value
+        (notif_ref, notif), (counter_ref, counter), (item_ref, item) = [c.args for c in batch.set.call_args_list]
+        assert notif_ref is mock_doc_ref and notif["email_sent"] is False
+        assert counter_ref is mock_counter_ref and counter["unread"] == 1
+        assert item_ref is mock_outbox_ref
+        assert item["to"] == "user@example.com" and item["status"] == "pending"
+        batch.commit.assert_called_once()
+        mock_doc_ref.set.assert_not_called()
+        mock_doc_ref.update.assert_not_called()
     
-    def test_create_notification_email_send_failure(self, mock_db):
-        """Branch: send_email_util returns False (line 53->skip 54)"""
+    def test_create_notification_without_email_is_not_queued(self, mock_db):
+        """Branch: send_email -> FALSE writes the notification and its unread count only"""
         from backend.api.notifications import create_notification
         
-        mock_user_doc = Mock()
-        mock_user_doc.exists = True
-        mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-        
         mock_doc_ref = Mock()
         mock_doc_ref.id = "notif123"
-        mock_db.collection.return_value.document.side_effect = [
-            Mock(get=Mock(return_value=mock_user_doc)),
-            mock_doc_ref
-        ]
+        mock_db.collection.return_value.document.return_value = mock_doc_ref
         
-        with patch('backend.api.notifications.send_email_util', return_value=False):
-            result = create_notification(mock_db, "user123", "Title", "Body", send_email=True)
+        result = create_notification(mock_db, "user123", "Title", "Body", send_email=False)
         
-        mock_doc_ref.update.assert_not_called()
         assert result == "notif123"
+        batch = mock_db.batch.return_value
+        (_, notif), (_, counter) = [c.args for c in batch.set.call_args_list]
+        assert notif["user_id"] == "user123" and notif["read"] is False
+        assert counter == {"user_id": "user123", "unread": 1, "updated_at": counter["updated_at"]}
+        batch.commit.assert_called_once()
+        mock_doc_ref.set.assert_not_called()
 
 
 class TestCheckDeadlinesBranches:
@@ -198,64 +282,8 @@ class TestCheckDeadlinesBranches:
         
         assert response.status_code == 200
     
-    def test_check_deadlines_sample_task_exists(self, client, mock_db):
-        """Branch: sample task exists (line 134)"""
-        mock_task = Mock()
-        mock_task.to_dict.return_value = {"due_date": "2025-01-01T10:00"}
-        
-        mock_db.collection.return_value.limit.return_value.stream.return_value = iter([mock_task])
-        mock_db.collection.return_value.where.return_value.where.return_value.stream.return_value = []
-        mock_db.collection.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-        mock_db.collection.return_value.stream.return_value = []
-        
-        response = client.post("/api/notifications/check-deadlines")
-        
-        assert response.status_code == 200
-    
-    def test_check_deadlines_sample_task_no_due_date(self, client, mock_db):
-        """Branch: sample exists but no due_date (line 136)"""
-        mock_task = Mock()
-        mock_task.to_dict.return_value = {}  # No due_date
-        
-        mock_db.collection.return_value.limit.return_value.stream.return_value = iter([mock_task])
-        mock_db.collection.return_value.where.return_value.where.return_value.stream.return_value = []
-        mock_db.collection.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-        mock_db.collection.return_value.stream.return_value = []
-        
-        response = client.post("/api/notifications/check-deadlines")
-        
-        assert response.status_code == 200
-    
-    def test_check_deadlines_sample_due_date_minute_format(self, client, mock_db):
-        """Branch: sample_due matches minute pattern (line 137->138)"""
-        mock_task = Mock()
-        mock_task.to_dict.return_value = {"due_date": "2025-01-15T14:30"}
-        
-        mock_db.collection.return_value.limit.return_value.stream.return_value = iter([mock_task])
-        mock_db.collection.return_value.where.return_value.where.return_value.stream.return_value = []
-        mock_db.collection.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-        mock_db.collection.return_value.stream.return_value = []
-        
-        response = client.post(
-            "/api/notifications/check-deadlines",
-            query_string={
-                "start_iso": "2025-01-15T00:00:00+00:00",
-                "end_iso": "2025-01-16T00:00:00+00:00"
-            }
-        )
-        
-        assert response.status_code == 200
-    
     def test_check_deadlines_iso_parse_exception(self, client, mock_db):
-        """Branch: exception parsing ISO datetimes (line 145->149)"""
-        mock_task = Mock()
-        mock_task.to_dict.return_value = {"due_date": "2025-01-15T14:30"}
-        
-        mock_db.collection.return_value.limit.return_value.stream.return_value = iter([mock_task])
-        mock_db.collection.return_value.where.return_value.where.return_value.stream.return_value = []
-        mock_db.collection.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-        mock_db.collection.return_value.stream.return_value = []
-        
+        """Branch: unparseable start/end window is rejected"""
         response = client.post(
             "/api/notifications/check-deadlines",
             query_string={
@@ -264,26 +292,8 @@ class TestCheckDeadlinesBranches:
             }
         )
         
-        assert response.status_code == 200
-    
-    def test_check_deadlines_sample_lookup_exception(self, client, mock_db):
-        """Branch: exception in sample lookup (line 154->158)"""
-        call_count = [0]
-        
-        def raise_on_first_call(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                raise Exception("Database error")
-            return []
-        
-        mock_db.collection.return_value.limit.return_value.stream.side_effect = raise_on_first_call
-        mock_db.collection.return_value.where.return_value.where.return_value.stream.return_value = []
-        mock_db.collection.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-        mock_db.collection.return_value.stream.return_value = []
-        
-        response = client.post("/api/notifications/check-deadlines")
-        
-        assert response.status_code == 200
+        assert response.status_code == 400
+        mock_db.collection.return_value.where.assert_not_called()
     
     def test_check_deadlines_query_preview_exception(self, client, mock_db):
         """Branch: exception in query preview (line 164->166)"""
@@ -363,685 +373,175 @@ class TestCheckDeadlinesBranches:
         assert response.status_code == 200
     
     def test_check_deadlines_with_project_members(self, client, mock_db):
-        """Branch: project_id exists and has members (line 192->193)"""
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Test Task",
-            "due_date": "2025-01-15T14:30",
-            "project_id": "proj123"
-        }
-        
-        mock_member = Mock()
-        mock_member.to_dict.return_value = {"user_id": "member123"}
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                mock_tasks.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                return mock_tasks
-            elif name == "memberships":
-                mock_mems = Mock()
-                mock_mems.where.return_value.stream.return_value = [mock_member]
-                return mock_mems
-            elif name == "users":
-                mock_users = Mock()
-                mock_user_doc = Mock()
-                mock_user_doc.exists = True
-                mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-                mock_users.document.return_value.get.return_value = mock_user_doc
-                mock_users.stream.return_value = []
-                return mock_users
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                mock_notifs.document.return_value = Mock(id="notif123")
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        with patch('backend.api.notifications.send_email_util', return_value=True):
-            response = client.post("/api/notifications/check-deadlines")
-        
+        """Project members, creator and assignee each get one reminder"""
+        task = _task("task123", project_id="proj123", created_by={"user_id": "creator1"},
+                     assigned_to={"user_id": "member123"})
+        _deadline_db(
+            mock_db, [task],
+            users={"creator1": "creator@example.com", "member123": "member@example.com", "member456": None},
+            members=[{"project_id": "proj123", "user_id": "member123"},
+                     {"project_id": "proj123", "user_id": "member456"}],
+        )
+
+        response = client.post("/api/notifications/check-deadlines")
+
         assert response.status_code == 200
-    
+        data = response.get_json()
+        assert data["checked"] == 1
+        assert data["notifications_created"] == 3
+        notifs, outbox = _written(mock_db)
+        assert sorted(n["user_id"] for n in notifs) == ["creator1", "member123", "member456"]
+        assert all(n["task_id"] == "task123" and n["title"] == "Upcoming deadline tomorrow: Test Task" for n in notifs)
+        # member456 has no email address, so only two emails are queued
+        assert sorted(item["to"] for item in outbox) == ["creator@example.com", "member@example.com"]
+        # Every recipient's unread counter goes up with the reminder
+        assert _unread_added(mock_db) == {"creator1": 1, "member123": 1, "member456": 1}
+        # One batch for everything, one bulk read of users and one of reminder ids
+        mock_db.batch.return_value.commit.assert_called_once()
+        assert mock_db.get_all.call_count == 2
+
     def test_check_deadlines_membership_no_user_id(self, client, mock_db):
-        """Branch: membership exists but no user_id (line 196->197)"""
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Test Task",
-            "due_date": "2025-01-15T14:30",
-            "project_id": "proj123"
-        }
-        
-        mock_member = Mock()
-        mock_member.to_dict.return_value = {}  # No user_id
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                mock_tasks.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                return mock_tasks
-            elif name == "memberships":
-                mock_mems = Mock()
-                mock_mems.where.return_value.stream.return_value = [mock_member]
-                return mock_mems
-            elif name == "users":
-                return Mock(stream=Mock(return_value=[]))
-            elif name == "notifications":
-                return Mock(document=Mock(return_value=Mock(id="notif123")))
-        
-        mock_db.collection.side_effect = mock_collection
-        
+        """Membership docs without a user_id add no recipients"""
+        _deadline_db(mock_db, [_task("task123", project_id="proj123")], members=[{"project_id": "proj123"}])
+
         response = client.post("/api/notifications/check-deadlines")
-        
-        assert response.status_code == 200
-    
-    def test_check_deadlines_user_email_exception(self, client, mock_db):
-        """Branch: exception getting user email (line 205->206)"""
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Test Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "user123"}
-        }
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                mock_tasks.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                return mock_tasks
-            elif name == "users":
-                def raise_error(*args, **kwargs):
-                    raise Exception("DB error")
-                mock_users = Mock()
-                mock_users.document.return_value.get.side_effect = raise_error
-                mock_users.stream.return_value = []
-                return mock_users
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                mock_notifs.document.return_value = Mock(id="notif123")
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        with patch('backend.api.notifications.send_email_util', return_value=True):
-            response = client.post("/api/notifications/check-deadlines")
-        
+
         assert response.status_code == 200
-    
+        assert response.get_json()["notifications_created"] == 0
+        mock_db.batch.return_value.commit.assert_not_called()
+
+    def test_check_deadlines_user_without_email(self, client, mock_db):
+        """Users without an email (or a user doc) still get the in-app notification"""
+        _deadline_db(mock_db, [_task("task123", created_by={"user_id": "user123"},
+                                     assigned_to={"user_id": "ghost"})],
+                     users={"user123": None})
+
+        response = client.post("/api/notifications/check-deadlines")
+
+        assert response.get_json()["notifications_created"] == 2
+        notifs, outbox = _written(mock_db)
+        assert len(notifs) == 2
+        assert outbox == []
+
     def test_check_deadlines_existing_notification_found(self, client, mock_db):
-        """Branch: existing notification exists (line 211->212)"""
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Test Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "user123"}
-        }
-        
-        mock_existing_notif = Mock()
-        mock_existing_notif.to_dict.return_value = {"email_sent": True}
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                mock_tasks.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                return mock_tasks
-            elif name == "users":
-                mock_user_doc = Mock()
-                mock_user_doc.exists = True
-                mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-                mock_users = Mock()
-                mock_users.document.return_value.get.return_value = mock_user_doc
-                mock_users.stream.return_value = []
-                return mock_users
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = [mock_existing_notif]
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
+        """A reminder already created for the user and task is not created again"""
+        _deadline_db(mock_db, [_task("task123", created_by={"user_id": "user123"})],
+                     users={"user123": "user@example.com"},
+                     existing=[_existing("user123", "task123", email_sent=True)])
+
         response = client.post("/api/notifications/check-deadlines")
-        
-        assert response.status_code == 200
-    
+
+        assert response.get_json()["notifications_created"] == 0
+        mock_db.batch.return_value.create.assert_not_called()
+        mock_db.batch.return_value.commit.assert_not_called()
+
+    def test_check_deadlines_new_due_date_is_a_new_reminder(self, client, mock_db):
+        """A reminder for an earlier due date does not cover the rescheduled one"""
+        _deadline_db(mock_db, [_task("task123", created_by={"user_id": "user123"})],
+                     existing=[_existing("user123", "task123", due_date="2025-01-10T09:00")])
+
+        response = client.post("/api/notifications/check-deadlines")
+
+        assert response.get_json()["notifications_created"] == 1
+
+    def test_check_deadlines_concurrent_run_created_reminder(self, client, mock_db):
+        """If another run wins the create() race, the batch is redone per reminder"""
+        from backend.api.notifications import AlreadyExists
+        _deadline_db(mock_db, [_task("task123", created_by={"user_id": "user1"}, assigned_to={"user_id": "user2"})],
+                     users={"user1": "one@example.com", "user2": "two@example.com"})
+        commits = iter([AlreadyExists("exists"), AlreadyExists("exists"), None])
+        def commit():
+            error = next(commits)
+            if error:
+                raise error
+        mock_db.batch.return_value.commit.side_effect = commit
+
+        data = client.post("/api/notifications/check-deadlines").get_json()
+
+        assert data["notifications_created"] == 1
+        write = data["phases"]["write"]
+        assert write["emails_queued"] == 1
+        assert write["batches"] == 3
+
+    def test_reminder_id_is_stable_per_key(self):
+        """The same (user, task, kind, window) always maps to the same document id"""
+        from backend.api.notifications import reminder_id
+        rid = reminder_id("user1", "task1", "deadline", "2025-01-15T14:30")
+
+        assert rid == reminder_id("user1", "task1", "deadline", "2025-01-15T14:30")
+        assert rid.startswith("deadline-")
+        assert len({rid,
+                    reminder_id("user2", "task1", "deadline", "2025-01-15T14:30"),
+                    reminder_id("user1", "task2", "deadline", "2025-01-15T14:30"),
+                    reminder_id("user1", "task1", "deadline", "2025-01-16T14:30")}) == 4
+
     def test_check_deadlines_resend_existing_true_email_not_sent(self, client, mock_db):
-        """Branch: resend_existing=true, email_sent=false, user has email (line 216->217)"""
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Test Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "user123"}
-        }
-        
-        mock_existing_notif = Mock()
-        mock_existing_notif.to_dict.return_value = {"email_sent": False}
-        mock_existing_notif.reference = Mock()
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                mock_tasks.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                return mock_tasks
-            elif name == "users":
-                mock_user_doc = Mock()
-                mock_user_doc.exists = True
-                mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-                mock_users = Mock()
-                mock_users.document.return_value.get.return_value = mock_user_doc
-                mock_users.stream.return_value = []
-                return mock_users
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = [mock_existing_notif]
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        with patch('backend.api.notifications.send_email_util', return_value=True):
+        """resend_existing queues the email of an existing reminder again"""
+        existing = _existing("user123", "task123", email_sent=False)
+        _deadline_db(mock_db, [_task("task123", created_by={"user_id": "user123"})],
+                     users={"user123": "user@example.com"}, existing=[existing])
+
+        with patch('backend.api.notifications.send_email_util') as mock_send:
             response = client.post(
                 "/api/notifications/check-deadlines",
                 query_string={"resend_existing": "true"}
             )
-        
-        assert response.status_code == 200
-        mock_existing_notif.reference.update.assert_called_once()
-    
-    def test_check_deadlines_resend_email_failure(self, client, mock_db):
-        """Branch: resend email returns False (line 219->224)"""
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Test Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "user123"}
-        }
-        
-        mock_existing_notif = Mock()
-        mock_existing_notif.to_dict.return_value = {"email_sent": False}
-        mock_existing_notif.reference = Mock()
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                mock_tasks.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                return mock_tasks
-            elif name == "users":
-                mock_user_doc = Mock()
-                mock_user_doc.exists = True
-                mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-                mock_users = Mock()
-                mock_users.document.return_value.get.return_value = mock_user_doc
-                mock_users.stream.return_value = []
-                return mock_users
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = [mock_existing_notif]
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        with patch('backend.api.notifications.send_email_util', return_value=False):
-            response = client.post(
-                "/api/notifications/check-deadlines",
-                query_string={"resend_existing": "1"}
-            )
-        
-        assert response.status_code == 200
-        mock_existing_notif.reference.update.assert_not_called()
-    
-    def test_check_deadlines_resend_exception(self, client, mock_db):
-        """Branch: exception during resend (line 226->228)"""
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Test Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "user123"}
-        }
-        
-        mock_existing_notif = Mock()
-        mock_existing_notif.id = "notif123"
-        mock_existing_notif.to_dict.return_value = {"email_sent": False}
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                mock_tasks.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                return mock_tasks
-            elif name == "users":
-                mock_user_doc = Mock()
-                mock_user_doc.exists = True
-                mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-                mock_users = Mock()
-                mock_users.document.return_value.get.return_value = mock_user_doc
-                mock_users.stream.return_value = []
-                return mock_users
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = [mock_existing_notif]
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        with patch('backend.api.notifications.send_email_util', side_effect=Exception("Email error")):
-            response = client.post(
-                "/api/notifications/check-deadlines",
-                query_string={"resend_existing": "yes"}
-            )
-        
-        assert response.status_code == 200
-    
-    def test_check_deadlines_per_user_notification_exception(self, client, mock_db):
-        """Branch: exception in per-user notification pass (line 243->248)"""
-        
-        def bad_generator():
-            """Generator that raises exception when iterated"""
-            raise Exception("User stream error")
-            yield  # Never reached
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = []
-                mock_tasks.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                return mock_tasks
-            elif name == "users":
-                # Return a stream that will raise exception when iterated
-                return Mock(stream=Mock(return_value=bad_generator()))
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        response = client.post("/api/notifications/check-deadlines")
-        
+
         assert response.status_code == 200
+        data = response.get_json()
+        assert data["notifications_created"] == 0
+        assert data["emails_resent"] == 1
+        # The email is queued again rather than sent inline
+        mock_send.assert_not_called()
+        notifs, outbox = _written(mock_db)
+        assert notifs == []
+        assert outbox[0]["notification_id"] == existing.id
+        assert outbox[0]["to"] == "user@example.com" and outbox[0]["status"] == "pending"
 
+    def test_check_deadlines_resend_skips_sent_emails(self, client, mock_db):
+        """resend_existing leaves reminders whose email was already sent alone"""
+        _deadline_db(mock_db, [_task("task123", created_by={"user_id": "user123"})],
+                     users={"user123": "user@example.com"},
+                     existing=[_existing("user123", "task123", email_sent=True)])
 
-class TestNotifyUserDueTasksBranches:
-    """Test branches in _notify_user_due_tasks function"""
-    
-    def test_notify_user_sample_task_exists(self, mock_db):
-        """Branch: sample task exists with due_date (line 263->264)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        mock_task = Mock()
-        mock_task.to_dict.return_value = {"due_date": "2025-01-15T14:30"}
-        
-        mock_db.collection.return_value.limit.return_value.stream.return_value = iter([mock_task])
-        mock_db.collection.return_value.where.return_value.where.return_value.stream.return_value = []
-        
-        result = _notify_user_due_tasks(
-            mock_db,
-            "user123",
-            "2025-01-15T00:00:00+00:00",
-            "2025-01-16T00:00:00+00:00"
-        )
-        
-        assert result == 0
-    
-    def test_notify_user_sample_task_minute_format_parse_exception(self, mock_db):
-        """Branch: minute format but parse fails (line 270->272)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        mock_task = Mock()
-        mock_task.to_dict.return_value = {"due_date": "2025-01-15T14:30"}
-        
-        mock_db.collection.return_value.limit.return_value.stream.return_value = iter([mock_task])
-        mock_db.collection.return_value.where.return_value.where.return_value.stream.return_value = []
-        
-        result = _notify_user_due_tasks(
-            mock_db,
-            "user123",
-            "invalid-iso",
-            "also-invalid"
-        )
-        
-        assert result == 0
-    
-    def test_notify_user_sample_exception(self, mock_db):
-        """Branch: exception in sample lookup (line 277->278)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        call_count = [0]
-        
-        def raise_on_first_limit(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                raise Exception("DB error")
-            # For subsequent calls, return empty
-            return Mock(stream=Mock(return_value=[]))
-        
-        mock_db.collection.return_value.limit.side_effect = raise_on_first_limit
-        mock_db.collection.return_value.where.return_value.where.return_value.stream.return_value = []
-        
-        result = _notify_user_due_tasks(
-            mock_db,
-            "user123",
-            "2025-01-15T00:00:00+00:00",
-            "2025-01-16T00:00:00+00:00"
-        )
-        
-        assert result == 0
-    
-    def test_notify_user_archived_task(self, mock_db):
-        """Branch: task is archived (line 288->289)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "archived": True,
-            "title": "Archived Task",
-            "due_date": "2025-01-15T14:30"
-        }
-        
-        mock_db.collection.return_value.limit.return_value.stream.return_value = iter([Mock()])
-        mock_db.collection.return_value.where.return_value.where.return_value.stream.return_value = [mock_task]
-        
-        result = _notify_user_due_tasks(
-            mock_db,
-            "user123",
-            "2025-01-15T00:00:00+00:00",
-            "2025-01-16T00:00:00+00:00"
-        )
-        
-        assert result == 0
-    
-    def test_notify_user_creator_matches(self, mock_db):
-        """Branch: creator matches user_id (line 293->295)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "My Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "user123"}
-        }
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                return mock_tasks
-            elif name == "users":
-                mock_user_doc = Mock()
-                mock_user_doc.exists = True
-                mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-                return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_user_doc))))
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = iter([])
-                mock_notifs.document.return_value = Mock(id="notif123")
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        with patch('backend.api.notifications.send_email_util', return_value=True):
-            result = _notify_user_due_tasks(
-                mock_db,
-                "user123",
-                "2025-01-15T00:00:00+00:00",
-                "2025-01-16T00:00:00+00:00"
-            )
-        
-        assert result == 1
-    
-    def test_notify_user_assignee_matches(self, mock_db):
-        """Branch: assignee matches user_id (line 297->298)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Assigned Task",
-            "due_date": "2025-01-15T14:30",
-            "assigned_to": {"user_id": "user123"}
-        }
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                return mock_tasks
-            elif name == "users":
-                mock_user_doc = Mock()
-                mock_user_doc.exists = True
-                mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-                return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_user_doc))))
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = iter([])
-                mock_notifs.document.return_value = Mock(id="notif123")
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        with patch('backend.api.notifications.send_email_util', return_value=True):
-            result = _notify_user_due_tasks(
-                mock_db,
-                "user123",
-                "2025-01-15T00:00:00+00:00",
-                "2025-01-16T00:00:00+00:00"
-            )
-        
-        assert result == 1
-    
-    def test_notify_user_not_involved_no_project(self, mock_db):
-        """Branch: not involved, no project_id (line 300->skip 301-304)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Other Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "other_user"},
-            "assigned_to": {"user_id": "another_user"}
-        }
-        
-        mock_db.collection.return_value.limit.return_value.stream.return_value = iter([Mock()])
-        mock_db.collection.return_value.where.return_value.where.return_value.stream.return_value = [mock_task]
-        
-        result = _notify_user_due_tasks(
-            mock_db,
-            "user123",
-            "2025-01-15T00:00:00+00:00",
-            "2025-01-16T00:00:00+00:00"
-        )
-        
-        assert result == 0
-    
-    def test_notify_user_project_member_exists(self, mock_db):
-        """Branch: project_id exists and user is member (line 301->302->304)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Project Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "other_user"},
-            "project_id": "proj123"
-        }
-        
-        mock_membership_doc = Mock()
-        mock_membership_doc.exists = True
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                return mock_tasks
-            elif name == "memberships":
-                mock_mems = Mock()
-                mock_mems.document.return_value.get.return_value = mock_membership_doc
-                return mock_mems
-            elif name == "users":
-                mock_user_doc = Mock()
-                mock_user_doc.exists = True
-                mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-                return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_user_doc))))
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                mock_notifs.document.return_value = Mock(id="notif123")
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        with patch('backend.api.notifications.send_email_util', return_value=True):
-            result = _notify_user_due_tasks(
-                mock_db,
-                "user123",
-                "2025-01-15T00:00:00+00:00",
-                "2025-01-16T00:00:00+00:00"
-            )
-        
-        assert result == 1
-    
-    def test_notify_user_project_member_not_exists(self, mock_db):
-        """Branch: project_id exists but user is not member (line 303->False)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Project Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "other_user"},
-            "project_id": "proj123"
-        }
-        
-        mock_membership_doc = Mock()
-        mock_membership_doc.exists = False
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                return mock_tasks
-            elif name == "memberships":
-                mock_mems = Mock()
-                mock_mems.document.return_value.get.return_value = mock_membership_doc
-                return mock_mems
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        result = _notify_user_due_tasks(
-            mock_db,
-            "user123",
-            "2025-01-15T00:00:00+00:00",
-            "2025-01-16T00:00:00+00:00"
-        )
-        
-        assert result == 0
-    
-    def test_notify_user_user_email_exception(self, mock_db):
-        """Branch: exception getting user email (line 316->317)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "user123"}
-        }
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                return mock_tasks
-            elif name == "users":
-                def raise_error(*args, **kwargs):
-                    raise Exception("DB error")
-                return Mock(document=Mock(return_value=Mock(get=Mock(side_effect=raise_error))))
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                mock_notifs.document.return_value = Mock(id="notif123")
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        with patch('backend.api.notifications.send_email_util', return_value=True):
-            result = _notify_user_due_tasks(
-                mock_db,
-                "user123",
-                "2025-01-15T00:00:00+00:00",
-                "2025-01-16T00:00:00+00:00"
-            )
-        
-        assert result == 1
-    
-    def test_notify_user_existing_notification_exists(self, mock_db):
-        """Branch: existing notification found (line 324->325)"""
-        from backend.api.notifications import _notify_user_due_tasks
-        
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Task",
-            "due_date": "2025-01-15T14:30",
-            "created_by": {"user_id": "user123"}
-        }
-        
-        mock_existing = Mock()
-        
-        def mock_collection(name):
-            if name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.limit.return_value.stream.return_value = iter([Mock()])
-                mock_tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
-                return mock_tasks
-            elif name == "users":
-                mock_user_doc = Mock()
-                mock_user_doc.exists = True
-                mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-                return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_user_doc))))
-            elif name == "notifications":
-                mock_notifs = Mock()
-                mock_notifs.where.return_value.where.return_value.where.return_value.limit.return_value.stream.return_value = iter([mock_existing])
-                return mock_notifs
-        
-        mock_db.collection.side_effect = mock_collection
-        
-        result = _notify_user_due_tasks(
-            mock_db,
-            "user123",
-            "2025-01-15T00:00:00+00:00",
-            "2025-01-16T00:00:00+00:00"
+        response = client.post(
+            "/api/notifications/check-deadlines",
+            query_string={"resend_existing": "1"}
         )
-        
-        assert result == 0
+
+        assert response.get_json()["emails_resent"] == 0
+        mock_db.batch.return_value.set.assert_not_called()
+
+    def test_check_deadlines_writes_in_batches(self, client, mock_db, monkeypatch):
+        """A notification, its unread count and its email never straddle two batches"""
+        from backend.api import batching
+        monkeypatch.setattr(batching, "BATCH_LIMIT", 7)
+        _deadline_db(mock_db, [_task("task123", project_id="proj123")],
+                     users={f"u{i}": f"u{i}@example.com" for i in range(3)},
+                     members=[{"project_id": "proj123", "user_id": f"u{i}"} for i in range(3)])
+
+        response = client.post("/api/notifications/check-deadlines")
+
+        data = response.get_json()
+        assert data["notifications_created"] == 3
+        assert data["phases"]["write"]["batches"] == 2
+        assert mock_db.batch.return_value.commit.call_count == 2
+
+    def test_check_deadlines_reports_phases(self, client, mock_db):
+        """The response carries per-phase counts and timings"""
+        _deadline_db(mock_db, [_task("task1", created_by={"user_id": "user123"}),
+                               _task("task2", created_by={"user_id": "user123"})],
+                     users={"user123": "user@example.com"})
+
+        data = client.post("/api/notifications/check-deadlines").get_json()
+
+        phases = data["phases"]
+        assert phases["query"]["tasks"] == 2
+        assert phases["recipients"] == {"projects": 0, "users": 1, "pairs": 2, "ms": phases["recipients"]["ms"]}
+        assert phases["dedupe"]["existing"] == 0
+        assert phases["write"]["created"] == 2 and phases["write"]["emails_queued"] == 2
+        assert all("ms" in phase for phase in phases.values())
+        assert data["elapsed_ms"] >= 0
 
 
 class TestDueTodayBranches:
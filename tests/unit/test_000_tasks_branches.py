@@ -533,7 +533,7 @@ class TestSubtaskEndpoints:
         mock_subtask_ref = Mock()
         mock_subtask_ref.get.return_value = mock_subtask_doc
         # Raise exception during delete
-        mock_subtask_ref.delete.side_effect = Exception("Delete error")
+        mock_db.transaction.return_value.delete.side_effect = Exception("Delete error")
         
         def collection_side_effect(name):
             if name == "tasks":
@@ -555,3 +555,45 @@ class TestSubtaskEndpoints:
         
         assert response.status_code == 500
         assert b"Failed to delete subtask" in response.data
+    
+    def test_complete_subtask_exception_returns_500(self, client, mock_db, monkeypatch):
+        """An exception in the completion transaction returns a JSON 500"""
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        
+        mock_task_doc = Mock()
+        mock_task_doc.exists = True
+        mock_task_doc.to_dict.return_value = {
+            "created_by": {"user_id": "user1"}
+        }
+        
+        mock_subtask_doc = Mock()
+        mock_subtask_doc.exists = True
+        mock_subtask_doc.to_dict.return_value = {"completed": False}
+        
+        mock_subtask_ref = Mock()
+        mock_subtask_ref.get.return_value = mock_subtask_doc
+        # Raise exception during the update
+        mock_db.transaction.return_value.update.side_effect = Exception("Update error")
+        
+        def collection_side_effect(name):
+            if name == "tasks":
+                mock_tasks = Mock()
+                mock_tasks.document.return_value.get.return_value = mock_task_doc
+                return mock_tasks
+            elif name == "subtasks":
+                mock_subtasks = Mock()
+                mock_subtasks.document.return_value = mock_subtask_ref
+                return mock_subtasks
+            return Mock()
+        
+        mock_db.collection.side_effect = collection_side_effect
+        
+        with patch("backend.api.tasks._can_view_task_doc", return_value=True):
+            response = client.patch(
+                "/api/tasks/task1/subtasks/sub1/complete",
+                headers={"X-User-Id": "user1"},
+                json={"completed": True}
+            )
+        
+        assert response.status_code == 500
+        assert response.get_json() == {"error": "Failed to update subtask"}
@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
 from backend.api import tasks as tasks_module
+from conftest import static_query
 
 
 @pytest.fixture
@@ -53,10 +54,7 @@ class TestListTasksComplexFiltering:
                 mock_memberships.where.return_value.stream.return_value = []
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value.limit.return_value.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -103,10 +101,7 @@ class TestListTasksComplexFiltering:
                 mock_memberships.where.return_value.stream.return_value = []
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value.where.return_value.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value.limit.return_value.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -146,11 +141,7 @@ class TestListTasksComplexFiltering:
                 mock_memberships.where.return_value.stream.return_value = []
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_query = Mock()
-                mock_query.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value = mock_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -182,11 +173,7 @@ class TestListTasksComplexFiltering:
                 mock_memberships.where.return_value.stream.return_value = []
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_query = Mock()
-                mock_query.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value = mock_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
 from backend.api import tasks as tasks_module
+from conftest import static_query
 
 
 @pytest.fixture
@@ -200,11 +201,7 @@ class TestListTasksComplexBranches:
                 mock_memberships.where.return_value.stream.return_value = [mock_membership1, mock_membership2]
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_query = Mock()
-                mock_query.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value = mock_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -235,11 +232,7 @@ class TestListTasksComplexBranches:
                 mock_memberships.where.return_value.stream.return_value = []
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_query = Mock()
-                mock_query.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value = mock_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -272,11 +265,7 @@ class TestListTasksComplexBranches:
                 mock_memberships.where.return_value.stream.return_value = []
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_query = Mock()
-                mock_query.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value = mock_query
-                return mock_tasks
+                return static_query()
             elif name == "projects":
                 # Raise exception when getting project doc
                 raise Exception("Projects collection error")
@@ -580,11 +569,7 @@ class TestMiscellaneousBranches:
                 mock_memberships.where.return_value.stream.return_value = []
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_query = Mock()
-                mock_query.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value = mock_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
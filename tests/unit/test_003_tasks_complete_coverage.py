@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
 from backend.api import tasks as tasks_module
+from conftest import static_query
 
 
 @pytest.fixture
@@ -54,11 +55,7 @@ class TestListTasksProjectOwnerBranches:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_query = Mock()
-                mock_query.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value = mock_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -122,11 +119,7 @@ class TestListTasksProjectOwnerBranches:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_query = Mock()
-                mock_query.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value = mock_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
 from backend.api import tasks as tasks_module
+from conftest import static_query
 
 
 @pytest.fixture
@@ -69,7 +70,9 @@ class TestIncrementOperations:
         
         assert response.status_code == 200
         # Verify decrement was called twice (subtask_count and subtask_completed_count)
-        assert mock_task_ref.update.call_count >= 2
+        mock_db.transaction.return_value.update.assert_called_once_with(
+            mock_task_ref, {"subtask_count": -1, "subtask_completed_count": -1}
+        )
     
     def test_complete_subtask_increment_completed_count(self, client, mock_db, monkeypatch):
         """Lines 947, 952, 956, 984->989: Increment completed count when marking as complete"""
@@ -115,7 +118,7 @@ class TestIncrementOperations:
         
         assert response.status_code == 200
         # Verify increment was called
-        assert mock_task_ref.update.called
+        mock_db.transaction.return_value.update.assert_any_call(mock_task_ref, {"subtask_completed_count": 1})
     
     def test_uncomplete_subtask_decrement_completed_count(self, client, mock_db, monkeypatch):
         """Lines 984->989: Decrement completed count when unmarking as complete"""
@@ -161,7 +164,7 @@ class TestIncrementOperations:
         
         assert response.status_code == 200
         # Verify decrement was called
-        assert mock_task_ref.update.called
+        mock_db.transaction.return_value.update.assert_any_call(mock_task_ref, {"subtask_completed_count": -1})
 
 
 class TestUpdateSubtaskAllFields:
@@ -514,12 +517,7 @@ class TestListTasksComplexFiltering:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                call_count[0] += 1
-                mock_query = Mock()
-                mock_query.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value = mock_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -584,11 +582,7 @@ class TestListTasksComplexFiltering:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_query = Mock()
-                mock_query.limit.return_value.stream.return_value = []
-                mock_tasks.where.return_value = mock_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -5,6 +5,7 @@ Targets each specific remaining line with surgical precision
 import pytest
 import sys
 from unittest.mock import Mock, patch
+from conftest import static_query
 from datetime import datetime
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
@@ -161,11 +162,7 @@ def test_lines_469_to_491_viewer_is_owner(client, mock_db, monkeypatch):
             return mock_projects
         elif name == "tasks":
             call_count[0] += 1
-            mock_tasks = Mock()
-            mock_query = Mock()
-            mock_query.limit.return_value.stream.return_value = []
-            mock_tasks.where.return_value = mock_query
-            return mock_tasks
+            return static_query()
         return Mock()
     
     mock_db.collection.side_effect = collection_side_effect
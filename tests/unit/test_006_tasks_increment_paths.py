@@ -72,10 +72,9 @@ class TestIncrementSuccessfulPaths:
         
         assert response.status_code == 201
         # Verify Increment was called (line 871 executed)
-        assert mock_task_ref.update.called
-        # Check that it was called with Increment
-        call_args = mock_task_ref.update.call_args_list
-        assert len(call_args) > 0
+        batch = mock_db.batch.return_value
+        batch.update.assert_called_once_with(mock_task_ref, {"subtask_count": 1})
+        batch.commit.assert_called_once()
     
     def test_delete_subtask_successful_decrements_lines_936_937(self, client, mock_db, monkeypatch):
         """Lines 936-937: Successful decrements for subtask_count and subtask_completed_count"""
@@ -123,7 +122,9 @@ class TestIncrementSuccessfulPaths:
         
         assert response.status_code == 200
         # Verify decrements were called (lines 936-937)
-        assert mock_task_ref.update.call_count >= 2
+        mock_db.transaction.return_value.update.assert_called_once_with(
+            mock_task_ref, {"subtask_count": -1, "subtask_completed_count": -1}
+        )
     
     def test_complete_subtask_increment_lines_984_986(self, client, mock_db, monkeypatch):
         """Lines 984, 986: Increment completed count when marking subtask as complete"""
@@ -181,7 +182,7 @@ class TestIncrementSuccessfulPaths:
         
         assert response.status_code == 200
         # Verify increment was called (line 984)
-        assert mock_task_ref.update.called
+        mock_db.transaction.return_value.update.assert_any_call(mock_task_ref, {"subtask_completed_count": 1})
     
     def test_uncomplete_subtask_decrement_lines_986_987(self, client, mock_db, monkeypatch):
         """Lines 986-987: Decrement completed count when unmarking subtask"""
@@ -238,7 +239,7 @@ class TestIncrementSuccessfulPaths:
         
         assert response.status_code == 200
         # Verify decrement was called (line 986-987)
-        assert mock_task_ref.update.called
+        mock_db.transaction.return_value.update.assert_any_call(mock_task_ref, {"subtask_completed_count": -1})
 
 
 class TestUpdateSubtaskAllBranches:
@@ -436,7 +437,7 @@ class TestCompleteSubtaskFieldUpdates:
         
         assert response.status_code == 200
         # Verify completed_at and completed_by were set (lines 947, 952)
-        update_call = mock_subtask_ref.update.call_args[0][0]
+        update_call = mock_db.transaction.return_value.update.call_args_list[0][0][1]
         assert "completed" in update_call
         assert update_call["completed"] is True
         assert "completed_at" in update_call
@@ -497,7 +498,7 @@ class TestCompleteSubtaskFieldUpdates:
         
         assert response.status_code == 200
         # Verify completed_at and completed_by were cleared (line 956)
-        update_call = mock_subtask_ref.update.call_args[0][0]
+        update_call = mock_db.transaction.return_value.update.call_args_list[0][0][1]
         assert "completed" in update_call
         assert update_call["completed"] is False
         assert "completed_at" in update_call
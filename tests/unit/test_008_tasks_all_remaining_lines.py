@@ -266,10 +266,7 @@ class TestCompleteSubtaskDecrementBranch:
         
         assert response.status_code == 200
         # Verify decrement was called (line 985: Increment(-1))
-        assert mock_task_ref.update.called
-        update_calls = mock_task_ref.update.call_args_list
-        # Should have called update with Increment(-1)
-        assert len(update_calls) > 0
+        mock_db.transaction.return_value.update.assert_any_call(mock_task_ref, {"subtask_completed_count": -1})
     
     def test_complete_subtask_increment_exception_lines_986_987(self, client, mock_db, monkeypatch):
         """Lines 986-987: Exception handler for Increment operations"""
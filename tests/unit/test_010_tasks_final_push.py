@@ -6,6 +6,7 @@ Plus complex filtering: 469->491, 477->491, 479->491, 483-485
 import pytest
 import sys
 from unittest.mock import Mock, patch, MagicMock
+from conftest import static_query
 from datetime import datetime, timezone
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
@@ -323,6 +324,7 @@ class TestNotificationExceptions:
             elif name == "memberships":
                 mock_memberships = Mock()
                 mock_memberships.document.return_value.get.return_value = mock_membership_doc
+                mock_memberships.where.return_value.stream.return_value = []
                 return mock_memberships
             elif name == "tasks":
                 mock_tasks = Mock()
@@ -437,10 +439,6 @@ class TestListTasksComplexFiltering:
             "name": "Project 1"
         }
         
-        # Mock no tasks found
-        mock_tasks_query = Mock()
-        mock_tasks_query.stream.return_value = []
-        
         def collection_side_effect(name):
             if name == "users":
                 mock_users = Mock()
@@ -451,9 +449,7 @@ class TestListTasksComplexFiltering:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -6,6 +6,7 @@ Lines: 85, 171-175, 182-189, 239, 369-370, 469-491, 554, 622-623, 750-762
 import pytest
 import sys
 from unittest.mock import Mock, patch, MagicMock
+from conftest import static_query
 from datetime import datetime, timezone
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
@@ -347,6 +348,7 @@ class TestLines369To370NotificationException:
             elif name == "memberships":
                 mock_memberships = Mock()
                 mock_memberships.document.return_value.get.return_value = mock_membership_doc
+                mock_memberships.where.return_value.stream.return_value = []
                 return mock_memberships
             elif name == "tasks":
                 mock_tasks = Mock()
@@ -545,13 +547,6 @@ class TestLines469To491ComplexProjectFiltering:
             "name": "Project 1"
         }
         
-        # Mock tasks query
-        mock_tasks_query = Mock()
-        mock_tasks_query.limit.return_value = Mock(stream=Mock(return_value=[]))
-        
-        mock_tasks_where = Mock()
-        mock_tasks_where.where.return_value = mock_tasks_query
-        
         def collection_side_effect(name):
             if name == "users":
                 mock_users = Mock()
@@ -562,7 +557,7 @@ class TestLines469To491ComplexProjectFiltering:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                return mock_tasks_where
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -594,13 +589,6 @@ class TestLines469To491ComplexProjectFiltering:
             "name": "Project 1"
         }
         
-        # Mock tasks query
-        mock_tasks_query = Mock()
-        mock_tasks_query.limit.return_value = Mock(stream=Mock(return_value=[]))
-        
-        mock_tasks_where = Mock()
-        mock_tasks_where.where.return_value = mock_tasks_query
-        
         def collection_side_effect(name):
             if name == "users":
                 mock_users = Mock()
@@ -611,7 +599,7 @@ class TestLines469To491ComplexProjectFiltering:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                return mock_tasks_where
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -638,11 +626,6 @@ class TestLines469To491ComplexProjectFiltering:
         mock_project_doc.to_dict.side_effect = Exception("Database error")  # Line 483
         
         # Mock tasks query for fallback
-        mock_tasks_query = Mock()
-        mock_tasks_query.limit.return_value = Mock(stream=Mock(return_value=[]))
-        
-        mock_tasks_where = Mock()
-        mock_tasks_where.where.return_value = mock_tasks_query
         
         def collection_side_effect(name):
             if name == "users":
@@ -654,7 +637,7 @@ class TestLines469To491ComplexProjectFiltering:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                return mock_tasks_where
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -5,6 +5,7 @@ Targeting: 85, 171-175, 182-189, 239, 369-370, 469-491, 622-623, 750-762
 import pytest
 import sys
 from unittest.mock import Mock, patch
+from conftest import static_query
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
@@ -106,11 +107,6 @@ class TestComplexProjectFilteringRealScenarios:
             "name": "Project"
         }
         
-        mock_tasks_query = Mock()
-        mock_tasks_query.limit.return_value = Mock(stream=Mock(return_value=[]))
-        mock_tasks_where = Mock()
-        mock_tasks_where.where.return_value = mock_tasks_query
-        
         def collection_side_effect(name):
             if name == "users":
                 mock_users = Mock()
@@ -121,7 +117,7 @@ class TestComplexProjectFilteringRealScenarios:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                return mock_tasks_where
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -152,11 +148,6 @@ class TestComplexProjectFilteringRealScenarios:
             "name": "Project"
         }
         
-        mock_tasks_query = Mock()
-        mock_tasks_query.limit.return_value = Mock(stream=Mock(return_value=[]))
-        mock_tasks_where = Mock()
-        mock_tasks_where.where.return_value = mock_tasks_query
-        
         def collection_side_effect(name):
             if name == "users":
                 mock_users = Mock()
@@ -167,7 +158,7 @@ class TestComplexProjectFilteringRealScenarios:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                return mock_tasks_where
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
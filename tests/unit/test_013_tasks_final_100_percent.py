@@ -5,13 +5,16 @@ Covering: 85, 171->175, 188->185, 469->491, 477->491, 479->491, 483-485, 622-623
 import pytest
 import sys
 from unittest.mock import Mock, patch
+from conftest import fake_get_all, static_query
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
 
 @pytest.fixture
 def mock_db():
-    return Mock()
+    db = Mock()
+    db.get_all.side_effect = fake_get_all
+    return db
 
 
 class TestLine85IsManagerException:
@@ -224,15 +227,13 @@ class TestLines469to491ProjectOwnerFiltering:
         
         # Mock task in that project
         mock_task = Mock()
+        mock_task.id = "task1"
         mock_task.to_dict.return_value = {
             "id": "task1",
             "title": "Task",
             "project_id": "proj1"
         }
         
-        mock_tasks_query = Mock()
-        mock_tasks_query.limit.return_value.stream.return_value = [mock_task]
-        
         def collection_side_effect(name):
             if name == "users":
                 mock_users = Mock()
@@ -243,9 +244,7 @@ class TestLines469to491ProjectOwnerFiltering:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks_query
-                return mock_tasks
+                return static_query([mock_task])
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -283,15 +282,13 @@ class TestLines469to491ProjectOwnerFiltering:
         
         # Mock task
         mock_task = Mock()
+        mock_task.id = "task1"
         mock_task.to_dict.return_value = {
             "id": "task1",
             "title": "Task",
             "project_id": "proj1"
         }
         
-        mock_tasks_query = Mock()
-        mock_tasks_query.limit.return_value.stream.return_value = [mock_task]
-        
         # Track which user document is requested
         def user_doc_side_effect(user_id):
             mock_user = Mock()
@@ -311,9 +308,7 @@ class TestLines469to491ProjectOwnerFiltering:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks_query
-                return mock_tasks
+                return static_query([mock_task])
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -350,11 +345,7 @@ class TestLines469to491ProjectOwnerFiltering:
                 return mock_projects
             elif name == "tasks":
                 # Return empty result
-                mock_tasks_query = Mock()
-                mock_tasks_query.limit.return_value.stream.return_value = []
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks_query
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
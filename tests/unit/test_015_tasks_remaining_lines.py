@@ -384,7 +384,9 @@ class TestDeleteSubtaskErrors:
         
         assert response.status_code == 200
         # Should have called update with Increment(-1) for completed subtask
-        mock_task_ref.update.assert_called()
+        mock_db.transaction.return_value.update.assert_called_once_with(
+            mock_task_ref, {"subtask_count": -1, "subtask_completed_count": -1}
+        )
     
     def test_delete_subtask_not_found_line_961(self, client, mock_db, monkeypatch):
         """Line 961: Subtask doesn't exist when deleting"""
@@ -7,13 +7,16 @@ import pytest
 import sys
 from datetime import datetime, timezone
 from unittest.mock import Mock, patch
+from conftest import fake_get_all, static_query
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
 
 @pytest.fixture
 def mock_db():
-    return Mock()
+    db = Mock()
+    db.get_all.side_effect = fake_get_all
+    return db
 
 
 class TestIsManagedByNonExistentUser:
@@ -53,10 +56,7 @@ class TestIsManagedByNonExistentUser:
                 mock_users.document.side_effect = document_side_effect
                 return mock_users
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -234,11 +234,7 @@ class TestProjectOwnerVisibility:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.limit.return_value = mock_tasks
-                mock_tasks.stream.return_value = [mock_task]
-                return mock_tasks
+                return static_query([mock_task])
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -297,11 +293,7 @@ class TestProjectOwnerVisibility:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.limit.return_value = mock_tasks
-                mock_tasks.stream.return_value = [mock_task]
-                return mock_tasks
+                return static_query([mock_task])
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -421,6 +413,10 @@ class TestReassignNotificationException:
                 mock_task_ref.update.return_value = None
                 mock_tasks.document.return_value = mock_task_ref
                 return mock_tasks
+            elif name == "memberships":
+                mock_memberships = Mock()
+                mock_memberships.where.return_value.stream.return_value = []
+                return mock_memberships
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -6,13 +6,16 @@ Targeting: 85, 171->175, 188->185, 469->491, 477->491, 479->491, 483-485, 750->7
 import pytest
 import sys
 from unittest.mock import Mock, patch
+from conftest import fake_get_all, static_query
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
 
 @pytest.fixture
 def mock_db():
-    return Mock()
+    db = Mock()
+    db.get_all.side_effect = fake_get_all
+    return db
 
 
 class TestLine85IsManagedBy:
@@ -62,10 +65,7 @@ class TestLine85IsManagedBy:
                 mock_users.document.side_effect = document_side_effect
                 return mock_users
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = [mock_task]
-                return mock_tasks
+                return static_query([mock_task])
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -202,10 +202,7 @@ class TestMissingBranches:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -253,10 +250,7 @@ class TestMissingBranches:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -309,10 +303,7 @@ class TestMissingBranches:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -350,10 +341,7 @@ class TestMissingBranches:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -418,6 +406,10 @@ class TestMissingBranches:
                 mock_task_ref.update.return_value = None
                 mock_tasks.document.return_value = mock_task_ref
                 return mock_tasks
+            elif name == "memberships":
+                mock_memberships = Mock()
+                mock_memberships.where.return_value.stream.return_value = []
+                return mock_memberships
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
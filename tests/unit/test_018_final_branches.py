@@ -6,6 +6,7 @@ Lines: 85, 188->185, 469->491, 477->491, 479->491, 483-485, 750->762
 import pytest
 import sys
 from unittest.mock import Mock, patch
+from conftest import static_query
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
@@ -113,10 +114,7 @@ class TestFinalMissingBranches:
                 mock_projects.document.return_value.get.return_value = mock_project_doc
                 return mock_projects
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -6,13 +6,16 @@ Lines: 85, 188->185, 469->491, 477->491, 479->491, 483-485, 750->762
 import pytest
 import sys
 from unittest.mock import Mock, patch
+from conftest import fake_get_all, static_query
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
 
 @pytest.fixture
 def mock_db():
-    return Mock()
+    db = Mock()
+    db.get_all.side_effect = fake_get_all
+    return db
 
 
 class TestLine85NonExistentUser:
@@ -130,10 +133,7 @@ class TestProjectOwnerBranches:
                 mock_memberships.document.return_value.get.return_value = mock_no_membership
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -205,10 +205,7 @@ class TestProjectOwnerBranches:
                 mock_memberships.document.return_value.get.return_value = mock_no_membership
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -269,10 +266,7 @@ class TestProjectOwnerBranches:
                 mock_memberships.document.return_value.get.return_value = mock_no_membership
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -398,6 +392,10 @@ class TestNotificationBranches:
                 mock_task_ref.update.return_value = None
                 mock_tasks.document.return_value = mock_task_ref
                 return mock_tasks
+            elif name == "memberships":
+                mock_memberships = Mock()
+                mock_memberships.where.return_value.stream.return_value = []
+                return mock_memberships
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -451,10 +449,7 @@ class TestExceptionInOwnerCheck:
                 mock_memberships.document.return_value.get.return_value = mock_no_membership
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
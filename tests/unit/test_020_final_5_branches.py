@@ -6,13 +6,16 @@ Lines: 85, 188->185, 239, 477->491, 750->762
 import pytest
 import sys
 from unittest.mock import Mock, patch
+from conftest import fake_get_all, static_query
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
 
 @pytest.fixture
 def mock_db():
-    return Mock()
+    db = Mock()
+    db.get_all.side_effect = fake_get_all
+    return db
 
 
 class TestFinal5Branches:
@@ -225,10 +228,7 @@ class TestFinal5Branches:
                 mock_memberships.document.return_value.get.return_value = mock_no_member
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
@@ -280,6 +280,10 @@ class TestFinal5Branches:
                 mock_ref.update.return_value = None
                 mock_tasks.document.return_value = mock_ref
                 return mock_tasks
+            elif name == "memberships":
+                mock_memberships = Mock()
+                mock_memberships.where.return_value.stream.return_value = []
+                return mock_memberships
             return Mock()
         
         mock_db.collection.side_effect = collection_side_effect
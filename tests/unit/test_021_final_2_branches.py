@@ -5,6 +5,7 @@ Final 2 branches for 100% coverage: 85, 477->491
 import pytest
 import sys
 from unittest.mock import Mock, patch
+from conftest import static_query
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
@@ -142,10 +143,7 @@ class TestLine477:
                 mock_memberships.document.return_value.get.return_value = mock_no_membership
                 return mock_memberships
             elif name == "tasks":
-                mock_tasks = Mock()
-                mock_tasks.where.return_value = mock_tasks
-                mock_tasks.stream.return_value = []
-                return mock_tasks
+                return static_query()
             return Mock()
         
         mock_db.collection = collection_side_effect
@@ -153,5 +151,6 @@ class TestLine477:
         response = client.get("/api/tasks?project_id=proj1", headers={"X-User-Id": "staff1"})
         
         assert response.status_code == 200
-        # Verify owner check was reached (2 calls: 1 for role, 1 for owner check at line 477)
-        assert viewer_get_count[0] == 2
+        # The owner check reuses the viewer doc read for the role lookup
+        # (request-scoped identity map), so the viewer is fetched only once
+        assert viewer_get_count[0] == 1
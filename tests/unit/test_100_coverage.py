@@ -15,6 +15,7 @@ UserNotFoundError = fake_auth.UserNotFoundError if fake_auth else Exception
 
 from flask import Flask
 from backend.api import admin_bp, manager_bp, dashboard_bp
+from conftest import empty_collection
 
 
 # ========== DASHBOARD.PY EDGE CASES ==========
@@ -254,7 +255,7 @@ class TestAdminComprehensive:
             mock_projects.append(p)
 
         def collection_side_effect(name):
-            mock_collection = Mock()
+            mock_collection = empty_collection()
             if name == "users":
                 mock_collection.stream.return_value = mock_users
                 mock_collection.document.return_value.get.return_value = mock_admin_doc
@@ -57,12 +57,14 @@ class TestManagerBranchCoverage:
                     if filter is not None:
                         field = getattr(filter, "field_path", field)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.stream.return_value = [mock_membership] if field == "user_id" else [mock_team_membership]
                     return mock_query
                 mock_collection_obj.where = mock_where
             elif collection_name == "tasks":
                 def mock_where(field=None, op=None, value=None, filter=None):
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.stream.return_value = [mock_task]
                     return mock_query
                 mock_collection_obj.where = mock_where
@@ -128,12 +130,14 @@ class TestManagerBranchCoverage:
                     if filter is not None:
                         field = getattr(filter, "field_path", field)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.stream.return_value = [mock_membership] if field == "user_id" else [mock_team_membership]
                     return mock_query
                 mock_collection_obj.where = mock_where
             elif collection_name == "tasks":
                 def mock_where(field=None, op=None, value=None, filter=None):
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.stream.return_value = [mock_task]
                     return mock_query
                 mock_collection_obj.where = mock_where
@@ -183,6 +187,7 @@ class TestManagerBranchCoverage:
             elif collection_name == "memberships":
                 def mock_where(field=None, op=None, value=None, filter=None):
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     if filter is not None:
                         field = getattr(filter, "field_path", field)
                     if field == "user_id":
@@ -195,7 +200,7 @@ class TestManagerBranchCoverage:
                     return mock_query
                 mock_collection_obj.where = mock_where
             elif collection_name == "tasks":
-                mock_collection_obj.where.return_value.stream.return_value = []
+                mock_collection_obj.where.return_value.select.return_value.stream.return_value = []
             elif collection_name == "projects":
                 mock_collection_obj.document.return_value.get.return_value.exists = False
             return mock_collection_obj
@@ -16,6 +16,7 @@ Test Organization:
 import pytest
 from unittest.mock import Mock
 import sys
+from conftest import chain_paging, stream_counts, empty_collection
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -58,15 +59,15 @@ class TestDashboard:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=[user1, user2])
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[task1, task2, task3]))
+                return chain_paging(Mock(stream=Mock(return_value=[task1, task2, task3])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[project1, project2]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[project1, project2])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -79,8 +80,8 @@ class TestDashboard:
         assert data['statistics']['active_users'] == 1
         assert data['statistics']['total_tasks'] == 3
         assert data['statistics']['total_projects'] == 2
-        assert 'all_projects' in data
-        assert len(data['all_projects']) == 2
+        assert 'recent_projects' in data
+        assert len(data['recent_projects']) == 2
     
     def test_dashboard_unknown_roles_branch_coverage(self, client, setup_firebase_mocks, mock_db):
         """Branch coverage: users with roles not in role_breakdown"""
@@ -103,15 +104,15 @@ class TestDashboard:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=users)
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[]))
+                return chain_paging(Mock(stream=Mock(return_value=[])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -423,7 +424,7 @@ class TestProjectsAndTasks:
             if name == "users":
                 return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return chain_paging(Mock(stream=Mock(return_value=tasks)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -756,7 +757,7 @@ class TestEdgeCases:
                 call_count[0] += 1
                 if call_count[0] == 1:
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
-                return Mock(stream=Mock(return_value=users))
+                return chain_paging(Mock(stream=Mock(return_value=users)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -825,15 +826,15 @@ class TestDashboardComplete:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=[user1])
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[task1, task2, task3, task4]))
+                return chain_paging(Mock(stream=Mock(return_value=[task1, task2, task3, task4])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[project1, project2]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[project1, project2])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -843,7 +844,7 @@ class TestDashboardComplete:
         assert 'statistics' in data
         assert 'tasks_by_status' in data['statistics']
         assert 'tasks_by_priority' in data['statistics']
-        assert 'all_projects' in data
+        assert 'recent_projects' in data
     
     def test_dashboard_with_varied_priorities(self, client, setup_firebase_mocks, mock_db):
         """Dashboard priority breakdown calculation"""
@@ -859,15 +860,15 @@ class TestDashboardComplete:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=[])
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return chain_paging(Mock(stream=Mock(return_value=tasks)))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -1219,7 +1220,7 @@ class TestProjectsAndTasksLoops:
             if name == "users":
                 return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return chain_paging(Mock(stream=Mock(return_value=tasks)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -1367,13 +1368,14 @@ class TestMissingLineCoverage:
                 mock_coll = Mock()
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 mock_coll.stream = Mock(return_value=[Mock(), Mock()])
+                stream_counts(mock_coll)
                 return mock_coll
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[Mock()]))
+                return stream_counts(Mock(stream=Mock(return_value=[Mock()])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[Mock()]))
+                return stream_counts(Mock(stream=Mock(return_value=[Mock()])))
             elif name == "memberships":
-                return Mock(stream=Mock(return_value=[Mock()]))
+                return stream_counts(Mock(stream=Mock(return_value=[Mock()])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -1396,7 +1398,7 @@ class TestMissingLineCoverage:
                 call_count[0] += 1
                 if call_count[0] == 1:
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
-                return Mock(stream=Mock(return_value=[mock_staff, mock_manager]))
+                return chain_paging(Mock(stream=Mock(return_value=[mock_staff, mock_manager])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -1419,7 +1421,7 @@ class TestMissingLineCoverage:
                 call_count[0] += 1
                 if call_count[0] == 1:
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
-                return Mock(stream=Mock(return_value=[mock_active, mock_inactive]))
+                return chain_paging(Mock(stream=Mock(return_value=[mock_active, mock_inactive])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -1442,13 +1444,38 @@ class TestMissingLineCoverage:
                 call_count[0] += 1
                 if call_count[0] == 1:
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
-                return Mock(stream=Mock(return_value=[mock_active, mock_inactive]))
+                return chain_paging(Mock(stream=Mock(return_value=[mock_active, mock_inactive])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         response = client.get('/api/admin/users?admin_id=admin1&status=inactive')
         assert response.status_code == 200
     
+    def test_users_filters_run_in_the_query_and_total_counts_all_pages(self, client, setup_firebase_mocks, mock_db):
+        """role/inactive are where clauses; total comes from count(), not the page"""
+        mock_admin = Mock(exists=True)
+        mock_admin.to_dict = Mock(return_value={"role": "admin"})
+        users = []
+        for user_id, data in [("u1", {"role": "staff"}), ("u2", {"role": "staff", "is_active": False}),
+                              ("u3", {"role": "staff", "is_active": True}), ("u4", {"role": "manager"})]:
+            user = Mock(id=user_id)
+            user.to_dict = Mock(return_value=data)
+            users.append(user)
+        users_coll = chain_paging(Mock(stream=Mock(return_value=users)))
+        users_coll.document.return_value.get.return_value = mock_admin
+        mock_db.collection = Mock(side_effect=lambda name: users_coll if name == "users" else Mock())
+        
+        inactive = client.get('/api/admin/users?admin_id=admin1&role=staff&status=inactive').get_json()
+        active = client.get('/api/admin/users?admin_id=admin1&role=staff&status=active&limit=1').get_json()
+        
+        assert [u["user_id"] for u in inactive["users"]] == ["u2"]
+        assert inactive["total"] == 1
+        # Users without is_active count as active; total spans both pages
+        assert [u["user_id"] for u in active["users"]] == ["u1"]
+        assert active["total"] == 2
+        assert active["next_cursor"]
+        assert users_coll.where.call_args.kwargs["filter"].field_path == "role"
+    
     def test_add_staff_firebase_error(self, client, setup_firebase_mocks, mock_db):
         """Line 232: Firebase create error"""
         mock_admin = Mock(exists=True)
@@ -1690,7 +1717,7 @@ class TestMissingLineCoverage:
             if name == "users":
                 return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[task1, task2]))
+                return chain_paging(Mock(stream=Mock(return_value=[task1, task2])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -1715,15 +1742,15 @@ class TestFinal100PercentCoverage:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=[mock_user])
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[]))
+                return chain_paging(Mock(stream=Mock(return_value=[])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -1743,16 +1770,16 @@ class TestFinal100PercentCoverage:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return stream_counts(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=users)
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return stream_counts(Mock(stream=Mock(return_value=tasks)))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=projects))
+                return stream_counts(Mock(stream=Mock(return_value=projects)))
             elif name == "memberships":
-                return Mock(stream=Mock(return_value=memberships))
+                return stream_counts(Mock(stream=Mock(return_value=memberships)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -1779,7 +1806,7 @@ class TestFinal100PercentCoverage:
                 call_count[0] += 1
                 if call_count[0] == 1:
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
-                return Mock(stream=Mock(return_value=[staff, manager]))
+                return chain_paging(Mock(stream=Mock(return_value=[staff, manager])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -2046,7 +2073,7 @@ class TestFinal100PercentCoverage:
             if name == "users":
                 return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[task1, task2, task3]))
+                return chain_paging(Mock(stream=Mock(return_value=[task1, task2, task3])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
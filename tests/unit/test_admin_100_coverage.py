@@ -5,6 +5,7 @@ Covers remaining 40 missing lines
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import sys
+from conftest import chain_paging, stream_counts
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -31,12 +32,16 @@ class TestAdmin100Coverage:
             if name == "users":
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 mock_coll.stream = Mock(return_value=mock_users)
+                stream_counts(mock_coll)
             elif name == "projects":
                 mock_coll.stream = Mock(return_value=mock_projects)
+                stream_counts(mock_coll)
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=mock_tasks)
+                stream_counts(mock_coll)
             elif name == "memberships":
                 mock_coll.stream = Mock(return_value=mock_memberships)
+                stream_counts(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -61,6 +66,7 @@ class TestAdmin100Coverage:
             if name == "users":
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 mock_coll.stream = Mock(return_value=mock_users)
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -83,6 +89,7 @@ class TestAdmin100Coverage:
             if name == "users":
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 mock_coll.stream = Mock(return_value=mock_users)
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -310,6 +317,7 @@ class TestAdmin100Coverage:
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=mock_tasks)
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -428,6 +436,7 @@ class TestFinalLines:
             if name == "users":
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 mock_coll.stream = Mock(return_value=[u1, u2, u3])
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -5,6 +5,7 @@ Targeting: 136, 177, 182, 367, 372, 418-419, 441, 446, 473-474, 493-494, 516, 52
 import pytest
 from unittest.mock import Mock, patch
 import sys
+from conftest import chain_paging, stream_counts
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -34,12 +35,16 @@ class TestLine136StatisticsCalculation:
                 else:
                     # Second call is for counting
                     mock_coll.stream = Mock(return_value=users_list)
+                    stream_counts(mock_coll)
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=tasks_list)
+                stream_counts(mock_coll)
             elif name == "projects":
                 mock_coll.stream = Mock(return_value=projects_list)
+                stream_counts(mock_coll)
             elif name == "memberships":
                 mock_coll.stream = Mock(return_value=memberships_list)
+                stream_counts(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -82,6 +87,7 @@ class TestLines177And182Continues:
                     mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 else:
                     mock_coll.stream = Mock(return_value=users_list)
+                    chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -121,6 +127,7 @@ class TestLines177And182Continues:
                     mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 else:
                     mock_coll.stream = Mock(return_value=users_list)
+                    chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -391,6 +398,7 @@ class TestLine669TasksLoop:
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=tasks)
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -5,6 +5,7 @@ Focuses on remaining uncovered lines (sync utilities, edge cases)
 import pytest
 from unittest.mock import Mock, MagicMock, patch
 from firebase_admin import auth
+from conftest import chain_paging
 
 
 class TestAdminSyncUtilities:
@@ -359,6 +360,7 @@ class TestAdminEdgeCases:
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=[task1, task2])
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -393,6 +395,7 @@ class TestAdminEdgeCases:
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=[task1, task2])
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=collection_side_effect)
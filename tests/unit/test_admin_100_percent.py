@@ -3,6 +3,7 @@
 import pytest
 from unittest.mock import Mock, patch
 from conftest import UserNotFoundError
+from conftest import stream_counts
 
 
 @pytest.fixture
@@ -46,12 +47,16 @@ class TestAdminComplete100:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                stream_counts(mock_coll)
             elif name == "tasks":
                 mock_coll.stream.return_value = [mock_task1]
+                stream_counts(mock_coll)
             elif name == "projects":
                 mock_coll.stream.return_value = [mock_project1]
+                stream_counts(mock_coll)
             elif name == "memberships":
                 mock_coll.stream.return_value = [mock_membership1]
+                stream_counts(mock_coll)
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
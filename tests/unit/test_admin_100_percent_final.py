@@ -5,6 +5,7 @@ Lines: 136, 177, 182, 367, 372, 418-419, 441, 446, 473-474, 493-494, 516, 521, 5
 import pytest
 from unittest.mock import Mock
 import sys
+from conftest import chain_paging, stream_counts
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -32,12 +33,16 @@ class TestLine136Statistics:
                     mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 else:
                     mock_coll.stream = Mock(return_value=users)
+                    stream_counts(mock_coll)
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=tasks)
+                stream_counts(mock_coll)
             elif name == "projects":
                 mock_coll.stream = Mock(return_value=projects)
+                stream_counts(mock_coll)
             elif name == "memberships":
                 mock_coll.stream = Mock(return_value=memberships)
+                stream_counts(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -82,6 +87,7 @@ class TestLines177And182UserFilters:
                     mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 else:
                     mock_coll.stream = Mock(return_value=[user_staff1, user_manager, user_staff2, user_admin_other])
+                    chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -119,6 +125,7 @@ class TestLines177And182UserFilters:
                     mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 else:
                     mock_coll.stream = Mock(return_value=[user_active1, user_inactive, user_active2])
+                    chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -417,6 +424,7 @@ class TestLine669TasksLoop:
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=tasks)
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -451,6 +459,7 @@ class TestLine669TasksLoop:
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=tasks)
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
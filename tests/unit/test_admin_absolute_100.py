@@ -5,6 +5,7 @@ Using direct app context to ensure coverage detection
 import pytest
 from unittest.mock import Mock, MagicMock
 import sys
+from conftest import chain_paging
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -47,6 +48,7 @@ class TestCoverageGaps:
                 else:
                     # Second call is for listing users
                     mock_coll.stream = Mock(return_value=[user_manager, user_staff])
+                    chain_paging(mock_coll)
                 return mock_coll
             return Mock()
         
@@ -93,6 +95,7 @@ class TestCoverageGaps:
                     mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 else:
                     mock_coll.stream = Mock(return_value=[user_active, user_inactive])
+                    chain_paging(mock_coll)
                 return mock_coll
             return Mock()
         
@@ -341,7 +344,7 @@ class TestCoverageGaps:
             if name == "users":
                 return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[task1, task2, task3, task4]))
+                return chain_paging(Mock(stream=Mock(return_value=[task1, task2, task3, task4])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -380,7 +383,7 @@ class TestForceExecutionPaths:
                 calls[0] += 1
                 if calls[0] == 1:
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
-                return Mock(stream=Mock(return_value=users))
+                return chain_paging(Mock(stream=Mock(return_value=users)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=coll_eff)
@@ -415,7 +418,7 @@ class TestForceExecutionPaths:
                 calls[0] += 1
                 if calls[0] == 1:
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
-                return Mock(stream=Mock(return_value=users))
+                return chain_paging(Mock(stream=Mock(return_value=users)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=coll_eff)
@@ -2,6 +2,7 @@
 
 import pytest
 from unittest.mock import Mock, patch
+from conftest import chain_paging, empty_collection
 
 
 class TestAdminBranchCoverage:
@@ -64,7 +65,7 @@ class TestAdminBranchCoverage:
         mock_project1.to_dict.return_value = {"name": "Project1"}
 
         def collection_side_effect(name):
-            mock_coll = Mock()
+            mock_coll = empty_collection()
             if name == "users":
                 def document_side_effect(doc_id):
                     if doc_id == "admin123":
@@ -72,10 +73,13 @@ class TestAdminBranchCoverage:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2, mock_user3]
+                chain_paging(mock_coll)
             elif name == "tasks":
                 mock_coll.stream.return_value = [mock_task1, mock_task2]
+                chain_paging(mock_coll)
             elif name == "projects":
                 mock_coll.stream.return_value = [mock_project1]
+                chain_paging(mock_coll)
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -113,6 +117,8 @@ class TestAdminBranchCoverage:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -147,6 +153,8 @@ class TestAdminBranchCoverage:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
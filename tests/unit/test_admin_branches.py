@@ -2,7 +2,8 @@
 
 import pytest
 from unittest.mock import Mock, patch
-from conftest import UserNotFoundError
+from conftest import UserNotFoundError, empty_collection
+from conftest import chain_paging, stream_counts
 
 
 @pytest.fixture
@@ -30,7 +31,7 @@ class TestAdminBranchSpecific:
         mock_user1.to_dict.return_value = {"name": "HR1", "role": "hr", "is_active": True, "created_at": "2024-01-01"}
 
         def collection_side_effect(name):
-            mock_coll = Mock()
+            mock_coll = empty_collection()
             if name == "users":
                 def document_side_effect(doc_id):
                     if doc_id == "admin123":
@@ -38,10 +39,13 @@ class TestAdminBranchSpecific:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1]
+                chain_paging(mock_coll)
             elif name == "tasks":
                 mock_coll.stream.return_value = []
+                chain_paging(mock_coll)
             elif name == "projects":
                 mock_coll.stream.return_value = []
+                chain_paging(mock_coll)
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -68,7 +72,7 @@ class TestAdminBranchSpecific:
         mock_user2.to_dict.return_value = {"name": "Manager2", "role": "manager", "is_active": False, "created_at": "2024-01-02"}
 
         def collection_side_effect(name):
-            mock_coll = Mock()
+            mock_coll = empty_collection()
             if name == "users":
                 def document_side_effect(doc_id):
                     if doc_id == "admin123":
@@ -76,10 +80,13 @@ class TestAdminBranchSpecific:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                chain_paging(mock_coll)
             elif name == "tasks":
                 mock_coll.stream.return_value = []
+                chain_paging(mock_coll)
             elif name == "projects":
                 mock_coll.stream.return_value = []
+                chain_paging(mock_coll)
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -98,7 +105,7 @@ class TestAdminBranchSpecific:
         mock_user1.to_dict.return_value = {"name": "Inactive", "role": "staff", "is_active": False, "created_at": "2024-01-01"}
 
         def collection_side_effect(name):
-            mock_coll = Mock()
+            mock_coll = empty_collection()
             if name == "users":
                 def document_side_effect(doc_id):
                     if doc_id == "admin123":
@@ -106,10 +113,13 @@ class TestAdminBranchSpecific:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1]
+                chain_paging(mock_coll)
             elif name == "tasks":
                 mock_coll.stream.return_value = []
+                chain_paging(mock_coll)
             elif name == "projects":
                 mock_coll.stream.return_value = []
+                chain_paging(mock_coll)
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -143,12 +153,16 @@ class TestAdminBranchSpecific:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                stream_counts(mock_coll)
             elif name == "tasks":
                 mock_coll.stream.return_value = [mock_task1]
+                stream_counts(mock_coll)
             elif name == "projects":
                 mock_coll.stream.return_value = [mock_project1]
+                stream_counts(mock_coll)
             elif name == "memberships":
                 mock_coll.stream.return_value = [mock_membership1]
+                stream_counts(mock_coll)
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -188,6 +202,8 @@ class TestAdminBranchSpecific:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2, mock_user3]
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -222,6 +238,8 @@ class TestAdminBranchSpecific:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -6,6 +6,7 @@ Achieves 100% statement and branch coverage for backend/api/admin.py
 import pytest
 from unittest.mock import Mock, patch
 import sys
+from conftest import chain_paging, stream_counts, empty_collection
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -33,15 +34,15 @@ class TestDashboard:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=[user])
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[task]))
+                return chain_paging(Mock(stream=Mock(return_value=[task])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[project]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[project])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -63,15 +64,15 @@ class TestDashboard:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=[user1, user2])
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[]))
+                return chain_paging(Mock(stream=Mock(return_value=[])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -100,15 +101,15 @@ class TestDashboard:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=[user1])
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[task1, task2, task3]))
+                return chain_paging(Mock(stream=Mock(return_value=[task1, task2, task3])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[project1]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[project1])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -130,16 +131,16 @@ class TestDashboard:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return stream_counts(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=users)
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return stream_counts(Mock(stream=Mock(return_value=tasks)))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=projects))
+                return stream_counts(Mock(stream=Mock(return_value=projects)))
             elif name == "memberships":
-                return Mock(stream=Mock(return_value=memberships))
+                return stream_counts(Mock(stream=Mock(return_value=memberships)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -698,7 +699,7 @@ class TestProjectsAndTasks:
             if name == "users":
                 return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return chain_paging(Mock(stream=Mock(return_value=tasks)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -732,7 +733,7 @@ class TestUserListFiltering:
                 call_count[0] += 1
                 if call_count[0] == 1:
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
-                return Mock(stream=Mock(return_value=[staff, manager]))
+                return chain_paging(Mock(stream=Mock(return_value=[staff, manager])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -755,7 +756,7 @@ class TestUserListFiltering:
                 call_count[0] += 1
                 if call_count[0] == 1:
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
-                return Mock(stream=Mock(return_value=[active, inactive]))
+                return chain_paging(Mock(stream=Mock(return_value=[active, inactive])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
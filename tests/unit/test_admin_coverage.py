@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import Mock, MagicMock
 from datetime import datetime, timezone
 import sys
+from conftest import chain_paging
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 fake_auth = sys.modules.get("firebase_admin.auth")
@@ -38,6 +39,8 @@ class TestAdminEndpoints:
             mock_coll = Mock()
             if name == "users":
                 mock_coll.stream.return_value = users
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
                 mock_coll.document.return_value.get.return_value = mock_admin
             return mock_coll
         
@@ -279,6 +282,8 @@ class TestAdminEndpoints:
                 mock_coll.document.return_value.get.return_value = mock_admin
             elif name == "tasks":
                 mock_coll.stream.return_value = tasks
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
         
         mock_db.collection.side_effect = collection_side_effect
@@ -5,6 +5,7 @@ Target 100% coverage with dashboard and remaining endpoints
 import pytest
 from unittest.mock import Mock
 import sys
+from conftest import chain_paging, empty_collection
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -43,15 +44,15 @@ class TestDashboardLoopCoverage:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=[user1])
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[task1, task2, task3, task4]))
+                return chain_paging(Mock(stream=Mock(return_value=[task1, task2, task3, task4])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[project1, project2]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[project1, project2])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -65,8 +66,8 @@ class TestDashboardLoopCoverage:
         assert 'tasks_by_priority' in data['statistics']
         
         # Verify projects were included (lines 99-101)
-        assert 'all_projects' in data
-        assert len(data['all_projects']) == 2
+        assert 'recent_projects' in data
+        assert len(data['recent_projects']) == 2
     
     def test_dashboard_with_varied_priorities(self, client, setup_firebase_mocks, mock_db):
         """Lines 84-92: Ensure priority breakdown is calculated"""
@@ -87,15 +88,15 @@ class TestDashboardLoopCoverage:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=[])
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return chain_paging(Mock(stream=Mock(return_value=tasks)))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -134,7 +135,7 @@ class TestRemainingMissingLines:
                 call_count[0] += 1
                 if call_count[0] == 1:
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
-                return Mock(stream=Mock(return_value=users))
+                return chain_paging(Mock(stream=Mock(return_value=users)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -168,7 +169,7 @@ class TestRemainingMissingLines:
             if name == "users":
                 return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return chain_paging(Mock(stream=Mock(return_value=tasks)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -272,7 +273,7 @@ class TestCompleteEndpointCoverage:
             if name == "users":
                 return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return chain_paging(Mock(stream=Mock(return_value=tasks)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
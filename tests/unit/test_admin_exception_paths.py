@@ -5,6 +5,7 @@ Lines: 237, 303, 372, 398-399, 418-419, 446, 473-474, 493-494, 521, 543-549, 574
 import pytest
 from unittest.mock import Mock, patch
 import sys
+from conftest import chain_paging
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -287,7 +288,7 @@ class TestSystemOverviewEndpoints:
             if name == "users":
                 return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return chain_paging(Mock(stream=Mock(return_value=tasks)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=collection_mock)
@@ -5,6 +5,7 @@ Missing: 177, 182, 372, 418-419, 446, 473-474, 493-494, 521, 543-549, 574, 630,
 import pytest
 from unittest.mock import Mock
 import sys
+from conftest import chain_paging
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -30,7 +31,7 @@ class TestExactLine177:
                     call_admin[0] = True
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
                 else:
-                    return Mock(stream=Mock(return_value=[u1, u2]))
+                    return chain_paging(Mock(stream=Mock(return_value=[u1, u2])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=coll_eff)
@@ -64,7 +65,7 @@ class TestExactLine182:
                     call_admin[0] = True
                     return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
                 else:
-                    return Mock(stream=Mock(return_value=[u1, u2]))
+                    return chain_paging(Mock(stream=Mock(return_value=[u1, u2])))
             return Mock()
         
         mock_db.collection = Mock(side_effect=coll_eff)
@@ -300,7 +301,7 @@ class TestExactLine669:
             if name == "users":
                 return Mock(document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=tasks))
+                return chain_paging(Mock(stream=Mock(return_value=tasks)))
             return Mock()
         
         mock_db.collection = Mock(side_effect=coll_eff)
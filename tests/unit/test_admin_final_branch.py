@@ -6,6 +6,7 @@ Lines 493-494: Manager soft delete Firebase Auth exception
 import pytest
 from unittest.mock import Mock
 import sys
+from conftest import chain_paging, empty_collection
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -46,15 +47,15 @@ class TestFinalBranchCoverage:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=[user1, user2, user3])
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[]))
+                return chain_paging(Mock(stream=Mock(return_value=[])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
@@ -125,15 +126,15 @@ class TestEdgeCaseRoles:
         
         def collection_mock(name):
             if name == "users":
-                return Mock(
+                return chain_paging(Mock(
                     document=Mock(return_value=Mock(get=Mock(return_value=mock_admin))),
                     stream=Mock(return_value=users)
-                )
+                ))
             elif name == "tasks":
-                return Mock(stream=Mock(return_value=[]))
+                return chain_paging(Mock(stream=Mock(return_value=[])))
             elif name == "projects":
-                return Mock(stream=Mock(return_value=[]))
-            return Mock()
+                return chain_paging(Mock(stream=Mock(return_value=[])))
+            return empty_collection()
         
         mock_db.collection = Mock(side_effect=collection_mock)
         
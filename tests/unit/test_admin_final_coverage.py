@@ -2,6 +2,7 @@
 
 import pytest
 from unittest.mock import Mock, patch
+from conftest import chain_paging
 
 
 @pytest.fixture
@@ -39,6 +40,8 @@ class TestAdminFinalCoverage:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -72,6 +75,8 @@ class TestAdminFinalCoverage:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -107,6 +112,8 @@ class TestAdminFinalCoverage:
                 mock_coll.document = Mock(side_effect=document_side_effect)
             elif name == "tasks":
                 mock_coll.stream.return_value = [mock_task1, mock_task2]
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -142,6 +149,8 @@ class TestAdminFinalCoverage:
                 mock_coll.document = Mock(side_effect=document_side_effect)
             elif name == "tasks":
                 mock_coll.stream.return_value = [mock_task1, mock_task2]
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -5,6 +5,7 @@ Lines: 136, 177, 182, 367, 372, 418-419, 441, 446, 473-474, 493-494, 516, 521, 5
 import pytest
 from unittest.mock import Mock, patch
 import sys
+from conftest import chain_paging, stream_counts
 
 fake_auth = sys.modules.get("firebase_admin.auth")
 
@@ -31,12 +32,16 @@ class TestFinalCoverageLines:
                     mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 else:
                     mock_coll.stream = Mock(return_value=users)
+                    stream_counts(mock_coll)
             elif name == "projects":
                 mock_coll.stream = Mock(return_value=projects)
+                stream_counts(mock_coll)
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=tasks)
+                stream_counts(mock_coll)
             elif name == "memberships":
                 mock_coll.stream = Mock(return_value=memberships)
+                stream_counts(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -75,6 +80,7 @@ class TestFinalCoverageLines:
                     mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 else:
                     mock_coll.stream = Mock(return_value=users)
+                    chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -86,8 +92,9 @@ class TestFinalCoverageLines:
         # Should only get staff users (line 177 filtered others)
         assert all(u['role'] == 'staff' for u in data['users'])
         
-        # Reset call count
-        coll_effect.call_count = 0
+        # The admin profile is now served from the role cache, so the next
+        # users collection call goes straight to the stream
+        coll_effect.call_count = 1
         
         # Test with status filter - should trigger line 182 continue
         response = client.get('/api/admin/users?admin_id=admin1&status=inactive')
@@ -286,6 +293,7 @@ class TestFinalCoverageLines:
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=tasks)
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -398,6 +406,7 @@ class TestEdgeCasesCoverage:
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=[task1, task2])
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=coll_effect)
@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import Mock, MagicMock, patch
 from datetime import datetime, timezone
 import sys
+from conftest import chain_paging, stream_counts
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 fake_auth = sys.modules.get("firebase_admin.auth")
@@ -26,12 +27,16 @@ class TestAdminMissingLines:
             if name == "users":
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 mock_coll.stream = Mock(return_value=[Mock(), Mock()])
+                stream_counts(mock_coll)
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=[Mock()])
+                stream_counts(mock_coll)
             elif name == "projects":
                 mock_coll.stream = Mock(return_value=[Mock()])
+                stream_counts(mock_coll)
             elif name == "memberships":
                 mock_coll.stream = Mock(return_value=[Mock()])
+                stream_counts(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -58,6 +63,7 @@ class TestAdminMissingLines:
             if name == "users":
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 mock_coll.stream = Mock(return_value=[mock_staff, mock_manager])
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -84,6 +90,7 @@ class TestAdminMissingLines:
             if name == "users":
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
                 mock_coll.stream = Mock(return_value=[mock_active, mock_inactive])
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -603,6 +610,7 @@ class TestAdminMissingLines:
                 mock_coll.document = Mock(return_value=Mock(get=Mock(return_value=mock_admin)))
             elif name == "tasks":
                 mock_coll.stream = Mock(return_value=[mock_task])
+                chain_paging(mock_coll)
             return mock_coll
         
         mock_db.collection = Mock(side_effect=collection_side_effect)
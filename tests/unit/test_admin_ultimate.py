@@ -2,7 +2,8 @@
 
 import pytest
 from unittest.mock import Mock, patch
-from conftest import UserNotFoundError
+from conftest import UserNotFoundError, empty_collection
+from conftest import chain_paging, stream_counts
 
 
 @pytest.fixture
@@ -60,7 +61,7 @@ class TestAdminUltimateCoverage:
         mock_user2.to_dict.return_value = {"name": "Staff2", "role": "staff", "is_active": True}
 
         def collection_side_effect(name):
-            mock_coll = Mock()
+            mock_coll = empty_collection()
             if name == "users":
                 def document_side_effect(doc_id):
                     if doc_id == "admin123":
@@ -68,10 +69,13 @@ class TestAdminUltimateCoverage:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                chain_paging(mock_coll)
             elif name == "tasks":
                 mock_coll.stream.return_value = []
+                chain_paging(mock_coll)
             elif name == "projects":
                 mock_coll.stream.return_value = []
+                chain_paging(mock_coll)
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -96,8 +100,10 @@ class TestAdminUltimateCoverage:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = []
+                stream_counts(mock_coll)
             else:
                 mock_coll.stream.return_value = []
+                stream_counts(mock_coll)
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -130,6 +136,8 @@ class TestAdminUltimateCoverage:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -163,6 +171,8 @@ class TestAdminUltimateCoverage:
                     return Mock()
                 mock_coll.document = Mock(side_effect=document_side_effect)
                 mock_coll.stream.return_value = [mock_user1, mock_user2]
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
 
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -0,0 +1,99 @@
+"""Unit tests for backend/api/aggregates.py and the admin statistics endpoint"""
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from backend.api import aggregates
+
+fake_firestore = sys.modules.get("firebase_admin.firestore")
+
+
+def _counted(value, error=None):
+    query = Mock()
+    if error is not None:
+        query.count.return_value.stream.side_effect = error
+    else:
+        query.count.return_value.stream.return_value = iter([[SimpleNamespace(alias="count", value=value)]])
+    return query
+
+
+class TestCountQueries:
+    def test_returns_counts_by_label(self):
+        a, b = _counted(3), _counted(0)
+
+        assert aggregates.count_queries([("a", a), ("b", b)]) == {"a": 3, "b": 0}
+        a.count.assert_called_once_with(alias="count")
+
+    def test_query_error_is_raised(self):
+        with pytest.raises(RuntimeError):
+            aggregates.count_queries([("a", _counted(1)), ("b", _counted(0, RuntimeError("quota")))])
+
+
+class TestCached:
+    def test_value_is_reused_until_ttl_expires(self):
+        now = [100.0]
+        compute = Mock(side_effect=[1, 2])
+
+        assert aggregates.cached("k", compute, ttl_seconds=10, clock=lambda: now[0]) == (1, False)
+        now[0] = 105.0
+        assert aggregates.cached("k", compute, ttl_seconds=10, clock=lambda: now[0]) == (1, True)
+        now[0] = 111.0
+        assert aggregates.cached("k", compute, ttl_seconds=10, clock=lambda: now[0]) == (2, False)
+
+    def test_invalidate_forces_recompute(self):
+        compute = Mock(side_effect=[1, 2])
+        aggregates.cached("k", compute)
+        aggregates.invalidate("k")
+
+        assert aggregates.cached("k", compute) == (2, False)
+
+    def test_counted_writes_invalidate_system_statistics(self):
+        from backend.api import counters
+        compute = Mock(side_effect=[1, 2, 3])
+        aggregates.cached(aggregates.SYSTEM_STATISTICS, compute)
+
+        # A task update that changes nothing counted keeps the cache
+        counters.record_task(Mock(), before={"status": "To Do"}, updates={"title": "x"})
+        assert aggregates.cached(aggregates.SYSTEM_STATISTICS, compute) == (1, True)
+
+        counters.record_task(Mock(), before={"status": "To Do"}, updates={"status": "Completed"})
+        assert aggregates.cached(aggregates.SYSTEM_STATISTICS, compute) == (2, False)
+
+
+class TestSystemStatistics:
+    def test_counts_come_from_aggregations_and_are_cached(self, client, mock_db, monkeypatch):
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        admin = Mock(exists=True)
+        admin.to_dict.return_value = {"role": "admin"}
+        counts = {
+            ("users", None): 10, ("tasks", None): 20, ("projects", None): 4, ("memberships", None): 12,
+            ("users", "is_active"): 3, ("users", "role"): 2, ("tasks", "status"): 5,
+        }
+        collections = {}
+
+        def collection(name):
+            if name not in collections:
+                coll = _counted(counts[(name, None)])
+                coll.document.return_value.get.return_value = admin
+                coll.where.side_effect = lambda filter: _counted(counts[(name, filter.field_path)])
+                collections[name] = coll
+            return collections[name]
+
+        mock_db.collection.side_effect = collection
+
+        first = client.get("/api/admin/statistics", headers={"X-User-Id": "admin1"}).get_json()
+        second = client.get("/api/admin/statistics", headers={"X-User-Id": "admin1"}).get_json()
+
+        stats = first["system_statistics"]
+        assert stats["users"] == 10 and stats["tasks"] == 20
+        assert stats["average_tasks_per_user"] == 2.0
+        assert stats["average_members_per_project"] == 3.0
+        assert (stats["active_users"], stats["inactive_users"]) == (7, 3)
+        assert stats["tasks_by_status"]["In Progress"] == 5
+        assert stats["users_by_role"]["manager"] == 2
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["generated_at"] == first["generated_at"]
+        assert collections["tasks"].count.call_count == 1
@@ -336,7 +336,7 @@ class TestAppCreation:
         """Test app creation with startup checks enabled"""
         from backend.app import create_app
         
-        with patch('backend.app.init_firebase', return_value=True):
+        with patch('backend.app.init_firebase', return_value=True), patch('backend.app.jobs.start'):
             with patch('backend.app.create_app') as mock_create:
                 # Call the real function to ensure coverage
                 app = create_app.__wrapped__(run_startup_checks=True) if hasattr(create_app, '__wrapped__') else create_app(run_startup_checks=True)
@@ -975,251 +975,48 @@ class TestComprehensiveCoverage:
 
 
 class TestStartupChecks:
-    """Tests for startup deadline checks"""
-    
-    def test_startup_checks_success_with_results(self):
-        """Test successful startup deadline check with results"""
-        from backend.app import create_app
-        
-        # Mock successful response from check_deadlines
-        mock_response = Mock()
-        mock_response.get_json.return_value = {"checked": 5, "sent": 3}
-        
-        with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                mock_client = MagicMock()
-                mock_client.post.return_value = mock_response
-                mock_client_ctx.return_value.__enter__.return_value = mock_client
-                
-                app = create_app(run_startup_checks=True)
-        
-        # Verify app was created and check_deadlines was called
-        assert app is not None
-        assert mock_client.post.called
+    """Tests for the background jobs started by run_startup_checks"""
     
-    def test_startup_checks_zero_checked_triggers_alternate(self):
-        """Test startup checks with zero checked triggers alternate timezone"""
+    def test_startup_checks_start_background_jobs(self):
+        """Startup schedules the jobs instead of running the deadline check inline"""
         from backend.app import create_app
         
-        # First response returns 0 checked, triggering alternate timezone
-        mock_response_1 = Mock()
-        mock_response_1.get_json.return_value = {"checked": 0, "sent": 0}
-        
-        mock_response_2 = Mock()
-        mock_response_2.get_json.return_value = {"checked": 2, "sent": 1}
-        
         with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                mock_client = MagicMock()
-                # First call returns 0, second call returns results
-                mock_client.post.side_effect = [mock_response_1, mock_response_2]
-                mock_client_ctx.return_value.__enter__.return_value = mock_client
-                
-                app = create_app(run_startup_checks=True)
+            with patch('backend.app.jobs.start') as mock_start:
+                with patch('flask.Flask.test_client') as mock_client_ctx:
+                    app = create_app(run_startup_checks=True)
         
-        # Verify alternate timezone check was called (2 POST calls)
         assert app is not None
-        assert mock_client.post.call_count == 2
+        mock_start.assert_called_once_with()
+        mock_client_ctx.assert_not_called()
     
-    def test_startup_checks_tuple_response_format(self):
-        """Test startup checks with tuple response format (Flask view style)"""
+    def test_startup_checks_disabled_by_default(self):
+        """Jobs are not started unless requested"""
         from backend.app import create_app
         
-        # Response as tuple (response_obj, status_code)
-        mock_response = Mock()
-        mock_response.get_json.return_value = {"checked": 3, "sent": 2}
-        
         with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                mock_client = MagicMock()
-                # Return tuple format
-                mock_client.post.return_value = (mock_response, 200)
-                mock_client_ctx.return_value.__enter__.return_value = mock_client
-                
-                app = create_app(run_startup_checks=True)
+            with patch('backend.app.jobs.start') as mock_start:
+                create_app()
         
-        assert app is not None
+        mock_start.assert_not_called()
     
-    def test_startup_checks_exception_in_view(self):
-        """Test startup checks when check_deadlines view raises exception"""
+    def test_startup_checks_without_firebase(self):
+        """Jobs need Firestore for their lease, so they are skipped without it"""
         from backend.app import create_app
         
-        with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                mock_client = MagicMock()
-                # First call raises exception
-                mock_client.post.side_effect = Exception("View error")
-                mock_client_ctx.return_value.__enter__.return_value = mock_client
-                
-                # Should handle exception gracefully
-                app = create_app(run_startup_checks=True)
-        
-        assert app is not None
-    
-    def test_startup_checks_alternate_exception(self):
-        """Test startup checks when alternate timezone check fails"""
-        from backend.app import create_app
-        
-        mock_response = Mock()
-        mock_response.get_json.return_value = {"checked": 0}
-        
-        with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                mock_client = MagicMock()
-                # First returns 0, second raises exception
-                mock_client.post.side_effect = [mock_response, Exception("Alternate failed")]
-                mock_client_ctx.return_value.__enter__.return_value = mock_client
-                
-                app = create_app(run_startup_checks=True)
-        
-        assert app is not None
-    
-    def test_startup_checks_get_json_exception(self):
-        """Test startup checks when get_json() raises exception"""
-        from backend.app import create_app
-        
-        mock_response = Mock()
-        mock_response.get_json.side_effect = Exception("JSON parse error")
-        
-        with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                mock_client = MagicMock()
-                mock_client.post.return_value = mock_response
-                mock_client_ctx.return_value.__enter__.return_value = mock_client
-                
-                app = create_app(run_startup_checks=True)
-        
-        assert app is not None
-    
-    def test_startup_checks_none_parsed_response(self):
-        """Test startup checks with None parsed response"""
-        from backend.app import create_app
-        
-        mock_response = Mock()
-        mock_response.get_json.return_value = None
-        
-        mock_response_2 = Mock()
-        mock_response_2.get_json.return_value = {"checked": 1}
-        
-        with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                mock_client = MagicMock()
-                mock_client.post.side_effect = [mock_response, mock_response_2]
-                mock_client_ctx.return_value.__enter__.return_value = mock_client
-                
-                app = create_app(run_startup_checks=True)
-        
-        # Should trigger alternate check
-        assert app is not None
-        assert mock_client.post.call_count == 2
-    
-    def test_startup_checks_response_with_get_json_method(self, capsys):
-        """Test startup checks with response that has get_json (not tuple) - branch 209->215"""
-        from backend.app import create_app
-        from flask import Flask, jsonify
-        
-        # Create a real Flask app to get a real Response object (not a tuple)
-        temp_app = Flask(__name__)
-        with temp_app.app_context():
-            # jsonify returns a Response object, not a tuple
-            mock_response = jsonify({"checked": 5, "sent": 3})
-        
-        with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                mock_client = MagicMock()
-                # Return a real Response object which is NOT a tuple
-                mock_client.post.return_value = mock_response
-                mock_client_ctx.return_value.__enter__.return_value = mock_client
-                
-                app = create_app(run_startup_checks=True)
-        
-        # Should have called get_json via elif branch (line 210)
-        assert app is not None
-        
-        # Verify the elif branch was hit by checking the print output
-        captured = capsys.readouterr()
-        # The elif branch has this print statement (line 211)
-        assert 'check_deadlines response' in captured.out
-    
-    def test_startup_checks_response_without_get_json(self):
-        """Test startup checks when response has NO get_json - skips elif (branch 209->215)"""
-        from backend.app import create_app
-        
-        # Create a response object that has NO get_json method
-        # This will skip both the if and elif branches
-        class NoGetJsonResponse:
-            def __init__(self):
-                self.status_code = 200
-        
-        mock_response = NoGetJsonResponse()
-        
-        # Second response for alternate check
-        mock_response_2 = Mock()
-        mock_response_2.get_json.return_value = {"checked": 1}
-        
-        with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                mock_client = MagicMock()
-                # First call returns object without get_json, triggering alternate check
-                mock_client.post.side_effect = [mock_response, mock_response_2]
-                mock_client_ctx.return_value.__enter__.return_value = mock_client
-                
-                app = create_app(run_startup_checks=True)
-        
-        # Should trigger alternate check because parsed is None
-        assert app is not None
-        assert mock_client.post.call_count == 2
-    
-    def test_startup_checks_outer_exception(self):
-        """Test startup checks with outer exception handling - executes line 229"""
-        from backend.app import create_app
-        
-        # Don't mock stdout - let print statement execute for coverage
-        with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client', side_effect=Exception("Client creation failed")):
-                app = create_app(run_startup_checks=True)
-        
-        assert app is not None
-    
-    def test_startup_checks_alternate_inner_exception(self):
-        """Test startup checks with exception in alternate check - executes line 225"""
-        from backend.app import create_app
-        
-        # Don't mock stdout - let print execute for coverage
-        mock_response = Mock()
-        mock_response.get_json.return_value = {"checked": 0}
-        
-        with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                mock_client = MagicMock()
-                # First call succeeds with 0, second raises exception
-                mock_client.post.side_effect = [mock_response, Exception("Alternate failed")]
-                mock_client_ctx.return_value.__enter__.return_value = mock_client
-                
-                app = create_app(run_startup_checks=True)
+        with patch('backend.app.init_firebase', return_value=False):
+            with patch('backend.app.jobs.start') as mock_start:
+                create_app(run_startup_checks=True)
         
-        assert app is not None
+        mock_start.assert_not_called()
     
-    def test_startup_checks_alternate_outer_exception(self):
-        """Test startup checks alternate local-day outer exception - executes lines 226-227"""
+    def test_startup_checks_job_start_failure(self, capsys):
+        """A scheduler that fails to start does not stop the app"""
         from backend.app import create_app
         
-        # Don't mock stdout - let print execute for coverage
-        mock_response = Mock()
-        mock_response.get_json.return_value = {"checked": 0}
-        
         with patch('backend.app.init_firebase', return_value=True):
-            with patch('flask.Flask.test_client') as mock_client_ctx:
-                # First context manager call succeeds for main check
-                mock_client_main = MagicMock()
-                mock_client_main.post.return_value = mock_response
-                
-                # Second context manager call raises exception for alternate check
-                mock_client_ctx.return_value.__enter__.side_effect = [
-                    mock_client_main,  # First call succeeds
-                    Exception("Client context failed")  # Second call fails
-                ]
-                
+            with patch('backend.app.jobs.start', side_effect=Exception("scheduler error")):
                 app = create_app(run_startup_checks=True)
         
         assert app is not None
+        assert "Background jobs not started: scheduler error" in capsys.readouterr().out
@@ -0,0 +1,90 @@
+"""Unit tests for backend/api/batching.py"""
+from unittest.mock import Mock
+
+import pytest
+
+from backend.api import batching
+from backend.api.batching import Batcher
+
+
+def _db():
+    """db whose batch() hands out a fresh batch Mock each time (kept in db.batches)."""
+    db = Mock()
+    db.batches = []
+
+    def batch():
+        db.batches.append(Mock())
+        return db.batches[-1]
+
+    db.batch.side_effect = batch
+    return db
+
+
+class TestBatcher:
+    def test_commits_every_limit_writes_and_the_rest_on_flush(self):
+        db = _db()
+        writer = Batcher(db, limit=2)
+
+        for i in range(5):
+            writer.delete(f"ref{i}")
+        writer.flush()
+
+        committed = [b for b in db.batches if b.commit.called]
+        assert [len(b.delete.call_args_list) for b in committed] == [2, 2, 1]
+        assert writer.commits == 3
+
+    def test_default_limit_is_the_firestore_cap(self, monkeypatch):
+        monkeypatch.setattr(batching, "BATCH_LIMIT", 3)
+        db = _db()
+        writer = Batcher(db)
+
+        for i in range(4):
+            writer.set(f"ref{i}", {"n": i}, merge=True)
+        writer.flush()
+
+        assert writer.commits == 2
+        db.batches[0].set.assert_called_with("ref2", {"n": 2}, merge=True)
+
+    def test_reserve_keeps_a_group_in_one_batch(self):
+        db = _db()
+        writer = Batcher(db, limit=3)
+
+        writer.create("a", {})
+        writer.create("b", {})
+        writer.reserve(2)
+        writer.create("c", {})
+        writer.update("d", {})
+        writer.flush()
+
+        first, second = [b for b in db.batches if b.commit.called]
+        assert len(first.create.call_args_list) == 2
+        second.create.assert_called_once_with("c", {})
+        second.update.assert_called_once_with("d", {})
+
+    def test_fits_counts_the_queued_writes(self):
+        writer = Batcher(_db(), limit=3)
+        writer.delete("a")
+
+        assert writer.fits(2)
+        assert not writer.fits(3)
+
+    def test_flush_without_writes_commits_nothing(self):
+        db = _db()
+
+        Batcher(db).flush()
+
+        db.batches[0].commit.assert_not_called()
+
+    def test_failed_batch_is_dropped(self):
+        db = _db()
+        writer = Batcher(db)
+        writer.delete("a")
+        db.batches[0].commit.side_effect = Exception("boom")
+
+        with pytest.raises(Exception, match="boom"):
+            writer.flush()
+        writer.delete("b")
+        writer.flush()
+
+        db.batches[1].delete.assert_called_once_with("b")
+        db.batches[1].commit.assert_called_once()
@@ -0,0 +1,229 @@
+"""Unit tests for backend/api/counters.py and the admin dashboard counters"""
+import sys
+from unittest.mock import Mock
+
+from backend.api import counters
+from conftest import chain_paging
+
+fake_firestore = sys.modules.get("firebase_admin.firestore")
+
+
+def _doc(doc_id, data):
+    doc = Mock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return doc
+
+
+def _marker(seeded_at="2025-01-01T00:00:00+00:00"):
+    """Snapshot of counters/admin_dashboard; None for a missing document."""
+    snap = Mock()
+    snap.exists = seeded_at is not None
+    snap.to_dict.return_value = {"seeded_at": seeded_at}
+    return snap
+
+
+def _written(db):
+    """The nested dict passed to the shard's set(..., merge=True)."""
+    shard = db.collection.return_value.document.return_value.collection.return_value.document.return_value
+    shard.set.assert_called_once()
+    args, kwargs = shard.set.call_args
+    assert kwargs == {"merge": True}
+    return args[0]
+
+
+class TestRecord:
+    def test_create_increments_every_bucket(self):
+        db = Mock()
+
+        counters.record_task(db, after={"status": "In Progress", "priority": 3})
+
+        assert _written(db) == {
+            "totals": {"tasks": 1},
+            "tasks_by_status": {"In Progress": 1},
+            "tasks_by_priority": {"Priority 3": 1},
+        }
+        db.collection.assert_called_once_with("counters")
+
+    def test_update_moves_between_buckets(self):
+        db = Mock()
+
+        counters.record_task(db, before={"status": "To Do", "priority": 5}, updates={"status": "Completed"})
+
+        assert _written(db) == {"tasks_by_status": {"To Do": -1, "Completed": 1}}
+
+    def test_delete_decrements(self):
+        db = Mock()
+
+        counters.record_user(db, before={"role": "manager", "is_active": False})
+
+        assert _written(db) == {"totals": {"users": -1}, "users_by_role": {"manager": -1}}
+
+    def test_bulk_task_delete_is_one_write(self):
+        db = Mock()
+
+        counters.record_tasks_deleted(db, [{"status": "Done", "priority": 3}, {"status": "Done"}])
+
+        assert _written(db) == {
+            "totals": {"tasks": -2},
+            "tasks_by_status": {"Done": -2},
+            "tasks_by_priority": {"Priority 3": -1, "Priority 5": -1},
+        }
+
+    def test_unrelated_update_writes_nothing(self):
+        db = Mock()
+
+        counters.record_user(db, before={"role": "staff"}, updates={"name": "New"})
+
+        db.collection.assert_not_called()
+
+    def test_write_errors_are_swallowed(self):
+        db = Mock()
+        db.collection.side_effect = RuntimeError("unavailable")
+
+        counters.record_project(db, after={"name": "P"})
+
+
+class TestReadDashboard:
+    def test_sums_shards(self):
+        db = Mock()
+        db.collection.return_value.document.return_value.get.return_value = _marker()
+        db.collection.return_value.document.return_value.collection.return_value.stream.return_value = [
+            _doc("0", {"totals": {"users": 3, "tasks": 2}, "tasks_by_status": {"To Do": 2}}),
+            _doc("5", {"totals": {"users": -1}, "tasks_by_status": {"To Do": -1, "Completed": 1}}),
+        ]
+
+        stats = counters.read_dashboard(db)
+
+        assert stats["totals"] == {"users": 2, "active_users": 0, "tasks": 2, "projects": 0}
+        assert stats["tasks_by_status"] == {"To Do": 1, "Completed": 1}
+
+    def test_unseeded_returns_none(self):
+        db = Mock()
+        db.collection.return_value.document.return_value.get.return_value = _marker(None)
+        db.collection.return_value.document.return_value.collection.return_value.stream.return_value = []
+
+        assert counters.read_dashboard(db) is None
+
+    def test_shards_written_before_seeding_are_not_trusted(self):
+        db = Mock()
+        counter = db.collection.return_value.document.return_value
+        counter.get.return_value = _marker(None)
+        counter.collection.return_value.stream.return_value = [_doc("2", {"totals": {"tasks": -1}})]
+
+        assert counters.read_dashboard(db) is None
+        counter.collection.return_value.stream.assert_not_called()
+
+
+class TestRebuild:
+    def test_recounts_into_shard_zero_and_drops_the_rest(self):
+        db = Mock()
+        shards = Mock()
+        stale = _doc("3", {})
+        shards.stream.return_value = [_doc("0", {}), stale]
+        docs = {
+            "users": [_doc("u1", {"role": "staff"}), _doc("u2", {"role": "admin", "is_active": False})],
+            "tasks": [_doc("t1", {"status": "Completed", "priority": 1}), _doc("t2", {})],
+            "projects": [_doc("p1", {})],
+        }
+
+        def collection(name):
+            coll = Mock()
+            if name == "counters":
+                coll.document.return_value.collection.return_value = shards
+            else:
+                coll.stream.return_value = docs[name]
+            return coll
+
+        db.collection.side_effect = collection
+
+        totals = counters.rebuild(db)
+
+        assert totals["totals"] == {"users": 2, "active_users": 1, "tasks": 2, "projects": 1}
+        assert totals["users_by_role"] == {"staff": 1, "admin": 1}
+        assert totals["tasks_by_status"] == {"Completed": 1, "To Do": 1}
+        assert totals["tasks_by_priority"] == {"Priority 1": 1, "Priority 5": 1}
+        batch = db.batch.return_value
+        (shard_write, marker_write) = batch.set.call_args_list
+        assert shard_write.args == (shards.document.return_value, totals)
+        shards.document.assert_called_once_with("0")
+        batch.delete.assert_called_once_with(stale.reference)
+        # Seeded in the same commit as the fresh totals
+        assert set(marker_write.args[1]) == {"seeded_at"}
+        assert marker_write.kwargs == {"merge": True}
+        batch.commit.assert_called_once()
+
+
+class TestCheckDrift:
+    def _db(self, shard_totals, docs):
+        db = Mock()
+
+        def collection(name):
+            if name == "counters":
+                coll = Mock()
+                coll.document.return_value.get.return_value = _marker()
+                coll.document.return_value.collection.return_value.stream.return_value = [
+                    _doc("0", {"totals": shard_totals})]
+                return coll
+            coll = chain_paging(Mock())
+            coll.stream.return_value = docs.get(name, [])
+            return coll
+
+        db.collection.side_effect = collection
+        return db
+
+    def test_reports_only_totals_that_differ(self):
+        db = self._db({"users": 2, "active_users": 2, "tasks": 3, "projects": 1}, {
+            "users": [_doc("u1", {}), _doc("u2", {"is_active": False})],
+            "tasks": [_doc("t1", {}), _doc("t2", {}), _doc("t3", {})],
+            "projects": [_doc("p1", {})],
+        })
+
+        assert counters.check_drift(db) == {"active_users": {"stored": 2, "counted": 1}}
+        db.batch.assert_not_called()
+
+    def test_unseeded_counters_are_not_checked(self):
+        db = Mock()
+        db.collection.return_value.document.return_value.get.return_value = _marker(None)
+
+        assert counters.check_drift(db) is None
+
+
+class TestAdminDashboard:
+    def test_served_from_counters_without_streaming_collections(self, client, mock_db, monkeypatch):
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        admin = Mock(exists=True)
+        admin.to_dict.return_value = {"role": "admin", "name": "Admin"}
+        shard = _doc("0", {
+            "totals": {"users": 4, "active_users": 3, "tasks": 7, "projects": 2},
+            "users_by_role": {"staff": 3, "hr": 1},
+            "tasks_by_status": {"To Do": 7},
+            "tasks_by_priority": {"Priority 5": 7},
+        })
+        collections = {}
+
+        def collection(name):
+            if name not in collections:
+                coll = Mock()
+                coll.document.return_value.get.return_value = _marker() if name == "counters" else admin
+                coll.document.return_value.collection.return_value.stream.return_value = [shard]
+                recent = coll.order_by.return_value.limit.return_value
+                recent.stream.return_value = [_doc(f"{name}-1", {"name": "x"})]
+                collections[name] = coll
+            return collections[name]
+
+        mock_db.collection.side_effect = collection
+
+        response = client.get("/api/admin/dashboard", headers={"X-User-Id": "admin1"})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["statistics"]["total_users"] == 4
+        assert data["statistics"]["inactive_users"] == 1
+        assert data["statistics"]["users_by_role"] == {"staff": 3, "manager": 0, "admin": 0, "hr": 1}
+        assert data["statistics"]["total_tasks"] == 7
+        assert data["recent_projects"] == [{"name": "x", "project_id": "projects-1"}]
+        collections["tasks"].order_by.assert_called_once_with("created_at", direction="DESCENDING")
+        collections["tasks"].order_by.return_value.limit.assert_called_once_with(20)
+        for name in ("users", "tasks", "projects"):
+            collections[name].stream.assert_not_called()
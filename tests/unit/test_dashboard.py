@@ -2,7 +2,7 @@ import sys
 from unittest.mock import Mock
 from datetime import datetime, timezone, timedelta
 import pytest
-from conftest import make_tasks_collection  # type: ignore
+from conftest import make_tasks_collection, participants_query  # type: ignore
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
@@ -88,9 +88,11 @@ class TestUserDashboard:
         # Mock empty task collections
         mock_created_where = Mock()
         mock_created_where.stream = Mock(return_value=[])
+        mock_created_where.select = Mock(return_value=mock_created_where)
         
         mock_assigned_where = Mock()
         mock_assigned_where.stream = Mock(return_value=[])
+        mock_assigned_where.select = Mock(return_value=mock_assigned_where)
         
         mock_task_collection = Mock()
         def where_side_effect(field=None, op=None, value=None, filter=None):
@@ -98,6 +100,8 @@ class TestUserDashboard:
             if filter is not None:
                 field = getattr(filter, "field_path", field)
                 value = getattr(filter, "value", value)
+            if field == "participant_ids":
+                return participants_query(mock_created_where, mock_assigned_where)
             if "created_by" in field:
                 return mock_created_where
             elif "assigned_to" in field:
@@ -150,9 +154,11 @@ class TestUserDashboard:
         # Mock task collections
         mock_created_where = Mock()
         mock_created_where.stream = Mock(return_value=[mock_task1, mock_task2])
+        mock_created_where.select = Mock(return_value=mock_created_where)
         
         mock_assigned_where = Mock()
         mock_assigned_where.stream = Mock(return_value=[])
+        mock_assigned_where.select = Mock(return_value=mock_assigned_where)
         
         mock_task_collection = Mock()
         def where_side_effect(field=None, op=None, value=None, filter=None):
@@ -160,6 +166,8 @@ class TestUserDashboard:
             if filter is not None:
                 field = getattr(filter, "field_path", field)
                 value = getattr(filter, "value", value)
+            if field == "participant_ids":
+                return participants_query(mock_created_where, mock_assigned_where)
             if "created_by" in field:
                 return mock_created_where
             elif "assigned_to" in field:
@@ -204,9 +212,11 @@ class TestUserDashboard:
         # Mock task collections
         mock_created_where = Mock()
         mock_created_where.stream = Mock(return_value=[])
+        mock_created_where.select = Mock(return_value=mock_created_where)
         
         mock_assigned_where = Mock()
         mock_assigned_where.stream = Mock(return_value=[mock_task1])
+        mock_assigned_where.select = Mock(return_value=mock_assigned_where)
         
         mock_task_collection = Mock()
         def where_side_effect(field=None, op=None, value=None, filter=None):
@@ -214,6 +224,8 @@ class TestUserDashboard:
             if filter is not None:
                 field = getattr(filter, "field_path", field)
                 value = getattr(filter, "value", value)
+            if field == "participant_ids":
+                return participants_query(mock_created_where, mock_assigned_where)
             if "created_by" in field:
                 return mock_created_where
             elif "assigned_to" in field:
@@ -289,9 +301,11 @@ class TestUserDashboard:
         # Mock task collections
         mock_created_where = Mock()
         mock_created_where.stream = Mock(return_value=[mock_overdue, mock_completed_late, mock_future, mock_no_due])
+        mock_created_where.select = Mock(return_value=mock_created_where)
         
         mock_assigned_where = Mock()
         mock_assigned_where.stream = Mock(return_value=[])
+        mock_assigned_where.select = Mock(return_value=mock_assigned_where)
         
         mock_task_collection = Mock()
         def where_side_effect(field=None, op=None, value=None, filter=None):
@@ -299,6 +313,8 @@ class TestUserDashboard:
             if filter is not None:
                 field = getattr(filter, "field_path", field)
                 value = getattr(filter, "value", value)
+            if field == "participant_ids":
+                return participants_query(mock_created_where, mock_assigned_where)
             if "created_by" in field:
                 return mock_created_where
             elif "assigned_to" in field:
@@ -335,16 +351,19 @@ class TestUserDashboard:
                 "status": "To Do",
                 "priority": "Medium",
                 "created_at": f"2025-10-{19-i:02d}T10:00:00+00:00",
-                "created_by": {"user_id": "u1"}
+                "created_by": {"user_id": "u1"},
+                "assigned_to": {"user_id": "u1"}
             }
             mock_tasks.append(task)
         
         # Mock task collections
         mock_created_where = Mock()
         mock_created_where.stream = Mock(return_value=mock_tasks)
+        mock_created_where.select = Mock(return_value=mock_created_where)
         
         mock_assigned_where = Mock()
         mock_assigned_where.stream = Mock(return_value=mock_tasks)  # Same for assigned
+        mock_assigned_where.select = Mock(return_value=mock_assigned_where)
         
         mock_task_collection = Mock()
         def where_side_effect(field=None, op=None, value=None, filter=None):
@@ -352,6 +371,8 @@ class TestUserDashboard:
             if filter is not None:
                 field = getattr(filter, "field_path", field)
                 value = getattr(filter, "value", value)
+            if field == "participant_ids":
+                return participants_query(mock_created_where, mock_assigned_where)
             if "created_by" in field:
                 return mock_created_where
             elif "assigned_to" in field:
@@ -422,9 +443,11 @@ class TestUserDashboard:
         # Mock task collections
         mock_created_where = Mock()
         mock_created_where.stream = Mock(return_value=[mock_task_valid, mock_task_null, mock_task_missing])
+        mock_created_where.select = Mock(return_value=mock_created_where)
         
         mock_assigned_where = Mock()
         mock_assigned_where.stream = Mock(return_value=[])
+        mock_assigned_where.select = Mock(return_value=mock_assigned_where)
         
         mock_task_collection = Mock()
         def where_side_effect(field=None, op=None, value=None, filter=None):
@@ -432,6 +455,8 @@ class TestUserDashboard:
             if filter is not None:
                 field = getattr(filter, "field_path", field)
                 value = getattr(filter, "value", value)
+            if field == "participant_ids":
+                return participants_query(mock_created_where, mock_assigned_where)
             if "created_by" in field:
                 return mock_created_where
             elif "assigned_to" in field:
@@ -491,9 +516,11 @@ class TestEdgeCases:
         
         mock_created_where = Mock()
         mock_created_where.stream = Mock(return_value=[mock_task])
+        mock_created_where.select = Mock(return_value=mock_created_where)
         
         mock_assigned_where = Mock()
         mock_assigned_where.stream = Mock(return_value=[])
+        mock_assigned_where.select = Mock(return_value=mock_assigned_where)
         
         mock_task_collection = Mock()
         def where_side_effect(field=None, op=None, value=None, filter=None):
@@ -501,6 +528,8 @@ class TestEdgeCases:
             if filter is not None:
                 field = getattr(filter, "field_path", field)
                 value = getattr(filter, "value", value)
+            if field == "participant_ids":
+                return participants_query(mock_created_where, mock_assigned_where)
             if "created_by" in field:
                 return mock_created_where
             elif "assigned_to" in field:
@@ -538,9 +567,11 @@ class TestEdgeCases:
         
         mock_created_where = Mock()
         mock_created_where.stream = Mock(return_value=[])
+        mock_created_where.select = Mock(return_value=mock_created_where)
         
         mock_assigned_where = Mock()
         mock_assigned_where.stream = Mock(return_value=[])
+        mock_assigned_where.select = Mock(return_value=mock_assigned_where)
         
         mock_task_collection = Mock()
         def where_side_effect(field=None, op=None, value=None, filter=None):
@@ -548,6 +579,8 @@ class TestEdgeCases:
             if filter is not None:
                 field = getattr(filter, "field_path", field)
                 value = getattr(filter, "value", value)
+            if field == "participant_ids":
+                return participants_query(mock_created_where, mock_assigned_where)
             if "created_by" in field:
                 return mock_created_where
             elif "assigned_to" in field:
@@ -693,7 +726,7 @@ class TestDashboardTimelineMode:
                 mock_collection.document.return_value = mock_doc_ref
             elif col_name == "tasks":
                 mock_query = Mock()
-                mock_query.where.return_value.stream.return_value = [unknown_status_task]
+                mock_query.where.return_value.select.return_value.stream.return_value = [unknown_status_task]
                 mock_collection.where = mock_query.where
             return mock_collection
         
@@ -701,7 +734,7 @@ class TestDashboardTimelineMode:
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
         
         # Patch enrich_task_with_timeline_status to return a task with unknown status
-        def mock_enrich(task):
+        def mock_enrich(task, due_dt=None):
             task["timeline_status"] = "unknown_custom_status"  # Not in timeline dict
             return task
         
@@ -87,7 +87,7 @@ class TestEnrichTaskEdgeCases:
         assert result["is_upcoming"] is False
     
     def test_due_date_invalid_string_format(self):
-        """Test due_date with invalid string format that _safe_iso_to_dt returns None"""
+        """Test due_date with invalid string format that due_dates.due_at returns None"""
         task = {
             "task_id": "task-789",
             "title": "Test Task",
@@ -117,6 +117,20 @@ class TestEnrichTaskEdgeCases:
         assert result["is_overdue"] is False
         assert result["is_upcoming"] is False
 
+    def test_due_ts_wins_over_due_date_string(self):
+        """The canonical due instant is used instead of re-parsing due_date"""
+        task = {
+            "task_id": "task-ts1",
+            "title": "Test Task",
+            "status": "To Do",
+            "due_date": "2000-01-01T00:00",
+        }
+        
+        result = enrich_task_with_timeline_status(task, datetime.now(timezone.utc) + timedelta(days=10))
+        
+        assert result["timeline_status"] == "future"
+        assert result["is_overdue"] is False
+
 
 class TestDetectConflictsEdgeCases:
     """Test edge cases in detect_conflicts function"""
@@ -0,0 +1,274 @@
+"""Unit tests for backend/api/data_access.py (request-scoped identity map)"""
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock
+from flask import Flask
+
+from backend.api import data_access
+
+
+def _snapshot(data, exists=True, doc_id="doc1"):
+    snap = Mock()
+    snap.exists = exists
+    snap.id = doc_id
+    snap.to_dict.return_value = data
+    return snap
+
+
+@pytest.fixture
+def ctx():
+    app = Flask("data_access_test")
+    with app.app_context():
+        yield
+
+
+class TestGetDoc:
+    def test_reads_once_per_request(self, ctx):
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.return_value = _snapshot({"role": "manager"})
+
+        first = data_access.get_doc(db, "users", "u1")
+        second = data_access.get_doc(db, "users", "u1")
+
+        assert first is second
+        assert ref.get.call_count == 1
+
+    def test_keys_by_collection_and_id(self, ctx):
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.side_effect = [_snapshot({"a": 1}), _snapshot({"b": 2}), _snapshot({"c": 3})]
+
+        data_access.get_doc(db, "users", "u1")
+        data_access.get_doc(db, "tasks", "u1")
+        data_access.get_doc(db, "users", "u2")
+
+        assert ref.get.call_count == 3
+
+    def test_uses_supplied_ref(self, ctx):
+        db = Mock()
+        ref = Mock()
+        ref.get.return_value = _snapshot({"title": "T"})
+
+        snap = data_access.get_doc(db, "tasks", "t1", ref=ref)
+
+        assert snap.to_dict() == {"title": "T"}
+        db.collection.assert_not_called()
+
+    def test_no_caching_outside_app_context(self):
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.return_value = _snapshot({})
+
+        data_access.get_doc(db, "users", "u1")
+        data_access.get_doc(db, "users", "u1")
+
+        assert ref.get.call_count == 2
+
+    def test_each_request_starts_empty(self):
+        app = Flask("data_access_test")
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.return_value = _snapshot({})
+
+        with app.app_context():
+            data_access.get_doc(db, "users", "u1")
+        with app.app_context():
+            data_access.get_doc(db, "users", "u1")
+
+        assert ref.get.call_count == 2
+
+
+class TestGetDocs:
+    @staticmethod
+    def _db(docs):
+        """Fake client whose get_all returns the existing docs in reverse order."""
+        db = Mock()
+        db.collection.return_value.document.side_effect = lambda doc_id: doc_id
+        db.get_all.side_effect = lambda refs: [
+            _snapshot(docs[ref], doc_id=ref) for ref in reversed(refs) if ref in docs
+        ]
+        return db
+
+    def test_preserves_order_and_marks_missing(self, ctx):
+        db = self._db({"u1": {"name": "A"}, "u3": {"name": "C"}})
+
+        snaps = data_access.get_docs(db, "users", ["u3", "u2", "u1", "u3"])
+
+        assert [s.id for s in snaps] == ["u3", "u2", "u1", "u3"]
+        assert [s.exists for s in snaps] == [True, False, True, True]
+        assert snaps[0].to_dict() == {"name": "C"}
+        assert snaps[1].to_dict() is None
+        assert db.get_all.call_count == 1
+        assert db.get_all.call_args[0][0] == ["u3", "u2", "u1"]
+
+    def test_chunks_requests(self, ctx):
+        ids = [f"u{i}" for i in range(5)]
+        db = self._db({doc_id: {} for doc_id in ids})
+
+        snaps = data_access.get_docs(db, "users", ids, chunk_size=2)
+
+        assert [s.id for s in snaps] == ids
+        assert [len(c[0][0]) for c in db.get_all.call_args_list] == [2, 2, 1]
+
+    def test_shares_identity_map_with_get_doc(self, ctx):
+        db = self._db({"u1": {"name": "A"}, "u2": {"name": "B"}})
+        db.collection.return_value.document.side_effect = None
+        ref = db.collection.return_value.document.return_value
+        ref.get.return_value = _snapshot({"name": "A"}, doc_id="u1")
+
+        data_access.get_doc(db, "users", "u1")
+        data_access.get_docs(db, "users", ["u1", "u2"])
+        data_access.get_doc(db, "users", "u2")
+
+        assert ref.get.call_count == 1
+        assert db.get_all.call_count == 1
+        assert len(db.get_all.call_args[0][0]) == 1
+
+    def test_empty_ids_skip_round_trip(self, ctx):
+        db = self._db({})
+
+        assert data_access.get_docs(db, "users", []) == []
+        db.get_all.assert_not_called()
+
+
+class TestWrites:
+    def test_note_update_merges_into_cached_snapshot(self, ctx):
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.return_value = _snapshot({"title": "Old", "status": "To Do"}, doc_id="t1")
+
+        data_access.get_doc(db, "tasks", "t1")
+        data_access.note_update("tasks", "t1", {"title": "New"})
+        snap = data_access.get_doc(db, "tasks", "t1")
+
+        assert ref.get.call_count == 1
+        assert snap.id == "t1"
+        assert snap.to_dict() == {"title": "New", "status": "To Do"}
+
+    def test_note_update_does_not_mutate_original_data(self, ctx):
+        db = Mock()
+        original = {"title": "Old"}
+        db.collection.return_value.document.return_value.get.return_value = _snapshot(original)
+
+        data_access.get_doc(db, "tasks", "t1")
+        data_access.note_update("tasks", "t1", {"title": "New"})
+
+        assert original == {"title": "Old"}
+
+    def test_note_update_with_dotted_path_evicts(self, ctx):
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.return_value = _snapshot({"assigned_to": {"user_id": "a"}})
+
+        data_access.get_doc(db, "tasks", "t1")
+        data_access.note_update("tasks", "t1", {"assigned_to.user_id": "b"})
+        data_access.get_doc(db, "tasks", "t1")
+
+        assert ref.get.call_count == 2
+
+    def test_note_update_with_transform_evicts(self, ctx):
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.return_value = _snapshot({"count": 1})
+        transform_cls = type("Increment", (), {"__module__": "google.cloud.firestore_v1.transforms"})
+
+        data_access.get_doc(db, "tasks", "t1")
+        data_access.note_update("tasks", "t1", {"count": transform_cls()})
+        data_access.get_doc(db, "tasks", "t1")
+
+        assert ref.get.call_count == 2
+
+    def test_note_update_without_cached_entry_is_noop(self, ctx):
+        data_access.note_update("tasks", "missing", {"title": "x"})
+        db = Mock()
+        db.collection.return_value.document.return_value.get.return_value = _snapshot({"title": "db"})
+
+        assert data_access.get_doc(db, "tasks", "missing").to_dict() == {"title": "db"}
+
+    def test_note_set_and_delete(self, ctx):
+        db = Mock()
+
+        data_access.note_set("memberships", "p1_u1", {"role": "owner"})
+        assert data_access.get_doc(db, "memberships", "p1_u1").to_dict() == {"role": "owner"}
+
+        data_access.note_delete("memberships", "p1_u1")
+        snap = data_access.get_doc(db, "memberships", "p1_u1")
+        assert snap.exists is False
+        assert snap.to_dict() is None
+        db.collection.assert_not_called()
+
+
+class TestApplyUpdate:
+    def test_merges_without_reading_back(self, ctx):
+        ref = Mock()
+        written = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+        ref.update.return_value = Mock(update_time=written)
+        snap = _snapshot({"name": "Old", "key": "P"}, doc_id="p1")
+
+        updated = data_access.apply_update(ref, snap, {"name": "New"})
+
+        ref.update.assert_called_once_with({"name": "New"})
+        ref.get.assert_not_called()
+        assert updated.id == "p1"
+        assert updated.to_dict() == {"name": "New", "key": "P"}
+        assert data_access.version(updated) == written.isoformat()
+
+    def test_folds_write_into_identity_map(self, ctx):
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.return_value = _snapshot({"body": "old"}, doc_id="n1")
+        snap = data_access.get_doc(db, "notes", "n1")
+
+        data_access.apply_update(ref, snap, {"body": "new"}, "notes")
+
+        assert data_access.get_doc(db, "notes", "n1").to_dict() == {"body": "new"}
+        assert ref.get.call_count == 1
+
+    def test_version_unknown_without_update_time(self):
+        assert data_access.version(data_access.merged(_snapshot({}), {"a": 1})) is None
+
+
+class TestEndpointsShareReads:
+    def test_get_task_shares_user_reads(self, client, mock_db, monkeypatch):
+        """Creator and assignee lookups in _can_view_task_doc share one read."""
+        import sys
+        fake_firestore = sys.modules.get("firebase_admin.firestore")
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+
+        task = _snapshot({
+            "title": "T",
+            "created_by": {"user_id": "c1"},
+            "assigned_to": {"user_id": "c1"},
+        }, doc_id="t1")
+        docs = {
+            "v1": _snapshot({"role": "manager"}, doc_id="v1"),
+            "c1": _snapshot({"manager_id": "someone_else"}, doc_id="c1"),
+        }
+        reads = {"users": 0}
+
+        def collection(name):
+            coll = Mock()
+            if name == "tasks":
+                coll.document.return_value.get.return_value = task
+            elif name == "users":
+                def document(user_id):
+                    ref = Mock()
+
+                    def get():
+                        reads["users"] += 1
+                        return docs[user_id]
+                    ref.get.side_effect = get
+                    return ref
+                coll.document.side_effect = document
+            else:
+                coll.document.return_value.get.return_value = _snapshot({}, exists=False)
+            return coll
+
+        mock_db.collection.side_effect = collection
+
+        resp = client.get("/api/tasks/t1", headers={"X-User-Id": "v1"})
+
+        assert resp.status_code == 404
+        # viewer + creator; the assignee is the same user and comes from the map
+        assert reads["users"] == 2
@@ -0,0 +1,133 @@
+"""Unit tests for backend/api/due_dates.py"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+from backend.api import due_dates
+
+UTC_0830 = datetime(2025, 10, 29, 8, 30, tzinfo=timezone.utc)
+
+
+def _doc(doc_id, data):
+    doc = Mock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return doc
+
+
+def _snap(data):
+    snap = Mock()
+    snap.exists = data is not None
+    snap.to_dict.return_value = data
+    return snap
+
+
+class TestParseDue:
+    def test_stored_formats_give_the_same_instant(self):
+        for value in ("2025-10-29T08:30", "2025-10-29T08:30:00", "2025-10-29T08:30:00Z",
+                      "2025-10-29T08:30:00.000Z", "2025-10-29T08:30:00+00:00", "2025-10-29T16:30:00+08:00"):
+            assert due_dates.parse_due(value) == UTC_0830, value
+
+    def test_result_is_utc(self):
+        assert due_dates.parse_due("2025-10-29T16:30:00+08:00").utcoffset() == timedelta(0)
+        assert due_dates.parse_due(datetime(2025, 10, 29, 8, 30)) == UTC_0830
+
+    def test_empty_or_invalid(self):
+        for value in (None, "", "tomorrow", 20251029, {"date": "2025-10-29"}):
+            assert due_dates.parse_due(value) is None
+
+    def test_due_fields(self):
+        assert due_dates.due_fields("2025-10-29T08:30") == {"due_date": "2025-10-29T08:30", "due_ts": UTC_0830}
+        assert due_dates.due_fields(None) == {"due_date": None, "due_ts": None}
+
+    def test_due_at_prefers_due_ts(self):
+        assert due_dates.due_at({"due_date": "2030-01-01T00:00", "due_ts": UTC_0830}) == UTC_0830
+        # Not migrated yet: falls back to the string
+        assert due_dates.due_at({"due_date": "2025-10-29T08:30"}) == UTC_0830
+        assert due_dates.due_at(None) is None
+
+
+class TestMigrate:
+    def _db(self, checkpoint=None):
+        db = Mock()
+        tasks, migrations = Mock(), Mock()
+        migrations.document.return_value.get.return_value = _snap(checkpoint)
+        db.collection.side_effect = lambda name: tasks if name == "tasks" else migrations
+        return db, tasks, migrations.document.return_value
+
+    def test_updates_missing_and_stale_tasks_page_by_page(self):
+        db, tasks, checkpoint = self._db()
+        page = tasks.select.return_value.order_by.return_value
+        current = _doc("t1", {"due_date": "2025-10-29T08:30", "due_ts": UTC_0830})
+        missing = _doc("t2", {"due_date": "2025-10-29T08:30:00Z"})
+        undated = _doc("t3", {"due_date": None})
+        stale = _doc("t4", {"due_date": "2025-10-29T08:30", "due_ts": UTC_0830 - timedelta(days=1)})
+        page.limit.return_value.stream.return_value = [current, missing, undated]
+        page.start_after.return_value.limit.return_value.stream.return_value = [undated, stale]
+        writer = db.bulk_writer.return_value
+
+        assert due_dates.migrate(db, page_size=2) == (4, 3, 0)
+
+        assert writer.update.call_args_list == [
+            ((missing.reference, {"due_ts": UTC_0830}),),
+            ((undated.reference, {"due_ts": None}),),
+            ((stale.reference, {"due_ts": UTC_0830}),),
+        ]
+        assert writer.flush.call_count == 2
+        writer.close.assert_called_once()
+        # Progress after each page, then reset for the next full run
+        recorded = [c.args[0]["last_id"] for c in checkpoint.set.call_args_list]
+        assert recorded == ["t2", "t4", None]
+
+    def test_failed_writes_hold_the_checkpoint(self):
+        db, tasks, checkpoint = self._db()
+        page = tasks.select.return_value.order_by.return_value
+        t1, t2, t3 = (_doc(f"t{i}", {"due_date": None}) for i in (1, 2, 3))
+        page.limit.return_value.stream.return_value = [t1, t2, t3]
+        page.start_after.return_value.limit.return_value.stream.return_value = [t3]
+        writer = db.bulk_writer.return_value
+        failures = [Mock(attempts=1), Mock(attempts=due_dates.WRITE_ATTEMPTS)]
+
+        def flush():
+            # The first page's second write is retried, then given up on
+            on_error = writer.on_write_error.call_args[0][0]
+            if writer.flush.call_count == 1:
+                assert [on_error(failure, writer) for failure in failures] == [True, False]
+
+        writer.flush.side_effect = flush
+
+        assert due_dates.migrate(db, page_size=2) == (3, 2, 1)
+
+        # Neither the failed page nor the later ones are recorded as done
+        checkpoint.set.assert_not_called()
+        writer.close.assert_called_once()
+
+    def test_resumes_after_the_recorded_task(self):
+        db, tasks, _ = self._db(checkpoint={"last_id": "t7"})
+        page = tasks.select.return_value.order_by.return_value
+        page.start_after.return_value.limit.return_value.stream.return_value = []
+
+        assert due_dates.migrate(db) == (0, 0, 0)
+
+        position = page.start_after.call_args[0][0]
+        tasks.document.assert_called_with("t7")
+        assert list(position.values()) == [tasks.document.return_value]
+
+    def test_restart_ignores_the_recorded_task(self):
+        db, tasks, checkpoint = self._db(checkpoint={"last_id": "t7"})
+        page = tasks.select.return_value.order_by.return_value
+        page.limit.return_value.stream.return_value = []
+
+        due_dates.migrate(db, restart=True)
+
+        checkpoint.get.assert_not_called()
+        page.start_after.assert_not_called()
+
+    def test_dry_run_writes_nothing(self):
+        db, tasks, checkpoint = self._db()
+        page = tasks.select.return_value.order_by.return_value
+        page.limit.return_value.stream.return_value = [_doc("t1", {"due_date": "2025-10-29T08:30"})]
+
+        assert due_dates.migrate(db, dry_run=True) == (1, 1, 0)
+
+        db.bulk_writer.assert_not_called()
+        checkpoint.set.assert_not_called()
@@ -36,6 +36,8 @@ class TestManagerEdgeCasesFull:
                 mock_task_doc.to_dict.return_value = {"project_id": "proj1", "title": "Task"}
                 mock_coll.document.return_value.get.return_value = mock_task_doc
                 mock_coll.document.return_value.update = Mock()
+            elif name == "memberships":
+                mock_coll.where.return_value.stream.return_value = []
             elif name == "users":
                 # Mock the where().stream() for direct staff query
                 mock_where = Mock()
@@ -0,0 +1,128 @@
+"""Unit tests for backend/api/email_outbox.py"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+
+from backend.api import email_outbox
+
+
+def _snap(data, doc_id="n1"):
+    snap = Mock()
+    snap.id = doc_id
+    snap.exists = data is not None
+    snap.to_dict.return_value = data
+    return snap
+
+
+def _iso(**delta):
+    return (datetime.now(timezone.utc) + timedelta(**delta)).isoformat()
+
+
+@pytest.fixture
+def send(monkeypatch):
+    send = Mock(return_value=True)
+    monkeypatch.setattr(email_outbox, "send_email", send)
+    return send
+
+
+class TestClaim:
+    def test_due_item_is_leased(self):
+        transaction, ref = Mock(), Mock()
+        ref.get.return_value = _snap({"status": "pending", "next_attempt_at": _iso(seconds=-1)})
+
+        data = email_outbox._claim_in_transaction(transaction, ref)
+
+        assert data["status"] == "pending"
+        updates = transaction.update.call_args[0][1]
+        assert updates["status"] == "sending"
+        assert updates["next_attempt_at"] > _iso(seconds=email_outbox.LEASE_SECONDS - 5)
+
+    def test_leased_or_finished_items_are_skipped(self):
+        transaction, ref = Mock(), Mock()
+        for data in (
+            {"status": "sending", "next_attempt_at": _iso(seconds=60)},
+            {"status": "sent", "next_attempt_at": None},
+            {"status": "dead", "next_attempt_at": None},
+        ):
+            ref.get.return_value = _snap(data)
+            assert email_outbox._claim_in_transaction(transaction, ref) is None
+        transaction.update.assert_not_called()
+
+    def test_expired_lease_is_reclaimed(self):
+        transaction, ref = Mock(), Mock()
+        ref.get.return_value = _snap({"status": "sending", "next_attempt_at": _iso(seconds=-1)})
+
+        assert email_outbox._claim_in_transaction(transaction, ref) is not None
+
+
+class TestDeliver:
+    def test_success_marks_item_and_notification(self, send):
+        db, ref = Mock(), Mock()
+        item = email_outbox.new_item("n1", "a@example.com", "Subject", "Body")
+
+        assert email_outbox.deliver(db, ref, item) == "sent"
+
+        send.assert_called_once_with("a@example.com", "Subject", "Body")
+        batch = db.batch.return_value
+        (item_ref, item_updates), (notif_ref, notif_updates) = [c.args for c in batch.update.call_args_list]
+        assert item_ref is ref
+        assert item_updates["status"] == "sent" and item_updates["next_attempt_at"] is None
+        db.collection.assert_called_with("notifications")
+        assert notif_updates["email_sent"] is True and notif_updates["email_sent_at"]
+        batch.commit.assert_called_once()
+
+    def test_failure_backs_off(self, send):
+        send.return_value = False
+        db, ref = Mock(), Mock()
+
+        status = email_outbox.deliver(db, ref, {"notification_id": "n1", "attempts": 2})
+
+        assert status == "pending"
+        updates = ref.update.call_args[0][0]
+        assert updates["attempts"] == 3
+        assert updates["last_error"] == "send failed"
+        # Third attempt waits ~4x the base delay
+        assert updates["next_attempt_at"] > _iso(seconds=email_outbox.BACKOFF_BASE_SECONDS * 4 * 0.9 - 5)
+        db.batch.assert_not_called()
+
+    def test_exhausted_item_is_dead_lettered(self, send):
+        send.side_effect = Exception("connection refused")
+        db, ref = Mock(), Mock()
+
+        status = email_outbox.deliver(db, ref, {"attempts": email_outbox.MAX_ATTEMPTS - 1})
+
+        assert status == "dead"
+        updates = ref.update.call_args[0][0]
+        assert updates["next_attempt_at"] is None
+        assert updates["last_error"] == "connection refused"
+
+    def test_backoff_is_capped(self):
+        assert email_outbox.backoff_seconds(50) <= email_outbox.BACKOFF_MAX_SECONDS * 1.1
+
+
+class TestDispatch:
+    def test_submits_claimed_items_up_to_capacity(self, monkeypatch):
+        worker = email_outbox.OutboxWorker(workers=1)
+        worker._db = Mock()
+        worker._executor = Mock()
+        docs = [_snap({}, doc_id=f"n{i}") for i in range(4)]
+        monkeypatch.setattr(email_outbox, "due_items", Mock(return_value=docs))
+        monkeypatch.setattr(email_outbox, "claim", lambda db, ref: None if ref is docs[0].reference else {})
+
+        assert worker.dispatch() == 2
+
+        submitted = [c.args[1] for c in worker._executor.submit.call_args_list]
+        assert submitted == ["n1", "n2"]
+        assert worker.dispatch() == 0
+
+    def test_finished_delivery_frees_its_slot(self, monkeypatch):
+        worker = email_outbox.OutboxWorker(workers=1)
+        worker._db = Mock()
+        worker._inflight.add("n1")
+        monkeypatch.setattr(email_outbox, "deliver", Mock(side_effect=Exception("boom")))
+
+        worker._deliver("n1", Mock(), {})
+
+        assert worker._inflight == set()
+        assert worker._wake.is_set()
@@ -0,0 +1,105 @@
+"""Unit tests for backend/email_utils.py against the local SMTP stub"""
+import pytest
+
+# Imported by package path: conftest replaces the top-level `email_utils`
+from backend import email_utils
+from backend.smtp_stub import StubSMTPServer
+
+
+@pytest.fixture
+def stub():
+    with StubSMTPServer() as server:
+        yield server
+
+
+def _pool(stub, **kwargs):
+    kwargs.setdefault("email_from", "app@example.com")
+    return email_utils.SMTPPool(stub.host, stub.port, starttls=False, **kwargs)
+
+
+class TestSMTPPool:
+    def test_send_many_reuses_one_session(self, stub):
+        pool = _pool(stub, user="app", password="secret")
+
+        results = pool.send_many([(f"u{i}@example.com", f"Subject {i}", "Body") for i in range(5)])
+
+        assert results == [True] * 5
+        assert stub.connections == 1
+        assert stub.commands["AUTH"] == 1
+        assert [m["Subject"] for m in stub.messages] == [f"Subject {i}" for i in range(5)]
+        assert stub.envelopes[0] == ("app@example.com", ["u0@example.com"])
+        pool.close()
+
+    def test_sessions_are_kept_between_calls(self, stub):
+        pool = _pool(stub)
+
+        assert pool.send("a@example.com", "One", "Body") is True
+        assert pool.send("b@example.com", "Two", "Body") is True
+
+        assert stub.connections == 1
+        assert pool.connections_opened == 1
+        pool.close()
+
+    def test_refused_recipient_does_not_break_the_batch(self, stub):
+        stub.reject.add("bad@example.com")
+        pool = _pool(stub)
+
+        results = pool.send_many([
+            ("a@example.com", "One", "Body"),
+            ("bad@example.com", "Two", "Body"),
+            ("c@example.com", "Three", "Body"),
+        ])
+
+        assert results == [True, False, True]
+        assert stub.connections == 1
+        pool.close()
+
+    def test_reconnects_after_server_hangs_up(self, stub):
+        pool = _pool(stub)
+        assert pool.send("a@example.com", "One", "Body") is True
+
+        stub.drop_connections()
+
+        assert pool.send("b@example.com", "Two", "Body") is True
+        assert stub.connections == 2
+        assert stub.wait_for(2)
+        pool.close()
+
+    def test_idle_session_is_checked_with_noop(self, stub):
+        pool = _pool(stub, keepalive_seconds=0)
+        pool.send("a@example.com", "One", "Body")
+
+        pool.send("b@example.com", "Two", "Body")
+
+        assert stub.commands["NOOP"] == 1
+        assert stub.connections == 1
+        pool.close()
+
+    def test_unreachable_server_fails_every_message(self, stub):
+        pool = _pool(stub)
+        stub.stop()
+
+        assert pool.send_many([("a@example.com", "One", "Body"), ("b@example.com", "Two", "Body")]) == [False, False]
+
+
+class TestSendEmail:
+    def test_send_email_uses_env_pool(self, stub, monkeypatch):
+        monkeypatch.setenv("SMTP_HOST", stub.host)
+        monkeypatch.setenv("SMTP_PORT", str(stub.port))
+        monkeypatch.setenv("SMTP_USER", "app@example.com")
+        monkeypatch.setenv("SMTP_PASSWORD", "secret")
+        monkeypatch.setenv("SMTP_STARTTLS", "false")
+        try:
+            assert email_utils.send_email("a@example.com", "One", "Body") is True
+            assert email_utils.send_many([("b@example.com", "Two", "Body")]) == [True]
+        finally:
+            email_utils.close_pool()
+
+        assert stub.connections == 1
+        assert stub.messages[0]["From"] == "app@example.com"
+
+    def test_not_configured(self, monkeypatch):
+        monkeypatch.delenv("SMTP_HOST", raising=False)
+
+        assert email_utils.send_email("a@example.com", "One", "Body") is False
+        assert email_utils.send_many([("a@example.com", "One", "Body")] * 2) == [False, False]
@@ -0,0 +1,193 @@
+"""Unit tests for backend/api/jobs.py"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+
+from backend.api import jobs
+
+
+def _snap(data):
+    snap = Mock()
+    snap.exists = data is not None
+    snap.to_dict.return_value = data
+    return snap
+
+
+def _iso(**delta):
+    return (datetime.now(timezone.utc) + timedelta(**delta)).isoformat()
+
+
+class TestLease:
+    def test_free_lease_is_taken(self):
+        transaction, ref = Mock(), Mock()
+        ref.get.return_value = _snap(None)
+
+        assert jobs._acquire_in_transaction(transaction, ref, "me", 60) is True
+
+        data = transaction.set.call_args[0][1]
+        assert data["owner"] == "me"
+        assert data["acquired_at"] == data["renewed_at"]
+        assert data["expires_at"] > _iso(seconds=55)
+
+    def test_lease_held_by_another_instance_is_refused(self):
+        transaction, ref = Mock(), Mock()
+        ref.get.return_value = _snap({"owner": "other", "expires_at": _iso(seconds=30)})
+
+        assert jobs._acquire_in_transaction(transaction, ref, "me", 60) is False
+        transaction.set.assert_not_called()
+
+    def test_expired_lease_is_taken_over(self):
+        transaction, ref = Mock(), Mock()
+        ref.get.return_value = _snap({"owner": "other", "expires_at": _iso(seconds=-1)})
+
+        assert jobs._acquire_in_transaction(transaction, ref, "me", 60) is True
+        assert transaction.set.call_args[0][1]["owner"] == "me"
+
+    def test_renewal_keeps_acquired_at(self):
+        transaction, ref = Mock(), Mock()
+        ref.get.return_value = _snap({"owner": "me", "acquired_at": "2025-01-01T00:00:00+00:00",
+                                      "expires_at": _iso(seconds=30)})
+
+        assert jobs._acquire_in_transaction(transaction, ref, "me", 60) is True
+        assert transaction.set.call_args[0][1]["acquired_at"] == "2025-01-01T00:00:00+00:00"
+
+    def test_release_only_deletes_own_lease(self):
+        transaction, ref = Mock(), Mock()
+        ref.get.return_value = _snap({"owner": "other"})
+        jobs._release_in_transaction(transaction, ref, "me")
+        transaction.delete.assert_not_called()
+
+        ref.get.return_value = _snap({"owner": "me"})
+        jobs._release_in_transaction(transaction, ref, "me")
+        transaction.delete.assert_called_once_with(ref)
+
+
+class TestRunJob:
+    def test_success_records_result_and_duration(self):
+        db = Mock()
+        job = jobs.Job("sample", Mock(return_value={"sent": 3}), "interval", {"minutes": 5}, False, "")
+
+        assert jobs.run_job(db, job, runner="me") == jobs.OK
+
+        job.fn.assert_called_once_with(db)
+        db.collection.assert_called_with(jobs.JOBS_COLLECTION)
+        ref = db.collection.return_value.document.return_value
+        (started,), (finished,) = [c.args for c in ref.set.call_args_list]
+        assert started["status"] == jobs.RUNNING and started["runner"] == "me"
+        assert finished["status"] == jobs.OK
+        assert finished["last_result"] == {"sent": 3}
+        assert finished["last_error"] is None
+        assert finished["last_duration_ms"] >= 0
+        assert finished["failures"] == 0
+
+    def test_failure_is_recorded(self):
+        db = Mock()
+        job = jobs.Job("sample", Mock(side_effect=Exception("boom")), "interval", {"minutes": 5}, False, "")
+
+        assert jobs.run_job(db, job) == jobs.ERROR
+
+        finished = db.collection.return_value.document.return_value.set.call_args[0][0]
+        assert finished["status"] == jobs.ERROR
+        assert finished["last_error"] == "boom"
+        assert finished["failures"] == 1
+
+
+class TestDashboardCounterDrift:
+    def test_drift_is_reported_without_rebuilding(self, monkeypatch):
+        drift = {"tasks": {"stored": 7, "counted": 6}}
+        monkeypatch.setattr(jobs.counters, "check_drift", Mock(return_value=drift))
+        rebuild = Mock()
+        monkeypatch.setattr(jobs.counters, "rebuild", rebuild)
+
+        assert jobs.JOBS["dashboard_counter_drift"].fn(Mock()) == {"seeded": True, "drift": drift}
+        rebuild.assert_not_called()
+
+    def test_unseeded_counters_are_left_alone(self, monkeypatch):
+        monkeypatch.setattr(jobs.counters, "check_drift", Mock(return_value=None))
+
+        assert jobs.JOBS["dashboard_counter_drift"].fn(Mock()) == {"seeded": False, "drift": {}}
+
+
+class TestJobRunner:
+    @pytest.fixture
+    def runner(self, monkeypatch):
+        runner = jobs.JobRunner()
+        runner._db = Mock()
+        run_job = Mock(return_value=jobs.OK)
+        monkeypatch.setattr(jobs, "run_job", run_job)
+        runner.run_job = run_job
+        return runner
+
+    def test_only_the_leader_runs_jobs(self, runner, monkeypatch):
+        monkeypatch.setattr(jobs, "acquire_lease", Mock(return_value=False))
+        runner.renew_lease()
+
+        assert runner.run("deadline_reminders") is None
+        runner.run_job.assert_not_called()
+
+        jobs.acquire_lease.return_value = True
+        runner.renew_lease()
+
+        assert runner.run("deadline_reminders") == jobs.OK
+        runner.run_job.assert_called_once_with(runner._db, jobs.JOBS["deadline_reminders"], runner=runner.owner)
+
+    def test_failed_renewal_gives_up_leadership(self, runner, monkeypatch):
+        monkeypatch.setattr(jobs, "acquire_lease", Mock(return_value=True))
+        runner.renew_lease()
+        assert runner.is_leader()
+
+        jobs.acquire_lease.side_effect = Exception("unavailable")
+        runner.renew_lease()
+
+        assert not runner.is_leader()
+
+    def test_start_schedules_jobs_without_blocking(self, monkeypatch):
+        monkeypatch.setattr(jobs, "acquire_lease", Mock(return_value=False))
+        monkeypatch.setattr(jobs, "release_lease", Mock())
+        runner = jobs.JobRunner()
+        try:
+            runner.start(Mock())
+            schedule = runner.schedule()
+        finally:
+            runner.stop()
+
+        assert set(schedule) == set(jobs.JOBS)
+        # The deadline check runs shortly after startup, the rollups overnight
+        assert schedule["deadline_reminders"] <= _iso(seconds=jobs.STARTUP_DELAY_SECONDS + 1)
+        assert not runner.is_running()
+        jobs.release_lease.assert_not_called()
+
+
+class TestJobsEndpoint:
+    def test_requires_admin(self, client, mock_db):
+        assert client.get("/api/admin/jobs").status_code == 401
+
+    def test_reports_lease_and_last_runs(self, client, mock_db):
+        admin = _snap({"role": "admin"})
+        lease = _snap({"owner": "host-1", "expires_at": _iso(seconds=30)})
+        run = Mock(id="deadline_reminders")
+        run.to_dict.return_value = {"status": "ok", "last_duration_ms": 812.5}
+
+        def collection(name):
+            coll = Mock()
+            if name == "users":
+                coll.document.return_value.get.return_value = admin
+            elif name == jobs.LEASE_COLLECTION:
+                coll.document.return_value.get.return_value = lease
+            elif name == jobs.JOBS_COLLECTION:
+                coll.stream.return_value = [run]
+            return coll
+
+        mock_db.collection = Mock(side_effect=collection)
+
+        response = client.get("/api/admin/jobs", headers={"X-User-Id": "admin1"})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["lease"]["owner"] == "host-1"
+        by_name = {job["name"]: job for job in data["jobs"]}
+        assert set(by_name) == set(jobs.JOBS)
+        assert by_name["deadline_reminders"]["last_duration_ms"] == 812.5
+        assert by_name["deadline_reminders"]["trigger"]["type"] == "interval"
+        assert by_name["label_counts"]["status"] is None
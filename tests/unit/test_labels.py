@@ -9,17 +9,16 @@ from backend.api import tags as labels_module
 
 class TestListTags:
     def test_list_tags_success(self, client, mock_db, monkeypatch):
-        """Test successfully listing tags from multiple tasks."""
-        mock_task1 = Mock()
-        mock_task1.id = "task1"
-        mock_task1.to_dict = Mock(return_value={"title": "Task 1", "tags": ["bug", "urgent"]})
-        
-        mock_task2 = Mock()
-        mock_task2.id = "task2"
-        mock_task2.to_dict = Mock(return_value={"title": "Task 2", "tags": ["feature", "urgent"]})
+        """Test listing tags from the tag index."""
+        entries = []
+        for tag, count in [("urgent", 2), ("bug", 1), ("feature", 1)]:
+            entry = Mock()
+            entry.id = tag
+            entry.to_dict = Mock(return_value={"tag": tag, "count": count})
+            entries.append(entry)
         
         mock_collection = Mock()
-        mock_collection.stream = Mock(return_value=[mock_task1, mock_task2])
+        mock_collection.where.return_value.stream = Mock(return_value=entries)
         mock_db.collection = Mock(return_value=mock_collection)
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -34,11 +33,13 @@ class TestListTags:
         assert "feature" in data
         assert "urgent" in data
         assert data == sorted(data)
+        mock_db.collection.assert_called_once_with("tag_index")
+        mock_collection.stream.assert_not_called()
     
     def test_list_tags_no_tasks(self, client, mock_db, monkeypatch):
-        """Test listing tags when there are no tasks."""
+        """Test listing tags when no task carries a tag."""
         mock_collection = Mock()
-        mock_collection.stream = Mock(return_value=[])
+        mock_collection.where.return_value.stream = Mock(return_value=[])
         mock_db.collection = Mock(return_value=mock_collection)
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -722,6 +722,7 @@ class TestManagerTeamTasksTimelineAndFiltering:
                         field = getattr(filter, "field_path", field)
                         value = getattr(filter, "value", value)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     if field == "user_id" and value == "manager1":
                         mock_query.stream.return_value = [mock_membership]
                     elif field == "project_id":
@@ -737,6 +738,7 @@ class TestManagerTeamTasksTimelineAndFiltering:
                         field = getattr(filter, "field_path", field)
                         value = getattr(filter, "value", value)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     def mock_where_chained(field2=None, op2=None, value2=None, filter=None):
                         if filter is not None:
                             field2 = getattr(filter, "field_path", field2)
@@ -836,6 +838,7 @@ class TestManagerTeamTasksTimelineAndFiltering:
                     if filter is not None:
                         field = getattr(filter, "field_path", field)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.stream.return_value = [mock_membership] if field == "user_id" else [mock_team_membership]
                     return mock_query
                 mock_collection_obj.where = mock_where
@@ -844,6 +847,7 @@ class TestManagerTeamTasksTimelineAndFiltering:
                     if filter is not None:
                         field = getattr(filter, "field_path", field)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.where.return_value.stream.return_value = [mock_task]
                     mock_query.stream.return_value = [mock_task]
                     return mock_query
@@ -953,6 +957,7 @@ class TestManagerTeamTasksTimelineAndFiltering:
                     if filter is not None:
                         field = getattr(filter, "field_path", field)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.stream.return_value = [mock_membership] if field == "user_id" else [mock_team_membership]
                     return mock_query
                 mock_collection_obj.where = mock_where
@@ -961,6 +966,7 @@ class TestManagerTeamTasksTimelineAndFiltering:
                     if filter is not None:
                         field = getattr(filter, "field_path", field)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.where.return_value.stream.return_value = [mock_task]
                     mock_query.stream.return_value = [mock_task]
                     return mock_query
@@ -1070,6 +1076,7 @@ class TestManagerTeamTasksTimelineAndFiltering:
                     if filter is not None:
                         field = getattr(filter, "field_path", field)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.stream.return_value = [mock_membership] if field == "user_id" else [mock_team_membership]
                     return mock_query
                 mock_collection_obj.where = mock_where
@@ -1078,6 +1085,7 @@ class TestManagerTeamTasksTimelineAndFiltering:
                     if filter is not None:
                         field = getattr(filter, "field_path", field)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.where.return_value.stream.return_value = [no_due_task, invalid_date_task, this_week_task]
                     mock_query.stream.return_value = [no_due_task, invalid_date_task, this_week_task]
                     return mock_query
@@ -1151,12 +1159,14 @@ class TestManagerTeamTasksTimelineAndFiltering:
                     if filter is not None:
                         field = getattr(filter, "field_path", field)
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.stream.return_value = [mock_membership] if field == "user_id" else [mock_team_membership]
                     return mock_query
                 mock_collection_obj.where = mock_where
             elif collection_name == "tasks":
                 def mock_where(field=None, op=None, value=None, filter=None):
                     mock_query = Mock()
+                    mock_query.select.return_value = mock_query
                     mock_query.where.return_value.stream.return_value = [mock_task]
                     mock_query.stream.return_value = [mock_task]
                     return mock_query
@@ -1173,3 +1183,88 @@ class TestManagerTeamTasksTimelineAndFiltering:
         assert response.status_code == 200
 
 
+
+
+class TestTeamQueryBatching:
+    """Team task and membership lookups use chunked queries"""
+
+    @staticmethod
+    def _task(task_id, creator, assignee=None):
+        doc = Mock()
+        doc.id = task_id
+        doc.to_dict.return_value = {
+            "title": task_id,
+            "created_by": {"user_id": creator},
+            "assigned_to": {"user_id": assignee} if assignee else None,
+        }
+        return doc
+
+    def test_team_tasks_use_one_participants_query_per_chunk(self):
+        member_ids = [f"m{i:02d}" for i in range(35)]
+        t1 = self._task("t1", "m00", "m01")
+        t2 = self._task("t2", "outsider", "m34")
+        filters = []
+
+        def where(filter):
+            filters.append((filter.field_path, filter.op, list(filter.value)))
+            query = Mock()
+            query.select.return_value = query
+            # t1 involves m00 and m01 (first chunk), t2 only m34 (second chunk)
+            query.stream.return_value = iter([t1] if "m00" in filter.value else [t2])
+            return query
+
+        db = Mock()
+        db.collection.return_value.where.side_effect = where
+
+        results = manager_module._get_team_task_docs(db, set(member_ids))
+
+        assert [(d.id, member, role) for d, member, role in results] == [
+            ("t1", "m00", "creator"),
+            ("t2", "m34", "assignee"),
+        ]
+        assert sorted((f, op, len(v)) for f, op, v in filters) == [
+            ("participant_ids", "array_contains_any", 5),
+            ("participant_ids", "array_contains_any", 30),
+        ]
+
+    def test_team_task_seen_in_two_chunks_is_returned_once(self):
+        t1 = self._task("t1", "m00", "m34")
+        db = Mock()
+        db.collection.return_value.where.return_value.select.return_value.stream.side_effect = lambda: iter([t1])
+
+        results = manager_module._get_team_task_docs(db, {f"m{i:02d}" for i in range(35)})
+
+        assert [(d.id, member, role) for d, member, role in results] == [("t1", "m00", "creator")]
+
+    def test_team_task_queries_select_projection(self):
+        db = Mock()
+        query = db.collection.return_value.where.return_value
+        query.select.return_value.stream.return_value = iter([])
+
+        manager_module._get_team_task_docs(db, {"m1"}, ["status", "due_date"])
+
+        query.select.assert_called_with(["status", "due_date"])
+
+    def test_team_tasks_propagate_query_errors(self):
+        db = Mock()
+        db.collection.return_value.where.return_value.select.return_value.stream.side_effect = RuntimeError("unavailable")
+
+        with pytest.raises(RuntimeError):
+            manager_module._get_team_task_docs(db, {"m1"})
+
+    def test_team_member_ids_use_one_in_query_per_chunk(self, mock_db, monkeypatch):
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        mine = Mock()
+        mine.to_dict.return_value = {"project_id": "p1", "user_id": "mgr"}
+        rows = []
+        for project_id, user_id in [("p1", "mgr"), ("p1", "a"), ("p2", "b")]:
+            row = Mock()
+            row.to_dict.return_value = {"project_id": project_id, "user_id": user_id}
+            rows.append(row)
+        mine2 = Mock()
+        mine2.to_dict.return_value = {"project_id": "p2", "user_id": "mgr"}
+        memberships = mock_db.collection.return_value
+        memberships.where.return_value.stream.side_effect = [iter([mine, mine2]), iter(rows)]
+
+        assert manager_module._get_manager_team_member_ids("mgr") == {"a", "b"}
+        assert memberships.where.call_count == 2
@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime, timezone
 import sys
+from conftest import chain_paging
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
@@ -66,6 +67,7 @@ class TestManagerDashboardBranches:
                 def where_side_effect(*args, **kwargs):
                     memberships_call_count["count"] += 1
                     mock_where_result = Mock()
+                    mock_where_result.select.return_value = mock_where_result
                     if memberships_call_count["count"] == 1:
                         # First call: get manager's memberships
                         mock_where_result.stream.return_value = iter([mock_mgr_membership])
@@ -78,6 +80,7 @@ class TestManagerDashboardBranches:
                 
             elif name == "tasks":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([])
                 mock_coll.where.return_value = mock_where_result
                 
@@ -194,17 +197,20 @@ class TestManagerDashboardBranches:
                 
                 # For FieldFilter - return users including manager
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_user1, mock_user2])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "memberships":
                 # No memberships - trigger fallback
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "tasks":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([])
                 mock_coll.where.return_value = mock_where_result
                 
@@ -257,16 +263,19 @@ class TestManagerDashboardBranches:
                 
                 mock_coll.document.side_effect = document_side_effect
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_user1])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "memberships":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_membership1])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "tasks":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([])
                 mock_coll.where.return_value = mock_where_result
                 
@@ -348,11 +357,13 @@ class TestManagerDashboardBranches:
                 
                 mock_coll.document.side_effect = document_side_effect
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_staff1])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "memberships":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([])
                 mock_coll.where.return_value = mock_where_result
                 
@@ -360,6 +371,7 @@ class TestManagerDashboardBranches:
                 # Alternate between created and assigned tasks
                 def where_side_effect(*args, **kwargs):
                     mock_where_result = Mock()
+                    mock_where_result.select.return_value = mock_where_result
                     # Check if this is created_by or assigned_to query
                     if len(args) >= 1 and args[0] == "created_by.user_id":
                         # Created tasks query
@@ -432,6 +444,8 @@ class TestGetAllUsersBranches:
                 
                 mock_coll.document.side_effect = document_side_effect
                 mock_coll.stream.return_value = iter([mock_user1, mock_user2])
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
                 
             return mock_coll
         
@@ -454,7 +468,7 @@ class TestBulkAssignStaffBranches:
     """Test specific branches in bulk_assign_staff"""
     
     def test_bulk_assign_exception_during_get_operation(self, client, mock_db, monkeypatch):
-        """Test exception during .update() operation - covers 1211->1171 (exception then continue loop)"""
+        """A failed transaction fails every staff member in it (nothing half-assigned)"""
         mock_mgr = Mock()
         mock_mgr.exists = True
         mock_mgr.to_dict.return_value = {
@@ -466,6 +480,7 @@ class TestBulkAssignStaffBranches:
         
         # First staff - successful
         mock_staff1 = Mock()
+        mock_staff1.id = "staff1"
         mock_staff1.exists = True
         mock_staff1.to_dict.return_value = {
             "name": "Staff One",
@@ -475,6 +490,7 @@ class TestBulkAssignStaffBranches:
         
         # Second staff - will have exception during update()
         mock_staff2 = Mock()
+        mock_staff2.id = "staff2"
         mock_staff2.exists = True
         mock_staff2.to_dict.return_value = {
             "name": "Staff Two",
@@ -484,6 +500,7 @@ class TestBulkAssignStaffBranches:
         
         # Third staff - successful
         mock_staff3 = Mock()
+        mock_staff3.id = "staff3"
         mock_staff3.exists = True
         mock_staff3.to_dict.return_value = {
             "name": "Staff Three",
@@ -493,6 +510,7 @@ class TestBulkAssignStaffBranches:
         
         # Fourth staff - also successful to ensure loop continues after exception
         mock_staff4 = Mock()
+        mock_staff4.id = "staff4"
         mock_staff4.exists = True
         mock_staff4.to_dict.return_value = {
             "name": "Staff Four",
@@ -513,8 +531,7 @@ class TestBulkAssignStaffBranches:
                         mock_doc_ref.update.return_value = None
                     elif doc_id == "staff2":
                         mock_doc_ref.get.return_value = mock_staff2
-                        # Make update raise an exception
-                        mock_doc_ref.update.side_effect = Exception("Database error during update for staff2")
+                        mock_doc_ref.update.return_value = None
                     elif doc_id == "staff3":
                         mock_doc_ref.get.return_value = mock_staff3
                         mock_doc_ref.update.return_value = None
@@ -532,6 +549,7 @@ class TestBulkAssignStaffBranches:
             return mock_coll
         
         mock_db.collection.side_effect = collection_side_effect
+        mock_db.transaction.return_value.update.side_effect = Exception("Database error during commit")
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
         
         response = client.post(
@@ -541,16 +559,13 @@ class TestBulkAssignStaffBranches:
         )
         assert response.status_code == 200
         data = response.get_json()
-        # staff1, staff3, staff4 should succeed; staff2 should fail with exception
-        assigned_list = data.get("assigned", data.get("staff_assigned", []))
+        assigned_list = data.get("staff_assigned", [])
         failed_list = data.get("failed", [])
-        assert len(assigned_list) >= 3  # staff1, staff3, staff4
-        assert len(failed_list) >= 1  # staff2
-        # Verify staff2 is in failed with our specific error
-        staff2_error = next((f for f in failed_list if f["user_id"] == "staff2"), None)
-        assert staff2_error is not None
-        assert "Database error" in staff2_error.get("error", "")
-    
+        assert assigned_list == []
+        assert [f["user_id"] for f in failed_list] == ["staff1", "staff2", "staff3", "staff4"]
+        assert all("Database error" in f["error"] for f in failed_list)
+        assert data["total_team_size"] == 0
+
     def test_bulk_assign_staff_already_in_team(self, client, mock_db, monkeypatch):
         """Test when staff_id is already in existing_staff_ids list - covers 1211->1171 (false branch)"""
         mock_mgr = Mock()
@@ -564,6 +579,7 @@ class TestBulkAssignStaffBranches:
         
         # First staff - already in team
         mock_staff1 = Mock()
+        mock_staff1.id = "staff1"
         mock_staff1.exists = True
         mock_staff1.to_dict.return_value = {
             "name": "Staff One",
@@ -573,6 +589,7 @@ class TestBulkAssignStaffBranches:
         
         # Second staff - new to team
         mock_staff2 = Mock()
+        mock_staff2.id = "staff2"
         mock_staff2.exists = True
         mock_staff2.to_dict.return_value = {
             "name": "Staff Two",
@@ -617,9 +634,14 @@ class TestBulkAssignStaffBranches:
         # Both should be assigned successfully
         assigned_list = data.get("assigned", data.get("staff_assigned", []))
         assert len(assigned_list) == 2
+        # staff1 is not added to the team twice
+        manager_updates = mock_db.transaction.return_value.update.call_args_list[-1][0][1]
+        assert manager_updates["team_staff_ids"] == ["staff1", "staff2"]
+        assert manager_updates["team_size"] == 2
+        assert data["total_team_size"] == 2
     
     def test_bulk_assign_with_exception_in_staff_loop(self, client, mock_db, monkeypatch):
-        """Test exception handling during staff assignment loop"""
+        """A failing chunk does not stop the following chunks"""
         mock_mgr = Mock()
         mock_mgr.exists = True
         mock_mgr.to_dict.return_value = {
@@ -631,6 +653,7 @@ class TestBulkAssignStaffBranches:
         
         # First staff - successful
         mock_staff1 = Mock()
+        mock_staff1.id = "staff1"
         mock_staff1.exists = True
         mock_staff1.to_dict.return_value = {
             "name": "Staff One",
@@ -640,6 +663,7 @@ class TestBulkAssignStaffBranches:
         
         # Second staff - will raise exception during update
         mock_staff2 = Mock()
+        mock_staff2.id = "staff2"
         mock_staff2.exists = True
         mock_staff2.to_dict.return_value = {
             "name": "Staff Two",
@@ -649,6 +673,7 @@ class TestBulkAssignStaffBranches:
         
         # Third staff - should succeed after exception
         mock_staff3 = Mock()
+        mock_staff3.id = "staff3"
         mock_staff3.exists = True
         mock_staff3.to_dict.return_value = {
             "name": "Staff Three",
@@ -671,10 +696,7 @@ class TestBulkAssignStaffBranches:
                         mock_doc_ref.update.return_value = None
                     elif doc_id == "staff2":
                         mock_doc_ref.get.return_value = mock_staff2
-                        # Second staff update raises exception during update call
-                        def raise_exception(*args, **kwargs):
-                            raise Exception("Update failed for staff2")
-                        mock_doc_ref.update.side_effect = raise_exception
+                        mock_doc_ref.update.return_value = None
                     elif doc_id == "staff3":
                         mock_doc_ref.get.return_value = mock_staff3
                         # Third staff update works
@@ -690,6 +712,18 @@ class TestBulkAssignStaffBranches:
             return mock_coll
         
         mock_db.collection.side_effect = collection_side_effect
+        # One staff member per transaction; the second one fails. Each transaction
+        # reads the team the previous ones wrote.
+        from backend.api import batching
+        monkeypatch.setattr(batching, "BATCH_LIMIT", 2)
+
+        def transaction_update(ref, updates):
+            if ref.get.return_value is mock_staff2:
+                raise Exception("Update failed for staff2")
+            if ref.get.return_value is mock_mgr:
+                mock_mgr.to_dict.return_value = {**mock_mgr.to_dict.return_value, **updates}
+
+        mock_db.transaction.return_value.update.side_effect = transaction_update
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
         
         response = client.post(
@@ -707,8 +741,77 @@ class TestBulkAssignStaffBranches:
         assert len(assigned_list) >= 2  # staff1 and staff3 succeeded
         assert len(failed_list) == 1  # staff2 failed
         assert failed_list[0]["user_id"] == "staff2"
+        assert data["total_team_size"] == 2
 
 
+    @staticmethod
+    def _users(mock_mgr, mgr_ref=None):
+        """users collection with manager mgr123 and staff member staff1."""
+        mock_staff1 = Mock()
+        mock_staff1.id = "staff1"
+        mock_staff1.exists = True
+        mock_staff1.to_dict.return_value = {"name": "Staff One", "email": "staff1@test.com", "role": "staff"}
+
+        def document_side_effect(doc_id):
+            if doc_id == "mgr123" and mgr_ref is not None:
+                return mgr_ref
+            mock_doc_ref = Mock()
+            mock_doc_ref.get.return_value = {"mgr123": mock_mgr, "staff1": mock_staff1}.get(
+                doc_id, Mock(exists=False)
+            )
+            return mock_doc_ref
+
+        mock_coll = Mock()
+        mock_coll.document.side_effect = document_side_effect
+        return lambda name: mock_coll
+
+    def test_bulk_assign_invalid_ids_fail_individually(self, client, mock_db, monkeypatch):
+        """Empty, non-string and unhashable ids are reported as failed, not a 500"""
+        mock_mgr = Mock()
+        mock_mgr.exists = True
+        mock_mgr.to_dict.return_value = {"role": "manager", "name": "Manager Name", "team_staff_ids": []}
+        mock_db.collection.side_effect = self._users(mock_mgr)
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+
+        response = client.post(
+            "/api/manager/assign-staff",
+            headers={"X-User-Id": "mgr123"},
+            json={"staff_ids": ["staff1", "", 7, {"id": "x"}, ["staff1"], "staff1"]}
+        )
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [r["user_id"] for r in data["results"]] == ["staff1", "", 7, {"id": "x"}, ["staff1"]]
+        assert [r["assigned"] for r in data["results"]] == [True, False, False, False, False]
+        assert all(f["error"] == "Invalid staff id" for f in data["failed"])
+        # Only the valid id is read
+        refs = [ref for call in mock_db.get_all.call_args_list for ref in call[0][0]]
+        assert len(refs) == 1
+
+    def test_bulk_assign_counts_the_team_read_in_the_transaction(self, client, mock_db, monkeypatch):
+        """team_size counts staff another request added after the manager was first read"""
+        mock_mgr = Mock()
+        mock_mgr.exists = True
+        mock_mgr.to_dict.return_value = {"role": "manager", "name": "Manager Name", "team_staff_ids": []}
+        # By the time the transaction runs, a concurrent request has added staff9
+        mock_mgr_now = Mock()
+        mock_mgr_now.exists = True
+        mock_mgr_now.to_dict.return_value = {**mock_mgr.to_dict.return_value, "team_staff_ids": ["staff9"]}
+        mgr_ref = Mock()
+        mgr_ref.get.side_effect = lambda transaction=None: mock_mgr_now if transaction else mock_mgr
+        mock_db.collection.side_effect = self._users(mock_mgr, mgr_ref)
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+
+        response = client.post(
+            "/api/manager/assign-staff",
+            headers={"X-User-Id": "mgr123"},
+            json={"staff_ids": ["staff1"]}
+        )
+        assert response.status_code == 200
+        manager_updates = mock_db.transaction.return_value.update.call_args_list[-1][0][1]
+        assert manager_updates["team_staff_ids"] == ["staff9", "staff1"]
+        assert manager_updates["team_size"] == 2
+        assert response.get_json()["total_team_size"] == 2
+
 class TestRemoveManagerBranches:
     """Test specific branches in remove_manager_from_staff"""
     
@@ -771,7 +771,7 @@ class TestManagerEndpoints:
         
         # Mock project membership
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         # Mock tasks with invalid due dates
         mock_task1 = Mock()
@@ -826,6 +826,7 @@ class TestManagerEndpoints:
                 # First call: get manager's projects
                 # Second call: get project members
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 if membership_call_count[0] == 0:
                     mock_query.stream.return_value = iter([mock_mgr_membership])
                     membership_call_count[0] += 1
@@ -834,6 +835,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_query
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task1, mock_task2])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -868,7 +870,7 @@ class TestManagerEndpoints:
         
         # Mock project membership
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         # Mock tasks with various due dates
         mock_task1 = Mock()
@@ -910,6 +912,7 @@ class TestManagerEndpoints:
                 # First call: get manager's projects
                 # Second call: get project members
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 if membership_call_count[0] == 0:
                     mock_query.stream.return_value = iter([mock_mgr_membership])
                     membership_call_count[0] += 1
@@ -918,6 +921,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_query
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task1, mock_task2])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -1088,7 +1092,7 @@ class TestManagerEndpoints:
         
         # Mock project membership
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         # Mock tasks with various due dates to cover all _get_task_status_flags branches
         mock_task1 = Mock()  # Critical overdue
@@ -1154,6 +1158,7 @@ class TestManagerEndpoints:
                 # First call: get manager's projects
                 # Second call: get project members
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 if membership_call_count[0] == 0:
                     mock_query.stream.return_value = iter([mock_mgr_membership])
                     membership_call_count[0] += 1
@@ -1162,6 +1167,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_query
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task1, mock_task2, mock_task3, mock_task4])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -1196,10 +1202,12 @@ class TestManagerEndpoints:
         
         # Mock assignees
         mock_assignee1 = Mock()
+        mock_assignee1.id = "assignee1"
         mock_assignee1.exists = True
         mock_assignee1.to_dict.return_value = {"name": "Assignee 1", "email": "assignee1@test.com"}
         
         mock_assignee2 = Mock()
+        mock_assignee2.id = "assignee2"
         mock_assignee2.exists = True
         mock_assignee2.to_dict.return_value = {"name": "Assignee 2", "email": "assignee2@test.com"}
         
@@ -1227,6 +1235,8 @@ class TestManagerEndpoints:
             return mock_coll
         
         mock_db.collection.side_effect = collection_side_effect
+        # Assignees are fetched together in one batched read
+        mock_db.get_all.side_effect = lambda refs, *args, **kwargs: [mock_assignee1, mock_assignee2]
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
         monkeypatch.setattr("backend.api.manager._get_manager_team_member_ids", lambda manager_id: ["assignee1", "assignee2"])
         
@@ -1292,7 +1302,7 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         # Task with malformed due date that will cause exception
         mock_task = Mock()
@@ -1321,6 +1331,7 @@ class TestManagerEndpoints:
                 mock_coll.document.return_value.get.return_value = mock_mgr
             elif name == "memberships":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 if membership_call_count[0] == 0:
                     mock_query.stream.return_value = iter([mock_mgr_membership])
                     membership_call_count[0] += 1
@@ -1329,6 +1340,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_query
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -1536,15 +1548,15 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         # Add a membership for the manager themselves to cover user_id == manager_id branch
         mock_mgr_in_project = Mock()
-        mock_mgr_in_project.to_dict.return_value = {"user_id": "mgr123"}
+        mock_mgr_in_project.to_dict.return_value = {"project_id": "proj123", "user_id": "mgr123"}
         
         # Add a membership for the manager themselves to cover user_id == manager_id branch
         mock_mgr_in_project = Mock()
-        mock_mgr_in_project.to_dict.return_value = {"user_id": "mgr123"}
+        mock_mgr_in_project.to_dict.return_value = {"project_id": "proj123", "user_id": "mgr123"}
         
         # Tasks with different properties for filtering
         mock_task1 = Mock()
@@ -1586,6 +1598,7 @@ class TestManagerEndpoints:
                 mock_coll.document.return_value.get.return_value = mock_mgr
             elif name == "memberships":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 call_num = membership_call_count[0] % 2  # Reset every 2 calls
                 if call_num == 0:
                     # Manager memberships query
@@ -1597,6 +1610,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_query
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task1, mock_task2])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -1644,7 +1658,7 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         mock_task = Mock()
         mock_task.to_dict.return_value = {
@@ -1673,6 +1687,7 @@ class TestManagerEndpoints:
                 mock_coll.document.return_value.get.return_value = mock_mgr
             elif name == "memberships":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 call_num = membership_call_count[0] % 2
                 if call_num == 0:
                     mock_query.stream.return_value = iter([mock_mgr_membership])
@@ -1682,6 +1697,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_query
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -1704,7 +1720,7 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         mock_task = Mock()
         mock_task.to_dict.return_value = {
@@ -1733,6 +1749,7 @@ class TestManagerEndpoints:
                 mock_coll.document.return_value.get.return_value = mock_mgr
             elif name == "memberships":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 call_num = membership_call_count[0] % 2
                 if call_num == 0:
                     mock_query.stream.return_value = iter([mock_mgr_membership])
@@ -1742,6 +1759,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_query
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -1764,7 +1782,7 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         mock_task = Mock()
         mock_task.to_dict.return_value = {
@@ -1793,6 +1811,7 @@ class TestManagerEndpoints:
                 mock_coll.document.return_value.get.return_value = mock_mgr
             elif name == "memberships":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 call_num = membership_call_count[0] % 2
                 if call_num == 0:
                     mock_query.stream.return_value = iter([mock_mgr_membership])
@@ -1802,6 +1821,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_query
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -1824,7 +1844,7 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         mock_task = Mock()
         mock_task.to_dict.return_value = {
@@ -1853,6 +1873,7 @@ class TestManagerEndpoints:
                 mock_coll.document.return_value.get.return_value = mock_mgr
             elif name == "memberships":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 call_num = membership_call_count[0] % 2
                 if call_num == 0:
                     mock_query.stream.return_value = iter([mock_mgr_membership])
@@ -1862,6 +1883,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_query
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -1884,10 +1906,10 @@ class TestManagerEndpoints:
         
         # Mock project memberships - include manager and member
         mock_mgr_in_project = Mock()
-        mock_mgr_in_project.to_dict.return_value = {"user_id": "mgr123"}
+        mock_mgr_in_project.to_dict.return_value = {"project_id": "proj123", "user_id": "mgr123"}
         
         mock_member_in_project = Mock()
-        mock_member_in_project.to_dict.return_value = {"user_id": "member123"}
+        mock_member_in_project.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         call_count = [0]
         def collection_side_effect(name):
@@ -1917,7 +1939,7 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         mock_task = Mock()
         mock_task.to_dict.return_value = {
@@ -1954,6 +1976,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_coll.where.return_value
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -1977,7 +2000,7 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         mock_task = Mock()
         mock_task.to_dict.return_value = {
@@ -2014,6 +2037,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_coll.where.return_value
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -2037,7 +2061,7 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         mock_task = Mock()
         mock_task.to_dict.return_value = {
@@ -2074,6 +2098,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_coll.where.return_value
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -2096,7 +2121,7 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "member123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         mock_task = Mock()
         mock_task.to_dict.return_value = {
@@ -2136,6 +2161,7 @@ class TestManagerEndpoints:
                 mock_coll.where.return_value = mock_coll.where.return_value
             elif name == "tasks":
                 mock_query = Mock()
+                mock_query.select.return_value = mock_query
                 mock_query.stream.return_value = iter([mock_task])
                 mock_coll.where.return_value = mock_query
             elif name == "projects":
@@ -2505,7 +2531,7 @@ class TestManagerEndpoints:
         mock_mgr_membership.to_dict.return_value = {"project_id": "proj123"}
         
         mock_proj_membership = Mock()
-        mock_proj_membership.to_dict.return_value = {"user_id": "assignee123"}
+        mock_proj_membership.to_dict.return_value = {"project_id": "proj123", "user_id": "assignee123"}
         
         user_call_count = [0]
         membership_call_count = [0]
@@ -2630,8 +2656,10 @@ class TestManagerEndpoints:
         
         # Mock user document for member
         mock_member_user = Mock()
+        mock_member_user.id = "member123"
         mock_member_user.exists = True
         mock_member_user.to_dict.return_value = {"name": "Member", "email": "member@test.com", "role": "staff"}
+        mock_project.id = "proj123"
         
         def collection_side_effect(collection_name):
             mock_collection = Mock()
@@ -2642,10 +2670,15 @@ class TestManagerEndpoints:
             elif collection_name == "memberships":
                 mock_collection.where.return_value.stream.return_value = [mock_membership_manager, mock_membership_other]
             elif collection_name == "tasks":
-                mock_collection.where.return_value.stream.return_value = [mock_task]
+                mock_collection.where.return_value.select.return_value.stream.return_value = [mock_task]
             return mock_collection
         
+        def get_all_side_effect(refs, *args, **kwargs):
+            # Team members are batch-read as users, projects as projects
+            return [mock_member_user] if refs and refs[0].get() is mock_manager else [mock_project]
+        
         mock_db.collection.side_effect = collection_side_effect
+        mock_db.get_all.side_effect = get_all_side_effect
         
         response = client.get("/api/manager/team-tasks?viewer_id=mgr123")
         assert response.status_code == 200
@@ -2705,7 +2738,7 @@ class TestManagerEndpoints:
             elif collection_name == "memberships":
                 mock_collection.where.return_value.stream.return_value = [mock_membership]
             elif collection_name == "tasks":
-                mock_collection.where.return_value.stream.return_value = [mock_task]
+                mock_collection.where.return_value.select.return_value.stream.return_value = [mock_task]
             return mock_collection
         
         mock_db.collection.side_effect = collection_side_effect
@@ -2767,7 +2800,7 @@ class TestManagerEndpoints:
             elif collection_name == "memberships":
                 mock_collection.where.return_value.stream.return_value = [mock_membership]
             elif collection_name == "tasks":
-                mock_collection.where.return_value.stream.return_value = [mock_task]
+                mock_collection.where.return_value.select.return_value.stream.return_value = [mock_task]
             return mock_collection
         
         mock_db.collection.side_effect = collection_side_effect
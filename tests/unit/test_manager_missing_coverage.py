@@ -5,9 +5,10 @@ Targeting: 237-356 (dashboard), 610, 767-814 (all-users),
 1254-1305 (remove-manager), 1336-1365 (my-team)
 """
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 from datetime import datetime, timezone
 import sys
+from conftest import chain_paging
 
 fake_firestore = sys.modules.get("firebase_admin.firestore")
 
@@ -172,16 +173,19 @@ class TestManagerDashboardEndpoint:
                 
                 mock_coll.document.side_effect = document_side_effect
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_staff1])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "memberships":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_membership1])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "tasks":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_task1])
                 mock_coll.where.return_value = mock_where_result
                 
@@ -238,6 +242,7 @@ class TestManagerDashboardEndpoint:
                 # For where with FieldFilter (fallback)
                 def where_side_effect(filter=None, **kwargs):
                     mock_where_result = Mock()
+                    mock_where_result.select.return_value = mock_where_result
                     if filter:
                         # FieldFilter case - return staff
                         mock_where_result.stream.return_value = iter([mock_staff])
@@ -250,11 +255,13 @@ class TestManagerDashboardEndpoint:
                 
             elif name == "memberships":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "tasks":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([])
                 mock_coll.where.return_value = mock_where_result
                 
@@ -312,16 +319,19 @@ class TestManagerDashboardEndpoint:
                 
                 mock_coll.document.side_effect = document_side_effect
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_staff])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "memberships":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "tasks":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_completed])
                 mock_coll.where.return_value = mock_where_result
                 
@@ -379,16 +389,19 @@ class TestManagerDashboardEndpoint:
                 
                 mock_coll.document.side_effect = document_side_effect
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_staff])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "memberships":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([])
                 mock_coll.where.return_value = mock_where_result
                 
             elif name == "tasks":
                 mock_where_result = Mock()
+                mock_where_result.select.return_value = mock_where_result
                 mock_where_result.stream.return_value = iter([mock_overdue])
                 mock_coll.where.return_value = mock_where_result
                 
@@ -520,6 +533,8 @@ class TestGetAllUsersEndpoint:
                 mock_coll.document.return_value = mock_doc_ref
                 # For stream() call
                 mock_coll.stream.return_value = iter([mock_staff, mock_other_mgr, mock_hr, mock_admin])
+                chain_paging(mock_coll)
+                mock_coll.order_by.return_value.limit.return_value = mock_coll
             return mock_coll
         
         mock_db.collection.side_effect = collection_side_effect
@@ -982,6 +997,7 @@ class TestBulkAssignStaffEndpoint:
         
         # Staff that exists
         mock_staff1_doc = Mock()
+        mock_staff1_doc.id = "staff1"
         mock_staff1_doc.exists = True
         mock_staff1_doc.to_dict.return_value = {
             "role": "staff",
@@ -994,12 +1010,14 @@ class TestBulkAssignStaffEndpoint:
         
         # Staff that doesn't exist
         mock_staff2_doc = Mock()
+        mock_staff2_doc.id = "staff_not_found"
         mock_staff2_doc.exists = False
         mock_staff2_ref = Mock()
         mock_staff2_ref.get.return_value = mock_staff2_doc
         
         # User with wrong role
         mock_staff3_doc = Mock()
+        mock_staff3_doc.id = "wrong_role"
         mock_staff3_doc.exists = True
         mock_staff3_doc.to_dict.return_value = {"role": "manager"}
         mock_staff3_ref = Mock()
@@ -1037,7 +1055,16 @@ class TestBulkAssignStaffEndpoint:
         data = response.get_json()
         assert len(data["staff_assigned"]) >= 1
         assert len(data["failed"]) >= 2
-        assert mock_mgr_ref.update.called
+        assert [r["assigned"] for r in data["results"]] == [True, False, False]
+        # Staff and manager documents are written together in one transaction,
+        # which re-reads the team it adds to
+        transaction = mock_db.transaction.return_value
+        mock_mgr_ref.get.assert_called_with(transaction=transaction)
+        transaction.update.assert_any_call(mock_staff1_ref, ANY)
+        transaction.update.assert_any_call(mock_mgr_ref, ANY)
+        manager_updates = transaction.update.call_args_list[-1][0][1]
+        assert manager_updates["team_staff_ids"] == ["staff1"]
+        assert manager_updates["team_size"] == 1
     
     def test_bulk_assign_defaults_to_self(self, client, mock_db, monkeypatch):
         """Test bulk assign defaults to current manager when no manager_id (line 1143)"""
@@ -1051,6 +1078,7 @@ class TestBulkAssignStaffEndpoint:
         }
         
         mock_staff_doc = Mock()
+        mock_staff_doc.id = "staff1"
         mock_staff_doc.exists = True
         mock_staff_doc.to_dict.return_value = {
             "role": "staff",
@@ -0,0 +1,154 @@
+"""Unit tests for backend/api/membership_replica.py"""
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from backend.api import membership_replica
+from backend.api.membership_replica import MembershipReplica
+
+
+def _change(kind, doc_id, data=None):
+    doc = Mock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=doc)
+
+
+def _started_replica():
+    replica = MembershipReplica()
+    db = Mock()
+    replica.start(db)
+    callback = db.collection.return_value.on_snapshot.call_args[0][0]
+    return replica, db, callback
+
+
+class TestMembershipReplica:
+    def test_not_ready_until_first_snapshot(self):
+        replica, db, callback = _started_replica()
+
+        db.collection.assert_called_with("memberships")
+        assert replica.is_ready() is False
+        assert replica.project_member_ids("p1") is None
+        assert replica.is_member("p1", "u1") is None
+
+        callback([], [], None)
+        assert replica.is_ready() is True
+        assert replica.project_member_ids("p1") == []
+
+    def test_applies_added_modified_and_removed(self):
+        replica, _, callback = _started_replica()
+        callback([], [
+            _change("ADDED", "p1_u1", {"project_id": "p1", "user_id": "u1"}),
+            _change("ADDED", "p1_u2", {"project_id": "p1", "user_id": "u2"}),
+            _change("ADDED", "p2_u1", {"project_id": "p2", "user_id": "u1"}),
+        ], None)
+
+        assert replica.project_member_ids("p1") == ["u1", "u2"]
+        assert replica.user_project_ids("u1") == ["p1", "p2"]
+
+        callback([], [
+            _change("MODIFIED", "p1_u2", {"project_id": "p3", "user_id": "u2"}),
+            _change("REMOVED", "p2_u1", {"project_id": "p2", "user_id": "u1"}),
+        ], None)
+
+        assert replica.project_member_ids("p1") == ["u1"]
+        assert replica.project_member_ids("p3") == ["u2"]
+        assert replica.user_project_ids("u1") == ["p1"]
+        assert replica.is_member("p2", "u1") is False
+
+    def test_duplicate_membership_docs_keep_pair_until_last_removed(self):
+        replica, _, callback = _started_replica()
+        data = {"project_id": "p1", "user_id": "u1"}
+        callback([], [_change("ADDED", "p1_u1", data), _change("ADDED", "auto_id", data)], None)
+
+        callback([], [_change("REMOVED", "auto_id", data)], None)
+        assert replica.is_member("p1", "u1") is True
+
+        callback([], [_change("REMOVED", "p1_u1", data)], None)
+        assert replica.is_member("p1", "u1") is False
+
+    def test_start_is_idempotent_and_stop_resets(self):
+        replica, db, callback = _started_replica()
+        replica.start(db)
+        assert db.collection.return_value.on_snapshot.call_count == 1
+
+        callback([], [_change("ADDED", "p1_u1", {"project_id": "p1", "user_id": "u1"})], None)
+        replica.stop()
+
+        db.collection.return_value.on_snapshot.return_value.unsubscribe.assert_called_once()
+        assert replica.is_ready() is False
+        assert replica.project_member_ids("p1") is None
+
+
+    def test_own_writes_apply_before_the_listener_delivers_them(self):
+        replica, _, callback = _started_replica()
+        replica.apply("p1_u1", {"project_id": "p1", "user_id": "u1"})
+        callback([], [], None)
+        # Not ready when written: the first snapshot carries it instead
+        assert replica.is_member("p1", "u1") is False
+
+        replica.apply("p1_u1", {"project_id": "p1", "user_id": "u1"})
+        assert replica.is_member("p1", "u1") is True
+        replica.apply("p1_u1", None)
+        assert replica.is_member("p1", "u1") is False
+
+    def test_closed_listener_falls_back_to_queries(self):
+        replica, db, callback = _started_replica()
+        callback([], [_change("ADDED", "p1_u1", {"project_id": "p1", "user_id": "u1"})], None)
+        assert replica.is_member("p1", "u1") is True
+
+        db.collection.return_value.on_snapshot.return_value.is_active = False
+
+        assert replica.is_ready() is False
+        assert replica.is_member("p1", "u1") is None
+
+    def test_snapshot_error_disables_the_replica(self):
+        replica, db, callback = _started_replica()
+        bad = _change("ADDED", "p1_u1")
+        bad.document.to_dict.side_effect = RuntimeError("decode")
+
+        callback([], [bad], None)
+        callback([], [_change("ADDED", "p1_u2", {"project_id": "p1", "user_id": "u2"})], None)
+
+        assert replica.is_ready() is False
+        assert replica.project_member_ids("p1") is None
+
+
+class TestLookupHelpers:
+    @pytest.fixture
+    def ready_replica(self, monkeypatch):
+        replica, _, callback = _started_replica()
+        callback([], [_change("ADDED", "p1_u1", {"project_id": "p1", "user_id": "u1"})], None)
+        monkeypatch.setattr(membership_replica, "_replica", replica)
+        return replica
+
+    def test_ready_replica_serves_without_queries(self, ready_replica):
+        db = Mock()
+
+        assert membership_replica.project_member_ids(db, "p1") == ["u1"]
+        assert membership_replica.user_project_ids(db, "u1") == ["p1"]
+        assert membership_replica.is_member(db, "p1", "u1") is True
+        db.collection.assert_not_called()
+
+    def test_falls_back_to_queries_while_warming_up(self, monkeypatch):
+        monkeypatch.setattr(membership_replica, "_replica", MembershipReplica())
+        db = Mock()
+        rows = [Mock(), Mock(), Mock()]
+        rows[0].to_dict.return_value = {"user_id": "u1", "project_id": "p1"}
+        rows[1].to_dict.return_value = {"user_id": "u1", "project_id": "p1"}
+        rows[2].to_dict.return_value = {}
+        db.collection.return_value.where.return_value.stream.side_effect = lambda: iter(rows)
+        db.collection.return_value.document.return_value.get.return_value = Mock(exists=True)
+
+        assert membership_replica.project_member_ids(db, "p1") == ["u1"]
+        assert membership_replica.user_project_ids(db, "u1") == ["p1"]
+        assert membership_replica.is_member(db, "p1", "u1") is True
+        db.collection.return_value.document.assert_called_with("p1_u1")
+
+    def test_is_member_requires_both_ids(self):
+        db = Mock()
+
+        assert membership_replica.is_member(db, "", "u1") is False
+        assert membership_replica.is_member(db, "p1", None) is False
+        db.collection.assert_not_called()
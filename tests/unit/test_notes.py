@@ -295,6 +295,7 @@ class TestListComments:
         
         mock_order_by = Mock()
         mock_order_by.limit = Mock(return_value=mock_limit)
+        mock_order_by.order_by = Mock(return_value=mock_order_by)
         
         mock_where = Mock()
         mock_where.order_by = Mock(return_value=mock_order_by)
@@ -320,8 +321,8 @@ class TestListComments:
         # Verify Firestore query (FieldFilter syntax uses filter parameter)
         mock_db.collection.assert_called_once_with("notes")
         assert mock_collection.where.called
-        mock_where.order_by.assert_called_once_with("created_at")
-        mock_order_by.limit.assert_called_once_with(100)
+        mock_where.order_by.assert_called_once_with("created_at", direction="ASCENDING")
+        mock_order_by.limit.assert_called_once_with(101)
     
     def test_list_comments_empty_result(self, client, mock_db, monkeypatch):
         """Test listing comments when no comments exist."""
@@ -331,6 +332,7 @@ class TestListComments:
         
         mock_order_by = Mock()
         mock_order_by.limit = Mock(return_value=mock_limit)
+        mock_order_by.order_by = Mock(return_value=mock_order_by)
         
         mock_where = Mock()
         mock_where.order_by = Mock(return_value=mock_order_by)
@@ -364,6 +366,7 @@ class TestListComments:
         
         mock_order_by = Mock()
         mock_order_by.limit = Mock(return_value=mock_limit)
+        mock_order_by.order_by = Mock(return_value=mock_order_by)
         
         mock_where = Mock()
         mock_where.order_by = Mock(return_value=mock_order_by)
@@ -389,6 +392,7 @@ class TestListComments:
         
         mock_order_by = Mock()
         mock_order_by.limit = Mock(return_value=mock_limit)
+        mock_order_by.order_by = Mock(return_value=mock_order_by)
         
         mock_where = Mock()
         mock_where.order_by = Mock(return_value=mock_order_by)
@@ -402,15 +406,16 @@ class TestListComments:
         client.get("/api/notes/by-task/task1")
         
         # Verify order_by was called with created_at
-        mock_where.order_by.assert_called_once_with("created_at")
+        mock_where.order_by.assert_called_once_with("created_at", direction="ASCENDING")
     
     def test_list_comments_limited_to_100(self, client, mock_db, monkeypatch):
-        """Test that comments are limited to 100 results."""
+        """Test that a page holds at most 100 comments by default."""
         mock_limit = Mock()
         mock_limit.stream = Mock(return_value=[])
         
         mock_order_by = Mock()
         mock_order_by.limit = Mock(return_value=mock_limit)
+        mock_order_by.order_by = Mock(return_value=mock_order_by)
         
         mock_where = Mock()
         mock_where.order_by = Mock(return_value=mock_order_by)
@@ -423,8 +428,8 @@ class TestListComments:
         
         client.get("/api/notes/by-task/task1")
         
-        # Verify limit was called with 100
-        mock_order_by.limit.assert_called_once_with(100)
+        # 100 per page plus one extra doc to detect a next page
+        mock_order_by.limit.assert_called_once_with(101)
     
     def test_list_comments_with_edited_comments(self, client, mock_db, monkeypatch):
         """Test listing comments that have been edited."""
@@ -443,6 +448,7 @@ class TestListComments:
         
         mock_order_by = Mock()
         mock_order_by.limit = Mock(return_value=mock_limit)
+        mock_order_by.order_by = Mock(return_value=mock_order_by)
         
         mock_where = Mock()
         mock_where.order_by = Mock(return_value=mock_order_by)
@@ -555,6 +561,7 @@ class TestEdgeCases:
         
         mock_order_by = Mock()
         mock_order_by.limit = Mock(return_value=mock_limit)
+        mock_order_by.order_by = Mock(return_value=mock_order_by)
         
         mock_where = Mock()
         mock_where.order_by = Mock(return_value=mock_order_by)
@@ -1,6 +1,6 @@
 """Unit tests for notifications.py module"""
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import ANY, Mock, patch, MagicMock
 from datetime import datetime, timezone, timedelta
 import sys
 
@@ -57,8 +57,7 @@ class TestCreateNotification:
         )
         
         assert result == "notif123"
-        mock_doc_ref.set.assert_called_once()
-        call_args = mock_doc_ref.set.call_args[0][0]
+        call_args = mock_db.batch.return_value.set.call_args_list[0][0][1]
         assert call_args["user_id"] == user_id
         assert call_args["title"] == title
         assert call_args["body"] == body
@@ -83,7 +82,7 @@ class TestCreateNotification:
         )
         
         assert result == "notif456"
-        call_args = mock_doc_ref.set.call_args[0][0]
+        call_args = mock_db.batch.return_value.set.call_args_list[0][0][1]
         assert call_args["task_id"] == task_id
         
     def test_create_notification_with_email(self, mock_db):
@@ -110,19 +109,18 @@ class TestCreateNotification:
         
         mock_db.collection.side_effect = collection_router
         
-        with patch('backend.api.notifications.send_email_util') as mock_send:
-            mock_send.return_value = True
-            
+        with patch('backend.api.notifications.send_email_util') as mock_send, \
+             patch('backend.api.notifications.email_outbox.add') as mock_add:
             result = notifications_module.create_notification(
                 mock_db, user_id, title, body, send_email=True
             )
             
             assert result == "notif789"
-            mock_send.assert_called_once_with("user@example.com", title, body)
-            mock_doc_ref.update.assert_called_once()
-            update_args = mock_doc_ref.update.call_args[0][0]
-            assert update_args["email_sent"] == True
-            assert "email_sent_at" in update_args
+            mock_send.assert_not_called()
+            batch = mock_db.batch.return_value
+            mock_add.assert_called_once_with(batch, mock_db, "notif789", "user@example.com", title, body)
+            batch.set.assert_any_call(mock_doc_ref, ANY)
+            batch.commit.assert_called_once()
             
     def test_create_notification_no_user_id(self, mock_db):
         """Test creating notification with no user_id returns None"""
@@ -300,9 +298,12 @@ class TestCheckDeadlines:
         }
         
         # Mock user
-        mock_user_doc = Mock()
-        mock_user_doc.exists = True
-        mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
+        def user_ref(uid):
+            mock_user_doc = Mock()
+            mock_user_doc.id = uid
+            mock_user_doc.exists = True
+            mock_user_doc.to_dict.return_value = {"email": f"{uid}@example.com"}
+            return Mock(get=Mock(return_value=mock_user_doc))
         
         # Mock notification ref
         mock_notif_ref = Mock()
@@ -318,15 +319,11 @@ class TestCheckDeadlines:
                 mock_coll.limit.return_value.stream.return_value = [mock_task]
                 return mock_coll
             elif name == "users":
-                mock_user_ref = Mock()
-                mock_user_ref.get.return_value = mock_user_doc
-                mock_coll.document.return_value = mock_user_ref
-                mock_coll.stream.return_value = []
+                mock_coll.document.side_effect = user_ref
                 return mock_coll
             elif name == "notifications":
-                mock_query = Mock()
-                mock_query.stream.return_value = []
-                mock_coll.where.return_value.where.return_value.where.return_value.limit.return_value = mock_query
+                # No reminder exists yet under its deterministic id
+                mock_notif_ref.get.return_value = Mock(exists=False)
                 mock_coll.document.return_value = mock_notif_ref
                 return mock_coll
             elif name == "memberships":
@@ -346,8 +343,10 @@ class TestCheckDeadlines:
             
         assert response.status_code == 200
         data = response.get_json()
-        assert "checked" in data
-        assert "notifications_created" in data
+        assert data["checked"] == 1
+        # Creator and assignee, each with their email queued in the same batch
+        assert data["notifications_created"] == 2
+        assert data["phases"]["write"]["emails_queued"] == 2
         
     def test_check_deadlines_with_hours_param(self, client, mock_db, monkeypatch):
         """Test checking deadlines with custom hours window"""
@@ -378,11 +377,9 @@ class TestCheckDeadlines:
                 mock_coll.stream.return_value = []
                 return mock_coll
             elif name == "notifications":
-                mock_query = Mock()
-                mock_query.stream.return_value = []
                 mock_notif_ref = Mock()
                 mock_notif_ref.id = "notif456"
-                mock_coll.where.return_value.where.return_value.where.return_value.limit.return_value = mock_query
+                mock_notif_ref.get.return_value = Mock(exists=False)
                 mock_coll.document.return_value = mock_notif_ref
                 return mock_coll
             elif name == "memberships":
@@ -403,6 +400,29 @@ class TestCheckDeadlines:
         assert response.status_code == 200
 
 
+    def test_check_deadlines_skips_archived_tasks(self, mock_db):
+        """Archived tasks still in the window get no reminders"""
+        mock_task = Mock()
+        mock_task.id = "task789"
+        mock_task.to_dict.return_value = {
+            "title": "Old Task",
+            "due_date": "2024-12-31T23:59",
+            "created_by": {"user_id": "user1"},
+            "archived": True,
+        }
+        tasks = Mock()
+        tasks.where.return_value.where.return_value.stream.return_value = [mock_task]
+        mock_db.collection.side_effect = lambda name: tasks if name == "tasks" else Mock()
+
+        summary = notifications_module.run_deadline_check(mock_db)
+
+        assert summary["checked"] == 1
+        assert summary["notifications_created"] == 0
+        assert summary["phases"]["recipients"]["pairs"] == 0
+        assert summary["phases"]["write"]["batches"] == 0
+        mock_db.batch.return_value.commit.assert_not_called()
+
+
 class TestDueToday:
     """Test the due_today endpoint"""
     
@@ -478,7 +498,8 @@ class TestDueToday:
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
         
         response = client.get(
-            f'/notifications/due-today?user_id={user_id}&start_iso={start_iso}&end_iso={end_iso}'
+            '/notifications/due-today',
+            query_string={"user_id": user_id, "start_iso": start_iso, "end_iso": end_iso}
         )
         
         assert response.status_code == 200
@@ -487,85 +508,147 @@ class TestDueToday:
         assert "tasks" in data
 
 
-class TestNotifyUserDueTasks:
-    """Test the _notify_user_due_tasks helper function"""
-    
-    def test_notify_user_due_tasks_basic(self, mock_db):
-        """Test notifying user of due tasks"""
-        user_id = "user123"
-        start_iso = "2024-12-31T00:00:00+00:00"
-        end_iso = "2024-12-31T23:59:59+00:00"
-        
-        # Mock task
-        mock_task = Mock()
-        mock_task.id = "task123"
-        mock_task.to_dict.return_value = {
-            "title": "Due Task",
-            "due_date": "2024-12-31T12:00:00+00:00",
-            "created_by": {"user_id": user_id},
-            "assigned_to": {"user_id": "other_user"},
-            "project_id": None,
-            "archived": False
-        }
-        
-        # Mock user
-        mock_user_doc = Mock()
-        mock_user_doc.exists = True
-        mock_user_doc.to_dict.return_value = {"email": "user@example.com"}
-        
-        mock_notif_ref = Mock()
-        mock_notif_ref.id = "notif123"
-        
-        def collection_router(name):
-            mock_coll = Mock()
-            if name == "tasks":
-                mock_query = Mock()
-                mock_query.stream.return_value = [mock_task]
-                mock_coll.where.return_value.where.return_value = mock_query
-                mock_coll.limit.return_value.stream.return_value = [mock_task]
-                return mock_coll
-            elif name == "users":
-                mock_user_ref = Mock()
-                mock_user_ref.get.return_value = mock_user_doc
-                mock_coll.document.return_value = mock_user_ref
-                return mock_coll
-            elif name == "notifications":
-                mock_query = Mock()
-                mock_query.stream.return_value = []
-                mock_coll.where.return_value.where.return_value.where.return_value.limit.return_value = mock_query
-                mock_coll.document.return_value = mock_notif_ref
-                return mock_coll
-            return Mock()
-        
-        mock_db.collection.side_effect = collection_router
-        
-        with patch('backend.api.notifications.send_email_util') as mock_send:
-            mock_send.return_value = True
-            
-            result = notifications_module._notify_user_due_tasks(mock_db, user_id, start_iso, end_iso)
-            
-        # Should have created at least one notification
-        assert result >= 0
-        
-    def test_notify_user_due_tasks_no_tasks(self, mock_db):
-        """Test notifying user when no tasks are due"""
-        user_id = "user456"
-        start_iso = "2024-12-31T00:00:00+00:00"
-        end_iso = "2024-12-31T23:59:59+00:00"
-        
-        def collection_router(name):
-            mock_coll = Mock()
-            if name == "tasks":
-                mock_query = Mock()
-                mock_query.stream.return_value = []
-                mock_coll.where.return_value.where.return_value = mock_query
-                mock_coll.limit.return_value.stream.return_value = []
-                return mock_coll
-            return Mock()
-        
-        mock_db.collection.side_effect = collection_router
-        
-        result = notifications_module._notify_user_due_tasks(mock_db, user_id, start_iso, end_iso)
-        
-        # Should create zero notifications
-        assert result == 0
+def _notif_doc(doc_id, **data):
+    doc = Mock()
+    doc.id = doc_id
+    doc.to_dict.return_value = {"user_id": "user1", "title": "T", "body": "B", "read": False,
+                                "created_at": "2025-01-15T10:00:00+00:00", **data}
+    return doc
+
+
+def _inbox_db(mock_db, docs=(), unread=None):
+    """Wire the notifications collection and the viewer's unread counter."""
+    notifications, counters = Mock(), Mock()
+    page = notifications.where.return_value.order_by.return_value.order_by.return_value
+    page.limit.return_value.stream.return_value = list(docs)
+    page.start_after.return_value.limit.return_value.stream.return_value = list(docs)
+    counter = Mock(exists=unread is not None)
+    counter.to_dict.return_value = {"unread": unread}
+    counters.document.return_value.get.return_value = counter
+    mock_db.collection.side_effect = lambda name: {"notifications": notifications,
+                                                   "notification_counters": counters}[name]
+    return notifications, counters
+
+
+class TestInbox:
+    """GET /api/notifications and the unread badge"""
+
+    def test_requires_user(self, client, mock_db):
+        assert client.get("/api/notifications").status_code == 401
+        assert client.get("/api/notifications/unread-count").status_code == 401
+
+    def test_lists_newest_first_with_cursor(self, client, mock_db):
+        docs = [_notif_doc(f"n{i}", created_at=f"2025-01-1{5 - i}T10:00:00+00:00") for i in range(3)]
+        notifications, _ = _inbox_db(mock_db, docs, unread=4)
+
+        response = client.get("/api/notifications?limit=2", headers={"X-User-Id": "user1"})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [n["notification_id"] for n in data["notifications"]] == ["n0", "n1"]
+        assert data["notifications"][0]["read"] is False
+        assert data["unread"] == 4
+        where = notifications.where.call_args.kwargs["filter"]
+        assert (where.field_path, where.op, where.value) == ("user_id", "==", "user1")
+        notifications.where.return_value.order_by.assert_called_once_with("created_at", direction="DESCENDING")
+        # The second page starts after the last notification returned
+        notifications.document.reset_mock()
+        client.get("/api/notifications", query_string={"cursor": data["next_cursor"]},
+                   headers={"X-User-Id": "user1"})
+        page = notifications.where.return_value.order_by.return_value.order_by.return_value
+        position = page.start_after.call_args[0][0]
+        assert position["created_at"] == "2025-01-14T10:00:00+00:00"
+        notifications.document.assert_called_with("n1")
+
+    def test_invalid_cursor(self, client, mock_db):
+        _inbox_db(mock_db)
+
+        response = client.get("/api/notifications?cursor=nope", headers={"X-User-Id": "user1"})
+
+        assert response.status_code == 400
+
+    def test_unread_count_is_one_document_read(self, client, mock_db):
+        notifications, counters = _inbox_db(mock_db, unread=3)
+
+        response = client.get("/api/notifications/unread-count", headers={"X-User-Id": "user1"})
+
+        assert response.get_json() == {"user_id": "user1", "unread": 3}
+        counters.document.assert_called_once_with("user1")
+        notifications.where.assert_not_called()
+
+    def test_unread_count_without_counter(self, client, mock_db):
+        _inbox_db(mock_db)
+
+        response = client.get("/api/notifications/unread-count", headers={"X-User-Id": "user1"})
+
+        assert response.get_json()["unread"] == 0
+
+
+class TestMarkRead:
+    """Marking notifications read keeps the unread counter in step"""
+
+    def _db(self, mock_db, snap):
+        notifications, counters = Mock(), Mock()
+        notifications.document.return_value.get.return_value = snap
+        mock_db.collection.side_effect = lambda name: {"notifications": notifications,
+                                                       "notification_counters": counters}[name]
+        return notifications, counters
+
+    def test_mark_read_decrements_once(self, client, mock_db):
+        snap = _notif_doc("n1")
+        snap.exists = True
+        notifications, counters = self._db(mock_db, snap)
+        transaction = mock_db.transaction.return_value
+
+        response = client.post("/api/notifications/n1/read", headers={"X-User-Id": "user1"})
+
+        assert response.get_json() == {"notification_id": "n1", "read": True, "changed": True}
+        ref, updates = transaction.update.call_args[0]
+        assert ref is notifications.document.return_value and updates["read"] is True
+        counter_ref, counter = transaction.set.call_args[0]
+        assert counter_ref is counters.document.return_value and counter["unread"] == -1
+
+        # Already read: nothing changes
+        snap.to_dict.return_value["read"] = True
+        transaction.reset_mock()
+        response = client.post("/api/notifications/n1/read", headers={"X-User-Id": "user1"})
+        assert response.get_json()["changed"] is False
+        transaction.set.assert_not_called()
+
+    def test_mark_read_of_someone_elses_notification(self, client, mock_db):
+        snap = _notif_doc("n1", user_id="user2")
+        snap.exists = True
+        self._db(mock_db, snap)
+
+        response = client.post("/api/notifications/n1/read", headers={"X-User-Id": "user1"})
+
+        assert response.status_code == 404
+        mock_db.transaction.return_value.update.assert_not_called()
+
+    def test_mark_all_read_uses_bulk_writer(self, client, mock_db):
+        docs = [_notif_doc(f"n{i}") for i in range(3)]
+        notifications, counters = self._db(mock_db, None)
+        unread = notifications.where.return_value.where.return_value
+        unread.select.return_value.stream.return_value = docs
+        writer = mock_db.bulk_writer.return_value
+        # Every successful write reports a result, the counter write included;
+        # n2 changed after it was listed, so its conditional update fails
+        report = lambda ref: writer.on_write_result.call_args[0][0](ref, Mock(), writer)
+        writer.update.side_effect = lambda ref, data, option: (
+            None if ref is docs[2].reference else report(ref))
+        writer.set.side_effect = lambda ref, data, merge=False: report(ref)
+        for doc in docs:
+            doc.reference.id = doc.id
+
+        response = client.post("/api/notifications/read-all", headers={"X-User-Id": "user1"})
+
+        assert response.get_json() == {"marked": 2}
+        filters = [unread_filter.kwargs["filter"] for unread_filter in
+                   (notifications.where.call_args, notifications.where.return_value.where.call_args)]
+        assert [(f.field_path, f.value) for f in filters] == [("user_id", "user1"), ("read", False)]
+        assert writer.update.call_count == 3
+        assert writer.update.call_args[0][1]["read"] is True
+        mock_db.write_option.assert_called_with(last_update_time=docs[2].update_time)
+        counter_ref, counter = writer.set.call_args[0]
+        assert counter_ref is counters.document.return_value and counter["unread"] == -2
+        writer.close.assert_called_once()
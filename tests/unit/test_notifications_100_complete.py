@@ -3,7 +3,7 @@ Comprehensive tests to achieve 100% coverage for notifications.py
 Tests notification creation, email sending, deadline checking, and all edge cases
 """
 import pytest
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import ANY, Mock, MagicMock, patch
 from datetime import datetime, timezone, timedelta
 
 
@@ -22,8 +22,7 @@ class TestNotificationCreation:
         result = create_notification(mock_db, "user123", "Test Title", "Test Body")
         
         assert result == "notif123"
-        mock_ref.set.assert_called_once()
-        call_args = mock_ref.set.call_args[0][0]
+        call_args = mock_db.batch.return_value.set.call_args_list[0][0][1]
         assert call_args["user_id"] == "user123"
         assert call_args["title"] == "Test Title"
         assert call_args["body"] == "Test Body"
@@ -40,7 +39,7 @@ class TestNotificationCreation:
         
         result = create_notification(mock_db, "user123", "Title", "Body", task_id="task123")
         
-        call_args = mock_ref.set.call_args[0][0]
+        call_args = mock_db.batch.return_value.set.call_args_list[0][0][1]
         assert call_args["task_id"] == "task123"
     
     def test_create_notification_empty_user_id(self, client, mock_db):
@@ -75,13 +74,15 @@ class TestNotificationCreation:
         
         mock_db.collection = Mock(side_effect=collection_side_effect)
         
-        with patch('backend.api.notifications.send_email_util', return_value=True):
+        with patch('backend.api.notifications.send_email_util') as mock_send:
             result = create_notification(mock_db, "user123", "Title", "Body", send_email=True)
         
         assert result == "notif123"
-        mock_ref.update.assert_called_once()
-        update_args = mock_ref.update.call_args[0][0]
-        assert update_args["email_sent"] is True
+        # The email is queued for the outbox workers, not sent in the request
+        mock_send.assert_not_called()
+        notif = mock_db.batch.return_value.set.call_args_list[0][0][1]
+        assert notif["email_sent"] is False
+        mock_db.batch.return_value.commit.assert_called_once()
     
     def test_create_notification_with_email_failure(self, client, mock_db):
         """Test notification creation when email sending fails"""
@@ -138,7 +139,7 @@ class TestNotificationCreation:
         
         # Should still create notification even if user not found
         assert result == "notif123"
-        mock_ref.set.assert_called_once()
+        mock_db.batch.return_value.set.assert_any_call(mock_ref, ANY)
     
     def test_create_notification_user_no_email(self, client, mock_db):
         """Test notification creation when user has no email"""
@@ -321,19 +322,18 @@ class TestCheckDeadlinesEndpoint:
             if name == "tasks":
                 return mock_query
             elif name == "notifications":
-                mock_notif_query = Mock()
-                mock_notif_query.where.return_value = mock_notif_query
-                mock_limit_mock = Mock()
-                mock_limit_mock.stream.return_value = []
-                mock_notif_query.limit.return_value = mock_limit_mock
-                mock_coll.document.return_value = Mock(id="notif123", set=Mock())
-                return mock_notif_query
+                # No reminder exists yet under its deterministic id
+                mock_coll.document.return_value.get.return_value = Mock(exists=False)
+                return mock_coll
             elif name == "users":
                 mock_coll.stream.return_value = mock_users_query.stream()
-                user_doc = Mock()
-                user_doc.exists = True
-                user_doc.to_dict.return_value = {"email": "user@example.com"}
-                mock_coll.document.return_value.get.return_value = user_doc
+                def user_ref(uid):
+                    user_doc = Mock()
+                    user_doc.id = uid
+                    user_doc.exists = True
+                    user_doc.to_dict.return_value = {"email": "user@example.com"}
+                    return Mock(get=Mock(return_value=user_doc))
+                mock_coll.document.side_effect = user_ref
                 return mock_coll
             return mock_coll
         
@@ -344,8 +344,8 @@ class TestCheckDeadlinesEndpoint:
         
         assert response.status_code == 200
         data = response.get_json()
-        assert "checked" in data
-        assert "notifications_created" in data
+        assert data["checked"] == 1
+        assert data["notifications_created"] == 2
     
     def test_check_deadlines_custom_window(self, client, mock_db):
         """Test deadline checking with custom start/end ISO"""
@@ -374,6 +374,7 @@ class TestCheckDeadlinesEndpoint:
     
     def test_check_deadlines_resend_existing(self, client, mock_db):
         """Test resending emails for existing notifications"""
+        from backend.api.notifications import reminder_id
         task = Mock()
         task.id = "task123"
         task.to_dict.return_value = {
@@ -384,11 +385,15 @@ class TestCheckDeadlinesEndpoint:
             "project_id": None
         }
         
-        # Mock existing notification
+        # Mock existing notification, stored under the reminder's deterministic id
         existing_notif = Mock()
-        existing_notif.reference = Mock()
-        existing_notif.reference.update = Mock()
-        existing_notif.to_dict.return_value = {"email_sent": False}
+        existing_notif.id = reminder_id("user123", "task123", "deadline", "2025-11-05T10:00:00+00:00")
+        existing_notif.exists = True
+        existing_notif.to_dict.return_value = {
+            "user_id": "user123",
+            "task_id": "task123",
+            "email_sent": False,
+        }
         
         mock_query = Mock()
         mock_query.where.return_value = mock_query
@@ -400,15 +405,12 @@ class TestCheckDeadlinesEndpoint:
             if name == "tasks":
                 return mock_query
             elif name == "notifications":
-                mock_notif_query = Mock()
-                mock_notif_query.where.return_value = mock_notif_query
-                mock_limit_mock = Mock()
-                mock_limit_mock.stream.return_value = [existing_notif]
-                mock_notif_query.limit.return_value = mock_limit_mock
-                return mock_notif_query
+                mock_coll.document.return_value.get.return_value = existing_notif
+                return mock_coll
             elif name == "users":
                 mock_coll.stream.return_value = []
                 user_doc = Mock()
+                user_doc.id = "user123"
                 user_doc.exists = True
                 user_doc.to_dict.return_value = {"email": "user@example.com"}
                 mock_coll.document.return_value.get.return_value = user_doc
@@ -417,12 +419,14 @@ class TestCheckDeadlinesEndpoint:
         
         mock_db.collection = Mock(side_effect=collection_side_effect)
         
-        with patch('backend.api.notifications.send_email_util', return_value=True):
+        with patch('backend.api.notifications.email_outbox.add') as mock_add:
             response = client.post("/api/notifications/check-deadlines?resend_existing=true")
         
         assert response.status_code == 200
-        # Verify update was called to mark email as sent
-        existing_notif.reference.update.assert_called_once()
+        assert response.get_json()["notifications_created"] == 0
+        # Verify the email was queued again for the existing notification
+        mock_add.assert_called_once()
+        assert mock_add.call_args[0][2:4] == (existing_notif.id, "user@example.com")
     
     def test_check_deadlines_with_project_members(self, client, mock_db):
         """Test deadline checking includes project members"""
@@ -438,7 +442,7 @@ class TestCheckDeadlinesEndpoint:
         
         # Mock membership
         member = Mock()
-        member.to_dict.return_value = {"user_id": "member123"}
+        member.to_dict.return_value = {"project_id": "proj123", "user_id": "member123"}
         
         mock_query = Mock()
         mock_query.where.return_value = mock_query
@@ -455,16 +459,13 @@ class TestCheckDeadlinesEndpoint:
                 mock_mem_query.stream.return_value = [member]
                 return mock_mem_query
             elif name == "notifications":
-                mock_notif_query = Mock()
-                mock_notif_query.where.return_value = mock_notif_query
-                mock_limit_mock = Mock()
-                mock_limit_mock.stream.return_value = []
-                mock_notif_query.limit.return_value = mock_limit_mock
-                mock_coll.document.return_value = Mock(id="notif123", set=Mock())
-                return mock_notif_query
+                # No reminder exists yet under its deterministic id
+                mock_coll.document.return_value.get.return_value = Mock(exists=False)
+                return mock_coll
             elif name == "users":
                 mock_coll.stream.return_value = []
                 user_doc = Mock()
+                user_doc.id = "member123"
                 user_doc.exists = True
                 user_doc.to_dict.return_value = {"email": "member@example.com"}
                 mock_coll.document.return_value.get.return_value = user_doc
@@ -477,6 +478,7 @@ class TestCheckDeadlinesEndpoint:
             response = client.post("/api/notifications/check-deadlines")
         
         assert response.status_code == 200
+        assert response.get_json()["notifications_created"] == 1
 
 
 class TestDueTodayEndpoint:
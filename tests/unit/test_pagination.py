@@ -0,0 +1,117 @@
+"""Unit tests for backend/api/pagination.py"""
+from unittest.mock import Mock
+
+import pytest
+from flask import Flask
+
+from backend.api import pagination
+from backend.api.pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, fetch_page, fill_page, page_args, split_page,
+)
+
+ORDER = [("created_at", "DESCENDING")]
+
+
+def _doc(doc_id, created_at=None):
+    doc = Mock()
+    doc.id = doc_id
+    doc.to_dict.return_value = {"created_at": created_at}
+    return doc
+
+
+class TestPageArgs:
+    @pytest.mark.parametrize("query,expected", [
+        ("/", 100),
+        ("/?limit=25", 25),
+        ("/?limit=0", 1),
+        ("/?limit=100000", pagination.MAX_PAGE_SIZE),
+        ("/?limit=abc", 100),
+    ])
+    def test_limit_is_defaulted_and_clamped(self, query, expected):
+        with Flask(__name__).test_request_context(query):
+            assert page_args() == (expected, None)
+
+    def test_cursor_round_trips(self):
+        token = encode_cursor(["2024-01-01T00:00:00+00:00", "p1"])
+        with Flask(__name__).test_request_context(f"/?cursor={token}"):
+            assert page_args(order=ORDER) == (100, ["2024-01-01T00:00:00+00:00", "p1"])
+
+    def test_cursor_must_match_order(self):
+        token = encode_cursor(["p1"])
+        with Flask(__name__).test_request_context(f"/?cursor={token}"):
+            with pytest.raises(InvalidCursor):
+                page_args(order=ORDER)
+
+    @pytest.mark.parametrize("token", ["%%%", encode_cursor({"id": "p1"}), encode_cursor([]), encode_cursor([1])])
+    def test_malformed_cursor(self, token):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(token)
+
+
+class TestFetchPage:
+    def test_orders_by_sort_key_then_document_id(self):
+        collection = Mock()
+        query = Mock()
+        ordered = query.order_by.return_value.order_by.return_value
+        ordered.start_after.return_value.limit.return_value.stream.return_value = [
+            _doc("p2", "b"), _doc("p3", "a"), _doc("p4", "a"),
+        ]
+
+        docs, next_cursor = fetch_page(collection, query, ORDER, 2, ["c", "p1"])
+
+        query.order_by.assert_called_once_with("created_at", direction="DESCENDING")
+        query.order_by.return_value.order_by.assert_called_once_with("__name__", direction="DESCENDING")
+        ordered.start_after.assert_called_once_with({
+            "created_at": "c", "__name__": collection.document.return_value,
+        })
+        collection.document.assert_called_once_with("p1")
+        ordered.start_after.return_value.limit.assert_called_once_with(3)
+        assert [d.id for d in docs] == ["p2", "p3"]
+        assert decode_cursor(next_cursor) == ["a", "p3"]
+
+    def test_last_page_has_no_cursor(self):
+        docs, next_cursor = split_page([_doc("a"), _doc("b")], 2)
+
+        assert [d.id for d in docs] == ["a", "b"]
+        assert next_cursor is None
+
+
+class TestFillPage:
+    def _scan(self, docs, page_size):
+        """scan() over `docs` (already in order), recording the positions it was asked for."""
+        positions = []
+
+        def scan(position):
+            positions.append(position)
+            start = 0 if position is None else [d.id for d in docs].index(position[-1]) + 1
+            return split_page(docs[start:start + page_size + 1], page_size, ORDER)
+        return scan, positions
+
+    def test_reads_on_until_the_page_is_full(self):
+        docs = [_doc(f"t{i}", f"2024-01-0{9 - i}") for i in range(6)]
+        scan, positions = self._scan(docs, 2)
+
+        page, next_cursor = fill_page(scan, lambda d: d.id in ("t0", "t3", "t4", "t5"), 2, ORDER)
+
+        assert [d.id for d in page] == ["t0", "t3"]
+        assert decode_cursor(next_cursor) == ["2024-01-06", "t3"]
+        assert positions == [None, ["2024-01-08", "t1"]]
+
+    def test_short_page_when_the_rounds_run_out(self):
+        docs = [_doc(f"t{i}", f"2024-01-0{9 - i}") for i in range(6)]
+        scan, positions = self._scan(docs, 1)
+
+        page, next_cursor = fill_page(scan, lambda d: d.id == "t5", 1, ORDER, max_rounds=3)
+
+        assert page == []
+        # Resumes after the last document scanned, not the last one kept
+        assert decode_cursor(next_cursor) == ["2024-01-07", "t2"]
+        assert len(positions) == 3
+
+    def test_last_page(self):
+        scan, _ = self._scan([_doc("t0", "b"), _doc("t1", "a")], 5)
+
+        page, next_cursor = fill_page(scan, lambda d: d.id == "t1", 5, ORDER)
+
+        assert [d.id for d in page] == ["t1"]
+        assert next_cursor is None
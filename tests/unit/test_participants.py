@@ -0,0 +1,79 @@
+"""Unit tests for backend/api/participants.py"""
+from unittest.mock import Mock
+
+from backend.api import participants
+
+
+def _doc(doc_id, data):
+    doc = Mock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return doc
+
+
+class TestParticipantIds:
+    def test_creator_and_assignee(self):
+        data = {"created_by": {"user_id": "u2"}, "assigned_to": {"user_id": "u1"}}
+
+        assert participants.participant_ids(data) == ["u1", "u2"]
+
+    def test_multiple_assignees_and_duplicates(self):
+        data = {
+            "created_by": {"user_id": "u1"},
+            "assigned_to": [{"user_id": "u1"}, {"user_id": "u3"}, {"name": "no id"}],
+        }
+
+        assert participants.participant_ids(data) == ["u1", "u3"]
+
+    def test_unassigned(self):
+        assert participants.participant_ids({"created_by": {"user_id": "u1"}, "assigned_to": None}) == ["u1"]
+        assert participants.participant_ids({}) == []
+
+    def test_updates_only_recomputed_when_people_change(self):
+        current = {"created_by": {"user_id": "u1"}, "assigned_to": {"user_id": "u2"}}
+
+        assert participants.participant_updates(current, {"status": "Done"}) == {"status": "Done"}
+        assert participants.participant_updates(current, {"assigned_to": {"user_id": "u3"}}) == {
+            "assigned_to": {"user_id": "u3"}, "participant_ids": ["u1", "u3"],
+        }
+
+
+class TestQueries:
+    def test_tasks_for_any_chunks_ids(self):
+        db = Mock()
+
+        queries = participants.tasks_for_any(db, {f"u{i:02d}" for i in range(31)} | {None})
+
+        assert [label for label, _ in queries] == ["participants[0]", "participants[1]"]
+        filters = [call.kwargs["filter"] for call in db.collection.return_value.where.call_args_list]
+        assert [(f.field_path, f.op, len(f.value)) for f in filters] == [
+            ("participant_ids", "array_contains_any", 30),
+            ("participant_ids", "array_contains_any", 1),
+        ]
+
+
+class TestBackfill:
+    def test_updates_missing_and_stale_tasks_page_by_page(self):
+        db = Mock()
+        tasks = db.collection.return_value
+        page = tasks.select.return_value.order_by.return_value
+        current = _doc("t1", {"created_by": {"user_id": "u1"}, "participant_ids": ["u1"]})
+        missing = _doc("t2", {"created_by": {"user_id": "u1"}, "assigned_to": {"user_id": "u2"}})
+        stale = _doc("t3", {"created_by": {"user_id": "u1"}, "assigned_to": {"user_id": "u3"}, "participant_ids": ["u1", "u2"]})
+        page.limit.return_value.stream.return_value = [current, missing, stale]
+        page.start_after.return_value.limit.return_value.stream.return_value = [stale]
+        batch = db.batch.return_value
+
+        assert participants.backfill(db, page_size=2) == (3, 2)
+
+        batch.update.assert_any_call(missing.reference, {"participant_ids": ["u1", "u2"]})
+        batch.update.assert_any_call(stale.reference, {"participant_ids": ["u1", "u3"]})
+        assert batch.commit.call_count == 2
+
+    def test_dry_run_writes_nothing(self):
+        db = Mock()
+        page = db.collection.return_value.select.return_value.order_by.return_value
+        page.limit.return_value.stream.return_value = [_doc("t1", {"created_by": {"user_id": "u1"}})]
+
+        assert participants.backfill(db, dry_run=True) == (1, 1)
+        db.batch.return_value.commit.assert_not_called()
@@ -0,0 +1,137 @@
+"""Unit tests for backend/api/profile_cache.py (process-wide role cache)"""
+import sys
+from unittest.mock import Mock
+
+from backend.api import profile_cache
+from backend.api.profile_cache import ProfileCache
+
+fake_firestore = sys.modules.get("firebase_admin.firestore")
+
+
+def _snapshot(data, exists=True):
+    snap = Mock()
+    snap.exists = exists
+    snap.to_dict.return_value = data
+    return snap
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProfileCache:
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = ProfileCache(ttl_seconds=10, max_entries=5, clock=clock)
+        cache.put("u1", {"role": "staff"})
+
+        clock.now = 9.9
+        assert cache.get("u1") == {"role": "staff"}
+        clock.now = 10
+        assert cache.get("u1") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ProfileCache(ttl_seconds=60, max_entries=2)
+        cache.put("u1", {})
+        cache.put("u2", {})
+        cache.get("u1")
+        cache.put("u3", {})
+
+        assert cache.get("u2") is None
+        assert cache.get("u1") == {}
+        assert cache.get("u3") == {}
+
+    def test_returns_copies(self):
+        cache = ProfileCache()
+        data = {"role": "staff"}
+        cache.put("u1", data)
+        data["role"] = "admin"
+        cache.get("u1")["role"] = "manager"
+
+        assert cache.get("u1") == {"role": "staff"}
+
+
+class TestGetUser:
+    def test_reads_firestore_once_across_calls(self):
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.return_value = _snapshot({"role": "Manager"})
+
+        assert profile_cache.get_role(db, "u1") == "manager"
+        assert profile_cache.get_role(db, "u1") == "manager"
+        assert ref.get.call_count == 1
+
+    def test_missing_user_is_not_cached(self):
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.return_value = _snapshot(None, exists=False)
+
+        assert profile_cache.get_user(db, "ghost").exists is False
+        assert profile_cache.get_role(db, "ghost") == "staff"
+        assert ref.get.call_count == 2
+
+    def test_empty_user_id_skips_lookup(self):
+        db = Mock()
+
+        assert profile_cache.get_user(db, "").exists is False
+        db.collection.assert_not_called()
+
+    def test_invalidate_forces_reread(self):
+        db = Mock()
+        ref = db.collection.return_value.document.return_value
+        ref.get.side_effect = [_snapshot({"role": "staff"}), _snapshot({"role": "manager"})]
+
+        assert profile_cache.get_role(db, "u1") == "staff"
+        profile_cache.invalidate("u1")
+        assert profile_cache.get_role(db, "u1") == "manager"
+
+
+class TestAdminInvalidation:
+    def test_change_user_role_invalidates_target(self, client, mock_db, monkeypatch):
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        profiles = {
+            "admin1": {"role": "admin"},
+            "u1": {"role": "staff"},
+        }
+
+        def document(user_id):
+            ref = Mock()
+            ref.get.side_effect = lambda: _snapshot(dict(profiles[user_id]))
+            ref.update.side_effect = lambda updates: profiles[user_id].update(updates)
+            return ref
+
+        mock_db.collection.return_value.document.side_effect = document
+
+        assert profile_cache.get_role(mock_db, "u1") == "staff"
+        resp = client.put("/api/admin/users/u1/role",
+                          headers={"X-User-Id": "admin1"}, json={"role": "manager"})
+
+        assert resp.status_code == 200
+        assert profile_cache.get_role(mock_db, "u1") == "manager"
+
+    def test_remove_manager_invalidates_staff_and_manager(self, client, mock_db, monkeypatch):
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        profiles = {
+            "m1": {"role": "manager", "team_staff_ids": ["s1"]},
+            "s1": {"role": "staff", "manager_id": "m1"},
+        }
+
+        def document(user_id):
+            ref = Mock()
+            ref.get.side_effect = lambda: _snapshot(dict(profiles[user_id]))
+            ref.update.side_effect = lambda updates: profiles[user_id].update(updates)
+            return ref
+
+        mock_db.collection.return_value.document.side_effect = document
+
+        assert profile_cache.get_user(mock_db, "s1").to_dict()["manager_id"] == "m1"
+        resp = client.delete("/api/manager/staff/s1/remove-manager", headers={"X-User-Id": "m1"})
+
+        assert resp.status_code == 200
+        assert profile_cache.get_user(mock_db, "s1").to_dict()["manager_id"] != "m1"
+        assert profile_cache.get_user(mock_db, "m1").to_dict()["team_staff_ids"] == []
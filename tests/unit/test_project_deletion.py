@@ -0,0 +1,114 @@
+"""Unit tests for backend/api/project_deletion.py"""
+from unittest.mock import Mock
+
+from backend.api import batching, project_deletion
+
+
+def _doc(doc_id, data=None):
+    doc = Mock()
+    doc.id = doc_id
+    doc.exists = data is not None
+    doc.to_dict.return_value = data
+    doc.reference = f"ref:{doc_id}"
+    return doc
+
+
+class _Db:
+    """Mock db: `tasks` pages, per-task child docs and memberships."""
+
+    def __init__(self, task_pages, children=None, memberships=()):
+        self.db = Mock()
+        self.colls = {}
+        children = children or {}
+        tasks = self._coll("tasks")
+        page = tasks.where.return_value.select.return_value.order_by.return_value
+        page.limit.return_value.stream.return_value = task_pages[0]
+        page.start_after.return_value.limit.return_value.stream.side_effect = task_pages[1:] + [[]]
+        for name in project_deletion.TASK_CHILD_COLLECTIONS:
+            coll = self._coll(name)
+            coll.where.side_effect = lambda filter=None, name=name: Mock(
+                select=Mock(return_value=Mock(stream=Mock(return_value=[
+                    _doc(f"{name}-{task_id}", {"task_id": task_id, "label_id": "l1"})
+                    for task_id in filter.value if task_id in children.get(name, ())
+                ])))
+            )
+        self._coll("memberships").where.return_value.select.return_value.stream.return_value = [
+            _doc(m) for m in memberships
+        ]
+        self.job = self._coll("project_deletions").document.return_value
+        self.job.get.return_value = _doc("p1", None)
+        self.db.collection.side_effect = self._coll
+
+    def _coll(self, name):
+        return self.colls.setdefault(name, Mock())
+
+    def deleted(self):
+        return [c.args[0] for c in self.db.batch.return_value.delete.call_args_list]
+
+
+class TestRun:
+    def test_deletes_tasks_children_memberships_then_project(self, monkeypatch):
+        task_pages = [[_doc("t1", {"tags": ["bug"], "status": "Done"}), _doc("t2", {"tags": ["bug", "ui"]})]]
+        fake = _Db(task_pages, children={"subtasks": ["t1"], "notes": ["t1", "t2"], "task_labels": ["t1", "t2"]}, memberships=["p1_u1"])
+        recorded = []
+        monkeypatch.setattr(project_deletion.counters, "record_tasks_deleted", lambda db, tasks: recorded.append(tasks))
+
+        job = project_deletion.run(fake.db, "p1", {"name": "Proj"})
+
+        assert job["status"] == "done"
+        assert job["deleted"] == {
+            "tasks": 2, "subtasks": 1, "notes": 2, "attachments": 0, "task_labels": 2, "memberships": 1,
+        }
+        assert set(fake.deleted()) == {
+            "ref:subtasks-t1", "ref:notes-t1", "ref:notes-t2", "ref:task_labels-t1", "ref:task_labels-t2", "ref:t1", "ref:t2", "ref:p1_u1",
+        }
+        fake.colls["projects"].document.return_value.delete.assert_called_once()
+        assert recorded == [[t.to_dict() for t in task_pages[0]]]
+        sets = [c.args[1] for c in fake.db.batch.return_value.set.call_args_list]
+        assert {s["tag"]: s["count"] for s in sets if "tag" in s} == {"bug": -2, "ui": -1}
+        assert [s for s in sets if "task_count" in s] == [{"task_count": -2}]
+        assert fake.job.set.call_args[0][0]["status"] == "done"
+
+    def test_pages_through_tasks(self, monkeypatch):
+        monkeypatch.setattr(project_deletion, "TASK_PAGE_SIZE", 2)
+        pages = [[_doc("t1", {}), _doc("t2", {}), _doc("t3", {})], [_doc("t3", {})]]
+        fake = _Db(pages)
+
+        job = project_deletion.run(fake.db, "p1", {})
+
+        assert job["deleted"]["tasks"] == 3
+        assert {"ref:t1", "ref:t2", "ref:t3"} <= set(fake.deleted())
+
+    def test_batches_are_capped_at_500_writes(self, monkeypatch):
+        monkeypatch.setattr(batching, "BATCH_LIMIT", 2)
+        fake = _Db([[_doc("t1", {}), _doc("t2", {}), _doc("t3", {})]])
+
+        project_deletion.run(fake.db, "p1", {})
+
+        assert fake.db.batch.return_value.commit.call_count == 2
+
+    def test_failure_is_recorded_and_project_kept(self):
+        fake = _Db([[_doc("t1", {})]])
+        fake.db.batch.return_value.commit.side_effect = Exception("quota")
+
+        job = project_deletion.run(fake.db, "p1", {})
+
+        assert job["status"] == "failed"
+        assert job["error"] == "quota"
+        fake._coll("projects").document.return_value.delete.assert_not_called()
+
+
+class TestStart:
+    def test_stale_running_job_is_restarted(self, monkeypatch):
+        db = Mock()
+        stale = project_deletion.new_job("p1")
+        stale.update({"status": "running", "updated_at": "2000-01-01T00:00:00+00:00"})
+        db.collection.return_value.document.return_value.get.return_value = _doc("p1", stale)
+        submit = Mock()
+        monkeypatch.setattr(project_deletion, "_submit", submit)
+
+        job, started = project_deletion.start(db, "p1", {"name": "Proj"})
+
+        assert started is True
+        assert job["status"] == "queued"
+        submit.assert_called_once_with(project_deletion.run, db, "p1", {"name": "Proj"})
@@ -0,0 +1,43 @@
+"""Unit tests for backend/api/projection.py"""
+from flask import Flask
+
+from backend.api.projection import requested_fields, select_fields, trim
+
+AVAILABLE = ["title", "status", "due_date", "description"]
+
+
+class TestRequestedFields:
+    def test_absent_means_every_field(self):
+        with Flask(__name__).test_request_context("/"):
+            assert requested_fields(AVAILABLE) is None
+
+    def test_blank_means_every_field(self):
+        with Flask(__name__).test_request_context("/?fields=,%20"):
+            assert requested_fields(AVAILABLE) is None
+
+    def test_unknown_names_are_ignored(self):
+        with Flask(__name__).test_request_context("/?fields=status,%20title,bogus"):
+            assert requested_fields(AVAILABLE) == ["title", "status"]
+
+
+class TestSelectFields:
+    def test_defaults_to_full_projection(self):
+        assert select_fields(AVAILABLE) == AVAILABLE
+
+    def test_requested_subset_keeps_required(self):
+        assert select_fields(AVAILABLE, ["title"], required=("due_date", "archived")) == [
+            "title", "due_date", "archived",
+        ]
+
+
+class TestTrim:
+    def test_no_fields_is_noop(self):
+        row = {"task_id": "t1", "title": "T", "description": "D"}
+        assert trim(row, None) is row
+
+    def test_keeps_requested_and_id_keys(self):
+        row = {"task_id": "t1", "title": "T", "description": "D", "member_id": "m1"}
+        assert trim(row, ["title"]) == {"task_id": "t1", "title": "T"}
+        assert trim(row, ["title"], keep=("task_id", "member_id")) == {
+            "task_id": "t1", "title": "T", "member_id": "m1",
+        }
@@ -583,8 +583,9 @@ class TestPatchProject:
         assert data["project_id"] == "proj123"
         assert data["name"] == "Updated Project"
         
-        # Verify update was called
+        # Verify update was called and the project was not read back
         mock_ref.update.assert_called_once()
+        mock_ref.get.assert_called_once()
         
     def test_patch_project_update_name(self, client, mock_db, monkeypatch):
         """Test updating only the name"""
@@ -726,45 +727,44 @@ class TestDeleteProject:
     """Test the delete_project DELETE endpoint"""
     
     def test_delete_project_success(self, client, mock_db, monkeypatch):
-        """Test successfully deleting a project"""
+        """Deleting a project queues a background job and returns 202"""
         mock_ref = Mock()
         mock_get_result = Mock()
         mock_get_result.exists = True
+        mock_get_result.to_dict.return_value = {"name": "Proj"}
         mock_ref.get.return_value = mock_get_result
         
-        # Mock memberships query
-        mock_mem1 = Mock()
-        mock_mem1.id = "mem1"
-        mock_mem2 = Mock()
-        mock_mem2.id = "mem2"
+        jobs = Mock()
+        jobs.document.return_value.get.return_value.exists = False
         
-        mock_db.collection.return_value.document.return_value = mock_ref
-        
-        # Setup collection mocking for both projects and memberships
         def mock_collection(name):
             if name == "projects":
                 projects_collection = Mock()
                 projects_collection.document.return_value = mock_ref
                 return projects_collection
-            elif name == "memberships":
-                memberships_collection = Mock()
-                memberships_collection.where.return_value.stream.return_value = [mock_mem1, mock_mem2]
-                memberships_collection.document = Mock(return_value=Mock())
-                return memberships_collection
+            elif name == "project_deletions":
+                return jobs
             return Mock()
         
         mock_db.collection = mock_collection
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        submitted = []
+        monkeypatch.setattr(projects_module.project_deletion, "_submit", lambda fn, *args: submitted.append(args))
         
-        response = client.delete("/api/projects/proj123")
+        response = client.delete("/api/projects/proj123", headers={"X-User-Id": "admin1"})
         
-        assert response.status_code == 200
+        assert response.status_code == 202
         data = response.get_json()
         assert data["ok"] == True
         assert data["project_id"] == "proj123"
+        assert data["job"]["status"] == "queued"
+        assert data["job"]["requested_by"] == "admin1"
         
-        # Verify delete was called
-        mock_ref.delete.assert_called_once()
+        # The project is flagged and the cascade runs in the background
+        assert mock_ref.update.call_args[0][0]["deleting"] is True
+        mock_ref.delete.assert_not_called()
+        assert submitted == [(mock_db, "proj123", {"name": "Proj"})]
+        jobs.document.assert_called_with("proj123")
         
     def test_delete_project_not_found(self, client, mock_db, monkeypatch):
         """Test error when project doesn't exist"""
@@ -783,50 +783,47 @@ class TestDeleteProject:
         assert "error" in data
         assert "Project not found" in data["error"]
         
-    def test_delete_project_cleans_up_memberships(self, client, mock_db, monkeypatch):
-        """Test that deleting project also deletes associated memberships"""
-        mock_ref = Mock()
-        mock_get_result = Mock()
-        mock_get_result.exists = True
-        mock_ref.get.return_value = mock_get_result
+    def test_delete_project_already_running(self, client, mock_db, monkeypatch):
+        """A second DELETE while the job runs returns the existing job"""
+        running = projects_module.project_deletion.new_job("proj123")
+        running["status"] = "running"
+        job_snap = Mock(exists=True)
+        job_snap.to_dict.return_value = running
+        mock_db.collection.return_value.document.return_value.get.side_effect = [
+            Mock(exists=True, to_dict=Mock(return_value={})), job_snap,
+        ]
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        submit = Mock()
+        monkeypatch.setattr(projects_module.project_deletion, "_submit", submit)
         
-        # Mock memberships
-        mock_mem1 = Mock()
-        mock_mem1.id = "mem1"
-        mock_mem2 = Mock()
-        mock_mem2.id = "mem2"
+        response = client.delete("/api/projects/proj123")
         
-        deleted_memberships = []
+        assert response.status_code == 202
+        assert response.get_json()["job"]["status"] == "running"
+        submit.assert_not_called()
+
+
+class TestGetProjectDeletion:
+    """Test the deletion progress endpoint"""
+    
+    def test_progress(self, client, mock_db, monkeypatch):
+        job = projects_module.project_deletion.new_job("proj123")
+        job["deleted"]["tasks"] = 500
+        mock_db.collection.return_value.document.return_value.get.return_value = Mock(
+            exists=True, to_dict=Mock(return_value=job))
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
         
-        def mock_collection(name):
-            if name == "projects":
-                projects_collection = Mock()
-                projects_collection.document.return_value = mock_ref
-                return projects_collection
-            elif name == "memberships":
-                memberships_collection = Mock()
-                memberships_collection.where.return_value.stream.return_value = [mock_mem1, mock_mem2]
-                
-                def mock_mem_document(mem_id):
-                    mem_doc = Mock()
-                    def delete_mem():
-                        deleted_memberships.append(mem_id)
-                    mem_doc.delete = delete_mem
-                    return mem_doc
-                
-                memberships_collection.document = mock_mem_document
-                return memberships_collection
-            return Mock()
+        response = client.get("/api/projects/proj123/deletion")
         
-        mock_db.collection = mock_collection
+        assert response.status_code == 200
+        assert response.get_json()["deleted"]["tasks"] == 500
+    
+    def test_no_job(self, client, mock_db, monkeypatch):
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
         
-        response = client.delete("/api/projects/proj123")
+        response = client.get("/api/projects/proj123/deletion")
         
-        assert response.status_code == 200
-        # Verify memberships were deleted
-        assert "mem1" in deleted_memberships
-        assert "mem2" in deleted_memberships
+        assert response.status_code == 404
 
 
 class TestBlueprintRegistration:
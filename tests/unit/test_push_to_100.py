@@ -352,6 +352,8 @@ class TestStaffBranch:
                 mock_coll.document.return_value.get.return_value = mock_user
             elif name == "projects":
                 mock_coll.document.return_value.get.return_value = mock_proj
+            elif name == "memberships":
+                mock_coll.where.return_value.stream.return_value = []
             elif name == "tasks":
                 mock_coll.add = Mock(return_value=(None, Mock(id="task123")))
             return mock_coll
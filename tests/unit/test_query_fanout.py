@@ -0,0 +1,121 @@
+"""Unit tests for backend/api/query_fanout.py and its use in list_tasks"""
+import sys
+import threading
+from unittest.mock import Mock
+
+from backend.api import query_fanout
+
+fake_firestore = sys.modules.get("firebase_admin.firestore")
+
+
+def _query(docs=None, error=None, barrier=None):
+    query = Mock()
+
+    def stream():
+        if barrier is not None:
+            barrier.wait(timeout=5)
+        if error is not None:
+            raise error
+        return iter(docs or [])
+
+    query.stream.side_effect = stream
+    return query
+
+
+def _doc(doc_id, data=None):
+    doc = Mock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data or {}
+    return doc
+
+
+class TestRunQueries:
+    def test_results_keep_input_order(self):
+        results = query_fanout.run_queries([
+            ("a", _query([_doc("1")])),
+            ("b", _query([_doc("2"), _doc("3")])),
+        ])
+
+        assert [r.label for r in results] == ["a", "b"]
+        assert [len(r.docs) for r in results] == [1, 2]
+        assert all(r.elapsed_ms >= 0 for r in results)
+
+    def test_queries_run_concurrently(self):
+        # Each stream blocks until both are in flight; serial execution would time out
+        barrier = threading.Barrier(2)
+        results = query_fanout.run_queries([
+            ("a", _query([_doc("1")], barrier=barrier)),
+            ("b", _query([_doc("2")], barrier=barrier)),
+        ])
+
+        assert not barrier.broken
+        assert [r.error for r in results] == [None, None]
+
+    def test_failing_query_is_isolated(self):
+        results = query_fanout.run_queries([
+            ("ok", _query([_doc("1")])),
+            ("bad", _query(error=RuntimeError("boom"))),
+        ])
+
+        assert results[0].docs and results[0].error is None
+        assert results[1].docs == [] and str(results[1].error) == "boom"
+        assert query_fanout.timings(results)[1] == {
+            "query": "bad", "ms": results[1].elapsed_ms, "docs": 0, "error": "boom"
+        }
+
+    def test_chunked_respects_in_limit(self):
+        chunks = query_fanout.chunked(range(65))
+
+        assert [len(c) for c in chunks] == [30, 30, 5]
+        assert query_fanout.chunked([]) == []
+
+    def test_empty_input(self):
+        assert query_fanout.run_queries([]) == []
+
+
+class TestListTasksDiagnostics:
+    def _collections(self, mock_db, monkeypatch, backfilled=True):
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        viewer = Mock(exists=True)
+        viewer.to_dict.return_value = {"role": "staff"}
+        tasks = Mock()
+        tasks.where.return_value = tasks
+        tasks.limit.return_value = tasks
+        tasks.select.return_value = tasks
+        tasks.order_by.return_value = tasks
+        tasks.stream.side_effect = lambda: iter([_doc("t1", {"title": "T", "created_at": "1"})])
+        memberships = Mock()
+        memberships.where.return_value.stream.return_value = iter([])
+        users = Mock()
+        users.document.return_value.get.return_value = viewer
+        migrations = Mock()
+        migrations.document.return_value.get.return_value = _doc(
+            "task_acl", {"completed_at": "2025-01-01T00:00:00+00:00"} if backfilled else {})
+
+        mock_db.collection.side_effect = lambda name: {
+            "tasks": tasks, "memberships": memberships, "users": users, "migrations": migrations,
+        }[name]
+
+    def test_diag_reports_per_query_timings(self, client, mock_db, monkeypatch):
+        self._collections(mock_db, monkeypatch)
+
+        resp = client.get("/api/tasks?debug=1", headers={"X-User-Id": "u1"})
+
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert [t["task_id"] for t in body["tasks"]] == ["t1"]
+        assert [q["query"] for q in body["_diag"]["queries"]] == ["visible_to"]
+        assert all(q["docs"] == 1 for q in body["_diag"]["queries"])
+        assert "fanout_ms" in body["_diag"]
+
+    def test_rule_queries_run_until_visible_to_is_backfilled(self, client, mock_db, monkeypatch):
+        self._collections(mock_db, monkeypatch, backfilled=False)
+
+        resp = client.get("/api/tasks?debug=1", headers={"X-User-Id": "u1"})
+
+        assert resp.status_code == 200
+        body = resp.get_json()
+        # Every query finds t1; the page holds it once
+        assert [t["task_id"] for t in body["tasks"]] == ["t1"]
+        assert [q["query"] for q in body["_diag"]["queries"]] == ["visible_to", "created_by", "assigned_to"]
+        assert "visible_to_not_backfilled" in body["_diag"]["steps"]
@@ -87,12 +87,12 @@ class TestStaffDashboard:
         # Mock tasks created by user
         mock_task1 = Mock()
         mock_task1.id = "task1"
-        mock_task1.to_dict.return_value = {"title": "Task 1", "status": "in_progress"}
+        mock_task1.to_dict.return_value = {"title": "Task 1", "status": "in_progress", "created_by": {"user_id": user_id}}
         
         # Mock tasks assigned to user
         mock_task2 = Mock()
         mock_task2.id = "task2"
-        mock_task2.to_dict.return_value = {"title": "Task 2", "status": "to_do"}
+        mock_task2.to_dict.return_value = {"title": "Task 2", "status": "to_do", "assigned_to": {"user_id": user_id}}
         
         # Mock memberships
         mock_membership = Mock()
@@ -100,6 +100,7 @@ class TestStaffDashboard:
         
         # Mock project
         mock_project_doc = Mock()
+        mock_project_doc.id = "proj1"
         mock_project_doc.exists = True
         mock_project_doc.to_dict.return_value = {"name": "Project 1", "description": "Test project"}
         
@@ -108,8 +109,8 @@ class TestStaffDashboard:
             if name == "users":
                 mock_coll.document.return_value.get.return_value = mock_user_doc
             elif name == "tasks":
-                # First call is for created_by, second for assigned_to
-                mock_coll.where.return_value.stream.side_effect = [[mock_task1], [mock_task2]]
+                # One participant_ids query returns created and assigned tasks
+                mock_coll.where.return_value.stream.return_value = [mock_task1, mock_task2]
             elif name == "memberships":
                 mock_coll.where.return_value.stream.return_value = [mock_membership]
             elif name == "projects":
@@ -191,6 +192,7 @@ class TestGetStaffDashboard:
         
         # Mock project
         mock_project = Mock()
+        mock_project.id = "proj1"
         mock_project.exists = True
         mock_project.to_dict.return_value = {
             "name": "Test Project",
@@ -205,8 +207,8 @@ class TestGetStaffDashboard:
                 return mock_coll
             elif name == "tasks":
                 mock_query = Mock()
-                # First call for created_by tasks
-                mock_query.stream.side_effect = [[mock_task1], [mock_task2]]
+                # One participant_ids query returns created and assigned tasks
+                mock_query.stream.return_value = [mock_task1, mock_task2]
                 mock_coll.where.return_value = mock_query
                 return mock_coll
             elif name == "memberships":
@@ -303,7 +305,7 @@ class TestGetMyTasks:
         mock_task2.to_dict.return_value = {"title": "Task 2", "status": "to_do"}
         
         mock_coll = Mock()
-        mock_coll.where.return_value.stream.return_value = [mock_task1, mock_task2]
+        mock_coll.where.return_value.select.return_value.stream.return_value = [mock_task1, mock_task2]
         mock_db.collection.return_value = mock_coll
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -313,6 +315,25 @@ class TestGetMyTasks:
         data = response.get_json()
         assert 'tasks' in data
         assert len(data['tasks']) == 2
+        projection = mock_coll.where.return_value.select.call_args[0][0]
+        assert "title" in projection and "description" in projection
+    
+    def test_get_my_tasks_fields_param(self, client, mock_db, monkeypatch):
+        """?fields= narrows both the Firestore projection and the rows"""
+        mock_task = Mock()
+        mock_task.id = "task1"
+        mock_task.to_dict.return_value = {"title": "Task 1", "status": "to_do"}
+        
+        mock_coll = Mock()
+        mock_coll.where.return_value.select.return_value.stream.return_value = [mock_task]
+        mock_db.collection.return_value = mock_coll
+        
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        
+        response = client.get("/api/staff/tasks?user_id=staff123&fields=title,bogus")
+        assert response.status_code == 200
+        assert response.get_json()['tasks'] == [{"title": "Task 1", "task_id": "task1"}]
+        mock_coll.where.return_value.select.assert_called_once_with(["title"])
 
 
 class TestStaffCreateTask:
@@ -360,6 +381,8 @@ class TestStaffCreateTask:
             mock_coll = Mock()
             if name == "users":
                 mock_coll.document.return_value.get.return_value = mock_user_doc
+            elif name == "memberships":
+                mock_coll.where.return_value.stream.return_value = []
             elif name == "tasks":
                 mock_coll.add.return_value = mock_task_ref
             return mock_coll
@@ -402,6 +425,8 @@ class TestStaffCreateTask:
             mock_coll = Mock()
             if name == "users":
                 mock_coll.document.return_value.get.return_value = mock_user_doc
+            elif name == "memberships":
+                mock_coll.where.return_value.stream.return_value = []
             elif name == "tasks":
                 mock_coll.add.return_value = mock_task_ref
             return mock_coll
@@ -425,6 +450,7 @@ class TestStaffCreateTask:
         mock_collection = Mock()
         mock_query = Mock()
         mock_query.stream.return_value = []
+        mock_query.select.return_value = mock_query
         mock_collection.where.return_value = mock_query
         mock_db.collection.return_value = mock_collection
         
@@ -471,10 +497,16 @@ class TestCreateTask:
             mock_coll = Mock()
             if name == "users":
                 mock_coll.document.return_value.get.return_value = mock_user_doc
+            elif name == "memberships":
+                member = Mock()
+                member.to_dict.return_value = {"project_id": "proj1", "user_id": "teammate1"}
+                mock_coll.where.return_value.stream.return_value = [member]
             elif name == "tasks":
                 mock_coll.add.return_value = (None, mock_doc_ref)
+                tasks_colls.append(mock_coll)
             return mock_coll
         
+        tasks_colls = []
         mock_db.collection.side_effect = collection_side_effect
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
         
@@ -484,6 +516,8 @@ class TestCreateTask:
         data = response.get_json()
         assert data["success"] == True
         assert data["task_id"] == "new_task_123"
+        added = next(c.add.call_args[0][0] for c in tasks_colls if c.add.called)
+        assert added["visible_to"] == ["staff123", "teammate1"]
         assert "message" in data
         
     def test_create_task_with_defaults(self, client, mock_db, monkeypatch):
@@ -582,6 +616,7 @@ class TestStaffEndpointsIntegration:
                 }
                 mock_query = Mock()
                 mock_query.stream.return_value = [mock_task]
+                mock_query.select.return_value = mock_query
                 mock_coll.where.return_value = mock_query
                 
             return mock_coll
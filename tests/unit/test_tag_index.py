@@ -0,0 +1,145 @@
+"""Unit tests for backend/api/tag_index.py and the tag catalog endpoint"""
+import sys
+from unittest.mock import Mock
+
+from backend.api import tag_index
+from backend.api.pagination import decode_cursor, encode_cursor
+
+fake_firestore = sys.modules.get("firebase_admin.firestore")
+
+
+def _doc(doc_id, data):
+    doc = Mock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return doc
+
+
+def _index_writes(transaction):
+    """{tag: delta} from the transaction's merge-sets on tag_index."""
+    return {
+        args[1]["tag"]: args[1]["count"]
+        for args, kwargs in transaction.set.call_args_list
+        if kwargs == {"merge": True}
+    }
+
+
+class TestDocId:
+    def test_plain_tags_are_kept(self):
+        assert tag_index._doc_id("bug-fix2") == "bug-fix2"
+
+    def test_separators_and_reserved_ids_are_escaped(self):
+        assert tag_index._doc_id("a/b") == "a%2Fb"
+        assert tag_index._doc_id("..") == "%2E%2E"
+        assert tag_index._doc_id("__x__") == "%5F%5Fx%5F%5F"
+
+
+class TestWrites:
+    def test_untagged_create_is_a_plain_set(self):
+        db, ref = Mock(), Mock()
+
+        tag_index.set_task(db, ref, {"title": "t", "tags": []})
+
+        ref.set.assert_called_once_with({"title": "t", "tags": []})
+        db.transaction.assert_not_called()
+
+    def test_tagged_create_counts_tags_in_the_same_transaction(self):
+        db, ref = Mock(), Mock()
+        doc = {"title": "t", "tags": ["bug", "ui"], "archived": False}
+
+        tag_index.set_task(db, ref, doc)
+
+        transaction = db.transaction.return_value
+        transaction.set.assert_any_call(ref, doc)
+        assert _index_writes(transaction) == {"bug": 1, "ui": 1}
+        ref.set.assert_not_called()
+
+    def test_tag_edit_moves_counts_using_the_stored_tags(self):
+        db, ref = Mock(), Mock()
+        ref.get.return_value = _doc("t1", {"tags": ["bug", "ui"]})
+        updates = {"tags": ["ui", "api"]}
+
+        tag_index.update_task(db, ref, {"tags": ["bug", "ui"]}, updates)
+
+        transaction = db.transaction.return_value
+        ref.get.assert_called_once_with(transaction=transaction)
+        transaction.update.assert_called_once_with(ref, updates)
+        assert _index_writes(transaction) == {"api": 1, "bug": -1}
+
+    def test_archival_releases_tags(self):
+        db, ref = Mock(), Mock()
+        ref.get.return_value = _doc("t1", {"tags": ["bug"]})
+
+        tag_index.update_task(db, ref, {"tags": ["bug"]}, {"archived": True})
+
+        assert _index_writes(db.transaction.return_value) == {"bug": -1}
+
+    def test_other_updates_skip_the_transaction(self):
+        db, ref = Mock(), Mock()
+
+        tag_index.update_task(db, ref, {"tags": ["bug"]}, {"title": "new"})
+
+        ref.update.assert_called_once_with({"title": "new"})
+        db.transaction.assert_not_called()
+
+
+class TestRebuild:
+    def test_streams_tasks_in_pages_and_replaces_the_index(self):
+        db = Mock()
+        tasks, index = Mock(), Mock()
+        db.collection.side_effect = lambda name: tasks if name == "tasks" else index
+        index.document.side_effect = lambda doc_id: f"ref:{doc_id}"
+        page = tasks.select.return_value.order_by.return_value
+        page.limit.return_value.stream.return_value = [
+            _doc("t1", {"tags": ["bug"]}), _doc("t2", {"tags": ["bug", "ui"]}), _doc("t3", {}),
+        ]
+        page.start_after.return_value.limit.return_value.stream.return_value = [
+            _doc("t3", {}), _doc("t4", {"tags": ["ui"], "archived": True}),
+        ]
+        stale = _doc("old", {"tag": "old", "count": 3})
+        index.stream.return_value = [_doc("bug", {}), stale]
+
+        counts = tag_index.rebuild(db, page_size=2)
+
+        assert counts == {"bug": 2, "ui": 1}
+        tasks.select.assert_called_with(["tags", "archived"])
+        page.start_after.assert_called_once_with({"__name__": tasks.document.return_value})
+        tasks.document.assert_called_once_with("t2")
+        batch = db.batch.return_value
+        batch.set.assert_any_call("ref:bug", {"tag": "bug", "count": 2})
+        batch.set.assert_any_call("ref:ui", {"tag": "ui", "count": 1})
+        batch.delete.assert_called_once_with(stale.reference)
+        batch.commit.assert_called_once()
+
+
+class TestCatalog:
+    def test_prefix_page_with_counts(self, client, mock_db, monkeypatch):
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        index = Mock()
+        mock_db.collection = Mock(return_value=index)
+        ranged = index.where.return_value.where.return_value
+        page = ranged.order_by.return_value.order_by.return_value.limit.return_value
+        page.stream.return_value = [
+            _doc("bug", {"tag": "bug", "count": 4}),
+            _doc("bugfix", {"tag": "bugfix", "count": 0}),
+            _doc("build", {"tag": "build", "count": 1}),
+        ]
+
+        response = client.get("/api/tags/catalog?prefix=bu&limit=2")
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["tags"] == [{"tag": "bug", "count": 4}]
+        assert decode_cursor(data["next_cursor"]) == ["bugfix", "bugfix"]
+        bounds = [index.where.call_args.kwargs["filter"], index.where.return_value.where.call_args.kwargs["filter"]]
+        assert [(f.field_path, f.op, f.value) for f in bounds] == [("tag", ">=", "bu"), ("tag", "<", "bu\uf8ff")]
+        page_limit = ranged.order_by.return_value.order_by.return_value.limit
+        page_limit.assert_called_once_with(3)
+        mock_db.collection.assert_called_with("tag_index")
+
+    def test_invalid_cursor(self, client, mock_db, monkeypatch):
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+
+        response = client.get(f"/api/tags/catalog?cursor={encode_cursor(['only-id'])}")
+
+        assert response.status_code == 400
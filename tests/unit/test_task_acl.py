@@ -0,0 +1,225 @@
+"""Unit tests for backend/api/task_acl.py"""
+from unittest.mock import Mock
+
+from conftest import fake_get_all
+from backend.api import task_acl
+
+
+def _doc(doc_id, data, exists=True):
+    doc = Mock()
+    doc.id = doc_id
+    doc.exists = exists
+    doc.to_dict.return_value = data
+    return doc
+
+
+def _db(users=None, members=None):
+    """Mock db with `users` ({id: data}) and `members` ({project_id: [user ids]})."""
+    users, members = users or {}, members or {}
+    db = Mock()
+    db.get_all.side_effect = fake_get_all
+    user_coll, membership_coll, task_coll, migrations_coll = Mock(), Mock(), Mock(), Mock()
+
+    def user_ref(user_id):
+        ref = Mock()
+        ref.get.return_value = _doc(user_id, users.get(user_id), exists=user_id in users)
+        return ref
+    user_coll.document.side_effect = user_ref
+
+    def memberships_where(filter=None):
+        query = Mock()
+        query.stream.return_value = [
+            _doc(f"{filter.value}_{uid}", {"project_id": filter.value, "user_id": uid})
+            for uid in members.get(filter.value, [])
+        ]
+        return query
+    membership_coll.where.side_effect = memberships_where
+
+    db.collection.side_effect = lambda name: {
+        "users": user_coll, "memberships": membership_coll, "tasks": task_coll, "migrations": migrations_coll,
+    }[name]
+    return db, task_coll
+
+
+class TestComputeVisibleTo:
+    def test_participants_members_and_managers(self):
+        db, _ = _db(
+            users={
+                "creator": {"manager_id": "mgr1"}, "assignee": {"manager_id": "mgr2"},
+                "mgr1": {"role": "manager"}, "mgr2": {"role": "Director"},
+            },
+            members={"p1": ["member1", "creator"]},
+        )
+        data = {
+            "created_by": {"user_id": "creator"},
+            "assigned_to": {"user_id": "assignee"},
+            "project_id": "p1",
+        }
+
+        assert task_acl.compute_visible_to(db, data) == ["assignee", "creator", "member1", "mgr1", "mgr2"]
+
+    def test_manager_id_needs_a_managing_role(self):
+        db, _ = _db(users={
+            "creator": {"manager_id": "lead"}, "assignee": {"manager_id": "hr1"},
+            "lead": {"role": "staff"}, "hr1": {"role": "hr"},
+        })
+        data = {"created_by": {"user_id": "creator"}, "assigned_to": {"user_id": "assignee"}}
+
+        assert task_acl.compute_visible_to(db, data) == ["assignee", "creator", "hr1"]
+
+    def test_missing_manager_is_left_out(self):
+        db, _ = _db(users={"creator": {"manager_id": "gone"}})
+
+        assert task_acl.compute_visible_to(db, {"created_by": {"user_id": "creator"}}) == ["creator"]
+
+    def test_no_project_or_managers(self):
+        db, _ = _db(users={"creator": {}})
+
+        assert task_acl.compute_visible_to(db, {"created_by": {"user_id": "creator"}}) == ["creator"]
+
+    def test_updates_only_recomputed_when_inputs_change(self):
+        db, _ = _db(users={"u1": {}, "u3": {"manager_id": "m3"}, "m3": {"role": "manager"}})
+        current = {"created_by": {"user_id": "u1"}, "assigned_to": {"user_id": "u2"}}
+
+        assert task_acl.acl_updates(db, current, {"status": "Done"}) == {"status": "Done"}
+        assert task_acl.acl_updates(db, current, {"assigned_to": {"user_id": "u3"}}) == {
+            "assigned_to": {"user_id": "u3"}, "visible_to": ["m3", "u1", "u3"],
+        }
+
+
+class TestCanView:
+    def test_listed_viewer(self):
+        assert task_acl.can_view({"visible_to": ["u1"]}, "u1") is True
+        assert task_acl.can_view({"visible_to": ["u1"]}, "u2") is False
+
+    def test_admin_sees_everything(self):
+        assert task_acl.can_view({"visible_to": []}, "a1", "admin") is True
+
+    def test_legacy_task_is_undecided(self):
+        assert task_acl.can_view({"title": "old"}, "u1") is None
+
+
+class TestRecompute:
+    def test_project_recompute_rewrites_stale_tasks(self):
+        db, tasks = _db(members={"p1": ["u1", "u2"]})
+        stale = _doc("t1", {"created_by": {"user_id": "u1"}, "project_id": "p1", "visible_to": ["u1"]})
+        current = _doc("t2", {"created_by": {"user_id": "u2"}, "project_id": "p1", "visible_to": ["u1", "u2"]})
+        tasks.where.return_value.select.return_value.stream.return_value = [stale, current]
+
+        assert task_acl.recompute_project(db, "p1") == 1
+
+        batch = db.batch.return_value
+        batch.update.assert_called_once_with(stale.reference, {"visible_to": ["u1", "u2"]})
+        batch.commit.assert_called_once()
+
+    def test_verify_reports_and_fixes(self):
+        db, tasks = _db()
+        good = _doc("t1", {"created_by": {"user_id": "u1"}, "visible_to": ["u1"]})
+        legacy = _doc("t2", {"created_by": {"user_id": "u2"}})
+        tasks.select.return_value.order_by.return_value.limit.return_value.stream.return_value = [good, legacy]
+
+        assert task_acl.verify(db) == [("t2", None, ["u2"])]
+        db.batch.return_value.commit.assert_not_called()
+
+        assert task_acl.verify(db, fix=True) == [("t2", None, ["u2"])]
+        db.batch.return_value.update.assert_called_with(legacy.reference, {"visible_to": ["u2"]})
+        db.batch.return_value.commit.assert_called_once()
+        # Only the fixing pass records the completed backfill
+        marker = db.collection("migrations").document.return_value
+        marker.set.assert_called_once()
+        assert "completed_at" in marker.set.call_args[0][0]
+
+
+class TestBackfill:
+    def test_flag_is_read_until_the_backfill_completed(self):
+        db, _ = _db()
+        marker = db.collection("migrations").document.return_value
+        marker.get.return_value = _doc("task_acl", None, exists=False)
+
+        assert task_acl.is_backfilled(db) is False
+        marker.get.return_value = _doc("task_acl", {"completed_at": "2025-01-01T00:00:00+00:00"})
+        assert task_acl.is_backfilled(db) is True
+        assert task_acl.is_backfilled(db) is True
+        assert marker.get.call_count == 2
+
+    def test_legacy_queries_cover_each_rule(self):
+        db, tasks = _db()
+        db.collection("users").where.return_value.select.return_value.stream.return_value = [_doc("s1", {})]
+
+        labels = [label for label, _ in task_acl.legacy_visible_queries(db, "m1", "manager", [f"p{i}" for i in range(12)])]
+
+        assert labels == ["created_by", "assigned_to", "member_projects[0]", "member_projects[1]",
+                          "team_created_by[0]", "team_assigned_to[0]"]
+        chunks = [c.kwargs["filter"].value for c in tasks.where.call_args_list if c.kwargs["filter"].op == "in"]
+        assert [len(chunks[0]), len(chunks[1])] == [10, 2]
+
+    def test_staff_get_no_team_queries(self):
+        db, _ = _db()
+
+        labels = [label for label, _ in task_acl.legacy_visible_queries(db, "s1", "staff", [])]
+
+        assert labels == ["created_by", "assigned_to"]
+        db.collection("users").where.assert_not_called()
+
+
+def _change(doc_id, data, kind="MODIFIED"):
+    change = Mock()
+    change.document = _doc(doc_id, data)
+    change.type.name = kind
+    return change
+
+
+class TestPropagator:
+    def test_first_snapshots_only_prime(self):
+        propagator = task_acl.AclPropagator()
+        propagator.enqueue = Mock()
+
+        propagator._on_memberships(None, [_change("p1_u1", {"project_id": "p1"}, "ADDED")], None)
+        propagator._on_users(None, [_change("u1", {"manager_id": "m1"}, "ADDED")], None)
+
+        propagator.enqueue.assert_not_called()
+
+    def test_changes_enqueue_jobs(self):
+        propagator = task_acl.AclPropagator()
+        propagator._on_memberships(None, [], None)
+        propagator._on_users(None, [_change("u1", {"manager_id": "m1"}, "ADDED")], None)
+        propagator.enqueue = Mock()
+
+        propagator._on_memberships(None, [_change("p1_u2", {"project_id": "p1"}, "REMOVED")], None)
+        propagator._on_users(None, [_change("u1", {"manager_id": "m1", "name": "New"})], None)
+        propagator._on_users(None, [_change("u1", {"manager_id": "m2"})], None)
+
+        assert [c.args for c in propagator.enqueue.call_args_list] == [("project", "p1"), ("user", "u1")]
+
+    def test_role_changes_enqueue_reports_jobs(self):
+        propagator = task_acl.AclPropagator()
+        propagator._on_users(None, [_change("m1", {"role": "staff"}, "ADDED")], None)
+        propagator.enqueue = Mock()
+
+        propagator._on_users(None, [_change("m1", {"role": "manager"})], None)
+        propagator._on_users(None, [_change("m1", {"role": "director"})], None)
+        propagator._on_users(None, [_change("m1", {"role": "staff"})], None)
+
+        assert [c.args for c in propagator.enqueue.call_args_list] == [("reports", "m1"), ("reports", "m1")]
+
+    def test_reports_job_recomputes_each_report(self, monkeypatch):
+        db, _ = _db()
+        team = db.collection("users").where.return_value.select.return_value
+        team.stream.return_value = [_doc("s1", {}), _doc("s2", {})]
+        recompute_user = Mock(return_value=1)
+        monkeypatch.setattr(task_acl, "recompute_user", recompute_user)
+        propagator = task_acl.AclPropagator()
+        propagator._db = db
+
+        assert propagator.run_job(("reports", "m1")) == 2
+        assert [c.args[1] for c in recompute_user.call_args_list] == ["s1", "s2"]
+        assert db.collection("users").where.call_args.kwargs["filter"].value == "m1"
+
+    def test_pending_jobs_are_deduplicated(self):
+        propagator = task_acl.AclPropagator()
+
+        propagator.enqueue("project", "p1")
+        propagator.enqueue("project", "p1")
+        propagator.enqueue("project", None)
+
+        assert propagator._jobs.qsize() == 1
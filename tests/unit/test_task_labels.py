@@ -0,0 +1,211 @@
+"""Unit tests for label assignment and the label -> tasks listing in backend/api/labels.py"""
+from unittest.mock import Mock
+
+from google.api_core.exceptions import AlreadyExists, NotFound
+
+from conftest import fake_get_all
+from backend.api import labels as labels_module
+
+
+def _doc(doc_id, data=None):
+    doc = Mock()
+    doc.id = doc_id
+    doc.exists = data is not None
+    doc.to_dict.return_value = data
+    doc.reference = f"ref:{doc_id}"
+    return doc
+
+
+class _Db:
+    """Mock db whose collections are Mocks kept by name; refs are named 'coll/id'."""
+
+    def __init__(self):
+        self.db = Mock()
+        self.db.get_all.side_effect = fake_get_all
+        self.colls = {}
+        self.db.collection.side_effect = self.coll
+        self.batch = self.db.batch.return_value
+
+    def coll(self, name):
+        if name not in self.colls:
+            coll = Mock()
+
+            def document(doc_id=None, name=name):
+                ref = Mock()
+                ref.id = doc_id
+                ref.path = f"{name}/{doc_id}"
+                return ref
+            coll.document.side_effect = document
+            self.colls[name] = coll
+        return self.colls[name]
+
+    def writes(self, method):
+        return [(c.args[0].path, c.args[1] if len(c.args) > 1 else None)
+                for c in getattr(self.batch, method).call_args_list]
+
+
+class TestAssign:
+    def test_assign_is_one_batch(self, client, monkeypatch):
+        fake = _Db()
+        monkeypatch.setattr(labels_module.firestore, "client", Mock(return_value=fake.db))
+
+        response = client.post("/api/labels/assign", json={"task_id": "t1", "label_id": "l1"})
+
+        assert response.status_code == 200
+        [(path, mapping)] = fake.writes("create")
+        assert path == "task_labels/t1_l1"
+        assert mapping["task_id"] == "t1" and mapping["label_id"] == "l1"
+        assert fake.writes("update") == [
+            ("tasks/t1", {"labels": ["l1"]}),
+            ("labels/l1", {"task_count": 1}),
+        ]
+        fake.batch.commit.assert_called_once()
+
+    def test_assign_twice_is_a_noop(self, client, monkeypatch):
+        fake = _Db()
+        fake.batch.commit.side_effect = AlreadyExists("exists")
+        monkeypatch.setattr(labels_module.firestore, "client", Mock(return_value=fake.db))
+
+        response = client.post("/api/labels/assign", json={"task_id": "t1", "label_id": "l1"})
+
+        assert response.status_code == 200
+        assert response.get_json()["message"] == "Label already assigned to task"
+
+    def test_assign_missing_task_or_label(self, client, monkeypatch):
+        fake = _Db()
+        fake.batch.commit.side_effect = NotFound("missing")
+        monkeypatch.setattr(labels_module.firestore, "client", Mock(return_value=fake.db))
+
+        response = client.post("/api/labels/assign", json={"task_id": "t1", "label_id": "nope"})
+
+        assert response.status_code == 404
+
+    def test_assign_requires_ids(self, client, monkeypatch):
+        fake = _Db()
+        monkeypatch.setattr(labels_module.firestore, "client", Mock(return_value=fake.db))
+
+        response = client.post("/api/labels/assign", json={"task_id": "t1"})
+
+        assert response.status_code == 400
+        fake.batch.commit.assert_not_called()
+
+
+class TestUnassign:
+    def test_unassign_is_one_conditional_batch(self, client, monkeypatch):
+        fake = _Db()
+        monkeypatch.setattr(labels_module.firestore, "client", Mock(return_value=fake.db))
+
+        response = client.post("/api/labels/unassign", json={"task_id": "t1", "label_id": "l1"})
+
+        assert response.status_code == 200
+        delete = fake.batch.delete.call_args
+        assert delete.args[0].path == "task_labels/t1_l1"
+        fake.db.write_option.assert_called_once_with(exists=True)
+        assert delete.kwargs["option"] is fake.db.write_option.return_value
+        assert fake.writes("update") == [
+            ("tasks/t1", {"labels": ["l1"]}),
+            ("labels/l1", {"task_count": -1}),
+        ]
+        fake.batch.commit.assert_called_once()
+
+    def test_unassign_when_not_assigned(self, client, monkeypatch):
+        fake = _Db()
+        fake.batch.commit.side_effect = NotFound("missing")
+        monkeypatch.setattr(labels_module.firestore, "client", Mock(return_value=fake.db))
+
+        response = client.post("/api/labels/unassign", json={"task_id": "t1", "label_id": "l1"})
+
+        assert response.status_code == 200
+        assert response.get_json()["ok"] is True
+
+
+class TestListLabelTasks:
+    def _setup(self, fake, mappings, tasks):
+        fake.coll("task_labels").where.return_value.order_by.return_value.limit.return_value \
+            .stream.return_value = [_doc(f"{t}_l1", {"task_id": t, "label_id": "l1"}) for t in mappings]
+
+        def task_ref(doc_id=None):
+            ref = Mock()
+            ref.get.return_value = _doc(doc_id, tasks.get(doc_id))
+            return ref
+        fake.coll("tasks").document.side_effect = task_ref
+
+    def test_lists_tasks_from_mappings(self, client, monkeypatch):
+        fake = _Db()
+        self._setup(fake, ["t1", "t2", "gone"], {"t1": {"title": "One"}, "t2": {"title": "Two"}})
+        monkeypatch.setattr(labels_module.firestore, "client", Mock(return_value=fake.db))
+
+        response = client.get("/api/labels/l1/tasks")
+
+        assert response.status_code == 200
+        assert [t["title"] for t in response.get_json()] == ["One", "Two"]
+        flt = fake.coll("task_labels").where.call_args.kwargs["filter"]
+        assert (flt.field_path, flt.op, flt.value) == ("label_id", "==", "l1")
+        fake.coll("tasks").stream.assert_not_called()
+        fake.coll("tasks").where.assert_not_called()
+
+    def test_next_cursor_header(self, client, monkeypatch):
+        fake = _Db()
+        self._setup(fake, ["t1", "t2"], {"t1": {"title": "One"}, "t2": {"title": "Two"}})
+        monkeypatch.setattr(labels_module.firestore, "client", Mock(return_value=fake.db))
+
+        response = client.get("/api/labels/l1/tasks?limit=1")
+
+        assert response.status_code == 200
+        assert len(response.get_json()) == 1
+        assert "X-Next-Cursor" in response.headers
+
+    def test_invalid_cursor(self, client, monkeypatch):
+        fake = _Db()
+        monkeypatch.setattr(labels_module.firestore, "client", Mock(return_value=fake.db))
+
+        response = client.get("/api/labels/l1/tasks?cursor=%%%")
+
+        assert response.status_code == 400
+
+
+class TestUsageCounts:
+    def test_new_task_labels_skip_unknown_ids(self):
+        fake = _Db()
+
+        def label_ref(doc_id=None):
+            ref = Mock()
+            ref.id = doc_id
+            ref.path = f"labels/{doc_id}"
+            ref.get.return_value = _doc(doc_id, {"name": "Urgent"} if doc_id == "l1" else None)
+            return ref
+        fake.coll("labels").document.side_effect = label_ref
+
+        labels_module.assign_to_new_task(fake.db, "t1", ["l1", "l1", "urgent"])
+
+        assert [path for path, _ in fake.writes("create")] == ["task_labels/t1_l1"]
+        assert fake.writes("update") == [("labels/l1", {"task_count": 1})]
+        fake.batch.commit.assert_called_once()
+
+    def test_release_mappings_groups_by_label(self):
+        fake = _Db()
+        writer = Mock()
+
+        labels_module.release_mappings(writer, fake.db, [{"label_id": "l1"}, {"label_id": "l2"}, {"label_id": "l1"}, {}])
+
+        assert [(c.args[0].path, c.args[1], c.kwargs) for c in writer.set.call_args_list] == [
+            ("labels/l1", {"task_count": -2}, {"merge": True}),
+            ("labels/l2", {"task_count": -1}, {"merge": True}),
+        ]
+
+    def test_rebuild_usage(self):
+        fake = _Db()
+        fake.coll("labels").select.return_value.stream.return_value = [_doc("l1", {}), _doc("l2", {})]
+        fake.coll("tasks").select.return_value.order_by.return_value.limit.return_value.stream.return_value = [
+            _doc("t1", {"labels": ["l1", "ghost"]}),
+            _doc("t2", {"labels": ["l1"]}),
+        ]
+        fake.coll("task_labels").select.return_value.stream.return_value = [
+            _doc("t1_l1", {}), _doc("t3_l2", {}),
+        ]
+
+        assert labels_module.rebuild_usage(fake.db) == {"l1": 2, "l2": 0}
+
+        assert sorted(path for path, _ in fake.writes("set")) == ["task_labels/t1_l1", "task_labels/t2_l1"]
+        assert [c.args[0] for c in fake.batch.delete.call_args_list] == ["ref:t3_l2"]
+        assert sorted(fake.writes("update")) == [("labels/l1", {"task_count": 2}), ("labels/l2", {"task_count": 0})]
@@ -10,6 +10,7 @@ fake_firestore = sys.modules.get("firebase_admin.firestore")
 from flask import Flask
 from backend.api import tasks_bp
 from backend.api import tasks as tasks_module
+from backend.api.pagination import decode_cursor
 
 
 # app and client fixtures provided by conftest.py
@@ -241,6 +242,7 @@ class TestCreateTask:
         assert data["priority"] == "Medium"
         assert data["status"] == "To Do"
         assert mock_task_ref.set.called
+        assert mock_task_ref.set.call_args[0][0]["participant_ids"] == ["user1"]
         
     def test_create_task_success_complete(self, client, mock_db, monkeypatch):
         """Test creating task with all fields"""
@@ -285,6 +287,7 @@ class TestCreateTask:
             elif name == "memberships":
                 memberships_collection = Mock()
                 memberships_collection.document.return_value.get.return_value = mock_membership_doc
+                memberships_collection.where.return_value.stream.return_value = []
                 return memberships_collection
             return Mock()
         
@@ -425,6 +428,7 @@ class TestCreateTask:
             elif name == "memberships":
                 memberships_collection = Mock()
                 memberships_collection.document.return_value.get.return_value = mock_membership_doc
+                memberships_collection.where.return_value.stream.return_value = []
                 return memberships_collection
             return Mock()
         
@@ -589,7 +593,7 @@ class TestListTasks:
         }
         
         mock_query = Mock()
-        mock_query.limit.return_value.stream.return_value = [mock_doc1, mock_doc2]
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.return_value = [mock_doc1, mock_doc2]
         mock_db.collection.return_value.where.return_value = mock_query
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -603,6 +607,31 @@ class TestListTasks:
         assert data[0]["task_id"] == "task1"
         assert data[1]["task_id"] == "task2"
         
+    def test_list_tasks_fields_param(self, client, mock_db, monkeypatch):
+        """?fields= trims each row and narrows the select() projection"""
+        mock_doc = Mock()
+        mock_doc.id = "task1"
+        mock_doc.to_dict.return_value = {
+            "title": "Task 1",
+            "description": "Long description",
+            "created_by": {"user_id": "user1"},
+            "created_at": "2024-01-02T00:00:00+00:00",
+            "status": "To Do"
+        }
+        
+        mock_query = Mock()
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.return_value = [mock_doc]
+        mock_db.collection.return_value.where.return_value = mock_query
+        
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        
+        response = client.get("/api/tasks?fields=title,status", headers={"X-User-Id": "user1"})
+        
+        assert response.status_code == 200
+        assert response.get_json() == [{"task_id": "task1", "title": "Task 1", "status": "To Do"}]
+        projection = mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.call_args[0][0]
+        assert set(projection) == {"title", "status", "archived", "created_at", "tags"}
+        
     def test_list_tasks_no_viewer_id(self, client, mock_db, monkeypatch):
         """Test error when viewer_id is not provided"""
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -616,7 +645,7 @@ class TestListTasks:
     def test_list_tasks_with_project_filter(self, client, mock_db, monkeypatch):
         """Test filtering tasks by project_id"""
         mock_query = Mock()
-        mock_query.limit.return_value.stream.return_value = []
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.return_value = []
         
         # Track where calls
         where_calls = []
@@ -641,7 +670,7 @@ class TestListTasks:
     def test_list_tasks_with_assigned_to_filter(self, client, mock_db, monkeypatch):
         """Test filtering tasks by assigned_to_id"""
         mock_query = Mock()
-        mock_query.limit.return_value.stream.return_value = []
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.return_value = []
         
         where_calls = []
         def track_where(field=None, op=None, value=None, filter=None):
@@ -662,9 +691,9 @@ class TestListTasks:
         assert ("assigned_to.user_id", "==", "user2") in where_calls
         
     def test_list_tasks_with_label_filter(self, client, mock_db, monkeypatch):
-        """Test filtering tasks by label_id"""
+        """Test filtering tasks by label_id (admins filter in the query)"""
         mock_query = Mock()
-        mock_query.limit.return_value.stream.return_value = []
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.return_value = []
         
         where_calls = []
         def track_where(field=None, op=None, value=None, filter=None):
@@ -677,13 +706,48 @@ class TestListTasks:
         mock_query.where = track_where
         
         mock_db.collection.return_value.where.return_value = mock_query
+        viewer_doc = mock_db.collection.return_value.document.return_value.get.return_value
+        viewer_doc.exists = True
+        viewer_doc.to_dict.return_value = {"role": "admin"}
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        mock_db.collection.return_value.where = track_where
         
         response = client.get("/api/tasks?label_id=bug", headers={"X-User-Id": "user1"})
         
         assert response.status_code == 200
         assert ("tags", "array_contains", "bug") in where_calls
         
+    def test_list_tasks_label_filter_on_visible_to_query(self, client, mock_db, monkeypatch):
+        """Non-admins filter labels after the visible_to array_contains query"""
+        tagged, other = Mock(), Mock()
+        tagged.id, other.id = "task1", "task2"
+        tagged.to_dict.return_value = {"title": "Bug", "tags": ["bug"], "created_at": "2"}
+        other.to_dict.return_value = {"title": "Other", "tags": ["ui"], "created_at": "1"}
+        mock_query = Mock()
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.return_value = [tagged, other]
+        
+        where_calls = []
+        def track_where(field=None, op=None, value=None, filter=None):
+            if filter is not None:
+                field = getattr(filter, "field_path", field)
+                op = getattr(filter, "op", op)  # Changed from op_string to op
+                value = getattr(filter, "value", value)
+            where_calls.append((field, op, value))
+            return mock_query
+        mock_query.where = track_where
+        
+        mock_db.collection.return_value.where.return_value = mock_query
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        
+        mock_db.collection.return_value.where = track_where
+        
+        response = client.get("/api/tasks?label_id=bug", headers={"X-User-Id": "user1"})
+        
+        assert response.status_code == 200
+        assert [t["task_id"] for t in response.get_json()] == ["task1"]
+        assert ("visible_to", "array_contains", "user1") in where_calls
+        assert ("tags", "array_contains", "bug") not in where_calls
+        
     def test_list_tasks_with_limit(self, client, mock_db, monkeypatch):
         """Test limiting number of tasks returned"""
         # Create more docs than limit
@@ -698,7 +762,7 @@ class TestListTasks:
             docs.append(mock_doc)
         
         mock_query = Mock()
-        mock_query.limit.return_value.stream.return_value = docs
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.return_value = docs
         mock_db.collection.return_value.where.return_value = mock_query
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -708,11 +772,59 @@ class TestListTasks:
         assert response.status_code == 200
         data = response.get_json()
         assert len(data) == 5
+        # The page is the 5 newest, and the cursor resumes after the last of them
+        assert [t["task_id"] for t in data] == ["task8", "task7", "task6", "task5", "task4"]
+        assert decode_cursor(response.headers["X-Next-Cursor"]) == ["2024-01-05T00:00:00+00:00", "task4"]
+        mock_query.order_by.assert_called_with("created_at", direction="DESCENDING")
+        mock_query.order_by.return_value.order_by.assert_called_with("__name__", direction="DESCENDING")
+        mock_query.order_by.return_value.order_by.return_value.limit.assert_called_with(6)
+    
+    def test_list_tasks_cursor_resumes_after_last_id(self, client, mock_db, monkeypatch):
+        """Test that ?cursor= positions every query after the previous page"""
+        from backend.api.pagination import encode_cursor
+        mock_query = Mock()
+        page = mock_query.order_by.return_value.order_by.return_value.start_after.return_value
+        page.limit.return_value.select.return_value.stream.return_value = []
+        mock_db.collection.return_value.where.return_value = mock_query
+        
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        
+        response = client.get(f"/api/tasks?cursor={encode_cursor(['2024-01-05T00:00', 'task4'])}",
+                              headers={"X-User-Id": "user1"})
+        
+        assert response.status_code == 200
+        assert "X-Next-Cursor" not in response.headers
+        position = mock_query.order_by.return_value.order_by.return_value.start_after.call_args[0][0]
+        assert position == {"created_at": "2024-01-05T00:00",
+                            "__name__": mock_db.collection.return_value.document.return_value}
+        mock_db.collection.return_value.document.assert_any_call("task4")
+    
+    def test_list_tasks_failed_query_is_an_error(self, client, mock_db, monkeypatch):
+        """A query that fails (e.g. a missing index) is not served as an empty list"""
+        mock_query = Mock()
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.side_effect = \
+            Exception("The query requires an index")
+        mock_db.collection.return_value.where.return_value = mock_query
+        
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        
+        response = client.get("/api/tasks", headers={"X-User-Id": "user1"})
+        
+        assert response.status_code == 500
+        assert "requires an index" in response.get_json()["error"]
+    
+    def test_list_tasks_invalid_cursor(self, client, mock_db, monkeypatch):
+        """Test that a malformed cursor is rejected"""
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        
+        response = client.get("/api/tasks?cursor=not-a-cursor", headers={"X-User-Id": "user1"})
+        
+        assert response.status_code == 400
         
     def test_list_tasks_invalid_limit(self, client, mock_db, monkeypatch):
         """Test that invalid limit defaults to 50"""
         mock_query = Mock()
-        mock_query.limit.return_value.stream.return_value = []
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.return_value = []
         mock_db.collection.return_value.where.return_value = mock_query
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -741,7 +853,7 @@ class TestListTasks:
         }
         
         mock_query = Mock()
-        mock_query.limit.return_value.stream.return_value = [mock_doc1, mock_doc2]
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.return_value = [mock_doc1, mock_doc2]
         mock_db.collection.return_value.where.return_value = mock_query
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -774,7 +886,7 @@ class TestListTasks:
         }
         
         mock_query = Mock()
-        mock_query.limit.return_value.stream.return_value = [mock_doc1, mock_doc2]
+        mock_query.order_by.return_value.order_by.return_value.limit.return_value.select.return_value.stream.return_value = [mock_doc1, mock_doc2]
         mock_db.collection.return_value.where.return_value = mock_query
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -788,6 +900,32 @@ class TestListTasks:
         assert len(data) == 1
         assert data[0]["task_id"] == "task1"
 
+    def test_list_tasks_reads_on_when_filters_leave_a_short_page(self, client, mock_db, monkeypatch):
+        """Archived tasks do not shorten the page: the next round fills it"""
+        def task(i, archived=False):
+            doc = Mock()
+            doc.id = f"task{i}"
+            doc.to_dict.return_value = {"title": f"T{i}", "archived": archived, "created_at": f"2024-01-0{i}"}
+            return doc
+
+        mock_query = Mock()
+        ordered = mock_query.order_by.return_value.order_by.return_value
+        ordered.limit.return_value.select.return_value.stream.return_value = [
+            task(9), task(8, archived=True), task(7, archived=True)]
+        ordered.start_after.return_value.limit.return_value.select.return_value.stream.return_value = [
+            task(6), task(5), task(4)]
+        mock_db.collection.return_value.where.return_value = mock_query
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+
+        response = client.get("/api/tasks?limit=2", headers={"X-User-Id": "user1"})
+
+        assert response.status_code == 200
+        assert [t["task_id"] for t in response.get_json()] == ["task9", "task6"]
+        assert decode_cursor(response.headers["X-Next-Cursor"]) == ["2024-01-06", "task6"]
+        # The second round starts after the last task the first one scanned
+        position = ordered.start_after.call_args[0][0]
+        assert position["created_at"] == "2024-01-08"
+
 
 class TestGetTask:
     """Test the get_task GET endpoint"""
@@ -815,6 +953,25 @@ class TestGetTask:
         assert data["task_id"] == "task123"
         assert data["title"] == "Test Task"
         
+    def test_get_task_checks_visible_to(self, client, mock_db, monkeypatch):
+        """Tasks with a visible_to list are authorized from the list alone"""
+        mock_doc = Mock()
+        mock_doc.exists = True
+        mock_doc.id = "task123"
+        mock_doc.to_dict.return_value = {
+            "title": "Test Task",
+            "created_by": {"user_id": "user1"},
+            "project_id": "proj1",
+            "visible_to": ["user1", "member1"],
+        }
+        
+        mock_db.collection.return_value.document.return_value.get.return_value = mock_doc
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+        
+        assert client.get("/api/tasks/task123", headers={"X-User-Id": "member1"}).status_code == 200
+        assert client.get("/api/tasks/task123", headers={"X-User-Id": "outsider"}).status_code == 404
+        mock_db.collection.return_value.where.assert_not_called()
+        
     def test_get_task_not_found(self, client, mock_db, monkeypatch):
         """Test error when task doesn't exist"""
         mock_doc = Mock()
@@ -855,22 +1012,14 @@ class TestUpdateTask:
         """Test successfully updating a task"""
         mock_ref = Mock()
         mock_doc = Mock()
+        mock_doc.id = "task123"
         mock_doc.exists = True
         mock_doc.to_dict.return_value = {
             "title": "Old Title",
             "created_by": {"user_id": "user1"}
         }
         
-        updated_doc = Mock()
-        updated_doc.id = "task123"
-        updated_doc.to_dict.return_value = {
-            "title": "New Title",
-            "description": "Updated",
-            "created_by": {"user_id": "user1"},
-            "priority": "High"
-        }
-        
-        mock_ref.get.side_effect = [mock_doc, updated_doc]
+        mock_ref.get.return_value = mock_doc
         mock_db.collection.return_value.document.return_value = mock_ref
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -884,7 +1033,43 @@ class TestUpdateTask:
         data = response.get_json()
         assert data["title"] == "New Title"
         mock_ref.update.assert_called_once()
+        # The response is built from the pre-update snapshot, not read back
+        mock_ref.get.assert_called_once()
         
+    def test_update_task_tags_returns_stored_version(self, client, mock_db, monkeypatch):
+        """A tag edit goes through a transaction; the response is read back for its version"""
+        mock_ref = Mock()
+        mock_doc = Mock()
+        mock_doc.id = "task123"
+        mock_doc.exists = True
+        mock_doc.to_dict.return_value = {"title": "Title", "tags": ["bug"], "created_by": {"user_id": "user1"}}
+        stored = Mock()
+        stored.id = "task123"
+        stored.exists = True
+        stored.to_dict.return_value = {"title": "Title", "tags": ["ui"], "created_by": {"user_id": "user1"}}
+        stored.update_time = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+        # Reads before and inside the transaction see the old task
+        reads = []
+
+        def get(transaction=None):
+            reads.append(transaction)
+            return stored if any(reads[:-1]) else mock_doc
+
+        mock_ref.get.side_effect = get
+        mock_db.collection.return_value.document.return_value = mock_ref
+
+        monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
+
+        response = client.put("/api/tasks/task123",
+                            headers={"X-User-Id": "user1"},
+                            json={"tags": ["ui"]})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["tags"] == ["ui"]
+        assert data["version"] == "2024-05-01T12:00:00+00:00"
+        mock_ref.update.assert_not_called()
+
     def test_update_task_no_viewer_id(self, client, mock_db, monkeypatch):
         """Test error when viewer_id is not provided"""
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -957,22 +1142,13 @@ class TestUpdateTask:
         """Test updating multiple fields"""
         mock_ref = Mock()
         mock_doc = Mock()
+        mock_doc.id = "task123"
         mock_doc.exists = True
         mock_doc.to_dict.return_value = {
             "created_by": {"user_id": "user1"}
         }
         
-        updated_doc = Mock()
-        updated_doc.id = "task123"
-        updated_doc.to_dict.return_value = {
-            "title": "New Title",
-            "description": "New Description",
-            "priority": "High",
-            "status": "Done",
-            "created_by": {"user_id": "user1"}
-        }
-        
-        mock_ref.get.side_effect = [mock_doc, updated_doc]
+        mock_ref.get.return_value = mock_doc
         mock_db.collection.return_value.document.return_value = mock_ref
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -993,6 +1169,7 @@ class TestUpdateTask:
         """Test edge case where doc.to_dict() might return None"""
         mock_ref = Mock()
         mock_doc = Mock()
+        mock_doc.id = "task123"
         mock_doc.exists = True
         
         # First call returns valid data for line 166 check
@@ -1007,14 +1184,7 @@ class TestUpdateTask:
         
         mock_doc.to_dict = to_dict_side_effect
         
-        updated_doc = Mock()
-        updated_doc.id = "task123"
-        updated_doc.to_dict.return_value = {
-            "title": "Title",
-            "created_by": {"user_id": "user1"}
-        }
-        
-        mock_ref.get.side_effect = [mock_doc, updated_doc]
+        mock_ref.get.return_value = mock_doc
         mock_db.collection.return_value.document.return_value = mock_ref
         
         monkeypatch.setattr(fake_firestore, "client", Mock(return_value=mock_db))
@@ -1489,6 +1659,9 @@ class TestTasksEdgeCasesForCoverage:
         
         assert response.status_code == 200
         mock_task_ref.update.assert_called_once()
+        # The canonical due_ts is written alongside, read as UTC
+        updates = mock_task_ref.update.call_args[0][0]
+        assert updates["due_ts"] == datetime(2025, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
 
 
 class TestHelperFunctionsDirectly:
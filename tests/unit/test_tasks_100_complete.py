@@ -232,6 +232,7 @@ class TestCanViewTask:
             mock_coll = Mock()
             if name == "memberships":
                 mock_coll.document.return_value.get.return_value = mock_membership
+                mock_coll.where.return_value.stream.return_value = []
             return mock_coll
         
         mock_db.collection = Mock(side_effect=collection_side_effect)
@@ -409,6 +410,7 @@ class TestCreateTask:
                 mock_coll.document.return_value = mock_ref
             elif name == "memberships":
                 mock_coll.document.return_value.get.return_value = mock_membership
+                mock_coll.where.return_value.stream.return_value = []
             elif name == "users":
                 mock_coll.document.return_value.get.return_value = mock_user
             return mock_coll
@@ -442,6 +444,7 @@ class TestCreateTask:
             mock_coll = Mock()
             if name == "memberships":
                 mock_coll.document.return_value.get.return_value = mock_membership
+                mock_coll.where.return_value.stream.return_value = []
             elif name == "users":
                 mock_coll.document.return_value.get.return_value = mock_user
             return mock_coll
@@ -527,6 +530,8 @@ class TestListTasks:
         mock_query = Mock()
         mock_query.where.return_value = mock_query
         mock_query.limit.return_value = mock_query
+        mock_query.select.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
         mock_query.stream.return_value = [mock_task]
         
         def collection_side_effect(name):
@@ -576,6 +581,8 @@ class TestListTasks:
         mock_query = Mock()
         mock_query.where.return_value = mock_query
         mock_query.limit.return_value = mock_query
+        mock_query.select.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
         mock_query.stream.return_value = [mock_task]
         
         def collection_side_effect(name):
@@ -620,6 +627,8 @@ class TestListTasks:
         mock_query = Mock()
         mock_query.where.return_value = mock_query
         mock_query.limit.return_value = mock_query
+        mock_query.select.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
         mock_query.stream.return_value = [mock_task]
         
         def collection_side_effect(name):
@@ -668,6 +677,8 @@ class TestListTasks:
         mock_query = Mock()
         mock_query.where.return_value = mock_query
         mock_query.limit.return_value = mock_query
+        mock_query.select.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
         mock_query.stream.return_value = [mock_task]
         
         def collection_side_effect(name):
@@ -732,6 +743,8 @@ class TestListTasks:
         mock_query = Mock()
         mock_query.where.return_value = mock_query
         mock_query.limit.return_value = mock_query
+        mock_query.select.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
         # Both tasks are in query results, but endpoint should filter out archived
         mock_query.stream.return_value = [mock_task1, mock_task2]
         
@@ -1192,7 +1205,41 @@ class TestSubtasks:
             headers={"X-User-Id": "user123"})
         
         assert response.status_code == 200
-        mock_subtask_ref.delete.assert_called_once()
+        mock_db.transaction.return_value.delete.assert_called_once_with(mock_subtask_ref)
+    
+    def test_complete_subtask_already_completed_keeps_counter(self, client, mock_db):
+        """Completing an already-completed subtask (e.g. a double click) does not move the counter"""
+        mock_task = Mock()
+        mock_task.exists = True
+        mock_task.to_dict.return_value = {"created_by": {"user_id": "user123"}}
+        
+        mock_subtask = Mock()
+        mock_subtask.exists = True
+        mock_subtask.to_dict.return_value = {"title": "Sub", "completed": True, "completed_at": "t0"}
+        
+        mock_task_ref = Mock()
+        mock_task_ref.get.return_value = mock_task
+        mock_subtask_ref = Mock()
+        mock_subtask_ref.get.return_value = mock_subtask
+        
+        def collection_side_effect(name):
+            mock_coll = Mock()
+            if name == "tasks":
+                mock_coll.document.return_value = mock_task_ref
+            elif name == "subtasks":
+                mock_coll.document.return_value = mock_subtask_ref
+            return mock_coll
+        
+        mock_db.collection = Mock(side_effect=collection_side_effect)
+        
+        response = client.patch("/api/tasks/task123/subtasks/sub123/complete",
+            headers={"X-User-Id": "user123"}, json={"completed": True})
+        
+        assert response.status_code == 200
+        assert response.get_json()["completed_at"] == "t0"
+        transaction = mock_db.transaction.return_value
+        mock_subtask_ref.get.assert_called_once_with(transaction=transaction)
+        transaction.update.assert_called_once_with(mock_subtask_ref, {"completed": True})
     
     def test_complete_subtask_success(self, client, mock_db):
         """Test completing a subtask"""
@@ -1631,6 +1678,7 @@ class TestProjectMembership:
                 mock_coll.document.return_value.get.return_value = mock_user
             elif name == "memberships":
                 mock_coll.document.return_value.get.return_value = mock_membership
+                mock_coll.where.return_value.stream.return_value = []
             elif name == "tasks":
                 mock_coll.document.return_value = mock_task_ref
             return mock_coll
@@ -1672,6 +1720,8 @@ class TestProjectMembership:
         mock_query = Mock()
         mock_query.where.return_value = mock_query
         mock_query.limit.return_value = mock_query
+        mock_query.select.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
         mock_query.stream.return_value = [mock_task]
         
         def collection_side_effect(name):
@@ -1682,6 +1732,7 @@ class TestProjectMembership:
                 mock_coll.document.return_value.get.return_value = mock_user
             elif name == "memberships":
                 mock_coll.document.return_value.get.return_value = mock_membership
+                mock_coll.where.return_value.stream.return_value = []
                 mock_empty = Mock()
                 mock_empty.where.return_value = mock_empty
                 mock_empty.stream.return_value = []
@@ -1718,6 +1769,8 @@ class TestProjectMembership:
         mock_query = Mock()
         mock_query.where.return_value = mock_query
         mock_query.limit.return_value = mock_query
+        mock_query.select.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
         mock_query.stream.return_value = [mock_task]
         
         def collection_side_effect(name):
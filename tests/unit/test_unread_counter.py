@@ -0,0 +1,61 @@
+"""Unit tests for backend/api/unread_counter.py"""
+from unittest.mock import Mock
+
+from backend.api import unread_counter
+
+
+def _doc(doc_id, data):
+    doc = Mock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return doc
+
+
+def _db(counter=None, unread=(), counters=()):
+    db = Mock()
+    notifications, counter_coll = Mock(), Mock()
+    snap = Mock(exists=counter is not None)
+    snap.to_dict.return_value = counter
+    counter_coll.document.return_value.get.return_value = snap
+    counter_coll.document.side_effect = None
+    counter_coll.select.return_value.stream.return_value = list(counters)
+    notifications.where.return_value.select.return_value.stream.return_value = list(unread)
+    db.collection.side_effect = lambda name: notifications if name == "notifications" else counter_coll
+    return db, notifications, counter_coll
+
+
+class TestUnreadCounter:
+    def test_add_merges_an_increment(self):
+        db, _, counters = _db()
+        writer = Mock()
+
+        unread_counter.add(writer, db, "u1", -2)
+
+        ref, data = writer.set.call_args[0]
+        assert ref is counters.document.return_value
+        counters.document.assert_called_with("u1")
+        assert data["unread"] == -2 and data["user_id"] == "u1"
+        assert writer.set.call_args.kwargs == {"merge": True}
+
+    def test_get_reads_one_document(self):
+        db, notifications, _ = _db(counter={"unread": 5})
+
+        assert unread_counter.get(db, "u1") == 5
+        notifications.where.assert_not_called()
+
+    def test_get_never_negative_or_missing(self):
+        assert unread_counter.get(_db(counter={"unread": -1})[0], "u1") == 0
+        assert unread_counter.get(_db()[0], "u1") == 0
+
+    def test_rebuild_recounts_and_resets(self):
+        unread = [_doc("n1", {"user_id": "u1"}), _doc("n2", {"user_id": "u1"}),
+                  _doc("n3", {"user_id": "u2"}), _doc("n4", {})]
+        db, notifications, _ = _db(unread=unread, counters=[_doc("u3", {})])
+
+        assert unread_counter.rebuild(db) == {"u1": 2, "u2": 1, "u3": 0}
+
+        where = notifications.where.call_args.kwargs["filter"]
+        assert (where.field_path, where.op, where.value) == ("read", "==", False)
+        writer = db.bulk_writer.return_value
+        assert sorted(c.args[1]["unread"] for c in writer.set.call_args_list) == [0, 1, 2]
+        writer.close.assert_called_once()
@@ -180,7 +180,7 @@ class TestCreateUser:
         assert "created_at" in data["user"]
         
         # Verify database calls
-        mock_db.collection.assert_called_with("users")
+        mock_db.collection.assert_any_call("users")
         mock_ref.set.assert_called_once()
         
     def test_create_user_email_lowercase(self, client, mock_db, monkeypatch):